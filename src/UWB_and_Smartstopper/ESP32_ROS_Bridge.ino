@@ -6,6 +6,7 @@
 #include <rcl/error_handling.h>
 #include <rclc/rclc.h>
 #include <rclc/executor.h>
+#include <rmw_microros/rmw_microros.h>
 
 #include <std_msgs/msg/string.h>
 #include <geometry_msgs/msg/point_stamped.h>
@@ -19,6 +20,9 @@
 #define RCCHECK(fn) { rcl_ret_t temp_rc = fn; if((temp_rc != RCL_RET_OK)){error_loop();}}
 #define RCSOFTCHECK(fn) { rcl_ret_t temp_rc = fn; if((temp_rc != RCL_RET_OK)){}}
 
+#define TIME_SYNC_TIMEOUT_MS 1000
+#define TIME_SYNC_PERIOD_MS 60000  // 에이전트 시각과 주기적으로 재동기화 (지연 추적용 원점 시각)
+
 // ROS2 객체들
 rcl_allocator_t allocator;
 rclc_support_t support;
@@ -43,6 +47,10 @@ std_msgs__msg__String track_stop_msg;
 char debug_buffer[256];
 char track_buffer[32];
 
+// 지연 추적: 태그별 시퀀스 번호 (frame_id "tag_<id>#<seq>")
+uint32_t tag_seq[128];
+unsigned long last_time_sync_ms = 0;
+
 // ---------- 에러 처리 ----------
 void error_loop() {
   while(1) {
@@ -119,15 +127,23 @@ void processMegaSerial() {
           // 파싱
           int tag_id = 0, x_cm = 0, y_cm = 0, z_cm = 0;
           if (sscanf(serialBuf + 2, "%d,%d,%d,%d", &tag_id, &x_cm, &y_cm, &z_cm) == 4) {
-            // frame_id에 태그 ID 포함
+            // frame_id에 태그 ID와 시퀀스 번호 포함
             char frame_id_buf[32];
-            snprintf(frame_id_buf, sizeof(frame_id_buf), "tag_%d", tag_id);
+            snprintf(frame_id_buf, sizeof(frame_id_buf), "tag_%d#%lu", tag_id,
+                     (unsigned long)(++tag_seq[tag_id & 0x7F]));
             
             // PointStamped 메시지 생성
             pos_msg.header.frame_id.data = frame_id_buf;
             pos_msg.header.frame_id.size = strlen(frame_id_buf);
-            pos_msg.header.stamp.sec = 0;  // 시간은 ROS2에서 자동 설정
-            pos_msg.header.stamp.nanosec = 0;
+            // 에이전트와 시각 동기화가 됐으면 측정 시각, 아니면 0 (ROS2 파서가 수신 시각으로 채움)
+            if (rmw_uros_epoch_synchronized()) {
+              int64_t now_ns = rmw_uros_epoch_nanos();
+              pos_msg.header.stamp.sec = (int32_t)(now_ns / 1000000000LL);
+              pos_msg.header.stamp.nanosec = (uint32_t)(now_ns % 1000000000LL);
+            } else {
+              pos_msg.header.stamp.sec = 0;
+              pos_msg.header.stamp.nanosec = 0;
+            }
             
             // cm를 m로 변환
             pos_msg.point.x = x_cm / 100.0;
@@ -187,8 +203,12 @@ void setup() {
   // 노드 생성
   RCCHECK(rclc_node_init_default(&node, "uwb_bridge_node", "", &support));
   
-  // Publisher 생성 - /uwb/pos
-  RCCHECK(rclc_publisher_init_default(
+  // 에이전트 시각 동기화 (실패해도 stamp 0으로 동작)
+  rmw_uros_sync_session(TIME_SYNC_TIMEOUT_MS);
+  last_time_sync_ms = millis();
+  
+  // Publisher 생성 - /uwb/pos (best-effort: 서버 QoS 레지스트리의 position 프로파일과 맞춤, 재전송 없이 최신 좌표만)
+  RCCHECK(rclc_publisher_init_best_effort(
     &pos_publisher,
     &node,
     ROSIDL_GET_MSG_TYPE_SUPPORT(geometry_msgs, msg, PointStamped),
@@ -253,6 +273,12 @@ void loop() {
   // Arduino Mega로부터 시리얼 데이터 처리
   processMegaSerial();
   
+  // 시각 동기화 갱신 (ESP32 클럭 드리프트 보정)
+  if (millis() - last_time_sync_ms > TIME_SYNC_PERIOD_MS) {
+    rmw_uros_sync_session(TIME_SYNC_TIMEOUT_MS);
+    last_time_sync_ms = millis();
+  }
+  
   // ROS2 executor 실행
   RCSOFTCHECK(rclc_executor_spin_some(&executor, RCL_MS_TO_NS(10)));
   
@@ -16,6 +16,7 @@ IPAddress secondaryDNS(8, 8, 4, 4);       // 보조 DNS (구글 DNS)
 
 // ====== 타이머 설정 ======
 #define TIMER_DURATION_MS 1200  
+#define HEARTBEAT_INTERVAL_MS 2000
 
 // ====== L298N 핀 설정 ======
 #define PWM_PIN  14  // ENA와 ENB 둘 다 연결 (공통 PWM)
@@ -250,6 +251,13 @@ void loop() {
   handleTCPServer();
   checkStopConditions();
   
+  // 하트비트 전송 (서버 측 스토퍼 관리자가 연결 생존 여부 판단에 사용)
+  static unsigned long last_heartbeat = 0;
+  if (client_connected && client && millis() - last_heartbeat > HEARTBEAT_INTERVAL_MS) {
+    last_heartbeat = millis();
+    client.println("HEARTBEAT");
+  }
+  
   // 상태 출력 (디버그용)
   static unsigned long last_status = 0;
   if (millis() - last_status > 5000) {  // 5초마다
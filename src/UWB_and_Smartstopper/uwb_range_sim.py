@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""UWB 거리 측정 시뮬레이터
+
+ArduinoMega.ino 의 앵커 배치(ANCHOR[] / anchor_H / TAG_Z_CM)와 참값 궤적으로부터
+앵커별 원시 거리(cm, uint16) 스트림을 태그 수천 개 단위로 한 번에(numpy 벡터 연산) 생성한다.
+가우시안 잡음, NLOS 양의 편향(지속 구간 포함), 응답 누락, 펌웨어가 따로 처리하는 >= 50000 값을 넣을 수 있고,
+펌웨어와 같은 삼변측량으로 'P,tag,x,y,z' 시리얼 출력을 만들어 필터/브리지 종단 테스트에 쓸 수 있다.
+
+사용 예:
+    python3 uwb_range_sim.py --tags 2000 --steps 600 --nlos-prob 0.05 --out ranges.npz --serial serial.txt
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+# ArduinoMega.ino 기본값 (cm)
+ANCHOR_HEIGHT_CM = 100.0
+TAG_Z_CM = 13.0
+ANCHORS_XY_CM = ((-70.0, -70.0), (100.0, 300.0), (270.0, -70.0))
+OVERFLOW_CM = 50000         # 펌웨어가 raw >= 50000 이면 마지막 정상 좌표를 다시 보냄
+UINT16_MAX = 65535
+FIRST_TAG_ID = 10           # 펌웨어 tracker 는 tag_id 10부터 사용
+AREA_CM = ((0.0, 0.0), (180.0, 180.0))
+
+
+def anchor_positions(anchors_xy: Sequence[Tuple[float, float]] = ANCHORS_XY_CM,
+                     height: float = ANCHOR_HEIGHT_CM) -> np.ndarray:
+    """앵커 좌표 (A, 3) - ANCHOR[] 와 같이 모든 앵커가 같은 높이"""
+    xy = np.asarray(anchors_xy, dtype=np.float64)
+    return np.column_stack([xy, np.full(len(xy), height)])
+
+
+@dataclass
+class NoiseModel:
+    """거리 측정 오차 모델 (cm, 확률은 측정 1회 기준)"""
+    sigma: float = 5.0              # 가우시안 잡음 표준편차
+    nlos_prob: float = 0.0          # LOS -> NLOS 전이 확률
+    nlos_stay: float = 0.8          # NLOS 상태가 다음 측정에도 유지될 확률 (가려짐이 몇 샘플 지속)
+    nlos_bias: float = 40.0         # NLOS 양의 편향 평균 (지수 분포)
+    dropout_prob: float = 0.0       # 앵커 응답 없음 (requestDistanceOnce 실패)
+    overflow_prob: float = 0.0      # 50000 이상 값 (펌웨어 특수 처리 대상)
+
+
+@dataclass
+class RangeBatch:
+    """시뮬레이션 결과 (N 태그, T 샘플, A 앵커)"""
+    t: np.ndarray               # (T,) 초
+    tag_ids: np.ndarray         # (N,)
+    truth: np.ndarray           # (N, T, 2) 참값 xy (cm)
+    ranges: np.ndarray          # (N, T, A) uint16 원시 거리 (cm), 누락 샘플은 0
+    ok: np.ndarray              # (N, T, A) 응답 수신 여부
+    nlos: np.ndarray            # (N, T, A) NLOS 여부
+    anchors: np.ndarray         # (A, 3)
+
+    def save(self, path: str):
+        np.savez_compressed(path, t=self.t, tag_ids=self.tag_ids, truth=self.truth, ranges=self.ranges,
+                            ok=self.ok, nlos=self.nlos, anchors=self.anchors)
+
+    @classmethod
+    def load(cls, path: str) -> 'RangeBatch':
+        with np.load(path) as data:
+            return cls(**{name: data[name] for name in data.files})
+
+
+def random_waypoint_trajectories(n_tags: int, n_steps: int, dt: float = 0.1, speed: float = 20.0,
+                                 area: Tuple[Tuple[float, float], Tuple[float, float]] = AREA_CM,
+                                 rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """랜덤 웨이포인트 이동 궤적 (N, T, 2) - 태그마다 영역 안 목표점으로 직진, 도착하면 새 목표점"""
+    rng = np.random.default_rng() if rng is None else rng
+    lo, hi = np.asarray(area[0], dtype=np.float64), np.asarray(area[1], dtype=np.float64)
+    pos = rng.uniform(lo, hi, size=(n_tags, 2))
+    goal = rng.uniform(lo, hi, size=(n_tags, 2))
+    step = speed * dt
+    out = np.empty((n_tags, n_steps, 2))
+    for k in range(n_steps):
+        out[:, k] = pos
+        delta = goal - pos
+        dist = np.hypot(delta[:, 0], delta[:, 1])
+        arrived = dist <= step
+        pos = np.where(arrived[:, None], goal, pos + delta * (step / np.maximum(dist, 1e-9))[:, None])
+        if arrived.any():
+            goal[arrived] = rng.uniform(lo, hi, size=(int(arrived.sum()), 2))
+    return out
+
+
+def _markov_nlos(shape: Tuple[int, int, int], model: NoiseModel, rng: np.random.Generator) -> np.ndarray:
+    """태그-앵커 쌍별 2상태(LOS/NLOS) 마르코프 연쇄, 시간축만 순차 계산"""
+    n, steps, a = shape
+    nlos = np.zeros(shape, dtype=bool)
+    if model.nlos_prob <= 0:
+        return nlos
+    u = rng.random(shape)
+    state = u[:, 0] < model.nlos_prob
+    nlos[:, 0] = state
+    for k in range(1, steps):
+        state = np.where(state, u[:, k] < model.nlos_stay, u[:, k] < model.nlos_prob)
+        nlos[:, k] = state
+    return nlos
+
+
+def simulate_ranges(truth: np.ndarray, anchors: np.ndarray, model: NoiseModel, dt: float = 0.1,
+                    tag_z: float = TAG_Z_CM, first_tag_id: int = FIRST_TAG_ID,
+                    rng: Optional[np.random.Generator] = None) -> RangeBatch:
+    """참값 궤적 (N, T, 2) -> 앵커별 원시 거리 스트림"""
+    rng = np.random.default_rng() if rng is None else rng
+    n, steps, _ = truth.shape
+    a = len(anchors)
+    shape = (n, steps, a)
+    # 3D 거리: 앵커 높이와 태그 높이 차 포함 (펌웨어 horizRadius 의 역)
+    dx = truth[:, :, None, 0] - anchors[None, None, :, 0]
+    dy = truth[:, :, None, 1] - anchors[None, None, :, 1]
+    dz = anchors[None, None, :, 2] - tag_z
+    dist = np.sqrt(dx * dx + dy * dy + dz * dz)
+    dist += rng.normal(0.0, model.sigma, shape) if model.sigma > 0 else 0.0
+    nlos = _markov_nlos(shape, model, rng)
+    if nlos.any():
+        dist += np.where(nlos, rng.exponential(model.nlos_bias, shape), 0.0)
+    ranges = np.clip(np.rint(dist), 0, UINT16_MAX).astype(np.uint16)
+    if model.overflow_prob > 0:
+        overflow = rng.random(shape) < model.overflow_prob
+        ranges[overflow] = rng.integers(OVERFLOW_CM, UINT16_MAX + 1, int(overflow.sum()), dtype=np.uint16)
+    ok = rng.random(shape) >= model.dropout_prob if model.dropout_prob > 0 else np.ones(shape, dtype=bool)
+    ranges[~ok] = 0
+    return RangeBatch(t=np.arange(steps) * dt, tag_ids=np.arange(first_tag_id, first_tag_id + n),
+                      truth=truth, ranges=ranges, ok=ok, nlos=nlos, anchors=np.asarray(anchors, dtype=np.float64))
+
+
+def trilaterate(ranges: np.ndarray, anchors: np.ndarray, tag_z: float = TAG_Z_CM) -> Tuple[np.ndarray, np.ndarray]:
+    """펌웨어 horizRadius + trilat2D 와 같은 계산을 일괄 적용 (앵커 1~3 사용), (xy (..., 2), 유효 여부) 반환"""
+    d = ranges.astype(np.float64)
+    dz = anchors[:3, 2] - tag_z
+    h2 = d[..., :3] ** 2 - dz ** 2
+    valid = (h2 > 0).all(axis=-1)
+    r2 = np.where(h2 > 0, h2, 0.0)
+    a = anchors[:3, :2]
+    A11, A12 = 2 * (a[1, 0] - a[0, 0]), 2 * (a[1, 1] - a[0, 1])
+    A21, A22 = 2 * (a[2, 0] - a[0, 0]), 2 * (a[2, 1] - a[0, 1])
+    b1 = (r2[..., 0] - r2[..., 1]) + (a[1, 0] ** 2 - a[0, 0] ** 2) + (a[1, 1] ** 2 - a[0, 1] ** 2)
+    b2 = (r2[..., 0] - r2[..., 2]) + (a[2, 0] ** 2 - a[0, 0] ** 2) + (a[2, 1] ** 2 - a[0, 1] ** 2)
+    det = A11 * A22 - A12 * A21
+    if abs(det) < 1e-6:
+        return np.zeros(d.shape[:-1] + (2,)), np.zeros(d.shape[:-1], dtype=bool)
+    x = (b1 * A22 - A12 * b2) / det
+    y = (A11 * b2 - b1 * A21) / det
+    return np.stack([x, y], axis=-1), valid
+
+
+def serial_lines(batch: RangeBatch, tag_z: float = TAG_Z_CM) -> Iterator[str]:
+    """Mega 시리얼 형식 'P,tag,x,y,z' 줄 (시각 순, 같은 시각은 태그 순)
+
+    필터 없이 삼변측량 결과를 그대로 내보내며, 누락/50000 이상 샘플은 펌웨어처럼
+    마지막 정상 좌표를 다시 보내고 정상 좌표가 아직 없으면 건너뛴다.
+    """
+    xy, valid = trilaterate(batch.ranges, batch.anchors, tag_z)
+    good = valid & batch.ok[..., :3].all(axis=-1) & (batch.ranges[..., :3] < OVERFLOW_CM).all(axis=-1)
+    last = np.zeros((len(batch.tag_ids), 2))
+    has_last = np.zeros(len(batch.tag_ids), dtype=bool)
+    z = int(tag_z)
+    for k in range(batch.ranges.shape[1]):
+        g = good[:, k]
+        last[g] = xy[g, k]
+        has_last |= g
+        # 펌웨어의 (int) 변환과 같게 0 방향으로 버림
+        out = np.trunc(last).astype(np.int64)
+        for tag, (x, y) in zip(batch.tag_ids[has_last], out[has_last]):
+            yield f'P,{tag},{x},{y},{z}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='UWB 앵커 거리 측정 시뮬레이터')
+    parser.add_argument('--tags', type=int, default=1000)
+    parser.add_argument('--steps', type=int, default=600)
+    parser.add_argument('--hz', type=float, default=10.0, help='태그별 측정 주기 (펌웨어 100ms)')
+    parser.add_argument('--speed', type=float, default=20.0, help='태그 이동 속도 (cm/s)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--anchor-height', type=float, default=ANCHOR_HEIGHT_CM)
+    parser.add_argument('--sigma', type=float, default=5.0)
+    parser.add_argument('--nlos-prob', type=float, default=0.0)
+    parser.add_argument('--nlos-stay', type=float, default=0.8)
+    parser.add_argument('--nlos-bias', type=float, default=40.0)
+    parser.add_argument('--dropout', type=float, default=0.0)
+    parser.add_argument('--overflow', type=float, default=0.0)
+    parser.add_argument('--out', help='결과 저장 (.npz)')
+    parser.add_argument('--serial', help="'P,tag,x,y,z' 시리얼 출력 파일")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    dt = 1.0 / args.hz
+    anchors = anchor_positions(height=args.anchor_height)
+    model = NoiseModel(sigma=args.sigma, nlos_prob=args.nlos_prob, nlos_stay=args.nlos_stay,
+                       nlos_bias=args.nlos_bias, dropout_prob=args.dropout, overflow_prob=args.overflow)
+
+    start = time.perf_counter()
+    truth = random_waypoint_trajectories(args.tags, args.steps, dt, args.speed, rng=rng)
+    batch = simulate_ranges(truth, anchors, model, dt, rng=rng)
+    elapsed = time.perf_counter() - start
+    samples = batch.ranges.size
+    print(f"[SIM] {args.tags} tags x {args.steps} steps x {len(anchors)} anchors = {samples} ranges "
+          f"in {elapsed:.2f}s ({samples / max(elapsed, 1e-9) / 1e6:.1f} M ranges/s)")
+    print(f"[SIM] NLOS {batch.nlos.mean() * 100:.1f}%, dropout {(~batch.ok).mean() * 100:.1f}%, "
+          f"overflow {(batch.ranges >= OVERFLOW_CM).mean() * 100:.2f}%")
+
+    xy, valid = trilaterate(batch.ranges, anchors)
+    usable = valid & batch.ok.all(axis=-1) & (batch.ranges < OVERFLOW_CM).all(axis=-1)
+    err = np.hypot(*(xy - batch.truth)[usable].T)
+    if err.size:
+        print(f"[SIM] raw trilateration error: median {np.median(err):.1f}cm, "
+              f"p95 {np.percentile(err, 95):.1f}cm ({usable.mean() * 100:.1f}% usable)")
+
+    if args.out:
+        batch.save(args.out)
+        print(f"[SIM] saved {args.out}")
+    if args.serial:
+        with open(args.serial, 'w') as f:
+            count = 0
+            for line in serial_lines(batch):
+                f.write(line + '\n')
+                count += 1
+        print(f"[SIM] wrote {count} serial lines to {args.serial}")
+
+
+if __name__ == "__main__":
+    main()
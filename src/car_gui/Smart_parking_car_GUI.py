@@ -1,81 +1,59 @@
 import sys
-import socket
-import json
+import time
 import threading
-from heapq import heappush, heappop
-from math import sqrt, atan2, degrees, sin, cos, radians
+from math import sqrt, sin, cos, radians
 import random
-from datetime import datetime
-from typing import List, Tuple, Optional
+from collections import deque
+from typing import List
 from PyQt5.QtWidgets import (
-    QApplication, QGraphicsScene, QGraphicsView, QGraphicsRectItem,
-    QGraphicsSimpleTextItem, QGraphicsEllipseItem, QGraphicsPolygonItem,
-    QPushButton, QWidget, QVBoxLayout, QHBoxLayout, QGraphicsItem,
-    QLineEdit, QLabel, QMessageBox, QGraphicsItemGroup, QFrame, QGraphicsObject
+    QApplication, QGraphicsScene, QGraphicsView,
+    QPushButton, QWidget, QHBoxLayout, QGraphicsItem,
+    QMessageBox, QGraphicsItemGroup, QFrame, QGraphicsObject, QGraphicsPathItem
 )
 from PyQt5.QtGui import (
     QBrush, QPainter, QPen, QColor, QPainterPath, QFont, QPolygonF,
-    QLinearGradient, QRadialGradient, QTransform, QFontMetrics
-)
-from PyQt5.QtCore import (
-    Qt, QPointF, QRectF, pyqtSignal, QTimer, QPropertyAnimation,
-    pyqtProperty, QEasingCurve, QParallelAnimationGroup
+    QLinearGradient, QRadialGradient, QPixmap
 )
+from PyQt5.QtCore import Qt, QPointF, QRectF, pyqtSignal, QTimer
+from route_planner import GridPlanner
+from distance_field import DistanceFields
+from occupancy_grid import OccupancyGrid
+from pose_interpolator import PoseInterpolator
+from route_geometry import RouteGeometry
+from map_tiles import TiledMapItem
+from car_session import shared_session, CH_WAYPOINTS, CH_POSITION
+try:
+    from parking_common.tracing import Tracer, mono_ns
+except ImportError:  # 관제 서버 공용 패키지(parking_common)가 없는 환경에서는 지연 추적 생략
+    Tracer = None
 class WaypointReceiver:
-    def __init__(self, host='0.0.0.0', port=9999):
+    # 관제 서버 수신 포트를 공유 차량 세션에 열고 waypoint/위치 채널만 구독
+    def __init__(self, host='0.0.0.0', port=9999, session=None):
         self.host = host
         self.port = port
-        self.server_socket = None
+        self.session = session
         self.running = False
         self.waypoint_callback = None
         self.position_callback = None
+        # 좌표 지연 추적 (관제 전송 → 수신은 여기서, 수신 → 화면 반영은 ParkingLotUI에서 기록)
+        self.tracer = Tracer('car_gui') if Tracer else None
         print(f"📡 Waypoint 및 위치 수신기 초기화됨. 수신 대기 주소: {self.host}:{self.port}")
     def set_waypoint_callback(self, callback_function):
         self.waypoint_callback = callback_function
     def set_position_callback(self, callback_function):
         self.position_callback = callback_function
     def start_receiver(self):
-        def server_thread():
-            try:
-                self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-                self.server_socket.bind((self.host, self.port))
-                self.server_socket.listen(5)
-                print(f"✅ 서버가 {self.host}:{self.port}에서 대기 중...")
-                self.running = True
-                while self.running:
-                    try:
-                        client_socket, addr = self.server_socket.accept()
-                        print(f"🔗 클라이언트 연결됨: {addr}")
-                        self.handle_connection(client_socket)
-                    except Exception as e:
-                        if self.running:
-                            print(f"❌ 연결 오류: {e}")
-                        break
-            except Exception as e:
-                print(f"❌ 서버 시작 오류: {e}")
-        threading.Thread(target=server_thread, daemon=True).start()
-    def handle_connection(self, client_socket):
+        if self.running:
+            return
         try:
-            while self.running:
-                data = client_socket.recv(1024).decode('utf-8')
-                if not data:
-                    break
-                try:
-                    for chunk in data.strip().split('}{'):
-                        if not chunk.startswith('{'): chunk = '{' + chunk
-                        if not chunk.endswith('}'): chunk = chunk + '}'
-                        message = json.loads(chunk)
-                        self.process_waypoint_data(message)
-                        response = {"status": "received", "timestamp": datetime.now().isoformat()}
-                        client_socket.send(json.dumps(response).encode('utf-8'))
-                except json.JSONDecodeError:
-                    print(f"❌ 잘못된 JSON 데이터: {data}")
+            self.session = self.session or shared_session()
+            self.session.listen(self.port, self.host)
         except Exception as e:
-            print(f"❌ 데이터 수신 오류: {e}")
-        finally:
-            client_socket.close()
-            print("📱 클라이언트 연결 종료")
+            print(f"❌ 서버 시작 오류: {e}")
+            return
+        self.session.subscribe(CH_WAYPOINTS, self.process_waypoint_data)
+        self.session.subscribe(CH_POSITION, self.process_waypoint_data)
+        self.running = True
     def process_waypoint_data(self, data):
         msg_type = data.get('type')
         if msg_type == 'waypoint_assignment':
@@ -91,19 +69,25 @@ class WaypointReceiver:
             print(f"📍 실시간 위치 수신 - Tag {tag_id}: ({x}, {y})")
             if x is not None and y is not None:
                 position = [float(x), float(y)]
+                trace = self.record_receive(data.get('trace')) if self.tracer else None
                 if self.position_callback:
-                    self.position_callback(position)
+                    self.position_callback(position, trace)
             else:
                 print(f"❌ 잘못된 위치 데이터: x={x}, y={y}")
+    def record_receive(self, trace):
+        if not isinstance(trace, dict):
+            return None
+        trace['gui_recv_wall_ns'] = self.tracer.record_age('mgmt->gui', trace.get('sent_ns', 0))
+        trace['gui_recv_mono_ns'] = mono_ns()
+        return trace
     def stop(self):
+        if not self.running:
+            return
         print("🛑 Waypoint 수신기를 종료합니다...")
+        # 세션은 다른 화면과 공유하므로 구독만 해제 (포트와 연결은 유지)
         self.running = False
-        if self.server_socket:
-            try:
-                self.server_socket.shutdown(socket.SHUT_RDWR)
-            except OSError:
-                pass
-            self.server_socket.close()
+        self.session.unsubscribe(CH_WAYPOINTS, self.process_waypoint_data)
+        self.session.unsubscribe(CH_POSITION, self.process_waypoint_data)
 HYUNDAI_COLORS = {
     'primary': '#1a1a1a',
     'secondary': "#2d2d2d",
@@ -128,7 +112,11 @@ FONT_SIZES = {
     'map_label': 10, 'map_io_label': 12, 'map_waypoint_label': 12,
     'controls_title': 16, 'controls_info': 12, 'controls_button': 16, 'msgbox_button': 10
 }
+IDLE_DIRECTIONS = ("경로 설정 대기", "경로를 생성하세요", "목적지 도착", "출차 완료")
 class PremiumHudWidget(QFrame):
+    # 전환 중에만 최대 주기, 안내 중에는 방향 표시만 저속 갱신, 대기/숨김 시 정지
+    FULL_INTERVAL_MS, CRUISE_INTERVAL_MS = 50, 200
+    PAINT_STATS_EVERY = 0  # N 프레임마다 평균 paint 시간 출력 (0 = 끔)
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setFrameShape(QFrame.NoFrame)
@@ -149,7 +137,9 @@ class PremiumHudWidget(QFrame):
         self.progress = 0
         self.animation_timer = QTimer(self)
         self.animation_timer.timeout.connect(self.update_animation)
-        self.animation_timer.start(50)
+        self.static_layer = None
+        self.panel_cache = {}
+        self.paint_frames, self.paint_time_total, self.paint_time_last = 0, 0.0, 0.0
         self.rotation_angle = 0
         self.pulse_scale = 1.0
         self.pulse_growing = True
@@ -197,41 +187,134 @@ class PremiumHudWidget(QFrame):
                 'speed': random.uniform(0.3, 1.0), 'size': random.randint(1, 3),
                 'opacity': random.uniform(0.05, 0.15)
             })
+    def in_transition(self):
+        return self.direction_transition < 1.0
+    def schedule_animation(self):
+        if not self.isVisible() or (self.current_direction in IDLE_DIRECTIONS and not self.in_transition()):
+            self.animation_timer.stop()
+            return
+        interval = self.FULL_INTERVAL_MS if self.in_transition() else self.CRUISE_INTERVAL_MS
+        if not self.animation_timer.isActive() or self.animation_timer.interval() != interval:
+            self.animation_timer.start(interval)
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.schedule_animation()
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.animation_timer.stop()
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.static_layer = None
+        self.panel_cache.clear()
     def update_animation(self):
-        self.rotation_angle = (self.rotation_angle + 1) % 360
+        # 저속 주기에서도 회전/맥동 속도가 같도록 경과 틱 수만큼 진행
+        steps = self.animation_timer.interval() / self.FULL_INTERVAL_MS
+        self.rotation_angle = (self.rotation_angle + steps) % 360
         if self.pulse_growing:
-            self.pulse_scale += 0.01
-            if self.pulse_scale >= 1.05: self.pulse_growing = False
+            self.pulse_scale += 0.01 * steps
+            if self.pulse_scale >= 1.05: self.pulse_scale, self.pulse_growing = 1.05, False
         else:
-            self.pulse_scale -= 0.01
-            if self.pulse_scale <= 1.0: self.pulse_growing = True
+            self.pulse_scale -= 0.01 * steps
+            if self.pulse_scale <= 1.0: self.pulse_scale, self.pulse_growing = 1.0, True
         if self.glow_increasing:
-            self.glow_opacity += 0.02
+            self.glow_opacity += 0.02 * steps
             if self.glow_opacity >= 0.4: self.glow_increasing = False
         else:
-            self.glow_opacity -= 0.02
+            self.glow_opacity -= 0.02 * steps
             if self.glow_opacity <= 0.2: self.glow_increasing = True
-        for particle in self.particle_positions:
-            particle['y'] -= particle['speed']
-            if particle['y'] < 0:
-                particle['y'] = 700
-                particle['x'] = random.randint(0, 450)
-        if self.direction_transition < 1.0:
+        if self.in_transition():
+            for particle in self.particle_positions:
+                particle['y'] -= particle['speed']
+                if particle['y'] < 0:
+                    particle['y'] = 700
+                    particle['x'] = random.randint(0, 450)
             self.direction_transition = min(1.0, self.direction_transition + 0.1)
-        self.update()
+            self.update()
+        else:
+            self.update(self.panel_rects()['direction'])
+        self.schedule_animation()
+    def panel_rects(self):
+        cx = self.rect().width() // 2
+        return {
+            'direction': QRectF(cx - 92, 26, 184, 188).toAlignedRect(),
+            'distance': QRectF(cx - 152, 228, 304, 104).toAlignedRect(),
+            'speed': QRectF(cx - 85, 355, 170, 90).toAlignedRect(),
+            'progress': QRectF(cx - 177, 492, 354, 50).toAlignedRect(),
+            'next': QRectF(cx - 202, 538, 404, 84).toAlignedRect(),
+        }
+    def panel_keys(self):
+        arrived = "출차 완료" in self.current_direction or "목적지 도착" in self.current_direction
+        return {
+            'distance': (f"{self.current_distance:.1f}", self.current_distance <= 5, self.current_distance <= 20, self.current_direction),
+            'speed': (self.speed, arrived),
+            'progress': (round(self.progress, 1), arrived),
+            'next': (self.next_direction,),
+        }
+    def cached_panel(self, name, rect, key, draw):
+        # 상태 키가 같으면 이전에 그린 패널 pixmap 재사용
+        cached = self.panel_cache.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(int(rect.width() * ratio), int(rect.height() * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.translate(-rect.x(), -rect.y())
+        draw(painter)
+        painter.end()
+        self.panel_cache[name] = (key, pixmap)
+        return pixmap
+    def build_static_layer(self):
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(int(self.width() * ratio), int(self.height() * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        self.draw_decorative_elements(painter, self.rect())
+        painter.end()
+        self.static_layer = pixmap
     def paintEvent(self, event):
+        started = time.perf_counter()
         super().paintEvent(event)
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
         painter.setRenderHint(QPainter.SmoothPixmapTransform)
         rect, center_x = self.rect(), self.rect().width() // 2
+        dirty = event.rect()
+        rects, keys = self.panel_rects(), self.panel_keys()
         self.draw_background_effects(painter, rect)
-        self.draw_3d_direction_display(painter, center_x, 120)
-        self.draw_distance_panel(painter, center_x, 280)
-        self.draw_speed_gauge(painter, center_x, 400)
-        self.draw_progress_bar(painter, center_x, 500)
-        self.draw_next_instruction_card(painter, center_x, 580)
-        self.draw_decorative_elements(painter, rect)
+        if dirty.intersects(rects['direction']):
+            self.draw_3d_direction_display(painter, center_x, 120)
+        panels = (
+            ('distance', lambda p: self.draw_distance_panel(p, center_x, 280)),
+            ('speed', lambda p: self.draw_speed_gauge(p, center_x, 400)),
+            ('progress', lambda p: self.draw_progress_bar(p, center_x, 500)),
+            ('next', lambda p: self.draw_next_instruction_card(p, center_x, 580)),
+        )
+        for name, draw in panels:
+            if dirty.intersects(rects[name]):
+                painter.drawPixmap(rects[name].topLeft(), self.cached_panel(name, rects[name], keys[name], draw))
+        if self.static_layer is None:
+            self.build_static_layer()
+        painter.drawPixmap(0, 0, self.static_layer)
+        painter.end()
+        self.record_paint_time(time.perf_counter() - started)
+    def record_paint_time(self, elapsed):
+        self.paint_frames += 1
+        self.paint_time_total += elapsed
+        self.paint_time_last = elapsed
+        if self.PAINT_STATS_EVERY and self.paint_frames % self.PAINT_STATS_EVERY == 0:
+            print(f"⏱️ HUD paint: 평균 {self.paint_time_total / self.paint_frames * 1000:.2f}ms, "
+                  f"최근 {elapsed * 1000:.2f}ms ({self.paint_frames} 프레임)")
+    def refresh_changed_panels(self, old_keys):
+        # 값이 바뀐 패널 영역만 다시 그리도록 요청
+        rects = self.panel_rects()
+        for name, key in self.panel_keys().items():
+            if old_keys.get(name) != key:
+                self.update(rects[name])
     def draw_background_effects(self, painter, rect):
         painter.save()
         for particle in self.particle_positions:
@@ -462,10 +545,12 @@ class PremiumHudWidget(QFrame):
         painter.drawArc(rect.width()-35, rect.height()-35, corner_size, corner_size, 270*16, 90*16)
         painter.restore()
     def update_navigation_info(self, instructions, current_speed=0, route_progress=0):
+        old_keys = self.panel_keys()
         self.speed, self.progress = current_speed, route_progress
         if not instructions:
             self.current_direction, self.current_distance, self.next_direction = "경로를 생성하세요", 0.0, ""
             self.update()
+            self.schedule_animation()
             return
         direction, distance = instructions[0]
         is_turn_complete = ("좌회전" in direction or "우회전" in direction) and distance <= 1
@@ -501,7 +586,9 @@ class PremiumHudWidget(QFrame):
         new_direction = self.current_direction
         if new_direction != self.target_direction:
             self.previous_direction, self.target_direction, self.direction_transition = self.target_direction, new_direction, 0.0
-        self.update()
+            self.update(self.panel_rects()['direction'])
+        self.refresh_changed_panels(old_keys)
+        self.schedule_animation()
 class CarItem(QGraphicsObject):
     positionChanged = pyqtSignal(QPointF)
     def __init__(self, parent=None):
@@ -569,13 +656,36 @@ class CarItem(QGraphicsObject):
 class ParkingLotUI(QWidget):
     SCENE_W, SCENE_H = 2000, 2000
     CELL, MARGIN, PATH_WIDTH = 30, 10, 50
+    INFLATION = 0
     PIXELS_PER_METER = 50
     ENTRANCE = QPointF(200, 200)
+    REROUTE_DISTANCE = 100
+    REROUTE_INTERVAL, REROUTE_BACKOFF_MAX = 0.5, 8.0
+    DISPLAY_INTERVAL_MS = 16
+    PLAYOUT_DELAY = 0.15
+    SNAP_TO_ROUTE, SNAP_DISTANCE = True, 30
+    MANDATORY_WAYPOINT = [200, 925]
+    EXIT_POINT = [200, 200]
+    PARKING_WAYPOINTS = {
+        1: [200, 1475], 2: [550, 1475], 3: [850, 1475], 4: [1150, 1475],
+        5: [1450, 1475],
+        6: [1475, 1400], 7: [1475, 1000],
+        8: [1475, 925], 9: [1150, 925], 10: [850, 925], 11: [550, 925]
+    }
+    # 출차 시 일방통행(시계 방향) 순환을 따르기 위해 의무 경유지 전에 지나야 하는 차로 지점
+    EXIT_CIRCULATION = {
+        1: [], 2: [[200, 1475]], 3: [[200, 1475]], 4: [[200, 1475]], 5: [[200, 1475]],
+        6: [[1475, 1475], [200, 1475]], 7: [[1475, 925]],
+        8: [], 9: [], 10: [], 11: []
+    }
     newWaypointsReceived = pyqtSignal(list)
-    carPositionReceived = pyqtSignal(list)
-    def __init__(self):
-        super().__init__()
+    carPositionReceived = pyqtSignal(list, object)
+    distanceFieldsReady = pyqtSignal(object)
+    def __init__(self, parent=None, embedded=False):
+        super().__init__(parent)
         self.setWindowTitle("SmartParking Navigation System")
+        # embedded: 선호 정보 UI의 화면 스택에 미리 만들어 두는 경우 (시작 안내 대화상자 생략)
+        self.embedded = embedded
         self.initial_fit = False
         self.received_waypoints = []
         self.setup_styles()
@@ -590,6 +700,8 @@ class ParkingLotUI(QWidget):
     def init_ui(self):
         main_layout = QHBoxLayout(self)
         self.scene = QGraphicsScene(0, 0, self.SCENE_W, self.SCENE_H)
+        # 항목 수가 적고 차량/경로가 계속 바뀌므로 BSP 인덱스 갱신 비용을 피함
+        self.scene.setItemIndexMethod(QGraphicsScene.NoIndex)
         self.view = QGraphicsView(self.scene)
         self.view.setRenderHint(QPainter.Antialiasing)
         self.view.scale(1, -1)
@@ -601,15 +713,33 @@ class ParkingLotUI(QWidget):
         self.layer_static = QGraphicsItemGroup()
         self.layer_path = QGraphicsItemGroup()
         self.scene.addItem(self.layer_static)
+        # 정적 지도는 개별 항목 대신 줌 단계별 타일로 그림
+        self.map_tiles = TiledMapItem()
+        self.map_tiles.setParentItem(self.layer_static)
         self.scene.addItem(self.layer_path)
+        self.init_route_items()
         self.full_path_points = []
+        self.route_geometry = None
         self.snapped_waypoints = []
+        self.route_targets = []
+        self.route_target_index = 0
+        self.pose_received = False  # 실제 위치를 한 번이라도 받기 전에는 car.pos()가 (0, 0)이므로 재탐색하지 않음
+        self.reroute_backoff = self.REROUTE_INTERVAL
+        self.next_reroute_time = 0.0
         self.current_path_segment_index = 0
         self.is_exit_scenario = False
         self.car = CarItem()
-        self.car.positionChanged.connect(self.update_hud_from_car_position)
+        self.car.positionChanged.connect(self.mark_hud_dirty)
         self.scene.addItem(self.car)
         self.car.hide()
+        # 수신 샘플은 버퍼에만 넣고 차량 이동/HUD 갱신은 화면 주기 타이머에서 처리
+        self.pose_interpolator = PoseInterpolator(playout_delay=self.PLAYOUT_DELAY)
+        self.hud_dirty = False
+        self.last_display_pose = None
+        self.pending_traces = deque(maxlen=64)  # 아직 화면에 반영되지 않은 수신 샘플의 지연 추적 정보
+        self.display_timer = QTimer(self)
+        self.display_timer.timeout.connect(self.tick_display)
+        self.display_timer.start(self.DISPLAY_INTERVAL_MS)
         self.parking_spots = {}
         self.build_static_layout()
         self.build_occupancy()
@@ -621,11 +751,12 @@ class ParkingLotUI(QWidget):
         self.waypoint_receiver.set_waypoint_callback(self.handle_new_waypoints_from_thread)
         self.waypoint_receiver.set_position_callback(self.handle_new_position_from_thread)
         self.waypoint_receiver.start_receiver()
-        QMessageBox.information(self, "WiFi 수신기", f"서버가 {self.waypoint_receiver.host}:{self.waypoint_receiver.port}에서 시작되었습니다.\n관제 시스템의 연결을 기다립니다.")
+        if not self.embedded:
+            QMessageBox.information(self, "WiFi 수신기", f"서버가 {self.waypoint_receiver.host}:{self.waypoint_receiver.port}에서 시작되었습니다.\n관제 시스템의 연결을 기다립니다.")
     def handle_new_waypoints_from_thread(self, waypoints):
         self.newWaypointsReceived.emit(waypoints)
-    def handle_new_position_from_thread(self, position):
-        self.carPositionReceived.emit(position)
+    def handle_new_position_from_thread(self, position, trace=None):
+        self.carPositionReceived.emit(position, trace)
     def update_ui_with_waypoints(self, waypoints):
         if not waypoints or not isinstance(waypoints, list):
             QMessageBox.warning(self, "수신 오류", "잘못된 형식의 웨이포인트 데이터가 수신되었습니다.")
@@ -633,21 +764,52 @@ class ParkingLotUI(QWidget):
         self.received_waypoints = waypoints
         QMessageBox.information(self, "경로 자동 설정", f"새로운 경로가 수신되었습니다:\n{waypoints}\n\n자동으로 경로 안내를 시작합니다.")
         self.calculate_and_display_route()
-    def update_car_position_from_wifi(self, position: List[float]):
+    def update_car_position_from_wifi(self, position: List[float], trace=None):
         if not (isinstance(position, list) and len(position) == 2):
             return
-        new_pos = QPointF(position[0], position[1])
-        self.car.setPos(new_pos)
+        self.pose_interpolator.push(float(position[0]), float(position[1]))
+        self.pose_received = True
+        if trace: self.pending_traces.append(trace)
+    def mark_hud_dirty(self, _pos=None):
+        self.hud_dirty = True
+    def tick_display(self):
+        pose = self.pose_interpolator.sample()
+        # 보간 위치가 멈춘 뒤에는 손으로 옮긴 차량 위치를 덮어쓰지 않음
+        if pose is not None and pose != self.last_display_pose:
+            self.last_display_pose = pose
+            pos = self.snap_to_route(pose[0], pose[1]) if self.SNAP_TO_ROUTE else QPointF(pose[0], pose[1])
+            if pos != self.car.pos(): self.car.setPos(pos)
+        if self.pending_traces: self.record_render_latency()
+        if self.hud_dirty:
+            self.hud_dirty = False
+            self.update_hud_from_car_position(self.car.pos())
+    def record_render_latency(self):
+        # 보간 재생 시각(현재 - playout_delay)이 수신 시각을 지난 샘플은 이번 프레임에 반영된 것으로 기록
+        tracer = self.waypoint_receiver.tracer
+        playback_ns = mono_ns() - int(self.PLAYOUT_DELAY * 1e9)
+        while self.pending_traces and self.pending_traces[0]['gui_recv_mono_ns'] <= playback_ns:
+            trace = self.pending_traces.popleft()
+            tracer.record_since('gui', trace['gui_recv_mono_ns'])
+            tracer.record_age('origin->render', trace.get('origin_ns', 0))
+    def snap_to_route(self, x, y):
+        # 현재 구간 주변 선분에만 투영 (멀리 벗어난 위치는 그대로 두어 재탐색이 동작하도록)
+        hit = self.route_geometry.project(self.current_path_segment_index, x, y) if self.route_geometry else None
+        return QPointF(hit[0], hit[1]) if hit and hit[4] <= self.SNAP_DISTANCE else QPointF(x, y)
+    def set_route_targets(self, targets):
+        # 새 경로의 경유지 - 이전 경로의 재탐색 실패 대기도 초기화
+        self.route_targets = targets
+        self.route_target_index = 0
+        self.reroute_backoff = self.REROUTE_INTERVAL
+        self.next_reroute_time = 0.0
+    def set_route_points(self, pts):
+        # 경로가 바뀔 때만 누적 거리/회전 이벤트 계산
+        self.full_path_points = pts
+        self.route_geometry = RouteGeometry([(p.x(), p.y()) for p in pts], self.PIXELS_PER_METER)
+        self.current_path_segment_index = 0
     def detect_parking_spot_from_waypoint(self, waypoint):
         x, y = waypoint[0], waypoint[1]
-        parking_waypoints = {
-            1: [200, 1475], 2: [550, 1475], 3: [850, 1475], 4: [1150, 1475],
-            5: [1450, 1475],
-            6: [1475, 1400], 7: [1475, 1000],
-            8: [1475, 925], 9: [1150, 925], 10: [850, 925], 11: [550, 925]
-        }
         tolerance = 50
-        for spot_num, coord in parking_waypoints.items():
+        for spot_num, coord in self.PARKING_WAYPOINTS.items():
             if abs(x - coord[0]) <= tolerance and abs(y - coord[1]) <= tolerance:
                 return spot_num
         return None
@@ -698,7 +860,8 @@ class ParkingLotUI(QWidget):
         print(f"🗺️ 웨이포인트 경로 생성: {self.received_waypoints}")
         start_point = QPointF(200, 200)
         waypoints_qpoints = [QPointF(p[0], p[1]) for p in self.received_waypoints]
-        self.full_path_points = [start_point] + waypoints_qpoints
+        self.set_route_targets(waypoints_qpoints)
+        self.set_route_points(self.route_through(start_point, waypoints_qpoints) or [start_point] + waypoints_qpoints)
         if self.received_waypoints:
             last_waypoint = self.received_waypoints[-1]
             destination_parking_spot = self.detect_parking_spot_from_waypoint(last_waypoint)
@@ -712,9 +875,9 @@ class ParkingLotUI(QWidget):
             print(f"  {i+1}. ({point.x():.1f}, {point.y():.1f})")
         self.clear_path_layer()
         self.draw_straight_path(self.full_path_points)
-        self.current_path_segment_index = 0
         self.is_exit_scenario = False
         if not self.car.isVisible():
+            self.pose_interpolator.reset()
             self.car.setPos(start_point)
             self.car.show()
         self.update_hud_from_car_position(self.car.pos())
@@ -723,70 +886,62 @@ class ParkingLotUI(QWidget):
         if not self.initial_fit:
             self.view.fitInView(self.scene.sceneRect(), Qt.KeepAspectRatio)
             self.initial_fit = True
-    def closeEvent(self, event):
+    def shutdown(self):
+        self.display_timer.stop()
         self.waypoint_receiver.stop()
+        if self.waypoint_receiver.tracer: self.waypoint_receiver.tracer.export()
+    def closeEvent(self, event):
+        self.shutdown()
         super().closeEvent(event)
     def add_block(self, x, y, w, h, color, label=""):
-        r = QGraphicsRectItem(QRectF(x, y, w, h))
+        brush, pen = QBrush(color), QPen(QColor(255,255,255,100), 2)
         if "장애인" in label:
             gradient = QLinearGradient(x,y,x+w,y+h)
             gradient.setColorAt(0,QColor(135, 206, 250, 200))
             gradient.setColorAt(1,QColor(70, 130, 180,150))
-            r.setBrush(QBrush(gradient))
+            brush = QBrush(gradient)
         elif "전기차" in label:
             gradient = QLinearGradient(x,y,x+w,y+h)
             gradient.setColorAt(0,QColor(0,200,130,200))
             gradient.setColorAt(1,QColor(0,150,100,150))
-            r.setBrush(QBrush(gradient))
+            brush = QBrush(gradient)
         elif "일반" in label:
             gradient = QLinearGradient(x,y,x+w,y+h)
             gradient.setColorAt(0,QColor("#303030"))
             gradient.setColorAt(1,QColor("#303030"))
-            r.setBrush(QBrush(gradient))
-        else:
-            r.setBrush(QBrush(color))
+            brush = QBrush(gradient)
         if "장애인" in label or "전기" in label or "일반" in label:
             pen = QPen(QColor("white"), 20)
-            r.setPen(pen)
         elif label in ["백화점 본관 입구", "영화관 입구", "문화시설 입구"]:
             pen = QPen(QColor(255, 255, 0), 20)
-            r.setPen(pen)
         elif "입출차" in label:
-            r.setPen(QPen(Qt.NoPen))
-        else:
-            r.setPen(QPen(QColor(255,255,255,100), 2))
-        r.setParentItem(self.layer_static)
+            pen = QPen(Qt.NoPen)
+        r = self.map_tiles.add_rect(QRectF(x, y, w, h), brush, pen)
         if label:
-            t = QGraphicsSimpleTextItem(label)
-            t.setFlag(QGraphicsItem.ItemIgnoresTransformations, True)
-            t.setBrush(QColor(255,255,255))
             if label in ["백화점 본관 입구", "영화관 입구", "문화시설 입구"]:
                 font = QFont("Malgun Gothic", int(FONT_SIZES['map_label'] * 2.25), QFont.Bold)
                 if label == "백화점 본관 입구":
-                    t.setPos(x+w//2-50-310, y-20)
+                    pos = QPointF(x+w//2-50-310, y-20)
                 elif label == "영화관 입구":
-                    t.setPos(x+w+20, y+h-40)
+                    pos = QPointF(x+w+20, y+h-40)
                 elif label == "문화시설 입구":
-                    t.setPos(x+w+20, y+h-60)
+                    pos = QPointF(x+w+20, y+h-60)
             elif label in ["장애인", "전기", "일반"]:
                 font = QFont("Malgun Gothic", int(FONT_SIZES['map_label'] * 1.5), QFont.Bold)
-                t.setPos(x+5,y+h-25)
+                pos = QPointF(x+5,y+h-25)
             else:
                 font = QFont("Malgun Gothic", FONT_SIZES['map_label'], QFont.Bold)
-                t.setPos(x+5,y+h-25)
-            t.setFont(font)
-            t.setParentItem(self.layer_static)
+                pos = QPointF(x+5,y+h-25)
+            self.map_tiles.add_label(label, pos, font, QColor(255,255,255))
         return r
     def add_hatched(self, x, y, w, h, edge=QColor("black"), fill=QColor(220, 20, 60, 90)):
-        r = QGraphicsRectItem(QRectF(x,y,w,h)); b = QBrush(fill); b.setStyle(Qt.BDiagPattern); r.setBrush(b); r.setPen(QPen(edge,3)); r.setParentItem(self.layer_static)
-        t = QGraphicsSimpleTextItem("통행 불가"); t.setFlag(QGraphicsItem.ItemIgnoresTransformations, True); t.setBrush(QColor(255,100,100))
-        font = QFont("Malgun Gothic", int(FONT_SIZES['map_label'] * 1.5), QFont.Bold); t.setFont(font); t.setPos(x+10,y+h-30); t.setParentItem(self.layer_static)
+        b = QBrush(fill); b.setStyle(Qt.BDiagPattern); self.map_tiles.add_rect(QRectF(x,y,w,h), b, QPen(edge,3))
+        font = QFont("Malgun Gothic", int(FONT_SIZES['map_label'] * 1.5), QFont.Bold); self.map_tiles.add_label("통행 불가", QPointF(x+10,y+h-30), font, QColor(255,100,100))
     def add_dot_label_static(self, p: QPointF, text: str, color=QColor("blue")):
-        t = QGraphicsSimpleTextItem(text); t.setFlag(QGraphicsItem.ItemIgnoresTransformations, True); t.setBrush(QColor(0,200,255))
-        font = QFont("Malgun Gothic", FONT_SIZES['map_io_label'], QFont.Bold); t.setFont(font); t.setPos(p.x()-20,p.y()+25); t.setParentItem(self.layer_static)
+        font = QFont("Malgun Gothic", FONT_SIZES['map_io_label'], QFont.Bold); self.map_tiles.add_label(text, QPointF(p.x()-20,p.y()+25), font, QColor(0,200,255))
     def build_static_layout(self):
         c_dis, c_ele, c_gen, c_obs, c_emp, c_io = QColor(135, 206, 250), QColor(0, 200, 130), QColor("#303030"), QColor(108, 117, 125), QColor(206, 212, 218), QColor("#303030")
-        border = QGraphicsRectItem(0, 0, self.SCENE_W, self.SCENE_H); border.setPen(QPen(QColor(0, 170, 210), 12)); border.setBrush(QBrush(Qt.NoBrush)); border.setParentItem(self.layer_static)
+        self.map_tiles.add_rect(QRectF(0, 0, self.SCENE_W, self.SCENE_H), QBrush(Qt.NoBrush), QPen(QColor(0, 170, 210), 12))
         self.add_hatched(400, 0, 1600, 400)
         self.add_block(0, 0, 400, 400, c_io, "입출차")
         base = [
@@ -818,121 +973,135 @@ class ParkingLotUI(QWidget):
         rect_item = self.add_block(1300, 400, 300, 400, c_gen, "일반")
         self.parking_spots[8] = rect_item
     def build_occupancy(self):
-        W, H, C = self.SCENE_W, self.SCENE_H, self.CELL; gx, gy = (W + C - 1) // C, (H + C - 1) // C
-        self.grid_w, self.grid_h = gx, gy; self.occ = bytearray(gx * gy)
-        def idx(cx, cy): return cy * gx + cx
-        def block_rect(x, y, w, h):
-            x0,y0,x1,y1 = max(0,x-self.MARGIN), max(0,y-self.MARGIN), min(W,x+w+self.MARGIN), min(H,y+h+self.MARGIN)
-            cx0,cy0,cx1,cy1 = int(x0//C), int(y0//C), int((x1-1)//C), int((y1-1)//C)
-            for cy in range(cy0,cy1+1):
-                for cx in range(cx0,cx1+1):
-                    if 0<=cx<gx and 0<=cy<gy: self.occ[cy*gx+cx] = 1
-        for x,y,w,h,c,l in [
-            (550,1050,800,300,0,""),
-            (400,0,1600,400,0,""),
-            (1600,400,400,400,0,""),
-            (1600,1600,400,400,0,""),
-            (-400,1600,400,400,0,""),
-            (0,0,400,400,0,"")
-        ]: 
-            block_rect(x,y,w,h)
+        self.grid = OccupancyGrid(self.SCENE_W, self.SCENE_H, self.CELL, margin=self.MARGIN, inflation=self.INFLATION)
+        self.grid.add_rects([
+            (550,1050,800,300),
+            (400,0,1600,400),
+            (1600,400,400,400),
+            (1600,1600,400,400),
+            (-400,1600,400,400),
+            (0,0,400,400)
+        ])
         parking_blocks = [
-            (0, 1600, 400, 400, 0, ""),
-            (400, 1600, 300, 400, 0, ""),
-            (700, 1600, 300, 400, 0, ""),
-            (1000, 1600, 300, 400, 0, ""),
-            (1300, 1600, 300, 400, 0, ""),
-            (1600, 1200, 400, 400, 0, ""),
-            (1600, 800, 400, 400, 0, ""),
-            (1300, 400, 300, 400, 0, ""),
-            (1000, 400, 300, 400, 0, ""),
-            (700, 400, 300, 400, 0, ""),
-            (400, 400, 300, 400, 0, "")
+            (0, 1600, 400, 400),
+            (400, 1600, 300, 400),
+            (700, 1600, 300, 400),
+            (1000, 1600, 300, 400),
+            (1300, 1600, 300, 400),
+            (1600, 1200, 400, 400),
+            (1600, 800, 400, 400),
+            (1300, 400, 300, 400),
+            (1000, 400, 300, 400),
+            (700, 400, 300, 400),
+            (400, 400, 300, 400)
         ]
-        for x,y,w,h,c,l in parking_blocks: 
-            block_rect(x,y,w,h)
-        self._occ_idx = idx
+        self.grid.add_rects(parking_blocks)
+        self.grid.finalize()
+        self.planner = GridPlanner(self.grid.occ_bytes(), self.grid.width, self.grid.height)
+        self.build_distance_fields()
+    def build_distance_fields(self):
+        # 거리장은 작업 스레드에서 계산(또는 캐시 로드)하고 끝나면 시그널로 교체, 그 전까지 route_leg는 JPS 탐색
+        self.fields = None
+        circulation = {tuple(p) for via in self.EXIT_CIRCULATION.values() for p in via}
+        targets = [QPointF(*p) for p in list(self.PARKING_WAYPOINTS.values()) + sorted(circulation)] + [QPointF(*self.MANDATORY_WAYPOINT), QPointF(*self.EXIT_POINT)]
+        goals = {self._field_name(p): [self._goal_cell(p)] for p in targets}
+        self.distanceFieldsReady.connect(self.set_distance_fields)
+        args = (self.grid.occ.copy(), self.grid.clearance_field().copy(), goals)
+        self.fields_thread = threading.Thread(target=self._compute_distance_fields, args=args, daemon=True)
+        self.fields_thread.start()
+    def _compute_distance_fields(self, occ, clearance, goals):
+        start = time.monotonic()
+        try:
+            fields = DistanceFields(occ, self.CELL, clearance=clearance)
+            fields.ensure(goals)
+        except Exception as e:
+            print(f"⚠️ 거리장 준비 실패, JPS 탐색만 사용합니다: {e}")
+            return
+        print(f"🧭 거리장 준비 완료 ({len(goals)}개, {(time.monotonic() - start) * 1000:.0f} ms)")
+        try: self.distanceFieldsReady.emit(fields)
+        except RuntimeError: pass  # 계산 중에 화면이 닫힌 경우
+    def set_distance_fields(self, fields):
+        self.fields = fields
+    def _goal_cell(self, p: QPointF):
+        cx, cy = self.pt_to_cell(p)
+        if self.is_cell_free(cx, cy): return (cx, cy)
+        return self.pt_to_cell(self.find_nearest_free_cell_from_point(p))
+    def _field_name(self, p: QPointF):
+        return f"pt_{int(p.x())}_{int(p.y())}"
+    def route_leg(self, cell, t: QPointF):
+        # 미리 계산한 거리장이 있으면 따라 내려가고, 없는 목적지는 JPS 탐색
+        goal, name = self._goal_cell(t), self._field_name(t)
+        if self.fields is not None and self.fields.has(name, [goal]): return self.fields.descend(name, cell)
+        return self.planner.plan(cell, goal)
+    def route_through(self, start_pt: QPointF, targets):
+        # 목적지(웨이포인트)별 구간을 차례로 이어 경로 생성
+        if not targets: return []
+        cell = self._goal_cell(start_pt)
+        cells = [cell]
+        for t in targets:
+            leg = self.route_leg(cell, t)
+            if leg is None:
+                print(f"❌ 경로 없음: {cell} -> ({t.x():.0f}, {t.y():.0f})")
+                return []
+            cells.extend(leg[1:])
+            cell = leg[-1]
+        pts = [self.cell_to_pt_center(c) for c in self.simplify_cells(cells)]
+        pts[0], pts[-1] = start_pt, targets[-1]
+        return pts
+    def _distance_to_current_segment(self, car_pos):
+        return self.route_geometry.distance_to_segment(self.current_path_segment_index, car_pos.x(), car_pos.y())
+    def reroute_if_deviated(self, car_pos):
+        if not self.pose_received or not self.route_targets or len(self.full_path_points) < 2: return False
+        while self.route_target_index < len(self.route_targets) - 1:
+            t = self.route_targets[self.route_target_index]
+            if sqrt((car_pos.x() - t.x())**2 + (car_pos.y() - t.y())**2) >= 60: break
+            self.route_target_index += 1
+        if self._distance_to_current_segment(car_pos) <= self.REROUTE_DISTANCE: return False
+        if self.detect_parking_spot(car_pos) is not None: return False
+        # 화면 주기(16ms)마다 불리므로 재탐색 간격을 두고, 실패하면 간격을 늘려 탐색/로그 반복을 피함
+        now = time.monotonic()
+        if now < self.next_reroute_time: return False
+        # 이탈 위치 -> 다음 경유지는 JPS + 시야선 스무딩, 그 뒤는 순환 경유지를 따라 기존 경로
+        targets = self.route_targets[self.route_target_index:]
+        head = self.plan_route_points(car_pos, targets[0])
+        tail = self.route_through(targets[0], targets[1:]) if len(targets) > 1 else [targets[0]]
+        pts = head + tail[1:] if head and tail else []
+        if len(pts) < 2:
+            print(f"⚠️ 재탐색 실패 - {self.reroute_backoff:.1f}초 후 다시 시도")
+            self.next_reroute_time = now + self.reroute_backoff
+            self.reroute_backoff = min(self.reroute_backoff * 2, self.REROUTE_BACKOFF_MAX)
+            return False
+        self.reroute_backoff = self.REROUTE_INTERVAL
+        self.next_reroute_time = now + self.REROUTE_INTERVAL
+        print(f"🔄 경로 이탈 감지 -> 재탐색 ({len(pts)}개 포인트)")
+        self.set_route_points(pts)
+        self.clear_path_layer()
+        if self.is_exit_scenario: self.draw_exit_path(pts)
+        else: self.draw_straight_path(pts)
+        return True
     def clamp_point(self, p: QPointF): return QPointF(min(self.SCENE_W-1.,max(0.,p.x())), min(self.SCENE_H-1.,max(0.,p.y())))
     def pt_to_cell(self, p: QPointF): return int(p.x()//self.CELL), int(p.y()//self.CELL)
     def cell_to_pt_center(self, c): return QPointF(c[0]*self.CELL+self.CELL/2., c[1]*self.CELL+self.CELL/2.)
-    def is_cell_free(self, cx, cy): return 0<=cx<self.grid_w and 0<=cy<self.grid_h and self.occ[self._occ_idx(cx,cy)]==0
-    def find_nearest_free_cell_from_point(self, p: QPointF, max_radius_cells=100):
-        sx, sy = self.pt_to_cell(p)
-        print(f"🔍 자유 셀 검색: 원본 좌표 ({p.x():.1f}, {p.y():.1f}) -> 셀 ({sx}, {sy})")
-        if self.is_cell_free(sx, sy): 
-            result = self.cell_to_pt_center((sx, sy))
-            print(f"✅ 원본 셀이 자유함: {result}")
-            return result
-        for r in range(1, max_radius_cells + 1):
-            for dx in range(-r, r+1):
-                for dy in [-r, r]:
-                    if self.is_cell_free(sx+dx, sy+dy): 
-                        result = self.cell_to_pt_center((sx+dx, sy+dy))
-                        print(f"✅ 자유 셀 발견 (반경 {r}): ({sx+dx}, {sy+dy}) -> {result}")
-                        return result
-            for dy in range(-r+1, r):
-                for dx in [-r, r]:
-                    if self.is_cell_free(sx+dx, sy+dy): 
-                        result = self.cell_to_pt_center((sx+dx, sy+dy))
-                        print(f"✅ 자유 셀 발견 (반경 {r}): ({sx+dx}, {sy+dy}) -> {result}")
-                        return result
-        result = self.cell_to_pt_center((sx, sy))
-        print(f"⚠️ 자유 셀을 찾지 못함, 원본 셀 반환: {result}")
-        return result
+    def is_cell_free(self, cx, cy): return self.grid.is_free(cx, cy)
+    def find_nearest_free_cell_from_point(self, p: QPointF):
+        cell = self.grid.nearest_free(*self.pt_to_cell(p))
+        if cell is None:
+            print(f"⚠️ 자유 셀이 없음, 원본 셀 반환: ({p.x():.1f}, {p.y():.1f})")
+            return self.cell_to_pt_center(self.pt_to_cell(p))
+        return self.cell_to_pt_center(cell)
     def astar(self, start_pt: QPointF, goal_pt: QPointF):
-        sx, sy = self.pt_to_cell(start_pt)
-        gx, gy = self.pt_to_cell(goal_pt)
-        W, H = self.grid_w, self.grid_h
-        occ, idx = self.occ, self._occ_idx
-        print(f"🗺️ A* 경로 검색: ({start_pt.x():.1f}, {start_pt.y():.1f}) -> ({goal_pt.x():.1f}, {goal_pt.y():.1f})")
-        print(f"   셀 좌표: ({sx}, {sy}) -> ({gx}, {gy})")
-        if not (0 <= sx < W and 0 <= sy < H and 0 <= gx < W and 0 <= gy < H):
-            print(f"❌ 경계 밖 좌표: 시작({sx}, {sy}) 목적지({gx}, {gy}), 그리드 크기({W}, {H})")
-            return None
-        if occ[idx(sx, sy)]:
-            print(f"⚠️ 시작점 ({sx}, {sy})이 점유됨, 자유 셀 검색 중...")
-            free_start = self.find_nearest_free_cell_from_point(start_pt)
-            sx, sy = self.pt_to_cell(free_start)
-            print(f"   새로운 시작점: ({sx}, {sy})")
-        if occ[idx(gx, gy)]:
-            print(f"⚠️ 목적지 ({gx}, {gy})이 점유됨, 자유 셀 검색 중...")
-            free_goal = self.find_nearest_free_cell_from_point(goal_pt)
-            gx, gy = self.pt_to_cell(free_goal)
-            print(f"   새로운 목적지: ({gx}, {gy})")
-        if occ[idx(sx, sy)] or occ[idx(gx, gy)]:
-            print(f"❌ 시작점 또는 목적지가 여전히 점유됨: 시작({sx}, {sy})={occ[idx(sx, sy)]}, 목적지({gx}, {gy})={occ[idx(gx, gy)]}")
-            return None
-        openh = [(abs(sx - gx) + abs(sy - gy), 0, (sx, sy))]
-        came, g = {}, {(sx, sy): 0}
-        iterations = 0
-        max_iterations = 10000
-        while openh and iterations < max_iterations:
-            iterations += 1
-            _, gc, (x, y) = heappop(openh)
-            if (x, y) == (gx, gy):
-                path = []
-                curr = (x, y)
-                while curr in came:
-                    path.append(curr)
-                    curr = came[curr]
-                path.append((sx, sy))
-                path.reverse()
-                print(f"✅ 경로 발견! {len(path)}개 셀, {iterations}회 반복")
-                return path
-            for dx, dy, cst in [(1, 0, 1), (-1, 0, 1), (0, 1, 1), (0, -1, 1)]:
-                nx, ny = x + dx, y + dy
-                if not (0 <= nx < W and 0 <= ny < H) or occ[idx(nx, ny)]:
-                    continue
-                ng = gc + cst
-                if (nx, ny) not in g or ng < g[(nx, ny)]:
-                    g[(nx, ny)] = ng
-                    came[(nx, ny)] = (x, y)
-                    heappush(openh, (ng + abs(nx - gx) + abs(ny - gy), ng, (nx, ny)))
-        if iterations >= max_iterations:
-            print(f"❌ 최대 반복 횟수 초과: {max_iterations}회")
-        else:
-            print(f"❌ 경로를 찾을 수 없음: {iterations}회 반복 후 종료")
-        return None
+        # 출발/도착이 점유 셀이면 가장 가까운 자유 셀로 옮겨 JPS 탐색
+        start, goal = self._goal_cell(start_pt), self._goal_cell(goal_pt)
+        path = self.planner.plan(start, goal)
+        if path is None:
+            print(f"❌ 경로를 찾을 수 없음: {start} -> {goal} ({self.planner.expanded}개 점프 포인트 확장 후 종료)")
+        return path
+    def plan_route_points(self, start_pt: QPointF, goal_pt: QPointF):
+        cells = self.astar(start_pt, goal_pt)
+        if not cells: return []
+        pts = [self.cell_to_pt_center(c) for c in self.planner.smooth(self.simplify_cells(cells))]
+        pts[0], pts[-1] = start_pt, goal_pt
+        return pts
     def simplify_cells(self, cells):
         if not cells: return []
         simp = [cells[0]]
@@ -941,87 +1110,59 @@ class ParkingLotUI(QWidget):
             if norm(cells[i][0]-simp[-1][0], cells[i][1]-simp[-1][1]) != norm(cells[i+1][0]-cells[i][0], cells[i+1][1]-cells[i][1]): simp.append(cells[i])
         if len(cells)>1 and cells[-1]!=simp[-1]: simp.append(cells[-1])
         return simp
+    ROUTE_STYLES = {
+        'entry': (QColor(0, 170, 210), QColor(0, 200, 255)),
+        'exit': (QColor(255, 165, 0), QColor(255, 140, 0)),
+    }
+    def init_route_items(self):
+        # 경로는 고정된 QGraphicsPathItem 몇 개의 path만 교체해서 다시 그림
+        self.route_items = []
+        for width, z in [(self.PATH_WIDTH + 12, 0), (self.PATH_WIDTH + 6, 1), (self.PATH_WIDTH, 2), (2, 3)]:
+            item = QGraphicsPathItem(self.layer_path)
+            item.setPen(QPen(QColor(0, 0, 0, 0), width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
+            item.setZValue(z)
+            self.route_items.append(item)
+        self.route_arrows = QGraphicsPathItem(self.layer_path)
+        self.route_arrows.setPen(QPen(QColor(255, 255, 255), 2))
+        self.route_arrows.setZValue(4)
+    def set_route_path(self, pts, style):
+        glow, main = self.ROUTE_STYLES[style]
+        path = QPainterPath()
+        if len(pts) >= 2:
+            path.moveTo(pts[0])
+            for p in pts[1:]: path.lineTo(p)
+        colors = [QColor(glow.red(), glow.green(), glow.blue(), 60), QColor(glow.red(), glow.green(), glow.blue(), 100), main, QColor(255, 255, 255, 150)]
+        for item, color in zip(self.route_items, colors):
+            pen = item.pen(); pen.setColor(color); item.setPen(pen)
+            item.setPath(path)
     def draw_straight_path(self, pts):
         if len(pts) < 2: return
-        for i in range(len(pts) - 1):
-            start = pts[i]
-            end = pts[i + 1]
-            for width, alpha in [(self.PATH_WIDTH + 12, 60), (self.PATH_WIDTH + 6, 100)]:
-                glow_pen = QPen(QColor(0,170,210,alpha), width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
-                self.scene.addLine(start.x(), start.y(), end.x(), end.y(), glow_pen).setParentItem(self.layer_path)
-            main_pen = QPen(QColor(0,200,255), self.PATH_WIDTH, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
-            self.scene.addLine(start.x(), start.y(), end.x(), end.y(), main_pen).setParentItem(self.layer_path)
-            center_pen = QPen(QColor(255,255,255,150), 2, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
-            self.scene.addLine(start.x(), start.y(), end.x(), end.y(), center_pen).setParentItem(self.layer_path)
-    def generate_hud_instructions(self, pts, is_exit_scenario=False):
-        if len(pts) < 2: return []
-        instructions, total_dist = [], 0
-        for i in range(len(pts) - 1):
-            p1, p2 = pts[i], pts[i+1]
-            dist_m = sqrt((p2.x()-p1.x())**2 + (p2.y()-p1.y())**2) / self.PIXELS_PER_METER
-            total_dist += dist_m
-            if i < len(pts) - 2:
-                p3 = pts[i+2]
-                angle = (degrees(atan2(p3.y()-p2.y(),p3.x()-p2.x()))-degrees(atan2(p2.y()-p1.y(),p2.x()-p1.x()))+180)%360-180
-                direction = "좌회전" if angle>45 else ("우회전" if angle<-45 else "")
-                if direction: 
-                    if is_exit_scenario:
-                        direction = f"출차 {direction}"
-                    instructions.append((direction, total_dist)); total_dist = 0
-        if is_exit_scenario:
-            instructions.append(("출차 완료", total_dist))
-        else:
-            instructions.append(("목적지 도착", total_dist))
-        return instructions
+        self.set_route_path(pts, 'entry')
     def calculate_route_progress(self, car_pos):
-        if not self.full_path_points or len(self.full_path_points)<2: return 0
-        total_len = sum(sqrt((self.full_path_points[i+1].x()-p.x())**2 + (self.full_path_points[i+1].y()-p.y())**2) for i,p in enumerate(self.full_path_points[:-1]))
-        if total_len==0: return 0
-        min_dist, closest_seg, proj_ratio = float('inf'), 0, 0
-        for i,p1 in enumerate(self.full_path_points[:-1]):
-            p2 = self.full_path_points[i+1]; seg_vec, car_vec = p2-p1, car_pos-p1
-            seg_len_sq = QPointF.dotProduct(seg_vec, seg_vec)
-            if seg_len_sq==0: continue
-            t = max(0, min(1, QPointF.dotProduct(car_vec, seg_vec)/seg_len_sq))
-            proj = p1 + t * seg_vec
-            dist = sqrt((car_pos.x()-proj.x())**2 + (car_pos.y()-proj.y())**2)
-            if dist < min_dist: min_dist, closest_seg, proj_ratio = dist, i, t
-        traveled = sum(sqrt((self.full_path_points[i+1].x()-p.x())**2+(self.full_path_points[i+1].y()-p.y())**2) for i,p in enumerate(self.full_path_points[:closest_seg]))
-        if closest_seg < len(self.full_path_points)-1:
-            p1, p2 = self.full_path_points[closest_seg], self.full_path_points[closest_seg+1]
-            traveled += sqrt((p2.x()-p1.x())**2+(p2.y()-p1.y())**2) * proj_ratio
-        return min(100, (traveled / total_len) * 100)
+        if not self.route_geometry or self.route_geometry.n_segments == 0: return 0
+        return self.route_geometry.progress(self.current_path_segment_index, car_pos.x(), car_pos.y())
     def clear_path_layer(self):
-        for child in self.layer_path.childItems(): self.scene.removeItem(child)
+        empty = QPainterPath()
+        for item in self.route_items: item.setPath(empty)
+        self.route_arrows.setPath(empty)
     def _update_current_segment(self, car_pos):
-        if not self.full_path_points or len(self.full_path_points) < 2:
+        if not self.route_geometry or self.route_geometry.n_segments == 0:
             return
-        while self.current_path_segment_index < len(self.full_path_points) - 1:
-            p_curr = self.full_path_points[self.current_path_segment_index]
-            p_next = self.full_path_points[self.current_path_segment_index + 1]
-            dist_to_next = sqrt((car_pos.x() - p_next.x())**2 + (car_pos.y() - p_next.y())**2)
-            v_seg = p_next - p_curr
-            v_car = car_pos - p_curr
-            seg_len_sq = QPointF.dotProduct(v_seg, v_seg)
-            proj_ratio = 1.0
-            if seg_len_sq > 0:
-                proj_ratio = QPointF.dotProduct(v_car, v_seg) / seg_len_sq
-            if dist_to_next < 50 or proj_ratio > 1.0:
-                self.current_path_segment_index += 1
-            else:
-                break
+        self.current_path_segment_index = self.route_geometry.advance(self.current_path_segment_index, car_pos.x(), car_pos.y())
     def update_hud_from_car_position(self, car_pos):
         if not self.full_path_points: return
         self._update_current_segment(car_pos)
-        remaining_pts = self.full_path_points[self.current_path_segment_index+1:]
-        path_for_hud = [car_pos] + remaining_pts
-        if len(path_for_hud) < 2:
+        self.reroute_if_deviated(car_pos)
+        if self.current_path_segment_index + 1 >= len(self.full_path_points):
             if self.is_exit_scenario:
                 self.hud.update_navigation_info([("출차 완료", 0)], current_speed=0, route_progress=100)
             else:
                 self.hud.update_navigation_info([("목적지 도착", 0)], current_speed=0, route_progress=100)
             return
-        instructions = self.generate_hud_instructions(path_for_hud, self.is_exit_scenario)
+        if self.is_exit_scenario:
+            instructions = self.route_geometry.instructions(self.current_path_segment_index, car_pos.x(), car_pos.y(), prefix="출차 ", final="출차 완료")
+        else:
+            instructions = self.route_geometry.instructions(self.current_path_segment_index, car_pos.x(), car_pos.y())
         progress = self.calculate_route_progress(car_pos)
         speed = self.calculate_realistic_speed(instructions, progress, car_pos)
         self.hud.update_navigation_info(instructions, current_speed=speed, route_progress=progress)
@@ -1087,51 +1228,16 @@ class ParkingLotUI(QWidget):
                 return spot_num
         return None
     def generate_exit_waypoints(self, parking_spot):
-        MANDATORY_WAYPOINT = [200, 925]
-        parking_waypoints = {
-            1: [200, 1475], 2: [550, 1475], 3: [850, 1475], 4: [1150, 1475],
-            5: [1450, 1475],
-            6: [1475, 1400], 7: [1475, 1000],
-            8: [1475, 925], 9: [1150, 925], 10: [850, 925], 11: [550, 925]
-        }
-        current_waypoint = parking_waypoints.get(parking_spot)
-        if not current_waypoint:
+        if parking_spot not in self.PARKING_WAYPOINTS:
             return None
-        FINAL_DESTINATION = [200, 200]
-        exit_waypoints = []
-        if parking_spot == 1:
-            exit_waypoints.append(MANDATORY_WAYPOINT)
-            exit_waypoints.append(FINAL_DESTINATION)
-        elif parking_spot in [2, 3, 4, 5]:
-            exit_waypoints.append([200, 1475])
-            exit_waypoints.append(MANDATORY_WAYPOINT)
-            exit_waypoints.append(FINAL_DESTINATION)
-        elif parking_spot == 6:
-            exit_waypoints.append([1475, 1475])
-            exit_waypoints.append([200, 1475])
-            exit_waypoints.append(MANDATORY_WAYPOINT)
-            exit_waypoints.append(FINAL_DESTINATION)
-        elif parking_spot == 7:
-            exit_waypoints.append([1475, 925])
-            exit_waypoints.append(MANDATORY_WAYPOINT)
-            exit_waypoints.append(FINAL_DESTINATION)
-        elif parking_spot in [8, 9, 10, 11]:
-            exit_waypoints.append(MANDATORY_WAYPOINT)
-            exit_waypoints.append(FINAL_DESTINATION)
+        # 구역별 순환 차로 지점 -> 의무 경유지 -> 출구 순으로 지나야 역주행하지 않음 (구간 사이는 거리장을 따라감)
+        exit_waypoints = self.EXIT_CIRCULATION.get(parking_spot, []) + [self.MANDATORY_WAYPOINT, self.EXIT_POINT]
         print(f"🚗 출차 경로 생성 - 주차구역 {parking_spot}번")
-        print(f"   최종 목적지: {FINAL_DESTINATION}")
+        print(f"   최종 목적지: {self.EXIT_POINT}")
         print(f"   경로 포인트: {exit_waypoints}")
         return exit_waypoints
     def get_parking_spot_start_waypoint(self, parking_spot):
-        parking_waypoints = {
-            1: [200, 1475], 2: [550, 1475], 3: [850, 1475], 4: [1150, 1475],
-            5: [1450, 1475],
-            6: [1475, 1400], 7: [1475, 1000],
-            8: [1475, 925], 9: [1150, 925], 10: [850, 925], 11: [550, 925]
-        }
-        if parking_spot in parking_waypoints:
-            return parking_waypoints[parking_spot]
-        return None
+        return self.PARKING_WAYPOINTS.get(parking_spot)
     def calculate_and_display_exit_route(self, exit_waypoints, parking_spot):
         assigned_waypoint = self.get_parking_spot_start_waypoint(parking_spot)
         if not assigned_waypoint:
@@ -1139,36 +1245,31 @@ class ParkingLotUI(QWidget):
             return
         start_point = QPointF(assigned_waypoint[0], assigned_waypoint[1])
         waypoints_qpoints = [QPointF(p[0], p[1]) for p in exit_waypoints]
-        self.full_path_points = [start_point] + waypoints_qpoints
+        self.set_route_targets(waypoints_qpoints)
+        self.set_route_points(self.route_through(start_point, waypoints_qpoints) or [start_point] + waypoints_qpoints)
         print(f"✅ 출차 경로: {len(self.full_path_points)}개 포인트")
         for i, point in enumerate(self.full_path_points):
             print(f"  {i+1}. ({point.x():.1f}, {point.y():.1f})")
         self.clear_path_layer()
         self.draw_exit_path(self.full_path_points)
+        if not self.pose_received: self.car.setPos(start_point)
         self.car.show()
-        self.current_path_segment_index = 0
         self.update_hud_from_car_position(self.car.pos())
     def draw_exit_path(self, pts):
         if len(pts) < 2: 
             print(f"출차 경로 포인트가 부족합니다: {len(pts)}개")
             return
         print(f"출차 경로 그리기 시작: {len(pts)}개 포인트")
+        self.set_route_path(pts, 'exit')
+        arrows = QPainterPath()
         for i in range(len(pts) - 1):
             start, end = pts[i], pts[i + 1]
             print(f"경로 구간 {i+1}: ({start.x():.0f}, {start.y():.0f}) -> ({end.x():.0f}, {end.y():.0f})")
-            for width, alpha in [(self.PATH_WIDTH + 12, 60), (self.PATH_WIDTH + 6, 100)]:
-                glow_pen = QPen(QColor(255, 165, 0, alpha), width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
-                line_item = self.scene.addLine(start.x(), start.y(), end.x(), end.y(), glow_pen)
-                line_item.setParentItem(self.layer_path)
-            main_pen = QPen(QColor(255, 140, 0), self.PATH_WIDTH, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
-            line_item = self.scene.addLine(start.x(), start.y(), end.x(), end.y(), main_pen)
-            line_item.setParentItem(self.layer_path)
-            center_pen = QPen(QColor(255, 255, 255, 150), 2, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
-            line_item = self.scene.addLine(start.x(), start.y(), end.x(), end.y(), center_pen)
-            line_item.setParentItem(self.layer_path)
-            self.draw_clockwise_arrow(start, end)
+            self.draw_clockwise_arrow(start, end, arrows)
+        self.route_arrows.setBrush(QBrush(QColor(255, 140, 0)))
+        self.route_arrows.setPath(arrows)
         print("출차 경로 그리기 완료")
-    def draw_clockwise_arrow(self, start, end):
+    def draw_clockwise_arrow(self, start, end, arrows):
         mid_x = (start.x() + end.x()) / 2
         mid_y = (start.y() + end.y()) / 2
         dx = end.x() - start.x()
@@ -1193,12 +1294,8 @@ class ParkingLotUI(QWidget):
             QPointF(left_wing_x, left_wing_y),
             QPointF(right_wing_x, right_wing_y)
         ]
-        arrow_polygon = QPolygonF(arrow_points)
-        arrow_item = QGraphicsPolygonItem(arrow_polygon)
-        arrow_item.setBrush(QBrush(QColor(255, 140, 0)))
-        arrow_item.setPen(QPen(QColor(255, 255, 255), 2))
-        arrow_item.setParentItem(self.layer_path)
-        self.scene.addItem(arrow_item)
+        arrows.addPolygon(QPolygonF(arrow_points))
+        arrows.closeSubpath()
 if __name__ == "__main__":
     QApplication.setAttribute(Qt.AA_EnableHighDpiScaling)
     QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps)
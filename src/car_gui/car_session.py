@@ -0,0 +1,439 @@
+"""차량 ↔ 인프라 단일 세션 (selector 스레드 하나로 수신 포트/상대 연결을 모두 처리, 채널별 라우팅, 끊김 후 재연결)
+
+메시지는 기존 형식 그대로의 개행 구분 JSON이다. 수신한 메시지는 내용으로 채널(트리거, waypoint, 실시간 위치,
+선호 정보)을 추정해 구독한 핸들러로 넘기고, 보낸 쪽에는 기존 응답 형식으로 답한다.
+송신 상대와의 연결은 재사용하며, 끊기면 아직 보내지 않은 메시지를 위해 재연결한다.
+"""
+import json
+import time
+import errno
+import socket
+import selectors
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional
+
+CH_TRIGGER = 'trigger'
+CH_PREFERENCE = 'preference'
+CH_WAYPOINTS = 'waypoints'
+CH_POSITION = 'position'
+
+RECV_SIZE = 65536
+MAX_MESSAGE = 1 << 20
+CONNECT_TIMEOUT_SEC = 3.0
+MESSAGE_EXPIRY_SEC = 15.0       # 재연결을 기다리다 이 시간이 지난 송신 메시지는 실패 처리
+RECONNECT_MIN_SEC = 0.5
+RECONNECT_MAX_SEC = 5.0
+LOOP_INTERVAL_SEC = 0.2
+
+MessageHandler = Callable[[dict], Optional[dict]]
+ResultCallback = Callable[[bool, Optional[dict]], None]
+
+
+def classify(message: dict) -> Optional[str]:
+    """메시지 내용으로 채널 추정"""
+    if message.get('command') == 'start_simulation':
+        return CH_TRIGGER
+    msg_type = message.get('type')
+    if msg_type == 'waypoint_assignment':
+        return CH_WAYPOINTS
+    if msg_type == 'real_time_position':
+        return CH_POSITION
+    if 'preferred' in message:
+        return CH_PREFERENCE
+    return None
+
+
+class _Conn:
+    """TCP 연결 1개 (수신 포트로 들어온 연결 또는 Peer의 송신 연결)"""
+    __slots__ = ('sock', 'addr', 'inbuf', 'outbuf', 'peer')
+
+    def __init__(self, sock: socket.socket, addr, peer: Optional['Peer'] = None):
+        self.sock, self.addr, self.peer = sock, addr, peer
+        self.inbuf = bytearray()
+        self.outbuf = bytearray()
+
+
+class _Outgoing:
+    __slots__ = ('channel', 'message', 'callback', 'enqueued_at')
+
+    def __init__(self, channel: str, message: dict, callback: Optional[ResultCallback]):
+        self.channel, self.message, self.callback = channel, message, callback
+        self.enqueued_at = time.monotonic()
+
+
+class Peer:
+    """상시 유지하는 송신 연결 1개와 응답 대기 중인 메시지 큐"""
+
+    def __init__(self, name: str, host: str, port: int):
+        self.name, self.host, self.port = name, host, port
+        self.conn: Optional[_Conn] = None
+        self.connecting = False
+        self.connect_started = 0.0
+        self.next_attempt = 0.0
+        self.backoff = RECONNECT_MIN_SEC
+        self.pending: Deque[_Outgoing] = deque()
+        self.inflight: Deque[_Outgoing] = deque()
+
+    @property
+    def connected(self) -> bool:
+        return self.conn is not None and not self.connecting
+
+
+class CarSession:
+    """수신 포트 여러 개와 상대별 송신 연결을 한 스레드에서 다중화하는 세션
+
+    subscribe()로 등록한 핸들러와 send() 결과 콜백은 세션 스레드에서 호출된다.
+    핸들러가 dict를 반환하면 보낸 쪽에 돌려줄 응답으로 사용한다.
+    """
+
+    def __init__(self):
+        self.handlers: Dict[str, List[MessageHandler]] = {}
+        self.peers: Dict[str, Peer] = {}
+        self.listeners: Dict[int, socket.socket] = {}
+        self._conns: List[_Conn] = []
+        self._lock = threading.Lock()
+        self._calls: Deque[Callable[[], None]] = deque()
+        self._decoder = json.JSONDecoder()
+        self._recv_chunk = bytearray(RECV_SIZE)
+        self._selector = selectors.DefaultSelector()
+        # 다른 스레드에서 요청했을 때 select()를 깨우기 위한 소켓 쌍
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------------- 외부 API ----------------
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        print("🔗 차량 세션 시작")
+
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        self._wake()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        for conn in list(self._conns):
+            conn.sock.close()
+        for sock in self.listeners.values():
+            sock.close()
+        self._selector.close()
+        self._wake_r.close()
+        self._wake_w.close()
+        print("🛑 차량 세션을 종료합니다.")
+
+    def listen(self, port: int, host: str = '0.0.0.0'):
+        """수신 포트 추가 (이미 열려 있으면 무시), bind 실패는 호출한 쪽으로 예외 전달"""
+        with self._lock:
+            if port in self.listeners:
+                return
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                sock.bind((host, port))
+                sock.listen(16)
+            except OSError:
+                sock.close()
+                raise
+            sock.setblocking(False)
+            self.listeners[port] = sock
+        self._call_soon(lambda: self._selector.register(sock, selectors.EVENT_READ, port))
+        print(f"✅ 세션 수신 포트 {host}:{port} 대기 중...")
+
+    def subscribe(self, channel: str, handler: MessageHandler):
+        with self._lock:
+            self.handlers.setdefault(channel, []).append(handler)
+
+    def unsubscribe(self, channel: str, handler: MessageHandler):
+        with self._lock:
+            if handler in self.handlers.get(channel, []):
+                self.handlers[channel].remove(handler)
+
+    def add_peer(self, name: str, host: str, port: int) -> Peer:
+        """송신 상대 등록 (주소가 바뀌면 기존 연결을 끊고 새 주소로 재연결)
+
+        상대는 한 번에 메시지 하나를 처리하므로 응답을 받을 때까지 다음 메시지를 보내지 않는다.
+        """
+        with self._lock:
+            peer = self.peers.get(name)
+            if peer is not None and (peer.host, peer.port) == (host, port):
+                return peer
+            if peer is None:
+                peer = self.peers[name] = Peer(name, host, port)
+            else:
+                peer.host, peer.port = host, port
+                self._call_soon(lambda: self._drop_peer_conn(peer, '주소 변경'))
+        self._wake()
+        return peer
+
+    def send(self, peer_name: str, channel: str, data: dict, callback: Optional[ResultCallback] = None) -> bool:
+        """상대에게 메시지 전송 요청 (즉시 반환), 응답/실패는 callback(success, reply)으로 전달"""
+        with self._lock:
+            peer = self.peers.get(peer_name)
+            if peer is None:
+                return False
+            peer.pending.append(_Outgoing(channel, dict(data), callback))
+        self._wake()
+        return True
+
+    # ---------------- 세션 스레드 ----------------
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b'\0')
+        except OSError:
+            pass
+
+    def _call_soon(self, fn: Callable[[], None]):
+        with self._lock:
+            self._calls.append(fn)
+        self._wake()
+
+    def _run(self):
+        while self._running:
+            with self._lock:
+                calls, self._calls = self._calls, deque()
+                peers = list(self.peers.values())
+            for fn in calls:
+                fn()
+            now = time.monotonic()
+            for peer in peers:
+                self._service_peer(peer, now)
+            for key, mask in self._selector.select(timeout=LOOP_INTERVAL_SEC):
+                if key.data is None:
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except OSError:
+                        pass
+                elif isinstance(key.data, int):
+                    self._accept(key.fileobj)
+                else:
+                    conn = key.data
+                    if conn.peer is not None and conn.peer.connecting:
+                        if mask & selectors.EVENT_WRITE:
+                            self._finish_connect(conn.peer)
+                        continue
+                    if mask & selectors.EVENT_READ:
+                        self._read(conn)
+                    if mask & selectors.EVENT_WRITE and conn.sock.fileno() != -1:
+                        self._flush(conn)
+
+    def _accept(self, server: socket.socket):
+        try:
+            sock, addr = server.accept()
+        except OSError:
+            return
+        sock.setblocking(False)
+        conn = _Conn(sock, addr)
+        self._conns.append(conn)
+        self._selector.register(sock, selectors.EVENT_READ, conn)
+        print(f"🔗 세션 연결 수락: {addr}")
+
+    def _read(self, conn: _Conn):
+        try:
+            n = conn.sock.recv_into(self._recv_chunk)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            print(f"❌ 세션 수신 오류 {conn.addr}: {e}")
+            n = 0
+        if n == 0:
+            self._extract_messages(conn, closing=True)
+            self._close(conn, '상대가 연결 종료')
+            return
+        conn.inbuf += memoryview(self._recv_chunk)[:n]
+        self._extract_messages(conn)
+        if len(conn.inbuf) > MAX_MESSAGE:
+            self._close(conn, f'메시지가 너무 큼 ({len(conn.inbuf)} bytes)')
+
+    def _extract_messages(self, conn: _Conn, closing: bool = False):
+        # 개행 구분 JSON, 구분자 없이 이어 붙은 JSON 모두 처리 (부분 수신은 다음 recv까지 보관)
+        text = conn.inbuf.decode('utf-8', errors='replace')
+        pos, end = 0, len(text)
+        while pos < end:
+            while pos < end and text[pos] in ' \t\r\n':
+                pos += 1
+            if pos >= end:
+                break
+            try:
+                message, pos = self._decoder.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                newline = text.find('\n', pos)
+                if newline == -1 and not closing:
+                    break
+                bad = text[pos:] if newline == -1 else text[pos:newline]
+                print(f"❌ 잘못된 JSON 데이터: {bad[:200]}")
+                pos = end if newline == -1 else newline + 1
+                continue
+            if isinstance(message, dict):
+                self._handle(conn, message)
+        del conn.inbuf[:len(text[:pos].encode('utf-8'))]
+
+    def _handle(self, conn: _Conn, message: dict):
+        if conn.peer is not None:
+            # 송신 연결로 온 메시지는 응답 대기 중인 메시지에 대한 응답
+            self._complete_reply(conn.peer, message)
+            return
+        channel = classify(message)
+        if channel is None:
+            print(f"⚠️ 채널을 알 수 없는 메시지: {str(message)[:200]}")
+            return
+
+        reply = None
+        with self._lock:
+            handlers = list(self.handlers.get(channel, []))
+        for handler in handlers:
+            try:
+                reply = handler(message) or reply
+            except Exception as e:
+                print(f"❌ {channel} 메시지 처리 오류: {e}")
+        if message.get('ack') is False:
+            return
+        self._queue(conn, reply or {"status": "received", "timestamp": datetime.now().isoformat()})
+
+    def _queue(self, conn: _Conn, message: dict):
+        conn.outbuf += (json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8')
+        self._flush(conn)
+
+    def _flush(self, conn: _Conn):
+        try:
+            while conn.outbuf:
+                sent = conn.sock.send(conn.outbuf)
+                del conn.outbuf[:sent]
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError as e:
+            self._close(conn, f'송신 오류: {e}')
+            return
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if conn.outbuf else 0)
+        try:
+            self._selector.modify(conn.sock, events, conn)
+        except (KeyError, ValueError):
+            pass
+
+    def _close(self, conn: _Conn, reason: str):
+        try:
+            self._selector.unregister(conn.sock)
+        except (KeyError, ValueError):
+            pass
+        conn.sock.close()
+        if conn in self._conns:
+            self._conns.remove(conn)
+        peer = conn.peer
+        if peer is None:
+            print(f"📱 세션 연결 종료: {conn.addr} ({reason})")
+            return
+        if peer.conn is conn:
+            peer.conn = None
+            peer.connecting = False
+            # 이미 보낸 메시지는 상대가 처리했을 수 있으므로 다시 보내지 않고 실패 처리
+            failed, peer.inflight = list(peer.inflight), deque()
+            for out in failed:
+                print(f"❌ [{peer.name}] {out.channel} 메시지 전송 실패 ({reason})")
+                self._finish(out, False, None)
+            if peer.pending:
+                print(f"⚠️ [{peer.name}] 연결 끊김: {reason}")
+                self._schedule_reconnect(peer, time.monotonic())
+
+    # ---------------- 송신 상대 ----------------
+
+    def _service_peer(self, peer: Peer, now: float):
+        """재연결, 연결 타임아웃, 만료, 대기 메시지 전송"""
+        self._expire(peer, now)
+        if peer.conn is None:
+            if peer.pending and now >= peer.next_attempt:
+                self._start_connect(peer, now)
+            return
+        if peer.connecting:
+            if now - peer.connect_started > CONNECT_TIMEOUT_SEC:
+                self._close(peer.conn, '연결 시간 초과')
+            return
+        # 상대(ESP32 등)는 메시지를 하나씩 처리하므로 응답을 받을 때까지 하나씩 전송
+        if peer.pending and not peer.inflight:
+            with self._lock:
+                out = peer.pending.popleft()
+            peer.inflight.append(out)
+            self._queue(peer.conn, out.message)
+
+    def _start_connect(self, peer: Peer, now: float):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        err = sock.connect_ex((peer.host, peer.port))
+        if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+            sock.close()
+            self._schedule_reconnect(peer, now)
+            return
+        peer.conn = _Conn(sock, (peer.host, peer.port), peer)
+        peer.connecting = True
+        peer.connect_started = now
+        self._conns.append(peer.conn)
+        self._selector.register(sock, selectors.EVENT_WRITE, peer.conn)
+
+    def _finish_connect(self, peer: Peer):
+        conn = peer.conn
+        err = conn.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err != 0:
+            self._close(conn, f'연결 실패 (errno {err})')
+            return
+        peer.connecting = False
+        peer.backoff = RECONNECT_MIN_SEC
+        self._selector.modify(conn.sock, selectors.EVENT_READ, conn)
+        print(f"🔗 [{peer.name}] {peer.host}:{peer.port} 연결됨")
+        self._service_peer(peer, time.monotonic())
+
+    def _drop_peer_conn(self, peer: Peer, reason: str):
+        if peer.conn is not None:
+            self._close(peer.conn, reason)
+
+    def _schedule_reconnect(self, peer: Peer, now: float):
+        peer.next_attempt = now + peer.backoff
+        peer.backoff = min(peer.backoff * 2, RECONNECT_MAX_SEC)
+
+    def _complete_reply(self, peer: Peer, reply: dict):
+        if peer.inflight:
+            self._finish(peer.inflight.popleft(), True, reply)
+
+    def _expire(self, peer: Peer, now: float):
+        expired = []
+        with self._lock:
+            for queue in (peer.inflight, peer.pending):
+                while queue and now - queue[0].enqueued_at > MESSAGE_EXPIRY_SEC:
+                    expired.append(queue.popleft())
+        for out in expired:
+            print(f"❌ [{peer.name}] {out.channel} 메시지 전송 실패 (응답 없음)")
+            self._finish(out, False, None)
+
+    def _finish(self, out: _Outgoing, success: bool, reply: Optional[dict]):
+        if out.callback is None:
+            return
+        try:
+            out.callback(success, reply)
+        except Exception as e:
+            print(f"❌ 전송 결과 콜백 오류: {e}")
+
+
+_shared: Optional[CarSession] = None
+_shared_lock = threading.Lock()
+
+
+def shared_session() -> CarSession:
+    """프로세스 전체에서 공유하는 세션 (처음 호출 시 시작)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = CarSession()
+            _shared.start()
+        return _shared
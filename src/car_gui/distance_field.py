@@ -0,0 +1,159 @@
+"""목적지별 cost-to-go 거리장 (벽 근처 가중치를 둔 배열 단위 완화, 격자 해시 기반 .npz 캐시)"""
+import os
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+Cell = Tuple[int, int]
+
+UNREACHABLE = np.iinfo(np.int32).max
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'smart_parking')
+# 경사 하강 시 같은 비용 감소 이웃이 여럿이면 직전 진행 방향을 우선 (회전 수 최소화)
+NEIGHBORS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+KEEP_CLEARANCE = 2.0    # 장애물까지 이 거리(셀)보다 가까운 셀은 추가 비용
+WALL_PENALTY = 4        # 장애물 쪽으로 1셀 가까워질 때마다 더하는 비용
+
+
+def step_costs(clearance: np.ndarray, keep: float = KEEP_CLEARANCE, penalty: int = WALL_PENALTY) -> np.ndarray:
+    """셀로 들어가는 비용 (기본 1, 장애물에 keep보다 가까우면 penalty씩 증가) - 차량이 통로 가운데로 다니도록"""
+    shortfall = np.clip(keep - clearance, 0.0, None)
+    return (1 + np.rint(penalty * shortfall)).astype(np.int32)
+
+
+def compute_field(occ: np.ndarray, goals: List[Cell], costs: Optional[np.ndarray] = None) -> np.ndarray:
+    """occ[y, x] != 0 인 셀을 벽으로 보고 goals까지의 4방향 최소 비용 계산
+
+    costs[y, x]는 그 셀로 들어가는 비용 (없으면 모두 1, 즉 BFS 거리와 같음).
+    """
+    free = occ == 0
+    h, w = occ.shape
+    step = np.ones((h, w), dtype=np.int64) if costs is None else costs.astype(np.int64)
+    dist = np.full((h, w), UNREACHABLE, dtype=np.int64)
+    for cx, cy in goals:
+        if 0 <= cx < w and 0 <= cy < h and free[cy, cx]:
+            dist[cy, cx] = 0
+    # 모든 셀을 배열 슬라이스 연산으로 동시에 완화하고, 더 줄어드는 셀이 없을 때까지 반복
+    while True:
+        through = dist + step   # 이웃이 이 셀을 거쳐 갈 때의 비용
+        best = dist.copy()
+        np.minimum(best[1:, :], through[:-1, :], out=best[1:, :])
+        np.minimum(best[:-1, :], through[1:, :], out=best[:-1, :])
+        np.minimum(best[:, 1:], through[:, :-1], out=best[:, 1:])
+        np.minimum(best[:, :-1], through[:, 1:], out=best[:, :-1])
+        best[~free] = UNREACHABLE
+        if not (best < dist).any():
+            return dist.astype(np.int32)
+        dist = best
+
+
+def grid_hash(occ: np.ndarray, cell_size: int, costs: Optional[np.ndarray] = None) -> str:
+    h = hashlib.sha1()
+    h.update(np.ascontiguousarray(occ, dtype=np.uint8).tobytes())
+    if costs is not None:
+        h.update(np.ascontiguousarray(costs, dtype=np.int32).tobytes())
+    h.update(f'{occ.shape}:{cell_size}'.encode())
+    return h.hexdigest()[:16]
+
+
+class DistanceFields:
+    """목적지 이름별 거리장 모음 - 시작 시 한 번 계산하고 격자 해시로 캐시
+
+    clearance(셀별 장애물까지 거리)를 주면 벽에 붙은 셀일수록 비싸게 계산해 경로가 벽에서 떨어지게 한다.
+    """
+
+    def __init__(self, occ: np.ndarray, cell_size: int, cache_dir: str = DEFAULT_CACHE_DIR,
+                 clearance: Optional[np.ndarray] = None):
+        self.occ = occ
+        self.height, self.width = occ.shape
+        self.costs = None if clearance is None else step_costs(clearance)
+        self.cache_path = os.path.join(cache_dir, f'fields_{grid_hash(occ, cell_size, self.costs)}.npz')
+        self.fields: Dict[str, np.ndarray] = {}
+        self._goals: Dict[str, Tuple[Cell, ...]] = {}
+        self._dirty = False
+        self._load_cache()
+
+    def ensure(self, targets: Dict[str, List[Cell]]):
+        """필요한 목적지 거리장 준비 (캐시에 없거나 목적지 셀이 바뀐 것만 계산)"""
+        for name, goals in targets.items():
+            self.field(name, goals)
+        self.save()
+
+    def has(self, name: str, goals: List[Cell]) -> bool:
+        """같은 목적지 셀로 계산해 둔 거리장이 있는지 (없으면 호출 측이 다른 탐색으로 대신)"""
+        return name in self.fields and self._goals.get(name) == tuple(tuple(g) for g in goals)
+
+    def field(self, name: str, goals: List[Cell]) -> np.ndarray:
+        goals = tuple(tuple(g) for g in goals)
+        if name not in self.fields or self._goals.get(name) != goals:
+            self.fields[name] = compute_field(self.occ, list(goals), self.costs)
+            self._goals[name] = goals
+            self._dirty = True
+        return self.fields[name]
+
+    def cost(self, name: str, cell: Cell) -> Optional[int]:
+        cx, cy = cell
+        if not (0 <= cx < self.width and 0 <= cy < self.height):
+            return None
+        d = int(self.fields[name][cy, cx])
+        return None if d == UNREACHABLE else d
+
+    def descend(self, name: str, start: Cell) -> Optional[List[Cell]]:
+        """start에서 거리장을 따라 목적지까지 내려가는 셀 경로 (도달 불가면 None)"""
+        dist = self.fields[name]
+        if self.cost(name, start) is None:
+            return None
+        x, y = start
+        path = [start]
+        last = None
+        d = int(dist[y, x])
+        while d > 0:
+            order = NEIGHBORS if last is None else (last,) + tuple(n for n in NEIGHBORS if n != last)
+            for dx, dy in order:
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < self.width and 0 <= ny < self.height) or dist[ny, nx] == UNREACHABLE:
+                    continue
+                # 이 이웃으로 들어가는 비용만큼 정확히 줄어드는 이웃이 최단 경로 위의 다음 셀
+                step = 1 if self.costs is None else int(self.costs[ny, nx])
+                if int(dist[ny, nx]) + step == d:
+                    x, y, d, last = nx, ny, int(dist[ny, nx]), (dx, dy)
+                    path.append((x, y))
+                    break
+            else:
+                return None
+        return path
+
+    def save(self):
+        """새로 계산한 거리장이 있으면 캐시 파일 갱신"""
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            arrays = {}
+            for name, field in self.fields.items():
+                arrays[f'field__{name}'] = field
+                arrays[f'goals__{name}'] = np.array(self._goals[name], dtype=np.int32).reshape(-1, 2)
+            tmp_path = self.cache_path + '.tmp.npz'
+            np.savez_compressed(tmp_path, **arrays)
+            os.replace(tmp_path, self.cache_path)
+            self._dirty = False
+            print(f"💾 거리장 캐시 저장: {self.cache_path} ({len(self.fields)}개)")
+        except OSError as e:
+            print(f"⚠️ 거리장 캐시 저장 실패: {e}")
+
+    def _load_cache(self):
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with np.load(self.cache_path) as data:
+                for key in data.files:
+                    if not key.startswith('field__'):
+                        continue
+                    name = key[len('field__'):]
+                    self.fields[name] = data[key]
+                    self._goals[name] = tuple(tuple(int(v) for v in g) for g in data[f'goals__{name}'])
+            print(f"📂 거리장 캐시 로드: {self.cache_path} ({len(self.fields)}개)")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ 거리장 캐시 로드 실패, 다시 계산합니다: {e}")
+            self.fields.clear()
+            self._goals.clear()
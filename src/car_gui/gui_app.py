@@ -1,11 +1,9 @@
 import sys
 import random
 import datetime
-import subprocess
+import time
 import os
-import socket
 import json
-import threading
 from PyQt5.QtWidgets import (QApplication, QWidget, QLabel, QPushButton,
                              QVBoxLayout, QHBoxLayout, QDialog, QFrame,
                              QStackedWidget, QGridLayout, QProgressBar, QGraphicsOpacityEffect,
@@ -13,7 +11,10 @@ from PyQt5.QtWidgets import (QApplication, QWidget, QLabel, QPushButton,
 from PyQt5.QtGui import (QPixmap, QFont, QPainter, QPainterPath, QLinearGradient,
                          QColor, QIcon, QBrush, QPen, QPolygonF)
 from PyQt5.QtCore import (Qt, QTimer, QPropertyAnimation, QEasingCurve, pyqtProperty,
-                          QPointF, QSequentialAnimationGroup, QObject, pyqtSignal)
+                          QPointF, QSequentialAnimationGroup, QObject, pyqtSignal, QEvent)
+
+from car_session import shared_session, CH_PREFERENCE
+from Smart_parking_car_GUI import ParkingLotUI
 
 def get_destination_number(destination_name):
     destination_mapping = {
@@ -43,47 +44,28 @@ class WifiSender(QObject):
         super().__init__()
         self.host = host
         self.port = port
+        self.peer = 'vehicle'
+        self.session = shared_session()
+        self.session.add_peer(self.peer, host, port)
         print(f"📡 WifiSender 초기화 -> 대상: {self.host}:{self.port}")
 
     def send_data(self, data):
-        thread = threading.Thread(target=self._send_in_background, args=(data,))
-        thread.daemon = True
-        thread.start()
-
-    def _send_in_background(self, data):
-        error_message = None
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.settimeout(5)
-                print(f"연결 시도 중... -> {self.host}:{self.port}")
-                s.connect((self.host, self.port))
-                data['timestamp'] = datetime.datetime.now().isoformat()
-                message = json.dumps(data)
-
-                print("\n" + "="*50)
-                print("📩 전송할 데이터:")
-                print(json.dumps(data, indent=2, ensure_ascii=False))
-                print("="*50 + "\n")
-
-                s.sendall(message.encode('utf-8'))
-                print(f"🚀 데이터 전송 성공: {message}")
-                response = s.recv(1024)
-                print(f"📬 서버 응답: {response.decode('utf-8')}")
-
-        except socket.timeout:
-            error_message = f"❌ 전송 실패: 연결 시간 초과. {self.host} 기기가 켜져 있고 같은 네트워크에 있는지 확인하세요."
-            print(error_message)
-        except ConnectionRefusedError:
-            error_message = "❌ 전송 실패: 연결이 거부되었습니다. 대상 기기에서 수신 프로그램이 실행 중인지 확인하세요."
-            print(error_message)
-        except Exception as e:
-            error_message = f"❌ 전송 중 알 수 없는 오류 발생: {e}"
+        # 공유 차량 세션의 연결을 재사용해 전송 (연결이 끊겨 있으면 세션이 재연결 후 전송)
+        data['timestamp'] = datetime.datetime.now().isoformat()
+        print("\n" + "="*50)
+        print("📩 전송할 데이터:")
+        print(json.dumps(data, indent=2, ensure_ascii=False))
+        print("="*50 + "\n")
+        self.session.send(self.peer, CH_PREFERENCE, data, self._on_result)
+
+    def _on_result(self, success, response):
+        if success:
+            print(f"📬 서버 응답: {json.dumps(response, ensure_ascii=False)}")
+            self.send_finished.emit()
+        else:
+            error_message = f"❌ 전송 실패: 응답 시간 초과. {self.host} 기기가 켜져 있고 같은 네트워크에 있는지 확인하세요."
             print(error_message)
-        finally:
-            if error_message:
-                self.send_error.emit(error_message)
-            else:
-                self.send_finished.emit()
+            self.send_error.emit(error_message)
 
 
 HYUNDAI_COLORS = {
@@ -580,8 +562,13 @@ class RegularVehicleResult(BaseScreen):
             self.parent_window.show_destination_selection(self.vehicle_type, self.is_handicapped, 'regular')
 
 class HyundaiStyleUI(QWidget):
-    def __init__(self, vehicle_ip=None):
+    def __init__(self, vehicle_ip=None, trigger_time=None):
         super().__init__()
+        # 시작 지표 기준 시각 (트리거 수신 시각, 단독 실행이면 생성 시각)
+        self.trigger_time = trigger_time if trigger_time is not None else time.monotonic()
+        self.startup_metrics = {}
+        self.parking_ui = None
+        self.first_frame_pending = False
         if not vehicle_ip:
             print("⚠️ 경고: ESP32 IP 주소 없이 HyundaiStyleUI가 생성되었습니다. (단독 테스트용)")
             vehicle_ip = '127.0.0.1'
@@ -602,12 +589,20 @@ class HyundaiStyleUI(QWidget):
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.setSpacing(0)
+        # 최상위 스택: [선호 정보 입력 화면, 내비게이션 화면] - 내비게이션은 미리 만들어 두고 전환만 함
+        self.root_stack = QStackedWidget()
+        self.setup_page = QWidget()
+        setup_layout = QVBoxLayout(self.setup_page)
+        setup_layout.setContentsMargins(0, 0, 0, 0)
+        setup_layout.setSpacing(0)
         self.status_bar = StatusBar()
-        main_layout.addWidget(self.status_bar)
+        setup_layout.addWidget(self.status_bar)
         self.stacked_widget = QStackedWidget()
         self.home_screen = SimulationSetupScreen(self)
         self.stacked_widget.addWidget(self.home_screen)
-        main_layout.addWidget(self.stacked_widget)
+        setup_layout.addWidget(self.stacked_widget)
+        self.root_stack.addWidget(self.setup_page)
+        main_layout.addWidget(self.root_stack)
         self.setLayout(main_layout)
         self.setStyleSheet(f"background-color: {HYUNDAI_COLORS['background']};")
         self.showMaximized()
@@ -628,18 +623,50 @@ class HyundaiStyleUI(QWidget):
         
         self.wifi_sender.send_data(final_data)
 
-    def launch_parking_ui(self):
+    def prepare_parking_ui(self):
+        # 목적지를 고르는 동안 이벤트 루프 유휴 시점에 내비게이션 화면(지도, occupancy, 수신 포트)을 미리 생성
+        # (경로 거리장은 화면 생성을 막지 않도록 ParkingLotUI가 작업 스레드에서 계산)
+        if self.parking_ui is not None:
+            return
+        start = time.monotonic()
         try:
-            script_name = 'UI_testing.py'
-            print(f"\n✅ 전송 성공! 다음 UI 실행 시도: {script_name}")
-            subprocess.Popen([sys.executable, script_name])
-            QApplication.quit()
-        except FileNotFoundError:
-            print(f"❌ 실행 실패: {script_name} 파일을 찾을 수 없습니다.")
-            self.show_home()
+            self.parking_ui = ParkingLotUI(embedded=True)
         except Exception as e:
-            print(f"❌ 실행 실패: {script_name} 실행 중 오류 발생: {e}")
+            print(f"❌ 내비게이션 화면 생성 실패: {e}")
+            return
+        self.root_stack.addWidget(self.parking_ui)
+        self.parking_ui.view.viewport().installEventFilter(self)
+        self.startup_metrics['prepare_ms'] = (time.monotonic() - start) * 1000
+        print(f"🗺️ 내비게이션 화면 사전 생성 완료 ({self.startup_metrics['prepare_ms']:.0f} ms)")
+
+    def launch_parking_ui(self):
+        print("\n✅ 전송 성공! 내비게이션 화면으로 전환합니다.")
+        self.prepare_parking_ui()
+        if self.parking_ui is None:
             self.show_home()
+            return
+        self.startup_metrics['switch_at'] = time.monotonic()
+        self.first_frame_pending = True
+        self.root_stack.setCurrentWidget(self.parking_ui)
+
+    def eventFilter(self, obj, event):
+        # 전환 후 지도 뷰의 첫 페인트가 끝나면 트리거 -> 첫 내비게이션 프레임 시간 기록
+        if self.first_frame_pending and event.type() == QEvent.Paint and obj is self.parking_ui.view.viewport():
+            self.first_frame_pending = False
+            QTimer.singleShot(0, self.record_first_frame)
+        return super().eventFilter(obj, event)
+
+    def record_first_frame(self):
+        now = time.monotonic()
+        self.startup_metrics['trigger_to_first_frame_ms'] = (now - self.trigger_time) * 1000
+        self.startup_metrics['switch_to_first_frame_ms'] = (now - self.startup_metrics['switch_at']) * 1000
+        print(f"⏱️ 트리거 -> 첫 내비게이션 프레임: {self.startup_metrics['trigger_to_first_frame_ms']:.0f} ms "
+              f"(화면 전환 -> 첫 프레임 {self.startup_metrics['switch_to_first_frame_ms']:.0f} ms)")
+
+    def closeEvent(self, event):
+        if self.parking_ui is not None:
+            self.parking_ui.shutdown()
+        super().closeEvent(event)
 
     def handle_send_error(self, error_message):
         print("데이터 전송 실패로 인해 홈 화면으로 돌아갑니다.")
@@ -673,6 +700,7 @@ class HyundaiStyleUI(QWidget):
     def show_destination_selection(self, vehicle_type, is_handicapped, preferred_spot=None):
         destination_screen = DestinationSelectionScreen(vehicle_type, is_handicapped, self, preferred_spot)
         self.switch_screen(destination_screen)
+        QTimer.singleShot(0, self.prepare_parking_ui)
 
     def switch_screen(self, new_screen):
         while self.stacked_widget.count() > 1:
@@ -684,6 +712,7 @@ class HyundaiStyleUI(QWidget):
         self.stacked_widget.setCurrentWidget(new_screen)
 
     def show_home(self):
+        self.root_stack.setCurrentWidget(self.setup_page)
         while self.stacked_widget.count() > 1:
             widget_to_remove = self.stacked_widget.widget(1)
             self.stacked_widget.removeWidget(widget_to_remove)
@@ -0,0 +1,247 @@
+"""정적 지도 타일 렌더러 (줌 단계별 pixmap 타일, 지연 생성, 뷰포트 컬링, 상세도 단계, 메모리 상한 LRU)"""
+from collections import OrderedDict
+from math import floor
+from typing import Dict, List, Optional, Tuple
+
+from PyQt5.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem
+from PyQt5.QtGui import QBrush, QPainter, QPen, QColor, QFont, QFontMetricsF, QPixmap, QTransform
+from PyQt5.QtCore import Qt, QPointF, QRectF, QTimer
+
+TILE_PX = 256
+# 타일 픽셀 / 장면 단위 - 뷰 배율보다 크거나 같은 가장 작은 단계를 사용
+LEVEL_SCALES = (2.0, 1.0, 0.5, 0.25, 0.125, 0.0625)
+LABEL_MIN_SCALE = 0.2       # 뷰 배율이 이보다 작으면 라벨 생략
+GRADIENT_MIN_SCALE = 0.15   # 이보다 축소되면 그라디언트 대신 단색
+MAX_CACHE_BYTES = 48 << 20
+MAX_RENDERS_PER_PAINT = 12  # 한 번의 paint에서 새로 그리는 타일 수 상한 (나머지는 다음 프레임)
+BUCKET_SIZE = 512.0         # 공간 인덱스 버킷 크기 (장면 단위)
+
+TileKey = Tuple[int, int, int]
+
+
+def _buckets(rect: QRectF):
+    for bx in range(floor(rect.left() / BUCKET_SIZE), floor(rect.right() / BUCKET_SIZE) + 1):
+        for by in range(floor(rect.top() / BUCKET_SIZE), floor(rect.bottom() / BUCKET_SIZE) + 1):
+            yield bx, by
+
+
+class MapRect:
+    """타일에 그려지는 사각형 (QGraphicsRectItem과 같은 rect/brush/pen 접근자 제공)"""
+
+    def __init__(self, owner: 'TiledMapItem', rect: QRectF, brush: QBrush, pen: QPen):
+        self._owner = owner
+        self._rect = QRectF(rect)
+        self._brush = QBrush(brush)
+        self._pen = QPen(pen)
+
+    def rect(self) -> QRectF:
+        return QRectF(self._rect)
+
+    def brush(self) -> QBrush:
+        return QBrush(self._brush)
+
+    def pen(self) -> QPen:
+        return QPen(self._pen)
+
+    def setBrush(self, brush: QBrush):
+        self._brush = QBrush(brush)
+        self._owner.invalidate(self.bounds())
+
+    def setPen(self, pen: QPen):
+        old = self.bounds()
+        self._pen = QPen(pen)
+        self._owner.invalidate(old.united(self.bounds()))
+
+    def bounds(self) -> QRectF:
+        half = 0 if self._pen.style() == Qt.NoPen else self._pen.widthF() / 2
+        return self._rect.adjusted(-half, -half, half, half)
+
+
+class MapLabel:
+    """화면 크기가 고정된 텍스트 라벨 (anchor는 화면에서 본 좌상단, ItemIgnoresTransformations 텍스트와 동일)"""
+
+    def __init__(self, text: str, anchor: QPointF, font: QFont, color: QColor):
+        self.text = text
+        self.anchor = QPointF(anchor)
+        self.font = QFont(font)
+        self.color = QColor(color)
+        metrics = QFontMetricsF(self.font)
+        self.width_px = metrics.horizontalAdvance(text) if hasattr(metrics, 'horizontalAdvance') else metrics.width(text)
+        self.height_px = metrics.height()
+        self.ascent_px = metrics.ascent()
+
+
+class TiledMapItem(QGraphicsItem):
+    """정적 도형은 타일 pixmap으로 미리 그려 두고 보이는 타일만 그리는 QGraphicsItem
+
+    라벨은 화면 크기가 고정이라 타일에 굽지 않고, 보이는 영역의 라벨만 장치 좌표로 직접 그린다.
+    """
+
+    def __init__(self, parent: Optional[QGraphicsItem] = None):
+        super().__init__(parent)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+        self._rects: List[MapRect] = []
+        self._labels: List[MapLabel] = []
+        self._rect_index: Dict[Tuple[int, int], List[int]] = {}
+        self._label_index: Dict[Tuple[int, int], List[int]] = {}
+        self._max_label_px = (0.0, 0.0)
+        self._bounds = QRectF()
+        self._tiles: 'OrderedDict[TileKey, QPixmap]' = OrderedDict()
+        self._tile_bytes = TILE_PX * TILE_PX * 4
+        self._pending_update = False
+        self.tiles_rendered = 0
+
+    # ---------------- 도형 등록 ----------------
+
+    def add_rect(self, rect: QRectF, brush: QBrush, pen: QPen) -> MapRect:
+        item = MapRect(self, rect, brush, pen)
+        idx = len(self._rects)
+        self._rects.append(item)
+        for b in _buckets(item.bounds()):
+            self._rect_index.setdefault(b, []).append(idx)
+        self._grow(item.bounds())
+        return item
+
+    def add_label(self, text: str, anchor: QPointF, font: QFont, color: QColor) -> MapLabel:
+        label = MapLabel(text, anchor, font, color)
+        idx = len(self._labels)
+        self._labels.append(label)
+        self._label_index.setdefault(next(_buckets(QRectF(anchor, anchor))), []).append(idx)
+        self._max_label_px = (max(self._max_label_px[0], label.width_px), max(self._max_label_px[1], label.height_px))
+        # 뷰가 y축을 뒤집을 수 있으므로 위아래 모두 라벨 높이만큼 포함
+        w, h = label.width_px / LABEL_MIN_SCALE, label.height_px / LABEL_MIN_SCALE
+        self._grow(QRectF(anchor.x(), anchor.y() - h, w, 2 * h))
+        return label
+
+    def _grow(self, rect: QRectF):
+        self.prepareGeometryChange()
+        self._bounds = self._bounds.united(rect) if not self._bounds.isNull() else QRectF(rect)
+        self.invalidate(rect)
+
+    def invalidate(self, rect: Optional[QRectF] = None):
+        """rect와 겹치는 타일을 모든 단계에서 버리고 다시 그리기 요청 (None이면 전체)"""
+        if rect is None:
+            self._tiles.clear()
+            self.update()
+            return
+        for key in [k for k in self._tiles if self._tile_rect(k).intersects(rect)]:
+            del self._tiles[key]
+        self.update(rect)
+
+    # ---------------- QGraphicsItem ----------------
+
+    def boundingRect(self) -> QRectF:
+        return QRectF(self._bounds)
+
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget=None):
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        level = self.level_for(lod)
+        scale = LEVEL_SCALES[level]
+        size = TILE_PX / scale
+        exposed = option.exposedRect.intersected(self._bounds)
+        if exposed.isEmpty():
+            return
+        budget = MAX_RENDERS_PER_PAINT
+        deferred = False
+        for tx in range(floor(exposed.left() / size), floor(exposed.right() / size) + 1):
+            for ty in range(floor(exposed.top() / size), floor(exposed.bottom() / size) + 1):
+                key = (level, tx, ty)
+                pixmap = self._tiles.get(key)
+                if pixmap is None:
+                    if budget <= 0:
+                        deferred = True
+                        continue
+                    budget -= 1
+                    pixmap = self._render_tile(key)
+                    self._store(key, pixmap)
+                else:
+                    self._tiles.move_to_end(key)
+                painter.drawPixmap(QRectF(tx * size, ty * size, size, size), pixmap, QRectF(0, 0, TILE_PX, TILE_PX))
+        if lod >= LABEL_MIN_SCALE and self._labels:
+            self._draw_labels(painter, exposed, lod)
+        if deferred and not self._pending_update:
+            # 못 그린 타일은 이벤트 루프를 한 번 돌린 뒤 이어서 생성
+            self._pending_update = True
+            QTimer.singleShot(0, self._continue_render)
+
+    def _continue_render(self):
+        self._pending_update = False
+        self.update()
+
+    # ---------------- 타일 ----------------
+
+    @staticmethod
+    def level_for(lod: float) -> int:
+        for level in range(len(LEVEL_SCALES) - 1, -1, -1):
+            if LEVEL_SCALES[level] >= lod:
+                return level
+        return 0
+
+    @staticmethod
+    def _tile_rect(key: TileKey) -> QRectF:
+        level, tx, ty = key
+        size = TILE_PX / LEVEL_SCALES[level]
+        return QRectF(tx * size, ty * size, size, size)
+
+    def _store(self, key: TileKey, pixmap: QPixmap):
+        self._tiles[key] = pixmap
+        while len(self._tiles) * self._tile_bytes > MAX_CACHE_BYTES:
+            self._tiles.popitem(last=False)
+
+    def _query(self, index: Dict[Tuple[int, int], List[int]], rect: QRectF) -> List[int]:
+        found = set()
+        for b in _buckets(rect):
+            found.update(index.get(b, ()))
+        return sorted(found)
+
+    def _render_tile(self, key: TileKey) -> QPixmap:
+        level = key[0]
+        scale = LEVEL_SCALES[level]
+        tile = self._tile_rect(key)
+        pixmap = QPixmap(TILE_PX, TILE_PX)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.scale(scale, scale)
+        painter.translate(-tile.x(), -tile.y())
+        for i in self._query(self._rect_index, tile):
+            if self._rects[i].bounds().intersects(tile):
+                self._draw_rect(painter, self._rects[i], scale)
+        painter.end()
+        self.tiles_rendered += 1
+        return pixmap
+
+    def _draw_rect(self, painter: QPainter, item: MapRect, scale: float):
+        brush = item._brush
+        if scale < GRADIENT_MIN_SCALE and brush.gradient() is not None:
+            stops = brush.gradient().stops()
+            brush = QBrush(stops[0][1] if stops else QColor(0, 0, 0, 0))
+        elif Qt.Dense1Pattern <= brush.style() <= Qt.DiagCrossPattern:
+            # 빗금 패턴은 타일 배율과 무관하게 화면 픽셀 간격 유지
+            brush = QBrush(brush)
+            brush.setTransform(QTransform.fromScale(1 / scale, 1 / scale))
+        painter.setBrush(brush)
+        painter.setPen(item._pen)
+        painter.drawRect(item._rect)
+
+    def _draw_labels(self, painter: QPainter, exposed: QRectF, lod: float):
+        # 라벨은 화면 픽셀 크기가 고정이므로 현재 배율에서의 장면 크기만큼 넓혀 조회
+        w, h = self._max_label_px[0] / lod, self._max_label_px[1] / lod
+        area = exposed.adjusted(-w, -h, 0, h)
+        transform = painter.worldTransform()
+        painter.save()
+        painter.resetTransform()
+        for i in self._query(self._label_index, area):
+            label = self._labels[i]
+            if not area.contains(label.anchor):
+                continue
+            origin = transform.map(label.anchor)
+            painter.setFont(label.font)
+            painter.setPen(QPen(label.color))
+            painter.drawText(QPointF(origin.x(), origin.y() + label.ascent_px), label.text)
+        painter.restore()
+
+    def cache_info(self) -> dict:
+        return {'tiles': len(self._tiles), 'bytes': len(self._tiles) * self._tile_bytes,
+                'rendered': self.tiles_rendered, 'rects': len(self._rects), 'labels': len(self._labels)}
@@ -0,0 +1,155 @@
+"""주차장 occupancy 격자 (배열 슬라이스 래스터화, 장애물 팽창, 거리 변환 기반 최근접 자유 셀 인덱스)"""
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+try:
+    from scipy.ndimage import distance_transform_edt
+except ImportError:  # scipy가 없으면 아래 순수 numpy 구현 사용
+    distance_transform_edt = None
+
+Cell = Tuple[int, int]
+_INF = 1e20
+
+
+def _edt_1d(g: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """1차원 제곱 거리 변환 (Felzenszwalb-Huttenlocher 하한 포락선), (거리², 최근접 위치) 반환"""
+    n = len(g)
+    d = np.full(n, _INF)
+    arg = np.full(n, -1, dtype=np.int64)
+    sites = [q for q in range(n) if g[q] < _INF]
+    if not sites:
+        return d, arg
+    v = [sites[0]]
+    z = [-_INF, _INF]
+    for q in sites[1:]:
+        while True:
+            p = v[-1]
+            s = ((g[q] + q * q) - (g[p] + p * p)) / (2 * q - 2 * p)
+            if s > z[len(v) - 1]:
+                break
+            # z[0] = -inf 이므로 포물선이 모두 제거되는 경우는 없음
+            v.pop()
+            z.pop()
+        v.append(q)
+        z[-1] = s
+        z.append(_INF)
+    k = 0
+    for x in range(n):
+        while z[k + 1] < x:
+            k += 1
+        p = v[k]
+        d[x] = (x - p) ** 2 + g[p]
+        arg[x] = p
+    return d, arg
+
+
+def _edt_numpy(features: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """features(True) 셀까지의 유클리드 거리와 최근접 feature 좌표 (iy, ix)"""
+    h, w = features.shape
+    rows = np.arange(h)
+    # 1단계: 열마다 가장 가까운 feature 행 (정렬된 feature 행에서 이진 탐색)
+    col_d = np.full((h, w), _INF)
+    col_arg = np.full((h, w), -1, dtype=np.int64)
+    for x in range(w):
+        ys = rows[features[:, x]]
+        if len(ys) == 0:
+            continue
+        pos = np.searchsorted(ys, rows)
+        below = ys[np.clip(pos - 1, 0, len(ys) - 1)]
+        above = ys[np.clip(pos, 0, len(ys) - 1)]
+        nearest = np.where(np.abs(rows - below) <= np.abs(above - rows), below, above)
+        col_arg[:, x] = nearest
+        col_d[:, x] = (rows - nearest) ** 2
+    # 2단계: 행마다 포락선으로 열 방향 결합
+    dist2 = np.full((h, w), _INF)
+    iy = np.full((h, w), -1, dtype=np.int64)
+    ix = np.full((h, w), -1, dtype=np.int64)
+    for y in range(h):
+        d, arg = _edt_1d(col_d[y])
+        ok = arg >= 0
+        dist2[y] = d
+        ix[y, ok] = arg[ok]
+        iy[y, ok] = col_arg[y, arg[ok]]
+    return np.sqrt(dist2), iy, ix
+
+
+def edt_with_indices(features: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """features 셀까지 거리 변환 (scipy가 있으면 scipy, 없으면 numpy 구현)"""
+    if not features.any():
+        shape = features.shape
+        return np.full(shape, np.inf), np.full(shape, -1), np.full(shape, -1)
+    if distance_transform_edt is not None:
+        dist, (iy, ix) = distance_transform_edt(~features, return_indices=True)
+        return dist, iy, ix
+    return _edt_numpy(features)
+
+
+class OccupancyGrid:
+    """장면 좌표(px) 사각형 장애물을 셀 격자로 래스터화하고 거리 변환 인덱스를 유지"""
+
+    def __init__(self, scene_w: int, scene_h: int, cell: int, margin: int = 0, inflation: float = 0.0):
+        self.scene_w, self.scene_h = scene_w, scene_h
+        self.cell = cell
+        self.margin = margin
+        self.inflation = inflation
+        self.width = (scene_w + cell - 1) // cell
+        self.height = (scene_h + cell - 1) // cell
+        self.occ = np.zeros((self.height, self.width), dtype=np.uint8)
+        self._clearance: Optional[np.ndarray] = None
+        self._nearest: Optional[np.ndarray] = None
+
+    def add_rect(self, x: float, y: float, w: float, h: float):
+        """사각형 장애물(+margin) 이 걸치는 셀을 한 번의 슬라이스 대입으로 점유 처리"""
+        C, W, H = self.cell, self.scene_w, self.scene_h
+        x0, y0 = max(0, x - self.margin), max(0, y - self.margin)
+        x1, y1 = min(W, x + w + self.margin), min(H, y + h + self.margin)
+        if x1 <= x0 or y1 <= y0:
+            return
+        cx0, cy0 = int(x0 // C), int(y0 // C)
+        cx1, cy1 = int((x1 - 1) // C), int((y1 - 1) // C)
+        self.occ[cy0:cy1 + 1, cx0:cx1 + 1] = 1
+        self._clearance = self._nearest = None
+
+    def add_rects(self, rects: Iterable[Tuple[float, float, float, float]]):
+        for x, y, w, h in rects:
+            self.add_rect(x, y, w, h)
+
+    def finalize(self):
+        """장애물 팽창 후 clearance 거리장과 최근접 자유 셀 인덱스 계산"""
+        obstacles = self.occ != 0
+        if self.inflation > 0:
+            dist, _, _ = edt_with_indices(obstacles)
+            obstacles |= dist * self.cell <= self.inflation
+            self.occ = obstacles.astype(np.uint8)
+        # 자유 셀 -> 가장 가까운 장애물까지 거리 (셀 단위)
+        self._clearance, _, _ = edt_with_indices(obstacles)
+        # 모든 셀 -> 가장 가까운 자유 셀 좌표 (자유 셀은 자기 자신)
+        _, iy, ix = edt_with_indices(~obstacles)
+        self._nearest = np.stack([ix, iy], axis=-1).astype(np.int32)
+
+    def occ_bytes(self) -> bytearray:
+        """점유 배열의 평면 bytearray 복사본 (인덱스 cy * width + cx)"""
+        return bytearray(self.occ.tobytes())
+
+    def is_free(self, cx: int, cy: int) -> bool:
+        return 0 <= cx < self.width and 0 <= cy < self.height and not self.occ[cy, cx]
+
+    def clamp_cell(self, cx: int, cy: int) -> Cell:
+        return min(max(cx, 0), self.width - 1), min(max(cy, 0), self.height - 1)
+
+    def nearest_free(self, cx: int, cy: int) -> Optional[Cell]:
+        """가장 가까운 자유 셀 (O(1) 조회, 자유 셀이 없으면 None)"""
+        if self._nearest is None:
+            self.finalize()
+        cx, cy = self.clamp_cell(cx, cy)
+        nx, ny = self._nearest[cy, cx]
+        if nx < 0:
+            return None
+        return int(nx), int(ny)
+
+    def clearance_field(self) -> np.ndarray:
+        """셀별 가장 가까운 장애물까지 거리 배열 [y, x] (셀 단위, 점유 셀은 0, 장애물이 없으면 inf)"""
+        if self._clearance is None:
+            self.finalize()
+        return self._clearance
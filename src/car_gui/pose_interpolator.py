@@ -0,0 +1,69 @@
+"""수신 위치 샘플 버퍼링 및 화면 주기 보간/외삽 (네트워크 주기와 무관한 부드러운 차량 이동)"""
+import time
+from bisect import bisect_right
+from collections import deque
+from math import atan2, degrees, hypot
+from typing import Deque, Optional, Tuple
+
+Sample = Tuple[float, float, float]  # (수신 시각, x, y)
+Pose = Tuple[float, float, float]    # (x, y, heading deg)
+
+DEFAULT_PLAYOUT_DELAY = 0.15    # 샘플 간격보다 약간 길게 두어 항상 두 샘플 사이를 보간
+DEFAULT_MAX_EXTRAPOLATION = 0.3
+DEFAULT_BUFFER_SIZE = 32
+TELEPORT_DISTANCE = 300.0       # 이보다 크게 튀는 샘플은 보간하지 않고 바로 이동
+
+
+class PoseInterpolator:
+    """타임스탬프 샘플을 버퍼링하고 (현재 - playout_delay) 시점의 위치를 계산"""
+
+    def __init__(self, playout_delay: float = DEFAULT_PLAYOUT_DELAY,
+                 max_extrapolation: float = DEFAULT_MAX_EXTRAPOLATION,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.playout_delay = playout_delay
+        self.max_extrapolation = max_extrapolation
+        self.samples: Deque[Sample] = deque(maxlen=buffer_size)
+        self._heading = 0.0
+
+    def push(self, x: float, y: float, t: Optional[float] = None):
+        t = time.monotonic() if t is None else t
+        if self.samples:
+            lt, lx, ly = self.samples[-1]
+            if t <= lt:
+                # 같은 시각(또는 역순) 샘플은 마지막 샘플 갱신
+                self.samples[-1] = (lt, x, y)
+                return
+            if hypot(x - lx, y - ly) > TELEPORT_DISTANCE:
+                self.samples.clear()
+        self.samples.append((t, x, y))
+
+    def reset(self):
+        self.samples.clear()
+
+    def settled(self, now: Optional[float] = None) -> bool:
+        """마지막 샘플 이후 외삽 한도까지 지나 더 이상 위치가 변하지 않는지"""
+        if not self.samples:
+            return True
+        now = time.monotonic() if now is None else now
+        return now - self.playout_delay - self.samples[-1][0] >= self.max_extrapolation
+
+    def sample(self, now: Optional[float] = None) -> Optional[Pose]:
+        if not self.samples:
+            return None
+        now = time.monotonic() if now is None else now
+        t = now - self.playout_delay
+        samples = self.samples
+        if len(samples) == 1 or t <= samples[0][0]:
+            _, x, y = samples[0] if t <= samples[0][0] else samples[-1]
+            return x, y, self._heading
+        if t >= samples[-1][0]:
+            (t0, x0, y0), (t1, x1, y1) = samples[-2], samples[-1]
+            t = min(t, t1 + self.max_extrapolation)
+        else:
+            i = bisect_right([s[0] for s in samples], t)
+            (t0, x0, y0), (t1, x1, y1) = samples[i - 1], samples[i]
+        r = (t - t0) / (t1 - t0)
+        if hypot(x1 - x0, y1 - y0) > 1e-6:
+            self._heading = degrees(atan2(y1 - y0, x1 - x0))
+        return x0 + (x1 - x0) * r, y0 + (y1 - y0) * r, self._heading
+
@@ -0,0 +1,106 @@
+"""경로 기하 캐시 (경로당 한 번 누적 거리/선분 방향/회전 이벤트를 계산해 매 위치 갱신을 O(1)에 처리)"""
+from bisect import bisect_right
+from math import atan2, degrees, sqrt
+from typing import List, Optional, Sequence, Tuple
+
+TURN_THRESHOLD_DEG = 45
+ADVANCE_DISTANCE = 50       # 다음 꼭짓점까지 이 거리 이내면 다음 선분으로 진행
+PROJECT_WINDOW = (1, 2)     # 현재 선분 기준 앞/뒤로 투영을 시도할 선분 수
+
+
+class RouteGeometry:
+    """꼭짓점 목록 (x, y)으로 만든 경로의 불변 기하 정보"""
+
+    def __init__(self, pts: Sequence[Tuple[float, float]], pixels_per_meter: float):
+        self.xs = [float(p[0]) for p in pts]
+        self.ys = [float(p[1]) for p in pts]
+        self.ppm = pixels_per_meter
+        n = len(pts)
+        self.n_segments = max(0, n - 1)
+        # 선분별 방향 벡터 / 길이² / 길이, 꼭짓점별 누적 거리(px)
+        self.dx = [self.xs[i + 1] - self.xs[i] for i in range(self.n_segments)]
+        self.dy = [self.ys[i + 1] - self.ys[i] for i in range(self.n_segments)]
+        self.len_sq = [dx * dx + dy * dy for dx, dy in zip(self.dx, self.dy)]
+        self.cum = [0.0]
+        for l2 in self.len_sq:
+            self.cum.append(self.cum[-1] + sqrt(l2))
+        self.total = self.cum[-1]
+        # 회전 이벤트: (꼭짓점 index, '좌회전'/'우회전')
+        self.turn_vertices: List[int] = []
+        self.turn_labels: List[str] = []
+        for i in range(1, n - 1):
+            if self.len_sq[i - 1] == 0 or self.len_sq[i] == 0:
+                continue
+            angle = (degrees(atan2(self.dy[i], self.dx[i])) - degrees(atan2(self.dy[i - 1], self.dx[i - 1])) + 180) % 360 - 180
+            if angle > TURN_THRESHOLD_DEG:
+                self.turn_vertices.append(i); self.turn_labels.append("좌회전")
+            elif angle < -TURN_THRESHOLD_DEG:
+                self.turn_vertices.append(i); self.turn_labels.append("우회전")
+
+    def advance(self, index: int, x: float, y: float) -> int:
+        """차량이 지나간 선분을 건너뛴 현재 선분 index"""
+        while index < self.n_segments:
+            nx, ny = self.xs[index + 1], self.ys[index + 1]
+            l2 = self.len_sq[index]
+            ratio = 1.0 if l2 == 0 else ((x - self.xs[index]) * self.dx[index] + (y - self.ys[index]) * self.dy[index]) / l2
+            if (x - nx) ** 2 + (y - ny) ** 2 < ADVANCE_DISTANCE ** 2 or ratio > 1.0:
+                index += 1
+            else:
+                break
+        return index
+
+    def project_segment(self, seg: int, x: float, y: float) -> Tuple[float, float, float]:
+        """선분 seg 위 최근접점 (px, py, 비율 t)"""
+        l2 = self.len_sq[seg]
+        ax, ay = self.xs[seg], self.ys[seg]
+        t = 0.0 if l2 == 0 else max(0.0, min(1.0, ((x - ax) * self.dx[seg] + (y - ay) * self.dy[seg]) / l2))
+        return ax + self.dx[seg] * t, ay + self.dy[seg] * t, t
+
+    def project(self, index: int, x: float, y: float) -> Optional[Tuple[float, float, int, float, float]]:
+        """현재 선분 주변 창에서 최근접 투영 (px, py, seg, t, 거리), 선분이 없으면 None"""
+        if self.n_segments == 0:
+            return None
+        index = min(index, self.n_segments - 1)
+        best = None
+        for seg in range(max(0, index - PROJECT_WINDOW[0]), min(self.n_segments, index + PROJECT_WINDOW[1] + 1)):
+            px, py, t = self.project_segment(seg, x, y)
+            d2 = (x - px) ** 2 + (y - py) ** 2
+            if best is None or d2 < best[4]:
+                best = (px, py, seg, t, d2)
+        px, py, seg, t, d2 = best
+        return px, py, seg, t, sqrt(d2)
+
+    def distance_to_segment(self, index: int, x: float, y: float) -> float:
+        seg = min(index, self.n_segments - 1)
+        px, py, _ = self.project_segment(seg, x, y)
+        return sqrt((x - px) ** 2 + (y - py) ** 2)
+
+    def progress(self, index: int, x: float, y: float) -> float:
+        """진행률(%) = 투영점까지 누적 거리 / 전체 길이"""
+        if self.total == 0:
+            return 0
+        hit = self.project(index, x, y)
+        if hit is None:
+            return 0
+        _, _, seg, t, _ = hit
+        traveled = self.cum[seg] + (self.cum[seg + 1] - self.cum[seg]) * t
+        return min(100, traveled / self.total * 100)
+
+    def instructions(self, index: int, x: float, y: float, prefix: str = "", final: str = "목적지 도착") -> List[Tuple[str, float]]:
+        """현재 위치 이후의 회전 이벤트 목록 [(안내, 직전 안내로부터 거리 m), ...]"""
+        nxt = index + 1
+        if nxt >= len(self.xs):
+            return []
+        ppm = self.ppm
+        # 현재 위치 -> 다음 꼭짓점은 실제 거리, 이후는 누적 거리 차
+        base = sqrt((self.xs[nxt] - x) ** 2 + (self.ys[nxt] - y) ** 2) - self.cum[nxt]
+        out = []
+        last = None
+        for k in range(bisect_right(self.turn_vertices, index), len(self.turn_vertices)):
+            v = self.turn_vertices[k]
+            dist = (self.cum[v] + base) if last is None else (self.cum[v] - self.cum[last])
+            out.append((prefix + self.turn_labels[k], dist / ppm))
+            last = v
+        end = self.cum[-1] + base if last is None else self.cum[-1] - self.cum[last]
+        out.append((final, end / ppm))
+        return out
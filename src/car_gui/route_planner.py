@@ -0,0 +1,260 @@
+"""격자 경로 탐색 엔진 (4방향 Jump Point Search + 시야선 스무딩)"""
+from array import array
+from heapq import heappush, heappop
+from typing import List, Optional, Sequence, Tuple
+
+Cell = Tuple[int, int]
+
+INF = 0x7FFFFFFF
+# 도착 방향 (부모 -> 현재 노드)
+DIR_NONE, DIR_XP, DIR_XN, DIR_YP, DIR_YN = 0, 1, 2, 3, 4
+DIR_VEC = {DIR_XP: (1, 0), DIR_XN: (-1, 0), DIR_YP: (0, 1), DIR_YN: (0, -1)}
+VEC_DIR = {v: k for k, v in DIR_VEC.items()}
+
+
+class GridPlanner:
+    """occupancy 격자(0=자유, 그 외=점유) 위의 최단 경로 탐색기
+
+    g-score/부모는 셀 id(cy * width + cx)로 인덱싱한 평면 배열,
+    closed set은 bytearray로 관리한다. 균일 비용 4방향 격자이므로 JPS로
+    직선 구간을 건너뛰어 힙 연산 수를 줄이고, 방향별 다음 점프 포인트/벽까지의
+    거리를 격자 생성 시 미리 계산해 점프 자체도 O(1)로 처리한다.
+    """
+
+    def __init__(self, occ: Sequence[int], width: int, height: int):
+        self.occ = occ
+        self.width = width
+        self.height = height
+        size = width * height
+        self._build_jump_tables()
+        self._g = array('i', [INF]) * size
+        self._parent = array('i', [-1]) * size
+        self._arrive = bytearray(size)
+        self._closed = bytearray(size)
+        self._touched: List[int] = []
+        self.expanded = 0
+
+    def free(self, cx: int, cy: int) -> bool:
+        return 0 <= cx < self.width and 0 <= cy < self.height and not self.occ[cy * self.width + cx]
+
+    # ---------------- 탐색 ----------------
+
+    def plan(self, start: Cell, goal: Cell) -> Optional[List[Cell]]:
+        """start -> goal 최단 셀 경로 (양 끝 포함), 경로가 없으면 None"""
+        if not (self.free(*start) and self.free(*goal)):
+            return None
+        if start == goal:
+            return [start]
+
+        self._reset()
+        W = self.width
+        g, parent, arrive, closed = self._g, self._parent, self._arrive, self._closed
+        gx, gy = goal
+        sid = start[1] * W + start[0]
+        goal_id = gy * W + gx
+        self._set(sid, 0, -1, DIR_NONE)
+        openh = [(abs(start[0] - gx) + abs(start[1] - gy), 0, sid)]
+        self.expanded = 0
+
+        while openh:
+            _, gc, nid = heappop(openh)
+            if closed[nid]:
+                continue
+            closed[nid] = 1
+            self.expanded += 1
+            if nid == goal_id:
+                return self._reconstruct(goal_id)
+            x, y = nid % W, nid // W
+            for dx, dy in self._successor_dirs(x, y, arrive[nid]):
+                jp = self._jump(x, y, dx, dy, goal)
+                if jp is None:
+                    continue
+                jx, jy = jp
+                jid = jy * W + jx
+                if closed[jid]:
+                    continue
+                ng = gc + abs(jx - x) + abs(jy - y)
+                if ng < g[jid]:
+                    self._set(jid, ng, nid, VEC_DIR[(dx, dy)])
+                    heappush(openh, (ng + abs(jx - gx) + abs(jy - gy), ng, jid))
+        return None
+
+    def _successor_dirs(self, x: int, y: int, d: int) -> List[Tuple[int, int]]:
+        """도착 방향 기준 가지치기된 탐색 방향"""
+        if d == DIR_NONE:
+            return list(DIR_VEC.values())
+        dx, dy = DIR_VEC[d]
+        free = self.free
+        if dy == 0:
+            # 수평 이동: 진행 방향 + 위/아래 (수평 점프가 매 칸 수직 탐색을 포함하므로)
+            return [(dx, 0), (0, 1), (0, -1)]
+        dirs = [(0, dy)]
+        # 수직 이동: 옆 칸이 뒤쪽에서 막혀 있던 경우(강제 이웃)만 수평 전환
+        for vx in (1, -1):
+            if free(x + vx, y) and not free(x + vx, y - dy):
+                dirs.append((vx, 0))
+        return dirs
+
+    def _jump(self, x: int, y: int, dx: int, dy: int, goal: Cell) -> Optional[Cell]:
+        """(x, y)에서 (dx, dy) 방향 다음 점프 포인트 (정적 점프 포인트 또는 목적지)"""
+        W = self.width
+        nid = y * W + x
+        d = VEC_DIR[(dx, dy)]
+        wall = self._wall[d][nid]
+        if wall == 0:
+            return None
+        step = self._stop[d][nid]
+        gx, gy = goal
+        if dy == 0:
+            # 수평 점프: 목적지 열에 도달했을 때 그 열의 수직 자유 구간에 목적지가 있으면 정지
+            k = (gx - x) * dx
+            if 0 < k <= wall and (step == 0 or k < step) \
+                    and self._vrun[y * W + gx] == self._vrun[gy * W + gx]:
+                return gx, y
+        elif gx == x:
+            k = (gy - y) * dy
+            if 0 < k <= wall and (step == 0 or k < step):
+                return gx, gy
+        if step == 0:
+            return None
+        return x + dx * step, y + dy * step
+
+    def _build_jump_tables(self):
+        """방향별 벽까지 자유 칸 수 / 다음 정적 점프 포인트까지 거리 / 수직 자유 구간 id"""
+        W, H = self.width, self.height
+        size = W * H
+        free = self.free
+        self._wall = {d: array('i', [0]) * size for d in DIR_VEC}
+        self._stop = {d: array('i', [0]) * size for d in DIR_VEC}
+        self._vrun = array('i', [-1]) * size
+        # 수직 이동 중 목적지가 아닌 정적 정지 조건이 앞쪽에 있는지
+        vfinds = {DIR_YP: bytearray(size), DIR_YN: bytearray(size)}
+
+        def vforced(x, y, dy):
+            return any(free(x + vx, y) and not free(x + vx, y - dy) for vx in (1, -1))
+
+        def hforced(x, y, dx):
+            return any(free(x, y + vy) and not free(x - dx, y + vy) for vy in (1, -1))
+
+        run_id = 0
+        for x in range(W):
+            for y in range(H):
+                if free(x, y):
+                    if not free(x, y - 1):
+                        run_id += 1
+                    self._vrun[y * W + x] = run_id
+            for d, dy, ys in ((DIR_YP, 1, range(H - 1, -1, -1)), (DIR_YN, -1, range(H))):
+                wall, stop, found = self._wall[d], self._stop[d], vfinds[d]
+                for y in ys:
+                    nid = y * W + x
+                    ny = y + dy
+                    if not free(x, ny):
+                        continue
+                    nn = ny * W + x
+                    wall[nid] = wall[nn] + 1
+                    if vforced(x, ny, dy):
+                        stop[nid] = 1
+                    elif stop[nn]:
+                        stop[nid] = stop[nn] + 1
+                    found[nid] = 1 if stop[nid] else 0
+
+        for y in range(H):
+            for d, dx, xs in ((DIR_XP, 1, range(W - 1, -1, -1)), (DIR_XN, -1, range(W))):
+                wall, stop = self._wall[d], self._stop[d]
+                for x in xs:
+                    nid = y * W + x
+                    nx = x + dx
+                    if not free(nx, y):
+                        continue
+                    nn = y * W + nx
+                    wall[nid] = wall[nn] + 1
+                    if hforced(nx, y, dx) or vfinds[DIR_YP][nn] or vfinds[DIR_YN][nn]:
+                        stop[nid] = 1
+                    elif stop[nn]:
+                        stop[nid] = stop[nn] + 1
+
+    def _set(self, nid: int, gval: int, parent: int, d: int):
+        if self._g[nid] == INF:
+            self._touched.append(nid)
+        self._g[nid] = gval
+        self._parent[nid] = parent
+        self._arrive[nid] = d
+
+    def _reset(self):
+        # 이전 탐색에서 건드린 셀만 초기화 (재탐색 비용을 격자 크기와 무관하게 유지)
+        g, parent, arrive, closed = self._g, self._parent, self._arrive, self._closed
+        for nid in self._touched:
+            g[nid] = INF
+            parent[nid] = -1
+            arrive[nid] = DIR_NONE
+            closed[nid] = 0
+        self._touched = []
+
+    def _reconstruct(self, goal_id: int) -> List[Cell]:
+        """점프 포인트 사이 직선 구간을 셀 단위로 펼쳐 전체 경로 생성"""
+        W = self.width
+        jumps = []
+        nid = goal_id
+        while nid != -1:
+            jumps.append((nid % W, nid // W))
+            nid = self._parent[nid]
+        jumps.reverse()
+        cells = [jumps[0]]
+        for (x0, y0), (x1, y1) in zip(jumps, jumps[1:]):
+            sx = (x1 > x0) - (x1 < x0)
+            sy = (y1 > y0) - (y1 < y0)
+            x, y = x0, y0
+            while (x, y) != (x1, y1):
+                x += sx
+                y += sy
+                cells.append((x, y))
+        return cells
+
+    # ---------------- 후처리 ----------------
+
+    def line_of_sight(self, a: Cell, b: Cell) -> bool:
+        """두 셀 중심을 잇는 선분이 지나는 모든 셀이 자유인지 (격자 순회)"""
+        x, y = a
+        x1, y1 = b
+        dx, dy = abs(x1 - x), abs(y1 - y)
+        sx = 1 if x1 > x else -1
+        sy = 1 if y1 > y else -1
+        free = self.free
+        # 셀 경계를 넘는 순서대로 진행 (모서리 통과 시 양쪽 셀 모두 확인)
+        err = dx - dy
+        n = dx + dy
+        while n > 0:
+            if not free(x, y):
+                return False
+            e2 = 2 * err
+            if e2 > -dy and e2 < dx:
+                if not (free(x + sx, y) and free(x, y + sy)):
+                    return False
+                err += dx - dy
+                x += sx
+                y += sy
+                n -= 2
+            elif e2 > -dy:
+                err -= dy
+                x += sx
+                n -= 1
+            else:
+                err += dx
+                y += sy
+                n -= 1
+        return free(x1, y1)
+
+    def smooth(self, cells: List[Cell]) -> List[Cell]:
+        """시야선이 확보되는 가장 먼 점으로 건너뛰는 경로 단축"""
+        if len(cells) < 3:
+            return list(cells)
+        out = [cells[0]]
+        i = 0
+        last = len(cells) - 1
+        while i < last:
+            j = last
+            while j > i + 1 and not self.line_of_sight(cells[i], cells[j]):
+                j -= 1
+            out.append(cells[j])
+            i = j
+        return out
@@ -0,0 +1,5 @@
+"""car_gui 모듈은 패키지가 아니라 디렉터리 안에서 이름으로 import 하므로 경로 추가"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,126 @@
+"""CarSession 테스트 (루프백 소켓으로 부분 수신 / 상대 연결 끊김 확인)"""
+
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from car_session import CH_PREFERENCE, CH_WAYPOINTS, CarSession
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def session():
+    session = CarSession()
+    session.start()
+    yield session
+    session.stop()
+
+
+def listen_with(session, channel, reply=None):
+    received = []
+    event = threading.Event()
+
+    def handler(message):
+        received.append(message)
+        event.set()
+        return reply
+    session.subscribe(channel, handler)
+    port = free_port()
+    session.listen(port, '127.0.0.1')
+    return port, received, event
+
+
+def test_message_split_across_reads_is_handled_once(session):
+    port, received, event = listen_with(session, CH_WAYPOINTS, {'status': 'ok'})
+    with socket.create_connection(('127.0.0.1', port)) as client:
+        client.sendall(b'{"type": "waypoint_assign')
+        time.sleep(0.2)
+        assert received == []
+        client.sendall('ment", "waypoints": [[1, 2]], "description": "직진"}\n'.encode('utf-8'))
+        reply = client.makefile('rb').readline()
+    assert event.wait(2.0)
+    assert received == [{'type': 'waypoint_assignment', 'waypoints': [[1, 2]], 'description': '직진'}]
+    assert json.loads(reply) == {'status': 'ok'}
+
+
+def test_back_to_back_messages_without_newline(session):
+    port, received, _ = listen_with(session, CH_WAYPOINTS)
+    with socket.create_connection(('127.0.0.1', port)) as client:
+        client.sendall(b'{"type": "waypoint_assignment", "n": 1}{"type": "waypoint_assignment", "n": 2}\n')
+        reader = client.makefile('rb')
+        replies = [json.loads(reader.readline()), json.loads(reader.readline())]
+    assert [m['n'] for m in received] == [1, 2]
+    assert all(r['status'] == 'received' for r in replies)
+
+
+class FakeVehicle:
+    """차량 ESP32 흉내 - 연결마다 한 줄 받고 respond 여부에 따라 응답 후(또는 응답 없이) 종료"""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.received = []
+        self.server = socket.socket()
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen()
+        self.port = self.server.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            with conn:
+                line = conn.makefile('rb').readline()
+                self.received.append(json.loads(line))
+                if self.respond:
+                    conn.sendall(b'{"status": "ok"}\n')
+                    time.sleep(0.1)
+
+    def close(self):
+        self.server.close()
+
+
+def send_and_wait(session, vehicle, data):
+    session.add_peer('vehicle', '127.0.0.1', vehicle.port)
+    done = threading.Event()
+    results = []
+
+    def callback(success, reply):
+        results.append((success, reply))
+        done.set()
+    assert session.send('vehicle', CH_PREFERENCE, data, callback)
+    assert done.wait(5.0)
+    return results
+
+
+def test_send_to_peer_matches_reply(session):
+    vehicle = FakeVehicle(respond=True)
+    try:
+        assert send_and_wait(session, vehicle, {'preferred': 'normal'}) == [(True, {'status': 'ok'})]
+        assert vehicle.received == [{'preferred': 'normal'}]
+    finally:
+        vehicle.close()
+
+
+def test_peer_disconnect_before_reply_fails_without_resend(session):
+    vehicle = FakeVehicle(respond=False)
+    try:
+        assert send_and_wait(session, vehicle, {'preferred': 'disabled'}) == [(False, None)]
+        time.sleep(1.0)
+        assert vehicle.received == [{'preferred': 'disabled'}]
+    finally:
+        vehicle.close()
+
+
+def test_send_to_unknown_peer_is_rejected(session):
+    assert not session.send('nobody', CH_PREFERENCE, {})
@@ -0,0 +1,71 @@
+"""DistanceFields 캐시 / 경사 하강 테스트"""
+
+import numpy as np
+
+import distance_field
+from distance_field import UNREACHABLE, DistanceFields, compute_field
+
+
+def make_occ():
+    occ = np.zeros((8, 10), dtype=np.uint8)
+    occ[0:6, 4] = 1     # 아래쪽(y=6, 7)으로만 돌아갈 수 있는 벽
+    return occ
+
+
+def test_field_is_bfs_distance_around_walls():
+    field = compute_field(make_occ(), [(9, 0)])
+    assert field[0, 9] == 0
+    assert field[0, 5] == 4
+    # 벽 왼쪽은 y=6 으로 돌아가야 함: (0,0) -> (0,6) -> (5,6) -> (5,0) -> (9,0)
+    assert field[0, 0] == 6 + 5 + 6 + 4
+    assert field[3, 4] == UNREACHABLE
+
+
+def test_descend_reaches_target_along_decreasing_cost(tmp_path):
+    fields = DistanceFields(make_occ(), 30, str(tmp_path))
+    fields.ensure({'exit': [(9, 0)]})
+    path = fields.descend('exit', (0, 0))
+    assert path[0] == (0, 0) and path[-1] == (9, 0)
+    assert len(path) == fields.cost('exit', (0, 0)) + 1
+    for (x0, y0), (x1, y1) in zip(path, path[1:]):
+        assert abs(x1 - x0) + abs(y1 - y0) == 1
+        assert fields.cost('exit', (x1, y1)) == fields.cost('exit', (x0, y0)) - 1
+
+
+def test_descend_from_wall_or_unreachable_cell_returns_none(tmp_path):
+    occ = make_occ()
+    occ[7, 4] = occ[6, 4] = 1   # 벽으로 완전히 분리
+    fields = DistanceFields(occ, 30, str(tmp_path))
+    fields.ensure({'exit': [(9, 0)]})
+    assert fields.descend('exit', (4, 2)) is None
+    assert fields.descend('exit', (0, 0)) is None
+
+
+def test_cache_hit_skips_recompute(tmp_path, monkeypatch):
+    DistanceFields(make_occ(), 30, str(tmp_path)).ensure({'exit': [(9, 0)], 'entry': [(0, 7)]})
+
+    def fail(*args, **kwargs):
+        raise AssertionError('cached field was recomputed')
+    monkeypatch.setattr(distance_field, 'compute_field', fail)
+    cached = DistanceFields(make_occ(), 30, str(tmp_path))
+    assert cached.has('exit', [(9, 0)]) and cached.has('entry', [(0, 7)])
+    cached.ensure({'exit': [(9, 0)], 'entry': [(0, 7)]})
+    assert cached.descend('exit', (0, 0))[-1] == (9, 0)
+
+
+def test_cache_misses_when_grid_or_goal_changes(tmp_path):
+    original = DistanceFields(make_occ(), 30, str(tmp_path))
+    original.ensure({'exit': [(9, 0)]})
+
+    changed = make_occ()
+    changed[7, 0] = 1
+    rebuilt = DistanceFields(changed, 30, str(tmp_path))
+    assert rebuilt.cache_path != original.cache_path
+    assert not rebuilt.has('exit', [(9, 0)])
+
+    moved = DistanceFields(make_occ(), 30, str(tmp_path))
+    assert moved.has('exit', [(9, 0)])
+    assert not moved.has('exit', [(9, 1)])
+    assert moved.cost('exit', (9, 1)) == 1
+    moved.field('exit', [(9, 1)])
+    assert moved.cost('exit', (9, 1)) == 0
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""MCAP → 열 지향 궤적 추출기 (ROS 없이 오프라인 분석용)
+
+rosbag2 MCAP 파일을 레코드 단위로 스트리밍하며 (청크 하나씩만 메모리에 올림)
+/uwb/pos, /uwb/comp 좌표와 JSON 주차 이벤트 토픽을 디코딩해
+태그별로 정렬된 열 배열 (t, x, y, tag, event, ...) 로 저장한다 (압축 .npz 또는 Arrow/Feather).
+파일마다 독립적으로 처리하므로 여러 파일은 프로세스 풀로 병렬 추출하고,
+이미 추출된 파일(출력이 입력보다 최신)은 건너뛴다.
+
+좌표 단위는 모두 mm (/uwb/pos 의 m 값은 1000배), 시각은 기록 시각(log_time, ns).
+태그별 구간은 tags / tag_offsets 로 바로 자를 수 있다:  data['x'][tag_offsets[i]:tag_offsets[i + 1]]
+
+사용 예:
+    python3 mcap_extract.py ~/bags -o ~/extracts -j 8
+    python3 mcap_extract.py session.mcap --format arrow
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:  # 압축 안 된 기록(rosbag2 기본값)은 없어도 읽을 수 있음
+    zstandard = None
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+MAGIC = b'\x89MCAP0\r\n'
+OP_SCHEMA, OP_CHANNEL, OP_MESSAGE, OP_CHUNK, OP_DATA_END = 0x03, 0x04, 0x05, 0x06, 0x0F
+
+# 좌표 토픽: 토픽 → mm 환산 배율
+POSITION_TOPICS = {'/uwb/pos': 1000.0, '/uwb/comp': 1.0}
+# JSON(또는 "vehicle_id,tag_id") 문자열 이벤트 토픽
+EVENT_TOPICS = (
+    '/parking/auth_req', '/parking/exit_req', '/parking/barrier_event', '/parking/barrier_cmd',
+    '/uwb/vehicle_info', '/uwb/track_start', '/uwb/track_stop',
+    '/parking/spot_request', '/parking/spot_assignment', '/parking/spot_delta',
+    '/parking_exe/illegal_parking',
+)
+# event 열의 값 = 이 목록의 인덱스 (0, 1 은 좌표)
+EVENT_NAMES = tuple(POSITION_TOPICS) + EVENT_TOPICS
+EVENT_CODE = {topic: code for code, topic in enumerate(EVENT_NAMES)}
+NO_TAG = -1
+
+
+# ---------------- MCAP 스트리밍 ----------------
+
+class McapStream:
+    """MCAP 레코드를 순서대로 읽어 (topic, log_time, data) 를 내보냄 - 인덱스/요약 섹션은 읽지 않음"""
+
+    def __init__(self, path: str, topics: Optional[set] = None):
+        self.path = path
+        self.topics = topics
+        self.channels: Dict[int, Optional[str]] = {}  # channel id → 토픽 (관심 없는 토픽은 None)
+
+    def __iter__(self) -> Iterator[Tuple[str, int, memoryview]]:
+        with open(self.path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f'MCAP 파일이 아님: {self.path}')
+            while True:
+                head = f.read(9)
+                if len(head) < 9:
+                    return
+                op, length = head[0], struct.unpack_from('<Q', head, 1)[0]
+                if op == OP_DATA_END:
+                    return
+                if op in (OP_CHUNK, OP_CHANNEL, OP_MESSAGE):
+                    body = memoryview(f.read(length))
+                    if op == OP_CHUNK:
+                        yield from self._records(self._chunk_records(body))
+                    else:
+                        yield from self._record(op, body)
+                else:
+                    f.seek(length, os.SEEK_CUR)
+
+    def _records(self, buf: memoryview):
+        pos, end = 0, len(buf)
+        while pos + 9 <= end:
+            op, length = buf[pos], struct.unpack_from('<Q', buf, pos + 1)[0]
+            pos += 9
+            if op in (OP_CHANNEL, OP_MESSAGE):
+                yield from self._record(op, buf[pos:pos + length])
+            pos += length
+
+    def _record(self, op: int, body: memoryview):
+        if op == OP_MESSAGE:
+            channel_id = struct.unpack_from('<H', body, 0)[0]
+            topic = self.channels.get(channel_id)
+            if topic is not None:
+                yield topic, struct.unpack_from('<Q', body, 6)[0], body[22:]
+        else:
+            channel_id = struct.unpack_from('<H', body, 0)[0]
+            n = struct.unpack_from('<I', body, 4)[0]
+            topic = bytes(body[8:8 + n]).decode()
+            self.channels[channel_id] = topic if self.topics is None or topic in self.topics else None
+
+    @staticmethod
+    def _chunk_records(body: memoryview) -> memoryview:
+        uncompressed_size = struct.unpack_from('<Q', body, 16)[0]
+        n = struct.unpack_from('<I', body, 28)[0]
+        compression = bytes(body[32:32 + n]).decode()
+        records = body[32 + n + 8:]
+        if not compression:
+            return records
+        if compression == 'zstd':
+            if zstandard is None:
+                raise RuntimeError('zstd 압축 청크 - pip install zstandard 필요')
+            return memoryview(zstandard.ZstdDecompressor().decompress(records, max_output_size=uncompressed_size))
+        if compression == 'lz4':
+            if lz4_frame is None:
+                raise RuntimeError('lz4 압축 청크 - pip install lz4 필요')
+            return memoryview(lz4_frame.decompress(records))
+        raise RuntimeError(f'지원하지 않는 압축 방식: {compression}')
+
+
+# ---------------- CDR 디코딩 ----------------
+
+def _endian(data: memoryview) -> str:
+    # 캡슐화 헤더 2번째 바이트: 0 = CDR_BE, 1 = CDR_LE
+    return '<' if data[1] & 1 else '>'
+
+
+def decode_point_stamped(data: memoryview) -> Tuple[int, str, float, float, float]:
+    """geometry_msgs/PointStamped → (stamp ns, frame_id, x, y, z)"""
+    e = _endian(data)
+    sec, nanosec, n = struct.unpack_from(e + 'iII', data, 4)
+    frame_id = bytes(data[16:16 + n - 1]).decode()
+    offset = 4 + ((12 + n + 7) & ~7)  # 캡슐화 헤더 뒤 기준 8바이트 정렬
+    x, y, z = struct.unpack_from(e + 'ddd', data, offset)
+    return sec * 1_000_000_000 + nanosec, frame_id, x, y, z
+
+
+def decode_string(data: memoryview) -> str:
+    """std_msgs/String → str"""
+    n = struct.unpack_from(_endian(data) + 'I', data, 4)[0]
+    return bytes(data[8:8 + n - 1]).decode('utf-8', errors='replace')
+
+
+def parse_tag(frame_id: str) -> Tuple[int, int]:
+    """"tag_10#42" → (10, 42), 시퀀스 없으면 -1"""
+    if not frame_id.startswith('tag_'):
+        return NO_TAG, -1
+    tag, _, seq = frame_id[4:].partition('#')
+    try:
+        return int(tag), (int(seq) if seq else -1)
+    except ValueError:
+        return NO_TAG, -1
+
+
+def event_fields(text: str) -> Tuple[int, float, float]:
+    """이벤트 문자열에서 (tag, x, y) - 없으면 NO_TAG / NaN"""
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        # /uwb/track_start, /uwb/track_stop: "vehicle_id,tag_id"
+        _, _, tag = text.rpartition(',')
+        return (int(tag) if tag.strip().isdigit() else NO_TAG), np.nan, np.nan
+    if not isinstance(payload, dict):
+        return NO_TAG, np.nan, np.nan
+    tag = payload.get('tag_id')
+    x, y = payload.get('x'), payload.get('y')
+    return (int(tag) if isinstance(tag, (int, float)) or (isinstance(tag, str) and tag.isdigit()) else NO_TAG,
+            float(x) if isinstance(x, (int, float)) else np.nan,
+            float(y) if isinstance(y, (int, float)) else np.nan)
+
+
+# ---------------- 추출 ----------------
+
+class Columns:
+    """추출 중 열 버퍼 (array 모듈로 원소당 고정 크기만 사용)"""
+
+    def __init__(self):
+        self.t = array('q')
+        self.x = array('d')
+        self.y = array('d')
+        self.tag = array('h')
+        self.event = array('b')
+        self.seq = array('q')
+        self.stamp = array('q')
+        self.payload_index = array('i')
+        self.payloads: List[str] = []
+
+    def add(self, t, x, y, tag, event, seq=-1, stamp=0, payload=None):
+        self.t.append(t)
+        self.x.append(x)
+        self.y.append(y)
+        self.tag.append(tag)
+        self.event.append(event)
+        self.seq.append(seq)
+        self.stamp.append(stamp)
+        if payload is None:
+            self.payload_index.append(-1)
+        else:
+            self.payload_index.append(len(self.payloads))
+            self.payloads.append(payload)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """(tag, t) 순으로 정렬한 열 배열 + 태그별 구간 오프셋"""
+        cols = {
+            't': np.frombuffer(self.t, dtype=np.int64), 'x': np.frombuffer(self.x, dtype=np.float64),
+            'y': np.frombuffer(self.y, dtype=np.float64), 'tag': np.frombuffer(self.tag, dtype=np.int16),
+            'event': np.frombuffer(self.event, dtype=np.int8), 'seq': np.frombuffer(self.seq, dtype=np.int64),
+            'stamp': np.frombuffer(self.stamp, dtype=np.int64),
+            'payload_index': np.frombuffer(self.payload_index, dtype=np.int32),
+        }
+        order = np.lexsort((cols['t'], cols['tag']))
+        cols = {name: col[order] for name, col in cols.items()}
+        tags, offsets = np.unique(cols['tag'], return_index=True)
+        cols['tags'] = tags
+        cols['tag_offsets'] = np.append(offsets, len(order)).astype(np.int64)
+        cols['payloads'] = np.array(self.payloads, dtype=np.str_)
+        cols['event_names'] = np.array(EVENT_NAMES, dtype=np.str_)
+        return cols
+
+
+def extract_file(path: str) -> Dict[str, np.ndarray]:
+    cols = Columns()
+    for topic, log_time, data in McapStream(path, set(EVENT_NAMES)):
+        code = EVENT_CODE[topic]
+        if topic in POSITION_TOPICS:
+            stamp, frame_id, x, y, _ = decode_point_stamped(data)
+            tag, seq = parse_tag(frame_id)
+            scale = POSITION_TOPICS[topic]
+            cols.add(log_time, x * scale, y * scale, tag, code, seq, stamp)
+        else:
+            text = decode_string(data)
+            tag, x, y = event_fields(text)
+            cols.add(log_time, x, y, tag, code, payload=text)
+    return cols.to_arrays()
+
+
+def output_path(path: str, out_dir: Optional[str], fmt: str) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(out_dir or os.path.dirname(os.path.abspath(path)), stem + ('.npz' if fmt == 'npz' else '.arrow'))
+
+
+def save(cols: Dict[str, np.ndarray], out: str, fmt: str):
+    if fmt == 'npz':
+        np.savez_compressed(out, **cols)
+        return
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+    except ImportError:
+        raise RuntimeError('Arrow 저장 - pip install pyarrow 필요')
+    payloads = cols['payloads']
+    index = cols['payload_index']
+    table = pa.table({
+        't': cols['t'], 'x': cols['x'], 'y': cols['y'], 'tag': cols['tag'], 'event': cols['event'],
+        'seq': cols['seq'], 'stamp': cols['stamp'],
+        'payload': pa.array([payloads[i] if i >= 0 else None for i in index], type=pa.string()),
+    }).replace_schema_metadata({'event_names': json.dumps(EVENT_NAMES)})
+    feather.write_feather(table, out, compression='zstd')
+
+
+def extract_to(path: str, out_dir: Optional[str], fmt: str, force: bool = False) -> Tuple[str, str, int, float]:
+    """프로세스 풀 작업 단위 - (입력, 출력, 행 수, 소요 초), 최신 출력이 있으면 행 수 -1"""
+    out = output_path(path, out_dir, fmt)
+    if not force and os.path.exists(out) and os.path.getmtime(out) >= os.path.getmtime(path):
+        return path, out, -1, 0.0
+    start = time.perf_counter()
+    cols = extract_file(path)
+    save(cols, out, fmt)
+    return path, out, len(cols['t']), time.perf_counter() - start
+
+
+def find_mcap_files(inputs: List[str]) -> List[str]:
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, names in os.walk(item):
+                files.extend(os.path.join(root, n) for n in names if n.endswith('.mcap'))
+        else:
+            files.append(item)
+    return sorted(files)
+
+
+def load_extracts(paths: List[str]) -> Dict[str, np.ndarray]:
+    """여러 .npz 추출 결과를 이어 붙여 (tag, t) 순으로 다시 정렬"""
+    parts = [np.load(p) for p in paths]
+    names = ('t', 'x', 'y', 'tag', 'event', 'seq', 'stamp')
+    cols = {name: np.concatenate([part[name] for part in parts]) for name in names}
+    order = np.lexsort((cols['t'], cols['tag']))
+    cols = {name: col[order] for name, col in cols.items()}
+    tags, offsets = np.unique(cols['tag'], return_index=True)
+    cols['tags'] = tags
+    cols['tag_offsets'] = np.append(offsets, len(order)).astype(np.int64)
+    return cols
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='MCAP → 열 지향 궤적 추출 (태그별 t, x, y, tag, event)')
+    parser.add_argument('inputs', nargs='+', help='.mcap 파일 또는 디렉터리 (하위 .mcap 모두)')
+    parser.add_argument('-o', '--out-dir', help='출력 디렉터리 (기본: 입력 파일 옆)')
+    parser.add_argument('--format', choices=('npz', 'arrow'), default='npz')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='병렬 프로세스 수')
+    parser.add_argument('--force', action='store_true', help='최신 출력이 있어도 다시 추출')
+    args = parser.parse_args(argv)
+
+    files = find_mcap_files(args.inputs)
+    if not files:
+        print('[EXTRACT] .mcap 파일이 없습니다')
+        return 1
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    total_rows = 0
+    jobs = max(1, min(args.jobs, len(files)))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(extract_to, f, args.out_dir, args.format, args.force) for f in files]
+        for future in futures:
+            path, out, rows, elapsed = future.result()
+            if rows < 0:
+                print(f'[EXTRACT] 건너뜀 (최신): {out}')
+                continue
+            total_rows += rows
+            size_mb = os.path.getsize(path) / 1e6
+            print(f'[EXTRACT] {path} ({size_mb:.1f}MB) → {out}: {rows}행, {elapsed:.2f}s')
+    print(f'[EXTRACT] 완료: 파일 {len(files)}개, {total_rows}행, {time.perf_counter() - start:.2f}s ({jobs} 프로세스)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""MCAP 기록 재생 벤치마크 - 기록된 실제 트래픽으로 서버 노드 핫패스 회귀 검사
+
+rosbag2 MCAP 기록을 읽어 UWBControlSystem, ParkingManagementNode, ParkingExeNode 를
+한 프로세스에 띄우고 DDS 대신 구독 콜백을 직접 호출해 재생한다.
+- 노드끼리 주고받는 토픽(/uwb/comp, /parking/spot_request 등)은 프로세스 안에서 바로 전달하고,
+  기록에 있더라도 노드가 직접 발행하는 토픽은 입력에서 제외한다
+- 시계는 기록 시각을 따르는 시뮬레이션 시계 (use_sim_time + ROS 시계 override), 노드 타이머도
+  이 시계로 실행하므로 1배속 / N배속 / 최대 속도(--rate 0) 어느 쪽이든 결과가 같다
+- 차량 TCP 전송(send_tcp_message)은 소켓 대신 출력 기록으로 대체
+- 콜백별 처리 시간 백분위, 처리량을 보고하고, 출력(발행 메시지 + TCP 메시지)을
+  골든 실행 결과와 비교한다 (시각/추적 필드는 비교에서 제외)
+
+사용 예 (uwb_ws, park_ws 를 source 한 뒤):
+    python3 mcap_replay.py rosbag2_xxx --save-golden golden.jsonl      # 기준 출력 저장
+    python3 mcap_replay.py rosbag2_xxx --rate 0 --golden golden.jsonl  # 최대 속도 재생 + 비교
+traffic_sim 을 `ros2 bag record -s mcap /parking/auth_req /uwb/pos ...` 로 기록해 입력으로 써도 된다.
+"""
+
+import argparse
+import heapq
+import json
+import sys
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import rclpy
+from rclpy.logging import LoggingSeverity
+from rclpy.serialization import deserialize_message
+from rclpy.time import Time
+import rosbag2_py
+from rosidl_runtime_py.convert import message_to_ordereddict
+from rosidl_runtime_py.utilities import get_message
+
+from parking_common.tracing import LatencyHistogram
+
+NODE_NAMES = ('parser', 'management', 'exe')
+IGNORED_TOPICS = {'/rosout', '/parameter_events', '/clock', '/events/write_split'}
+VOLATILE_KEYS = {'timestamp', 'trace', 'request_time', 'start_time'}  # 벽시계 값이라 실행마다 달라지는 필드
+TCP_TOPIC = 'tcp:car'
+DEFAULT_TAIL_SEC = 12.0  # 마지막 입력 뒤 dwell(3초)/신호 손실(10초) 데드라인이 끝나도록 더 돌리는 시뮬레이션 시간
+FLOAT_DIGITS = 6
+NODE_PARAMS = (
+    'use_sim_time:=true',
+    "stoppers:=''",            # 스토퍼 TCP 연결 없음
+    "history_dir:=''",         # 이력 저장 없음
+    "journal_dir:=''",         # 상태 저널 없음 (이전 실행 상태를 복구하면 재생 결과가 달라짐)
+    'trace_period_sec:=0.0',   # 지연 추적 로그 끔 (재생 중 벽시계 차이는 의미 없음)
+    'metrics_period_sec:=0.0',  # 지표 발행 끔 (/diagnostics 출력이 골든 비교에 섞이지 않도록)
+    "metrics_dir:=''",         # .prom 파일 없음
+)
+
+Message = Tuple[int, str, Any]  # (기록 시각 ns, 토픽, 메시지)
+
+
+def load_bag(uri: str, topics: Optional[List[str]] = None) -> Tuple[List[Message], Dict[str, str]]:
+    """MCAP 기록을 모두 읽어 역직렬화 (재생 시간에 디코딩 비용이 섞이지 않도록 미리 로드)"""
+    reader = rosbag2_py.SequentialReader()
+    reader.open(rosbag2_py.StorageOptions(uri=uri, storage_id='mcap'),
+                rosbag2_py.ConverterOptions(input_serialization_format='cdr', output_serialization_format='cdr'))
+    types = {meta.name: meta.type for meta in reader.get_all_topics_and_types()}
+    classes = {name: get_message(type_name) for name, type_name in types.items()
+               if name not in IGNORED_TOPICS and (topics is None or name in topics)}
+    messages = []
+    while reader.has_next():
+        topic, data, t = reader.read_next()
+        if topic in classes:
+            messages.append((t, topic, deserialize_message(data, classes[topic])))
+    messages.sort(key=lambda m: m[0])
+    return messages, types
+
+
+def normalize(payload) -> Any:
+    """출력 비교용 정규화 - JSON 문자열은 풀어서 벽시계 필드를 지우고 실수는 반올림"""
+    if not isinstance(payload, dict):
+        if isinstance(getattr(payload, 'data', None), str):
+            try:
+                payload = json.loads(payload.data)
+            except ValueError:
+                return {'data': payload.data}
+        else:
+            payload = message_to_ordereddict(payload)
+    return _strip(payload)
+
+
+def _strip(value):
+    if isinstance(value, dict):
+        return {k: _strip(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, (list, tuple)):
+        return [_strip(v) for v in value]
+    if isinstance(value, float):
+        return round(value, FLOAT_DIGITS)
+    return value
+
+
+class ReplayHarness:
+    """노드들의 구독/발행/타이머를 가로채 시뮬레이션 시계 위에서 사건 순서대로 실행"""
+
+    def __init__(self, nodes: List[Any]):
+        self.nodes = nodes
+        self.subscribers: Dict[str, List[Tuple[str, Callable]]] = defaultdict(list)
+        self.produced = set()
+        self.callback_stats: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.outputs: List[Tuple[int, str, Any]] = []
+        self.sim_ns = 0
+        self._events: List[Tuple[int, int, str, Any]] = []
+        self._order = 0
+        self._timers: List[Tuple[str, Callable, int]] = []
+        for node in nodes:
+            self._wire(node)
+
+    def _wire(self, node):
+        name = node.get_name()
+        for sub in node.subscriptions:
+            if sub.topic_name not in IGNORED_TOPICS:
+                self.subscribers[sub.topic_name].append((f'{name}.{sub.callback.__name__}', sub.callback))
+        for pub in node.publishers:
+            if pub.topic_name not in IGNORED_TOPICS:
+                self.produced.add(pub.topic_name)
+                pub.publish = self._publisher(pub.topic_name)
+        for timer in node.timers:
+            # 실제 타이머는 멈추고 같은 주기로 시뮬레이션 시계에서 실행
+            timer.cancel()
+            self._timers.append((f'{name}.{timer.callback.__name__}', timer.callback, timer.timer_period_ns))
+        if hasattr(node, 'send_tcp_message'):
+            node.send_tcp_message = self._tcp_sink
+
+    def _publisher(self, topic: str) -> Callable:
+        def publish(msg):
+            self.outputs.append((self.sim_ns, topic, msg))
+            for label, callback in self.subscribers.get(topic, ()):
+                self._push(self.sim_ns, 'message', (label, callback, msg))
+        return publish
+
+    def _tcp_sink(self, data: dict, timeout: float = 5.0, expect_response: bool = False) -> bool:
+        self.outputs.append((self.sim_ns, TCP_TOPIC, json.loads(json.dumps(data))))
+        return True
+
+    def _push(self, t_ns: int, kind: str, payload):
+        heapq.heappush(self._events, (t_ns, self._order, kind, payload))
+        self._order += 1
+
+    def input_topics(self, recorded: List[str]) -> List[str]:
+        """기록된 토픽 중 노드가 구독하고, 노드가 직접 만들지 않는 토픽"""
+        return sorted(t for t in recorded if t in self.subscribers and t not in self.produced)
+
+    def set_time(self, t_ns: int):
+        self.sim_ns = t_ns
+        now = Time(nanoseconds=t_ns)
+        for node in self.nodes:
+            node.get_clock().set_ros_time_override(now)
+
+    def run(self, messages: List[Message], rate: float = 0.0, tail_sec: float = DEFAULT_TAIL_SEC) -> dict:
+        """rate 배속으로 재생 (0이면 최대 속도) - 입력 메시지 수, 시뮬레이션/벽시계 시간 반환"""
+        inputs = 0
+        for t_ns, topic, msg in messages:
+            for label, callback in self.subscribers.get(topic, ()):
+                self._push(t_ns, 'message', (label, callback, msg))
+            inputs += 1
+        if not self._events:
+            return {'inputs': 0, 'sim_sec': 0.0, 'wall_sec': 0.0}
+        start_ns = self._events[0][0]
+        end_ns = messages[-1][0] + int(tail_sec * 1e9)
+        self.set_time(start_ns)
+        for label, callback, period_ns in self._timers:
+            self._push(start_ns + period_ns, 'timer', (label, callback, period_ns))
+
+        wall_start = time.perf_counter()
+        while self._events:
+            t_ns, _, kind, (label, callback, arg) = heapq.heappop(self._events)
+            if t_ns > end_ns:
+                break
+            if rate > 0:
+                delay = wall_start + (t_ns - start_ns) / 1e9 / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            if t_ns != self.sim_ns:
+                self.set_time(t_ns)
+            began = time.perf_counter_ns()
+            if kind == 'timer':
+                callback()
+                self._push(t_ns + arg, 'timer', (label, callback, arg))
+            else:
+                callback(arg)
+            self.callback_stats[label].record((time.perf_counter_ns() - began) // 1000)
+        wall_sec = time.perf_counter() - wall_start
+        return {'inputs': inputs, 'sim_sec': (self.sim_ns - start_ns) / 1e9, 'wall_sec': wall_sec}
+
+    def normalized_outputs(self) -> List[dict]:
+        return [{'topic': topic, 't': t_ns, 'data': normalize(payload)} for t_ns, topic, payload in self.outputs]
+
+
+def compare_outputs(actual: List[dict], golden: List[dict]) -> List[str]:
+    """토픽별 출력 순서대로 비교 - 차이 설명 목록 (비어 있으면 동일)"""
+    def by_topic(records):
+        grouped = OrderedDict()
+        for rec in records:
+            grouped.setdefault(rec['topic'], []).append(rec['data'])
+        return grouped
+
+    problems = []
+    mine, theirs = by_topic(actual), by_topic(golden)
+    for topic in sorted(set(mine) | set(theirs)):
+        a, b = mine.get(topic, []), theirs.get(topic, [])
+        if len(a) != len(b):
+            problems.append(f'{topic}: 출력 수 {len(a)} (골든 {len(b)})')
+        for i, (x, y) in enumerate(zip(a, b)):
+            if x != y:
+                problems.append(f'{topic}[{i}]: {json.dumps(x, ensure_ascii=False)} != {json.dumps(y, ensure_ascii=False)}')
+                break
+    return problems
+
+
+def build_nodes(names: List[str]) -> List[Any]:
+    nodes = []
+    if 'parser' in names:
+        from uwb_parser.uwb_coordinate_parser import UWBControlSystem
+        nodes.append(UWBControlSystem())
+    if 'management' in names:
+        from parking_management.parking_management import ParkingManagementNode
+        nodes.append(ParkingManagementNode())
+    if 'exe' in names:
+        from parking_exe.parking_exe import ParkingExeNode
+        nodes.append(ParkingExeNode())
+    return nodes
+
+
+def print_report(stats: dict, harness: ReplayHarness):
+    wall = stats['wall_sec'] or 1e-9
+    print(f"\n[REPLAY] 입력 {stats['inputs']}건, 출력 {len(harness.outputs)}건, "
+          f"시뮬레이션 {stats['sim_sec']:.2f}s / 벽시계 {stats['wall_sec']:.3f}s "
+          f"(x{stats['sim_sec'] / wall:.1f}, {stats['inputs'] / wall:.0f} msg/s)")
+    print(f"{'callback':<52}{'n':>8}{'p50':>9}{'p99':>9}{'p99.9':>9}{'max':>9}  (ms)")
+    for label in sorted(harness.callback_stats):
+        h = harness.callback_stats[label]
+        print(f'{label:<52}{h.total:>8}{h.percentile(50) / 1000:>9.3f}{h.percentile(99) / 1000:>9.3f}'
+              f'{h.percentile(99.9) / 1000:>9.3f}{(h.max_us or 0) / 1000:>9.3f}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='MCAP 기록 재생 벤치마크 (서버 노드 핫패스 회귀 검사)')
+    parser.add_argument('bag', help='rosbag2 디렉터리 또는 .mcap 파일')
+    parser.add_argument('--rate', type=float, default=0.0, help='재생 배속 (1=실시간, 0=최대 속도)')
+    parser.add_argument('--nodes', default=','.join(NODE_NAMES), help=f'띄울 노드 ({",".join(NODE_NAMES)})')
+    parser.add_argument('--topics', help='입력으로 쓸 토픽 (쉼표 구분, 기본은 자동 선택)')
+    parser.add_argument('--tail', type=float, default=DEFAULT_TAIL_SEC, help='마지막 입력 뒤 더 돌릴 시뮬레이션 시간(초)')
+    parser.add_argument('--golden', help='비교할 골든 출력 (JSON Lines)')
+    parser.add_argument('--save-golden', help='이번 실행 출력을 골든으로 저장')
+    parser.add_argument('--report', help='결과 요약을 JSON으로 저장')
+    parser.add_argument('--verbose', action='store_true', help='노드 로그 출력 (기본은 경고 이상만)')
+    args = parser.parse_args(argv)
+
+    node_args = ['--ros-args']
+    for param in NODE_PARAMS:
+        node_args += ['-p', param]
+    rclpy.init(args=node_args)
+    nodes = build_nodes([n.strip() for n in args.nodes.split(',')])
+    try:
+        if not args.verbose:
+            for node in nodes:
+                node.get_logger().set_level(LoggingSeverity.WARN)
+        harness = ReplayHarness(nodes)
+
+        messages, types = load_bag(args.bag, args.topics.split(',') if args.topics else None)
+        inputs = args.topics.split(',') if args.topics else harness.input_topics(sorted({m[1] for m in messages}))
+        messages = [m for m in messages if m[1] in inputs]
+        print(f'[REPLAY] 기록 토픽: {", ".join(sorted(types))}')
+        print(f'[REPLAY] 입력 토픽: {", ".join(inputs) or "(없음)"} - 메시지 {len(messages)}건')
+        if not messages:
+            print('[REPLAY] 재생할 입력이 없습니다 (노드가 구독하는 토픽이 기록에 없음)')
+            return 1
+
+        stats = harness.run(messages, rate=args.rate, tail_sec=args.tail)
+        print_report(stats, harness)
+        outputs = harness.normalized_outputs()
+
+        problems = []
+        if args.golden:
+            with open(args.golden) as f:
+                golden = [json.loads(line) for line in f if line.strip()]
+            problems = compare_outputs(outputs, golden)
+            if problems:
+                print(f'[REPLAY] ❌ 골든 출력과 다름 ({len(problems)}개 토픽)')
+                for line in problems:
+                    print(f'  {line}')
+            else:
+                print(f'[REPLAY] ✅ 골든 출력과 동일 ({len(outputs)}건)')
+        if args.save_golden:
+            with open(args.save_golden, 'w') as f:
+                for rec in outputs:
+                    f.write(json.dumps(rec, ensure_ascii=False) + '\n')
+            print(f'[REPLAY] 골든 출력 저장: {args.save_golden}')
+        if args.report:
+            report = dict(stats, outputs=len(outputs), mismatches=problems,
+                          callbacks={label: h.to_dict() for label, h in harness.callback_stats.items()})
+            with open(args.report, 'w') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        return 1 if problems else 0
+    finally:
+        for node in nodes:
+            node.destroy_node()
+        rclpy.shutdown()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
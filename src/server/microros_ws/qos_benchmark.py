@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""QoS 프로파일 과부하 벤치마크 - 좌표 스트림을 처리 능력보다 빠르게 발행했을 때 지연/CPU 비교
+
+발행 프로세스가 /uwb/comp 와 같은 형식(PointStamped, frame_id "tag_N#seq", stamp=발행 벽시계 시각)으로
+--rate Hz 로 좌표를 보내고, 별도 프로세스의 구독 노드는 메시지마다 --work-us 만큼 바쁜 대기로
+파서/관리 노드 처리 시간을 흉내 낸다 (rate × work_us > 1 이면 과부하).
+프로파일마다 같은 조건으로 한 번씩 실행해
+- 수신 수 / 발행 수, stamp → 콜백 지연 백분위 (DDS 큐에 쌓인 시간 포함)
+- --stale-ms 이내에 처리된 '신선한' 좌표 수 (늦게 도착한 좌표는 없느니만 못하다)
+- 발행/구독 프로세스 CPU 사용률
+을 비교한다. 프로파일은 parking_common.qos_profiles 레지스트리 이름 (--qos-config 로 배포 설정 적용).
+
+사용 예 (park_ws 를 source 한 뒤):
+    python3 qos_benchmark.py                                  # default vs position, 2kHz, 처리 1ms
+    python3 qos_benchmark.py --rate 5000 --work-us 500 --profiles default,position,state
+    python3 qos_benchmark.py --qos-config field_qos.yaml --report /tmp/qos_bench.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+from typing import Dict, List
+
+import rclpy
+from rclpy.node import Node
+from geometry_msgs.msg import PointStamped
+
+from parking_common.qos_profiles import QosRegistry, QosSpec
+from parking_common.tracing import LatencyHistogram, format_frame_id, parse_frame_id, stamp_to_ns, wall_ns
+
+BENCH_TOPIC = '/qos_bench/pos'
+DEFAULT_PROFILES = 'default,position'
+DEFAULT_RATE_HZ = 2000.0
+DEFAULT_WORK_US = 1000
+DEFAULT_DURATION_SEC = 10.0
+DEFAULT_STALE_MS = 100.0
+DEFAULT_TAGS = 4
+MATCH_TIMEOUT_SEC = 10.0
+DRAIN_SEC = 2.0  # 발행이 끝난 뒤 구독 쪽 큐가 비도록 기다리는 시간
+
+
+def busy_wait_us(work_us: int):
+    end = time.perf_counter_ns() + work_us * 1000
+    while time.perf_counter_ns() < end:
+        pass
+
+
+def subscriber_main(spec: QosSpec, work_us: int, stale_ms: float, ready, stop, results):
+    """구독 프로세스 - 콜백마다 처리 시간을 흉내 내고 지연/수신 수/CPU 를 results 로 돌려줌"""
+    rclpy.init()
+    node = Node('qos_bench_sub')
+    hist = LatencyHistogram()
+    state = {'received': 0, 'fresh': 0, 'reordered': 0}
+    last_seq: Dict[int, int] = {}
+    stale_ns = int(stale_ms * 1e6)
+
+    def callback(msg):
+        age_ns = wall_ns() - stamp_to_ns(msg.header.stamp)
+        hist.record(age_ns // 1000)
+        state['received'] += 1
+        if age_ns <= stale_ns:
+            state['fresh'] += 1
+        tag, seq = parse_frame_id(msg.header.frame_id)
+        if seq is not None:
+            if seq <= last_seq.get(tag, 0):
+                state['reordered'] += 1
+            last_seq[tag] = max(seq, last_seq.get(tag, 0))
+        busy_wait_us(work_us)
+
+    node.create_subscription(PointStamped, BENCH_TOPIC, callback, spec.to_profile())
+    ready.set()
+    cpu_start, wall_start = time.process_time(), time.monotonic()
+    try:
+        while not stop.is_set():
+            rclpy.spin_once(node, timeout_sec=0.05)
+        elapsed = time.monotonic() - wall_start
+        results.put(dict(state, cpu_pct=100.0 * (time.process_time() - cpu_start) / elapsed,
+                         latency=hist.to_dict()))
+    finally:
+        node.destroy_node()
+        rclpy.shutdown()
+
+
+def publish_stream(node: Node, publisher, rate_hz: float, duration_sec: float, tags: int) -> int:
+    """rate_hz 로 duration_sec 동안 태그를 번갈아 발행 (늦어지면 따라잡기 위해 쉬지 않음), 발행 수 반환"""
+    seqs = [0] * tags
+    period = 1.0 / rate_hz
+    total = int(rate_hz * duration_sec)
+    msg = PointStamped()
+    next_t = time.monotonic()
+    for i in range(total):
+        tag = i % tags
+        seqs[tag] += 1
+        now = wall_ns()
+        msg.header.stamp.sec, msg.header.stamp.nanosec = divmod(now, 1_000_000_000)
+        msg.header.frame_id = format_frame_id(tag, seqs[tag])
+        msg.point.x = float(i)
+        msg.point.y = float(tag)
+        publisher.publish(msg)
+        next_t += period
+        delay = next_t - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    return total
+
+
+def run_profile(name: str, spec: QosSpec, args) -> dict:
+    ctx = multiprocessing.get_context('spawn')  # rclpy 컨텍스트는 fork 로 물려받으면 안 됨
+    ready, stop, results = ctx.Event(), ctx.Event(), ctx.Queue()
+    proc = ctx.Process(target=subscriber_main, args=(spec, args.work_us, args.stale_ms, ready, stop, results))
+    proc.start()
+    node = Node('qos_bench_pub')
+    publisher = node.create_publisher(PointStamped, BENCH_TOPIC, spec.to_profile())
+    try:
+        ready.wait(MATCH_TIMEOUT_SEC)
+        deadline = time.monotonic() + MATCH_TIMEOUT_SEC
+        while publisher.get_subscription_count() == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.5)  # 발견 직후 연결이 안정될 때까지
+
+        cpu_start, wall_start = time.process_time(), time.monotonic()
+        sent = publish_stream(node, publisher, args.rate, args.duration, args.tags)
+        elapsed = time.monotonic() - wall_start
+        pub_cpu = 100.0 * (time.process_time() - cpu_start) / elapsed
+
+        time.sleep(DRAIN_SEC)
+        stop.set()
+        sub = results.get(timeout=MATCH_TIMEOUT_SEC)
+    finally:
+        stop.set()
+        proc.join(MATCH_TIMEOUT_SEC)
+        node.destroy_node()
+    return dict(sub, profile=name, qos=spec.describe(), sent=sent, pub_cpu_pct=pub_cpu,
+                achieved_rate=sent / elapsed if elapsed else 0.0)
+
+
+def print_report(rows: List[dict], args):
+    print(f'[QOS-BENCH] 발행 {args.rate:g}Hz x {args.duration:g}s, 태그 {args.tags}개, '
+          f'콜백 처리 {args.work_us}µs (처리 능력 약 {1e6 / args.work_us:.0f}Hz), 신선 기준 {args.stale_ms:g}ms')
+    print(f'{"profile":<10} {"qos":<36} {"recv/sent":>14} {"fresh/s":>8} {"p50ms":>8} {"p99ms":>8} '
+          f'{"maxms":>8} {"subCPU%":>8} {"pubCPU%":>8}')
+    for row in rows:
+        lat = row['latency']
+        print(f'{row["profile"]:<10} {row["qos"]:<36} {row["received"]:>6}/{row["sent"]:<7} '
+              f'{row["fresh"] / args.duration:>8.0f} {lat["p50_ms"]:>8.1f} {lat["p99_ms"]:>8.1f} '
+              f'{lat["max_ms"]:>8.1f} {row["cpu_pct"]:>8.1f} {row["pub_cpu_pct"]:>8.1f}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='QoS 프로파일 과부하 벤치마크 (지연, 신선한 좌표 수, CPU)')
+    parser.add_argument('--profiles', default=DEFAULT_PROFILES, help='비교할 프로파일 이름 (쉼표 구분)')
+    parser.add_argument('--qos-config', help='QoS 레지스트리 YAML (기본은 PARKING_QOS_CONFIG 또는 코드 기본값)')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE_HZ, help='발행 주파수 (Hz)')
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION_SEC, help='프로파일당 발행 시간 (초)')
+    parser.add_argument('--work-us', type=int, default=DEFAULT_WORK_US, help='구독 콜백 처리 시간 (µs)')
+    parser.add_argument('--stale-ms', type=float, default=DEFAULT_STALE_MS, help='이보다 늦게 처리된 좌표는 stale')
+    parser.add_argument('--tags', type=int, default=DEFAULT_TAGS, help='번갈아 발행할 태그 수')
+    parser.add_argument('--report', help='결과를 JSON으로 저장')
+    args = parser.parse_args(argv)
+
+    registry = QosRegistry.load(args.qos_config)
+    names = [n.strip() for n in args.profiles.split(',') if n.strip()]
+    unknown = [n for n in names if n not in registry.profiles]
+    if unknown:
+        print(f'[QOS-BENCH] 알 수 없는 프로파일: {", ".join(unknown)} (가능: {", ".join(registry.profiles)})')
+        return 1
+
+    rclpy.init()
+    rows = []
+    try:
+        for name in names:
+            print(f'[QOS-BENCH] {name}: {registry.profiles[name].describe()} 실행 중...')
+            rows.append(run_profile(name, registry.profiles[name], args))
+    finally:
+        rclpy.shutdown()
+    print_report(rows, args)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'args': vars(args), 'results': rows}, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
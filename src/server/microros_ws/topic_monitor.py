@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""토픽 모니터 - 주차장 문제 발생 시 가장 먼저 보는 도구 (topic_catcher.py 대체)
+
+토픽을 주기적으로 탐색해 새로 생긴 토픽을 자동 구독하고, 토픽별 링 버퍼에 최근 수신 기록을 남겨
+이동 구간 수신율, 대역폭, 수신 간격 지터, stamp → 수신 지연을 계산한다.
+- 구독은 best-effort QoS + 직렬화 바이트 그대로(raw) 받아 발행 측을 막지 않고 역직렬화 비용도 없음
+  (header 가 있는 메시지는 CDR 앞부분의 stamp 만 직접 읽음)
+- 터미널에서는 주기적으로 갱신되는 표, 아니면(또는 --summary) 주기 요약 줄 / JSON Lines 파일
+- --echo 로 지정한 토픽만 예전 topic_catcher 처럼 메시지를 한 줄씩 출력
+- 종료할 때 --last N 이면 토픽별 링 버퍼에 남은 최근 메시지 N개를 풀어서 출력 (문제 직전 상황 확인)
+
+사용 예:
+    python3 topic_monitor.py                       # 모든 토픽 표
+    python3 topic_monitor.py --topics '/uwb/*,/parking/*' --window 10
+    python3 topic_monitor.py --echo '/parking/*'   # 주차 토픽 메시지 출력
+    python3 topic_monitor.py --summary --summary-file /tmp/topics.jsonl
+    python3 topic_monitor.py --topics '/parking/*' --last 5
+"""
+
+import argparse
+import fnmatch
+import json
+import struct
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from statistics import pstdev
+from typing import Deque, Dict, List, Optional, Tuple
+
+import rclpy
+from rclpy.node import Node
+from rclpy.qos import QoSProfile, DurabilityPolicy, HistoryPolicy, ReliabilityPolicy
+from rclpy.serialization import deserialize_message
+from rosidl_runtime_py.utilities import get_message
+
+DISCOVERY_PERIOD_SEC = 2.0
+DEFAULT_WINDOW_SEC = 5.0
+DEFAULT_REFRESH_SEC = 1.0
+RING_SIZE = 4096          # 토픽별 최근 수신 기록 (수신 시각, 크기, 지연) 최대 개수
+RECENT_MESSAGES = 8       # 토픽별 최근 원본 메시지 보관 개수
+EXCLUDED_TOPICS = ('/rosout', '/parameter_events')
+CLEAR_SCREEN = '\033[H\033[J'
+
+Arrival = Tuple[int, int, Optional[int]]  # (monotonic ns, 바이트 수, stamp → 수신 지연 ns)
+
+
+def header_stamp_ns(raw: bytes) -> int:
+    """header 가 첫 필드인 메시지의 CDR 에서 stamp(ns) 추출 (0 이면 stamp 없음)"""
+    sec, nanosec = struct.unpack_from('<iI' if raw[1] & 1 else '>iI', raw, 4)
+    return sec * 1_000_000_000 + nanosec
+
+
+class TopicStats:
+    """토픽 하나의 수신 링 버퍼와 이동 구간 통계"""
+
+    def __init__(self, topic: str, type_name: str, has_header: bool, msg_type=None):
+        self.topic = topic
+        self.type_name = type_name
+        self.has_header = has_header
+        self.msg_type = msg_type
+        self.arrivals: Deque[Arrival] = deque(maxlen=RING_SIZE)
+        self.recent: Deque[bytes] = deque(maxlen=RECENT_MESSAGES)
+        self.total = 0
+        self.total_bytes = 0
+        self.last_mono_ns = 0
+
+    def add(self, raw: bytes):
+        now = time.monotonic_ns()
+        latency = None
+        if self.has_header and len(raw) >= 12:
+            stamp = header_stamp_ns(raw)
+            if stamp:
+                latency = time.time_ns() - stamp
+        self.arrivals.append((now, len(raw), latency))
+        self.recent.append(raw)
+        self.total += 1
+        self.total_bytes += len(raw)
+        self.last_mono_ns = now
+
+    def latest(self, count: int) -> list:
+        """링 버퍼의 최근 메시지 count 개 (오래된 것부터, 필요할 때만 역직렬화)"""
+        recent = list(self.recent)[-count:] if count > 0 else []
+        return [deserialize_message(raw, self.msg_type) for raw in recent]
+
+    def summary(self, window_sec: float, now_ns: Optional[int] = None) -> dict:
+        now_ns = time.monotonic_ns() if now_ns is None else now_ns
+        start = now_ns - int(window_sec * 1e9)
+        window = [a for a in self.arrivals if a[0] >= start]
+        result = {'topic': self.topic, 'type': self.type_name, 'total': self.total,
+                  'window_count': len(window), 'rate_hz': 0.0, 'bandwidth_bps': 0.0,
+                  'jitter_ms': None, 'latency_p50_ms': None, 'latency_max_ms': None,
+                  'age_sec': (now_ns - self.last_mono_ns) / 1e9 if self.last_mono_ns else None}
+        if not window:
+            return result
+        # 창 안의 도착이 적으면 실제 관측 구간(첫 도착 ~ 지금)으로 나눔
+        span = min(window_sec, (now_ns - window[0][0]) / 1e9) or window_sec
+        result['rate_hz'] = len(window) / span
+        result['bandwidth_bps'] = sum(a[1] for a in window) / span
+        if len(window) >= 3:
+            gaps = [(b[0] - a[0]) / 1e6 for a, b in zip(window, window[1:])]
+            result['jitter_ms'] = pstdev(gaps)
+        latencies = sorted(a[2] for a in window if a[2] is not None)
+        if latencies:
+            result['latency_p50_ms'] = latencies[len(latencies) // 2] / 1e6
+            result['latency_max_ms'] = latencies[-1] / 1e6
+        return result
+
+
+class TopicMonitor(Node):
+    def __init__(self, patterns: List[str], echo: List[str], window_sec: float, refresh_sec: float,
+                 mode: str, summary_file: Optional[str] = None):
+        super().__init__('topic_monitor')
+        self.patterns = patterns
+        self.echo_patterns = echo
+        self.window_sec = window_sec
+        self.mode = mode  # 'table' | 'lines' | 'quiet'
+        self.summary_file = summary_file
+        self.stats: Dict[str, TopicStats] = {}
+        self.subs = {}
+        self.echo_types = {}
+        # best-effort: 발행 측 재전송/흐름 제어에 관여하지 않음 (늦게 붙어도 volatile)
+        self.qos = QoSProfile(history=HistoryPolicy.KEEP_LAST, depth=50,
+                              reliability=ReliabilityPolicy.BEST_EFFORT,
+                              durability=DurabilityPolicy.VOLATILE)
+        self.discover()
+        self.discovery_timer = self.create_timer(DISCOVERY_PERIOD_SEC, self.discover)
+        self.report_timer = self.create_timer(refresh_sec, self.report)
+        print(f"🎯 토픽 모니터 시작! 대상: {', '.join(patterns)} (창 {window_sec:.0f}초, best-effort 구독)")
+
+    def matches(self, topic: str, patterns: List[str]) -> bool:
+        return any(fnmatch.fnmatchcase(topic, p) for p in patterns)
+
+    def discover(self):
+        """새 토픽 구독 (타입을 알 수 없는 토픽은 건너뜀)"""
+        for topic, types in self.get_topic_names_and_types():
+            if topic in self.subs or topic in EXCLUDED_TOPICS or not self.matches(topic, self.patterns):
+                continue
+            type_name = types[0]
+            try:
+                msg_type = get_message(type_name)
+            except (AttributeError, ModuleNotFoundError, ValueError):
+                self.get_logger().warn(f'메시지 타입을 불러올 수 없어 건너뜀: {topic} ({type_name})')
+                self.subs[topic] = None
+                continue
+            fields = list(msg_type.get_fields_and_field_types().items())
+            has_header = bool(fields) and fields[0] == ('header', 'std_msgs/Header')
+            stats = self.stats[topic] = TopicStats(topic, type_name, has_header, msg_type)
+            if self.matches(topic, self.echo_patterns):
+                self.echo_types[topic] = msg_type
+            self.subs[topic] = self.create_subscription(
+                msg_type, topic, self.make_callback(stats), self.qos, raw=True)
+
+    def make_callback(self, stats: TopicStats):
+        echo_type = self.echo_types.get(stats.topic)
+        if echo_type is None:
+            return stats.add
+
+        def callback(raw):
+            stats.add(raw)
+            msg = deserialize_message(raw, echo_type)
+            text = msg.data if hasattr(msg, 'data') and isinstance(msg.data, str) else msg
+            print(f"📡 [{datetime.now().strftime('%H:%M:%S.%f')[:-3]}] {stats.topic}: {text}")
+        return callback
+
+    def summaries(self) -> List[dict]:
+        now = time.monotonic_ns()
+        return [self.stats[t].summary(self.window_sec, now) for t in sorted(self.stats)]
+
+    def report(self):
+        rows = self.summaries()
+        if self.summary_file:
+            with open(self.summary_file, 'a') as f:
+                f.write(json.dumps({'time': time.time(), 'window_sec': self.window_sec, 'topics': rows}) + '\n')
+        if self.mode == 'table':
+            sys.stdout.write(CLEAR_SCREEN + self.render_table(rows))
+            sys.stdout.flush()
+        elif self.mode == 'lines':
+            for row in rows:
+                if row['window_count']:
+                    print(self.render_line(row))
+
+    def print_recent(self, count: int):
+        for topic in sorted(self.stats):
+            messages = self.stats[topic].latest(count)
+            if messages:
+                print(f"\n🏷️  {topic} (최근 {len(messages)}개)")
+                for msg in messages:
+                    print(f"   {msg.data if hasattr(msg, 'data') and isinstance(msg.data, str) else msg}")
+
+    @staticmethod
+    def _ms(value: Optional[float]) -> str:
+        return '-' if value is None else f'{value:.1f}'
+
+    def render_line(self, row: dict) -> str:
+        return (f"[{datetime.now().strftime('%H:%M:%S')}] {row['topic']} {row['rate_hz']:.1f}Hz "
+                f"{row['bandwidth_bps'] / 1024:.1f}KB/s jitter={self._ms(row['jitter_ms'])}ms "
+                f"lat50={self._ms(row['latency_p50_ms'])}ms latmax={self._ms(row['latency_max_ms'])}ms")
+
+    def render_table(self, rows: List[dict]) -> str:
+        lines = [f"토픽 모니터 {datetime.now().strftime('%H:%M:%S')}  (최근 {self.window_sec:.0f}초, 토픽 {len(rows)}개)",
+                 f"{'topic':<34}{'type':<30}{'total':>9}{'Hz':>9}{'KB/s':>9}{'jit ms':>9}{'lat50':>9}{'latmax':>9}{'age s':>8}"]
+        for row in rows:
+            age = '-' if row['age_sec'] is None else f"{row['age_sec']:.1f}"
+            lines.append(f"{row['topic'][:33]:<34}{row['type'].split('/')[-1][:29]:<30}{row['total']:>9}"
+                         f"{row['rate_hz']:>9.1f}{row['bandwidth_bps'] / 1024:>9.1f}{self._ms(row['jitter_ms']):>9}"
+                         f"{self._ms(row['latency_p50_ms']):>9}{self._ms(row['latency_max_ms']):>9}{age:>8}")
+        return '\n'.join(lines) + '\n'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='토픽 모니터 (수신율, 대역폭, 지터, stamp 지연)')
+    parser.add_argument('--topics', default='*', help="감시할 토픽 패턴, 쉼표 구분 (예: '/uwb/*,/parking/*')")
+    parser.add_argument('--echo', default='', help='메시지를 한 줄씩 출력할 토픽 패턴')
+    parser.add_argument('--window', type=float, default=DEFAULT_WINDOW_SEC, help='통계 이동 구간(초)')
+    parser.add_argument('--refresh', type=float, default=DEFAULT_REFRESH_SEC, help='표/요약 갱신 주기(초)')
+    parser.add_argument('--summary', action='store_true', help='표 대신 주기 요약 줄 출력')
+    parser.add_argument('--summary-file', help='주기 요약을 JSON Lines로 추가 기록')
+    parser.add_argument('--last', type=int, default=0, help=f'종료 시 토픽별 최근 메시지 출력 개수 (최대 {RECENT_MESSAGES})')
+    args, ros_args = parser.parse_known_args(argv)
+
+    patterns = [p.strip() for p in args.topics.split(',') if p.strip()]
+    echo = [p.strip() for p in args.echo.split(',') if p.strip()]
+    # 표는 터미널에서만 (메시지 출력과 섞이지 않도록 --echo 중에는 끔), --echo 중 요약 줄은 --summary 일 때만
+    if not args.summary and not echo and sys.stdout.isatty():
+        mode = 'table'
+    else:
+        mode = 'lines' if args.summary or not echo else 'quiet'
+
+    rclpy.init(args=ros_args)
+    monitor = TopicMonitor(patterns, echo, args.window, args.refresh, mode, args.summary_file)
+    try:
+        rclpy.spin(monitor)
+    except KeyboardInterrupt:
+        print("\n토픽 모니터 종료")
+        monitor.print_recent(args.last)
+    finally:
+        monitor.destroy_node()
+        rclpy.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""노드 상태 저널 (append-only WAL + 주기 스냅샷) - 재시작 시 추적/점유 상태를 밀리초 단위로 복구
+
+상태는 {테이블: {키(str): JSON 값}} 형태로, 노드는 상태 전이가 있을 때만 put/delete 를 부른다
+(좌표 갱신처럼 잦은 변경은 기록하지 않음).
+- WAL 레코드: <길이 u32><crc32 u32><JSON> - 복구 중 잘린/깨진 레코드를 만나면 그 앞까지만 쓰고 잘라냄
+- 기록은 버퍼 없이 바로 write 하므로 프로세스가 죽어도 잃지 않고, fsync 는 sync_interval_sec 마다 묶어서
+  (전원이 나가면 마지막 sync_interval_sec 안의 전이만 잃을 수 있음 - 노드가 타이머로 sync() 를 불러 꼬리도 내림)
+- compact_every 레코드마다 전체 상태를 스냅샷(<name>.snapshot, 원자적 교체)으로 쓰고 다음 세대 WAL 로 넘어감
+  스냅샷에 세대 번호가 있어 교체 도중 죽어도 스냅샷 세대의 WAL 만 재생하면 된다
+"""
+import json
+import os
+import struct
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+DEFAULT_SYNC_INTERVAL_SEC = 0.05
+DEFAULT_COMPACT_EVERY = 1000
+RECORD_HEADER = struct.Struct('<II')  # (JSON 길이, crc32)
+SNAPSHOT_SUFFIX = '.snapshot'
+WAL_SUFFIX = '.wal'
+
+Tables = Dict[str, Dict[str, Any]]
+
+
+def _fsync_dir(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class StateJournal:
+    """테이블/키 단위 상태 저널 - recover() 로 이전 상태를 읽은 뒤 put/delete 로 전이를 기록"""
+
+    def __init__(self, directory: str, name: str, sync_interval_sec: float = DEFAULT_SYNC_INTERVAL_SEC,
+                 compact_every: int = DEFAULT_COMPACT_EVERY):
+        self.directory = os.path.expanduser(directory)
+        self.name = name
+        self.sync_interval_sec = sync_interval_sec
+        self.compact_every = compact_every
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.tables: Tables = {}
+        self.generation = 0
+        self.replayed = 0        # 마지막 복구에서 재생한 WAL 레코드 수
+        self.truncated = 0       # 마지막 복구에서 잘라낸 깨진 꼬리 바이트 수
+        self.recover_ms = 0.0
+        self._wal = None
+        self._wal_records = 0
+        self._dirty = False
+        self._last_sync = time.monotonic()
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.directory, self.name + SNAPSHOT_SUFFIX)
+
+    def wal_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f'{self.name}.{generation}{WAL_SUFFIX}')
+
+    # ---------------- 복구 ----------------
+
+    def recover(self) -> Tables:
+        """스냅샷 + 같은 세대 WAL 재생으로 상태 복구 후 이어 쓸 WAL 을 연다 (반환값은 읽기 전용으로 사용)"""
+        start = time.perf_counter()
+        self.tables, self.generation = {}, 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f)
+            self.tables = snapshot['tables']
+            self.generation = snapshot['generation']
+
+        path = self.wal_path(self.generation)
+        self.replayed, self.truncated = 0, 0
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            valid = self._replay(data)
+            if valid < len(data):
+                self.truncated = len(data) - valid
+                with open(path, 'r+b') as f:
+                    f.truncate(valid)
+                    os.fsync(f.fileno())
+        self._remove_stale_wals()
+        self._open_wal()
+        self._wal_records = self.replayed
+        self.recover_ms = (time.perf_counter() - start) * 1000.0
+        return self.tables
+
+    def _replay(self, data: bytes) -> int:
+        """WAL 바이트를 처음부터 적용하고 온전한 레코드가 끝나는 위치 반환"""
+        offset = 0
+        while offset + RECORD_HEADER.size <= len(data):
+            length, crc = RECORD_HEADER.unpack_from(data, offset)
+            body = data[offset + RECORD_HEADER.size:offset + RECORD_HEADER.size + length]
+            if len(body) < length or zlib.crc32(body) != crc:
+                break
+            try:
+                record = json.loads(body)
+            except ValueError:
+                break
+            self._apply(record)
+            self.replayed += 1
+            offset += RECORD_HEADER.size + length
+        return offset
+
+    def _apply(self, record: dict):
+        table = self.tables.setdefault(record['t'], {})
+        if record['op'] == 'put':
+            table[record['k']] = record['v']
+        else:
+            table.pop(record['k'], None)
+
+    def _remove_stale_wals(self):
+        prefix, current = self.name + '.', os.path.basename(self.wal_path(self.generation))
+        for entry in os.listdir(self.directory):
+            if entry.startswith(prefix) and entry.endswith(WAL_SUFFIX) and entry != current:
+                os.remove(os.path.join(self.directory, entry))
+
+    def _open_wal(self):
+        created = not os.path.exists(self.wal_path(self.generation))
+        self._wal = open(self.wal_path(self.generation), 'ab', buffering=0)
+        if created:
+            _fsync_dir(self.directory)
+
+    # ---------------- 기록 ----------------
+
+    def put(self, table: str, key, value: Any):
+        """키의 현재 값 기록 (이전 값과 같으면 기록하지 않음)"""
+        key = str(key)
+        value = json.loads(json.dumps(value))  # 호출 측 객체가 나중에 바뀌어도 영향받지 않도록 복사
+        if self.tables.get(table, {}).get(key, self) == value:
+            return
+        self._append({'op': 'put', 't': table, 'k': key, 'v': value})
+
+    def delete(self, table: str, key):
+        key = str(key)
+        if key not in self.tables.get(table, {}):
+            return
+        self._append({'op': 'del', 't': table, 'k': key})
+
+    def get(self, table: str) -> Dict[str, Any]:
+        return self.tables.get(table, {})
+
+    def _append(self, record: dict):
+        if self._wal is None:
+            raise RuntimeError('journal not opened - call recover() first')
+        self._apply(record)
+        body = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self._wal.write(RECORD_HEADER.pack(len(body), zlib.crc32(body)) + body)
+        self._wal_records += 1
+        self._dirty = True
+        if self._wal_records >= self.compact_every:
+            self.compact()
+        elif time.monotonic() - self._last_sync >= self.sync_interval_sec:
+            self.sync()
+
+    def sync(self):
+        """쓰고 아직 fsync 하지 않은 레코드가 있으면 디스크에 내림 (노드 타이머에서 주기 호출)"""
+        if self._dirty and self._wal is not None:
+            os.fsync(self._wal.fileno())
+            self._dirty = False
+        self._last_sync = time.monotonic()
+
+    def compact(self):
+        """전체 상태를 다음 세대 스냅샷으로 쓰고 새 WAL 로 전환 (이전 세대 WAL 삭제)"""
+        generation = self.generation + 1
+        tmp = self.snapshot_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'generation': generation, 'written': time.time(), 'tables': self.tables},
+                      f, ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        _fsync_dir(self.directory)
+
+        previous = self.wal_path(self.generation)
+        if self._wal is not None:
+            self._wal.close()
+        self.generation = generation
+        self._open_wal()
+        if os.path.exists(previous):
+            os.remove(previous)
+        self._wal_records = 0
+        self._dirty = False
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        """정상 종료 - 스냅샷으로 압축해 다음 시작 때 WAL 재생이 없도록"""
+        if self._wal is None:
+            return
+        self.compact()
+        self._wal.close()
+        self._wal = None
+
+    def describe(self) -> str:
+        size = sum(len(t) for t in self.tables.values())
+        torn = f', 깨진 꼬리 {self.truncated}B 제거' if self.truncated else ''
+        return (f'세대 {self.generation}, 항목 {size}개 (WAL {self.replayed}건 재생{torn}) '
+                f'{self.recover_ms:.1f}ms')
+
+
+def open_journal(directory: Optional[str], name: str, **kwargs) -> Optional[StateJournal]:
+    """directory 가 빈 값이면 None (저널 끔), 아니면 만들어서 recover() 까지 마친 저널"""
+    if not directory:
+        return None
+    journal = StateJournal(directory, name, **kwargs)
+    journal.recover()
+    return journal
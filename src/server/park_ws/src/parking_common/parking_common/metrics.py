@@ -0,0 +1,323 @@
+"""서버 노드 실시간 지표 (카운터/게이지/고정 버킷 지연 히스토그램, /diagnostics 발행, Prometheus 텍스트 파일)
+
+- Metrics 는 ROS 와 무관한 순수 파이썬 레지스트리: 카운터는 증가만, 게이지는 값 또는 읽을 때 호출할 함수,
+  히스토그램은 Prometheus 와 같은 고정 버킷(누적) + 발행 주기마다 초기화되는 구간 카운트
+- NodeMetrics 는 노드가 구독/타이머를 만들 때 timed() 로 감싼 콜백의 실행 시간을 재고,
+  주기마다 /diagnostics(DiagnosticArray) 발행 + <metrics_dir>/<노드 이름>.prom 을 원자적으로 교체
+  (node_exporter textfile collector 등으로 로컬 수집)
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+from parking_common.qos_profiles import QosRegistry
+
+# 콜백 지연 버킷 상한 (초) - 마지막 +Inf 는 암묵적
+LATENCY_BUCKETS_SEC = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                       0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+DEFAULT_PERIOD_SEC = 5.0
+DEFAULT_METRICS_DIR = '/tmp/parking_metrics'
+DEFAULT_WARN_P99_MS = 50.0
+NAMESPACE = 'parking'
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Optional[Dict[str, str]]) -> Labels:
+    return tuple(sorted((labels or {}).items()))
+
+
+def _format_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ''
+    escaped = (v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+class Counter:
+    """증가만 하는 값 - fn 을 주면 노드에 이미 있는 누적 변수를 읽을 때 그대로 노출"""
+
+    def __init__(self, fn: Optional[Callable[[], int]] = None):
+        self.fn = fn
+        self._value = 0
+
+    def inc(self, amount: int = 1):
+        self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self.fn() if self.fn is not None else self._value
+
+
+class Gauge:
+    def __init__(self, fn: Optional[Callable[[], float]] = None):
+        self.fn = fn
+        self._value = 0.0
+
+    def set(self, value: float):
+        self._value = value
+
+    @property
+    def value(self) -> float:
+        return self.fn() if self.fn is not None else self._value
+
+
+class Histogram:
+    """고정 버킷 히스토그램 - 누적 카운트(Prometheus)와 구간 카운트(주기 요약)를 함께 유지"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS_SEC):
+        self.buckets = buckets
+        self._bounds_ns = [int(b * 1e9) for b in buckets]
+        self.counts = [0] * (len(buckets) + 1)
+        self.window = [0] * (len(buckets) + 1)
+        self.sum_ns = 0
+        self.count = 0
+        self.window_max_ns = 0
+
+    def observe_ns(self, value_ns: int):
+        i = bisect_left(self._bounds_ns, value_ns)
+        self.counts[i] += 1
+        self.window[i] += 1
+        self.sum_ns += value_ns
+        self.count += 1
+        if value_ns > self.window_max_ns:
+            self.window_max_ns = value_ns
+
+    def percentile(self, pct: float, window: bool = True) -> float:
+        """버킷 안 선형 보간으로 추정한 백분위 (초), 표본이 없으면 0"""
+        counts = self.window if window else self.counts
+        total = sum(counts)
+        if not total:
+            return 0.0
+        target = total * pct / 100.0
+        seen = 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= target:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i == len(self.buckets):  # +Inf 버킷은 구간 최댓값으로
+                    return max(lower, self.window_max_ns / 1e9)
+                return lower + (self.buckets[i] - lower) * (target - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def window_count(self) -> int:
+        return sum(self.window)
+
+    def reset_window(self):
+        self.window = [0] * len(self.window)
+        self.window_max_ns = 0
+
+
+class Metrics:
+    """이름 + 라벨로 구분되는 지표 모음 (같은 이름/라벨로 다시 요청하면 같은 객체 반환)"""
+
+    def __init__(self, namespace: str = NAMESPACE, const_labels: Optional[Dict[str, str]] = None):
+        self.namespace = namespace
+        self.const_labels = _labels(const_labels)
+        self._metrics: Dict[str, Tuple[str, str, Dict[Labels, object]]] = {}  # 이름: (타입, 설명, 라벨별 지표)
+        self._lock = threading.Lock()
+
+    def _get(self, kind: str, name: str, help_text: str, labels, factory):
+        key = _labels(labels)
+        with self._lock:
+            entry = self._metrics.setdefault(f'{self.namespace}_{name}', (kind, help_text, {}))
+            if entry[0] != kind:
+                raise ValueError(f'{name} 은 이미 {entry[0]} 로 등록됨')
+            metric = entry[2].get(key)
+            if metric is None:
+                metric = entry[2][key] = factory()
+        return metric
+
+    def counter(self, name: str, help_text: str = '', labels: Optional[Dict[str, str]] = None,
+                fn: Optional[Callable[[], int]] = None) -> Counter:
+        return self._get('counter', name, help_text, labels, lambda: Counter(fn))
+
+    def gauge(self, name: str, help_text: str = '', labels: Optional[Dict[str, str]] = None,
+              fn: Optional[Callable[[], float]] = None) -> Gauge:
+        return self._get('gauge', name, help_text, labels, lambda: Gauge(fn))
+
+    def histogram(self, name: str, help_text: str = '', labels: Optional[Dict[str, str]] = None) -> Histogram:
+        return self._get('histogram', name, help_text, labels, Histogram)
+
+    def timed(self, name: str, callback: Callable, labels: Optional[Dict[str, str]] = None) -> Callable:
+        """callback 실행 시간을 히스토그램에 기록하는 래퍼 (perf_counter_ns 두 번 + 버킷 이분 탐색)"""
+        hist = self.histogram(name, '콜백 실행 시간 (초)', labels)
+        clock = time.perf_counter_ns
+
+        def wrapper(*args):
+            start = clock()
+            try:
+                return callback(*args)
+            finally:
+                hist.observe_ns(clock() - start)
+        wrapper.__name__ = getattr(callback, '__name__', 'callback')
+        return wrapper
+
+    def items(self):
+        with self._lock:
+            snapshot = [(name, kind, help_text, list(series.items()))
+                        for name, (kind, help_text, series) in self._metrics.items()]
+        return snapshot
+
+    def prometheus_text(self) -> str:
+        """Prometheus 텍스트 노출 형식 (히스토그램은 누적 버킷 + 구간 p50/p99 게이지)"""
+        lines = []
+        for name, kind, help_text, series in self.items():
+            lines.append(f'# HELP {name} {help_text or name}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, metric in series:
+                labels = self.const_labels + labels
+                if kind == 'histogram':
+                    cumulative = 0
+                    for bound, n in zip(metric.buckets, metric.counts):
+                        cumulative += n
+                        lines.append(f'{name}_bucket{_format_labels(labels, (("le", repr(bound)),))} {cumulative}')
+                    lines.append(f'{name}_bucket{_format_labels(labels, (("le", "+Inf"),))} {metric.count}')
+                    lines.append(f'{name}_sum{_format_labels(labels)} {metric.sum_ns / 1e9:.9f}')
+                    lines.append(f'{name}_count{_format_labels(labels)} {metric.count}')
+                else:
+                    lines.append(f'{name}{_format_labels(labels)} {metric.value}')
+        for name, kind, _, series in self.items():
+            if kind != 'histogram':
+                continue
+            for quantile in (50, 99):
+                lines.append(f'# HELP {name}_p{quantile} 최근 발행 주기의 p{quantile} 추정값 (초)')
+                lines.append(f'# TYPE {name}_p{quantile} gauge')
+                for labels, metric in series:
+                    lines.append(f'{name}_p{quantile}{_format_labels(self.const_labels + labels)} '
+                                 f'{metric.percentile(quantile):.9f}')
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path: str):
+        """임시 파일에 쓰고 교체 - 수집기가 쓰는 도중의 파일을 읽지 않도록"""
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+    def summary(self) -> List[Tuple[str, str]]:
+        """/diagnostics 용 (키, 값) 목록 - 카운터/게이지 값, 히스토그램은 구간 건수/p50/p99/max (ms)"""
+        values = []
+        for name, kind, _, series in self.items():
+            short = name[len(self.namespace) + 1:]
+            for labels, metric in series:
+                label = ','.join(v for _, v in labels)
+                key = f'{short}[{label}]' if label else short
+                if kind == 'histogram':
+                    values.append((key, f'n={metric.window_count()} p50={metric.percentile(50) * 1e3:.2f}ms '
+                                        f'p99={metric.percentile(99) * 1e3:.2f}ms '
+                                        f'max={metric.window_max_ns / 1e6:.2f}ms'))
+                else:
+                    values.append((key, f'{metric.value:g}' if isinstance(metric.value, float) else str(metric.value)))
+        return values
+
+    def slowest_p99(self) -> Tuple[str, float]:
+        """구간 p99 가 가장 큰 히스토그램 (라벨, 초)"""
+        worst = ('', 0.0)
+        for _, kind, _, series in self.items():
+            if kind != 'histogram':
+                continue
+            for labels, metric in series:
+                p99 = metric.percentile(99)
+                if p99 > worst[1]:
+                    worst = (','.join(v for _, v in labels), p99)
+        return worst
+
+    def reset_windows(self):
+        for _, kind, _, series in self.items():
+            if kind == 'histogram':
+                for _, metric in series:
+                    metric.reset_window()
+
+
+class SeqGapCounter:
+    """키(태그)별 시퀀스 번호 건너뜀을 세어 유실 메시지 수로 누적 (시퀀스가 줄면 송신 측 재시작으로 보고 기준만 갱신)"""
+
+    def __init__(self, counter: Counter):
+        self.counter = counter
+        self.last: Dict[int, int] = {}
+
+    def observe(self, key: int, seq: Optional[int]) -> int:
+        if seq is None:
+            return 0
+        last = self.last.get(key)
+        self.last[key] = seq
+        gap = seq - last - 1 if last is not None and seq > last + 1 else 0
+        if gap:
+            self.counter.inc(gap)
+        return gap
+
+
+class NodeMetrics:
+    """노드 콜백 계측 + 주기 발행 - 구독/타이머보다 먼저 생성하고 콜백은 timed() 로 감싸서 넘김
+
+        self.sub = node.create_subscription(String, topic, self.metrics.timed(self.callback, topic), qos)
+        self.timer = node.create_timer(period, self.metrics.timed(self.on_timer))
+
+    파라미터: metrics_period_sec (0이면 끔), metrics_dir (빈 값이면 .prom 파일 생략),
+    metrics_warn_p99_ms (콜백 p99 가 이보다 크면 /diagnostics 상태 WARN)
+    qos: 노드의 QosRegistry (/diagnostics QoS, 없으면 노드 파라미터 qos_config 로 새로 만듦)
+    """
+
+    def __init__(self, node, qos=None):
+        from diagnostic_msgs.msg import DiagnosticArray, DiagnosticStatus, KeyValue
+
+        self._msg_types = (DiagnosticArray, DiagnosticStatus, KeyValue)
+        self.node = node
+        node.declare_parameter('metrics_period_sec', DEFAULT_PERIOD_SEC)
+        node.declare_parameter('metrics_dir', DEFAULT_METRICS_DIR)
+        node.declare_parameter('metrics_warn_p99_ms', DEFAULT_WARN_P99_MS)
+        self.period_sec = node.get_parameter('metrics_period_sec').value
+        metrics_dir = node.get_parameter('metrics_dir').value
+        self.warn_p99_sec = node.get_parameter('metrics_warn_p99_ms').value / 1000.0
+        self.metrics = Metrics(const_labels={'node': node.get_name()})
+        self.textfile = os.path.join(os.path.expanduser(metrics_dir), f'{node.get_name()}.prom') if metrics_dir else None
+        if self.textfile:
+            os.makedirs(os.path.dirname(self.textfile), exist_ok=True)
+
+        qos = qos or QosRegistry.from_node(node)
+        self.diag_pub = node.create_publisher(DiagnosticArray, '/diagnostics', qos.profile('/diagnostics'))
+        self.timer = node.create_timer(self.period_sec, self.publish) if self.period_sec > 0 else None
+
+    def timed(self, callback: Callable, topic: str = '') -> Callable:
+        """create_subscription / create_timer 에 넘길 콜백을 실행 시간 측정 래퍼로 감쌈 (지표를 끄면 그대로 반환)"""
+        if self.period_sec <= 0:
+            return callback
+        return self.metrics.timed('callback_seconds', callback,
+                                  {'callback': getattr(callback, '__name__', 'callback'), 'topic': topic})
+
+    def counter(self, name: str, help_text: str = '', fn: Optional[Callable[[], int]] = None,
+                labels: Optional[Dict[str, str]] = None) -> Counter:
+        return self.metrics.counter(name, help_text, labels, fn)
+
+    def gauge(self, name: str, help_text: str = '', fn: Optional[Callable[[], float]] = None,
+              labels: Optional[Dict[str, str]] = None) -> Gauge:
+        return self.metrics.gauge(name, help_text, labels, fn)
+
+    def publish(self):
+        DiagnosticArray, DiagnosticStatus, KeyValue = self._msg_types
+        try:
+            if self.textfile:
+                self.metrics.write_textfile(self.textfile)
+            slowest, p99 = self.metrics.slowest_p99()
+            status = DiagnosticStatus()
+            status.name = f'{self.node.get_name()}: metrics'
+            status.hardware_id = self.node.get_name()
+            if p99 > self.warn_p99_sec:
+                status.level = DiagnosticStatus.WARN
+                status.message = f'{slowest} p99 {p99 * 1e3:.1f}ms'
+            else:
+                status.level = DiagnosticStatus.OK
+                status.message = 'OK'
+            status.values = [KeyValue(key=k, value=v) for k, v in self.metrics.summary()]
+            array = DiagnosticArray()
+            array.header.stamp = self.node.get_clock().now().to_msg()
+            array.status = [status]
+            self.diag_pub.publish(array)
+        except Exception as e:
+            self.node.get_logger().warn(f'지표 발행 실패: {e}')
+        finally:
+            self.metrics.reset_windows()
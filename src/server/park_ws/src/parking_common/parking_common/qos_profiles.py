@@ -0,0 +1,161 @@
+"""토픽별 QoS 프로파일 레지스트리 (코드 기본값 + 배포별 YAML 재정의)
+
+기본 프로파일
+- position: 좌표 스트림 (/uwb/pos, /uwb/comp) - best-effort, keep-last POSITION_DEPTH, volatile
+  부하가 걸리면 재전송/큐잉으로 늦게 도착하는 좌표보다 최신 좌표만 받는 편이 낫다
+  (한 토픽에 여러 태그 좌표가 섞여 오므로 depth 1 이면 다른 태그의 최신 좌표까지 밀려나 동시 추적 태그 수만큼 둔다)
+- state: 상태 토픽 (/parking/spot_info, /parking_exe/snapshot) - reliable, transient-local, depth 1
+  늦게 붙은 구독자도 발행자가 보관한 마지막 상태를 바로 받는다
+  (/parking_exe/snapshot 은 바뀐 경우에만 발행하므로 래치하지 않으면 다음 변경까지 대시보드가 비어 있다)
+- default: 그 밖의 토픽 - reliable, volatile, keep-last 10 (예전 depth 10 과 같음)
+  /uwb/vehicle_info 같은 이벤트 토픽은 래치하면 안 됨 - 재시작한 구독자에게 지난 start/stop_tracking 이
+  다시 전달되면 저널로 복구한 차량이 지워지거나 다시 대기 상태가 된다
+
+호환성: best-effort 발행 → reliable 구독, volatile 발행 → transient-local 구독은 연결되지 않으므로
+같은 토픽의 발행/구독은 모두 이 레지스트리를 거쳐야 한다.
+
+YAML 형식 (노드 파라미터 qos_config, 없으면 환경변수 PARKING_QOS_CONFIG - 배포마다 다른 파일):
+    profiles:
+      position: {depth: 1}                          # 기본 프로파일 일부 재정의 (태그 1개 배포)
+      lossless: {reliability: reliable, depth: 100}  # 새 프로파일 (나머지 필드는 default 기준)
+    topics:
+      /uwb/comp: lossless                           # 프로파일 이름
+      /parking/spot_delta: {profile: state, depth: 20}  # 프로파일 + 필드 재정의
+필드: reliability (reliable | best_effort), durability (volatile | transient_local),
+      history (keep_last | keep_all), depth, lifespan_ms (0 이면 무제한)
+"""
+import os
+from dataclasses import dataclass, fields, replace
+from typing import Dict, Optional, Union
+
+CONFIG_PATH_ENV = 'PARKING_QOS_CONFIG'
+DEFAULT_PROFILE = 'default'
+POSITION_DEPTH = 4       # 동시에 추적하는 태그 수 - 태그마다 최신 좌표 하나씩
+VEHICLE_INFO_DEPTH = 32  # /uwb/vehicle_info 는 차량마다 한 번 발행되는 이벤트 - 여러 대가 몰려도 밀려나지 않도록
+
+CHOICES = {
+    'reliability': ('reliable', 'best_effort'),
+    'durability': ('volatile', 'transient_local'),
+    'history': ('keep_last', 'keep_all'),
+}
+
+TopicEntry = Union[str, dict]
+
+
+@dataclass(frozen=True)
+class QosSpec:
+    """ROS 와 무관한 QoS 설정값 (to_profile 에서 rclpy QoSProfile 로 변환)"""
+    reliability: str = 'reliable'
+    durability: str = 'volatile'
+    history: str = 'keep_last'
+    depth: int = 10
+    lifespan_ms: float = 0.0
+
+    def override(self, values: dict) -> 'QosSpec':
+        known = {f.name for f in fields(self)}
+        unknown = set(values) - known
+        if unknown:
+            raise ValueError(f'unknown QoS fields: {sorted(unknown)}')
+        for key, value in values.items():
+            if key in CHOICES and value not in CHOICES[key]:
+                raise ValueError(f'invalid {key}: {value} (choose from {CHOICES[key]})')
+        spec = replace(self, **values)
+        if spec.history == 'keep_last' and int(spec.depth) < 1:
+            raise ValueError(f'depth must be >= 1 for keep_last: {spec.depth}')
+        return replace(spec, depth=int(spec.depth), lifespan_ms=float(spec.lifespan_ms))
+
+    def to_profile(self):
+        from rclpy.duration import Duration
+        from rclpy.qos import DurabilityPolicy, HistoryPolicy, QoSProfile, ReliabilityPolicy
+
+        profile = QoSProfile(
+            history=HistoryPolicy.KEEP_LAST if self.history == 'keep_last' else HistoryPolicy.KEEP_ALL,
+            depth=self.depth,
+            reliability=(ReliabilityPolicy.RELIABLE if self.reliability == 'reliable'
+                         else ReliabilityPolicy.BEST_EFFORT),
+            durability=(DurabilityPolicy.TRANSIENT_LOCAL if self.durability == 'transient_local'
+                        else DurabilityPolicy.VOLATILE))
+        if self.lifespan_ms > 0:
+            profile.lifespan = Duration(nanoseconds=int(self.lifespan_ms * 1e6))
+        return profile
+
+    def describe(self) -> str:
+        history = f'keep_last({self.depth})' if self.history == 'keep_last' else 'keep_all'
+        lifespan = f' lifespan={self.lifespan_ms:g}ms' if self.lifespan_ms > 0 else ''
+        return f'{self.reliability}/{self.durability}/{history}{lifespan}'
+
+
+DEFAULT_PROFILES: Dict[str, QosSpec] = {
+    DEFAULT_PROFILE: QosSpec(),
+    'position': QosSpec(reliability='best_effort', depth=POSITION_DEPTH),
+    'state': QosSpec(durability='transient_local', depth=1),
+}
+
+DEFAULT_TOPICS: Dict[str, TopicEntry] = {
+    '/uwb/pos': 'position',
+    '/uwb/comp': 'position',
+    '/parking/spot_info': 'state',
+    '/parking_exe/snapshot': 'state',
+    '/uwb/vehicle_info': {'depth': VEHICLE_INFO_DEPTH},
+    '/diagnostics': DEFAULT_PROFILE,
+}
+
+
+class QosRegistry:
+    """토픽 이름 → QoS (기본값 위에 config 의 profiles/topics 를 덮어씀, 토픽별로 캐시)"""
+
+    def __init__(self, config: Optional[dict] = None):
+        config = config or {}
+        self.profiles = dict(DEFAULT_PROFILES)
+        for name, values in (config.get('profiles') or {}).items():
+            base = self.profiles.get(name, DEFAULT_PROFILES[DEFAULT_PROFILE])
+            self.profiles[name] = base.override(values or {})
+        self.topics: Dict[str, QosSpec] = {}
+        for topic, entry in {**DEFAULT_TOPICS, **(config.get('topics') or {})}.items():
+            self.topics[self._normalize(topic)] = self._resolve(topic, entry)
+        self._profile_cache = {}
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'QosRegistry':
+        """YAML 파일에서 생성 (path 가 없으면 PARKING_QOS_CONFIG, 둘 다 없으면 기본값)"""
+        path = path or os.environ.get(CONFIG_PATH_ENV)
+        if not path:
+            return cls()
+        import yaml
+
+        with open(os.path.expanduser(path)) as f:
+            return cls(yaml.safe_load(f) or {})
+
+    @classmethod
+    def from_node(cls, node) -> 'QosRegistry':
+        """노드 파라미터 qos_config 로 생성 (토픽별 QoS 는 debug 로그로 남김)"""
+        if not node.has_parameter('qos_config'):
+            node.declare_parameter('qos_config', '')
+        registry = cls.load(node.get_parameter('qos_config').value or None)
+        for topic, spec in sorted(registry.topics.items()):
+            node.get_logger().debug(f'QoS {topic}: {spec.describe()}')
+        return registry
+
+    @staticmethod
+    def _normalize(topic: str) -> str:
+        return topic if topic.startswith('/') else '/' + topic
+
+    def _resolve(self, topic: str, entry: TopicEntry) -> QosSpec:
+        if isinstance(entry, str):
+            entry = {'profile': entry}
+        entry = dict(entry)
+        name = entry.pop('profile', DEFAULT_PROFILE)
+        if name not in self.profiles:
+            raise ValueError(f'{topic}: unknown QoS profile {name}')
+        return self.profiles[name].override(entry)
+
+    def spec(self, topic: str) -> QosSpec:
+        return self.topics.get(self._normalize(topic), self.profiles[DEFAULT_PROFILE])
+
+    def profile(self, topic: str):
+        """create_publisher / create_subscription 에 넘길 QoSProfile"""
+        topic = self._normalize(topic)
+        profile = self._profile_cache.get(topic)
+        if profile is None:
+            profile = self._profile_cache[topic] = self.spec(topic).to_profile()
+        return profile
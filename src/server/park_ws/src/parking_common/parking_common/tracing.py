@@ -0,0 +1,207 @@
+"""UWB 좌표 지연 추적 (원점 시각/시퀀스 번호 전달, 구간별 HDR 방식 히스토그램, 주기 내보내기)
+
+/uwb/pos → /uwb/comp → TCP real_time_position → CarItem.setPos 경로에서
+- 원점 시각은 header.stamp 로 전달 (ESP32가 micro-ROS 시각 동기화에 성공하면 측정 시각, 아니면 파서 수신 시각)
+- 시퀀스 번호는 frame_id 뒤에 '#seq' 로 붙이고 ("tag_10#42"), TCP 메시지에서는 'trace' 딕셔너리로 전달
+- 한 프로세스 안의 처리 시간은 monotonic 시계로, 프로세스/장치 사이 구간은 벽시계(ns) 차이로 잰다
+  (벽시계 구간은 NTP/micro-ROS 시각 동기화 오차만큼 틀어질 수 있고, 음수는 0으로 잘라 skewed 로 센다)
+"""
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+SUB_BUCKET_BITS = 7          # 2배 구간마다 64칸 (상대 오차 1.6% 이하)
+MAX_VALUE_US = 3_600_000_000  # 1시간 넘는 값은 최댓값 칸에 기록
+EXPORT_PATH_ENV = 'PARKING_TRACE_FILE'
+DEFAULT_PERIOD_SEC = 10.0
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+SEQ_SEPARATOR = '#'
+
+wall_ns = time.time_ns
+mono_ns = time.monotonic_ns
+
+
+def format_frame_id(tag_id: int, seq: Optional[int] = None) -> str:
+    """태그 번호와 시퀀스 번호를 frame_id 로 ("tag_10", "tag_10#42")"""
+    return f'tag_{tag_id}' if seq is None else f'tag_{tag_id}{SEQ_SEPARATOR}{seq}'
+
+
+def parse_frame_id(frame_id: str) -> Tuple[int, Optional[int]]:
+    """frame_id 에서 (tag_id, seq) 추출 - 시퀀스가 없는 예전 형식이면 seq 는 None, 형식이 틀리면 ValueError"""
+    if not frame_id.startswith('tag_'):
+        raise ValueError(f'invalid frame_id: {frame_id}')
+    tag, _, seq = frame_id[4:].partition(SEQ_SEPARATOR)
+    return int(tag), (int(seq) if seq else None)
+
+
+def stamp_to_ns(stamp) -> int:
+    """builtin_interfaces/Time → ns (0이면 원점 시각 없음)"""
+    return stamp.sec * 1_000_000_000 + stamp.nanosec
+
+
+class LatencyHistogram:
+    """HdrHistogram 방식 로그-선형 버킷 히스토그램 (µs 단위, 희소 dict 저장)
+
+    값 v < 2^SUB_BUCKET_BITS 는 1µs 칸 그대로, 그 위로는 2배 구간마다 2^(SUB_BUCKET_BITS-1) 칸으로 나눈다.
+    """
+
+    def __init__(self, sub_bucket_bits: int = SUB_BUCKET_BITS, max_value_us: int = MAX_VALUE_US):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.half_count = self.sub_bucket_count >> 1
+        self.max_value_us = max_value_us
+        self.reset()
+
+    def reset(self):
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.sum_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us: Optional[int] = None
+        self.skewed = 0
+
+    def index_of(self, value_us: int) -> int:
+        if value_us < self.sub_bucket_count:
+            return value_us
+        shift = value_us.bit_length() - self.sub_bucket_bits
+        return self.sub_bucket_count + (shift - 1) * self.half_count + ((value_us >> shift) - self.half_count)
+
+    def highest_equivalent(self, index: int) -> int:
+        """칸에 들어가는 가장 큰 값 (HdrHistogram 과 같이 백분위는 칸의 상한으로 보고)"""
+        if index < self.sub_bucket_count:
+            return index
+        shift, sub = divmod(index - self.sub_bucket_count, self.half_count)
+        shift += 1
+        return ((sub + self.half_count + 1) << shift) - 1
+
+    def record(self, value_us: int, count: int = 1):
+        if value_us < 0:
+            self.skewed += count
+            value_us = 0
+        value_us = min(int(value_us), self.max_value_us)
+        idx = self.index_of(value_us)
+        self.counts[idx] = self.counts.get(idx, 0) + count
+        self.total += count
+        self.sum_us += value_us * count
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+        self.max_us = value_us if self.max_us is None else max(self.max_us, value_us)
+
+    def merge(self, other: 'LatencyHistogram'):
+        for idx, n in other.counts.items():
+            self.counts[idx] = self.counts.get(idx, 0) + n
+        self.total += other.total
+        self.sum_us += other.sum_us
+        self.skewed += other.skewed
+        for attr, pick in (('min_us', min), ('max_us', max)):
+            theirs = getattr(other, attr)
+            if theirs is not None:
+                mine = getattr(self, attr)
+                setattr(self, attr, theirs if mine is None else pick(mine, theirs))
+
+    def percentile(self, pct: float) -> int:
+        if not self.total:
+            return 0
+        target = max(1, -(-self.total * pct // 100))
+        seen = 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            if seen >= target:
+                return min(self.highest_equivalent(idx), self.max_us)
+        return self.max_us
+
+    def mean(self) -> float:
+        return self.sum_us / self.total if self.total else 0.0
+
+    def to_dict(self) -> dict:
+        """내보내기용 요약 (ms) + 오프라인 병합용 버킷 [칸 상한 µs, 개수]"""
+        summary = {'count': self.total, 'skewed': self.skewed,
+                   'min_ms': (self.min_us or 0) / 1000.0, 'mean_ms': round(self.mean() / 1000.0, 3),
+                   'max_ms': (self.max_us or 0) / 1000.0}
+        for pct in PERCENTILES:
+            summary[f'p{pct:g}_ms'] = self.percentile(pct) / 1000.0
+        summary['buckets'] = [[self.highest_equivalent(i), self.counts[i]] for i in sorted(self.counts)]
+        return summary
+
+
+class Tracer:
+    """구간(stage)별 지연 히스토그램 모음 - period_sec 마다 구간 히스토그램을 내보내고 초기화
+
+    record 는 여러 스레드에서 불러도 되며, 내보내기는 기록하는 쪽에서 주기가 지났을 때 수행한다.
+    내보내기 파일(JSON Lines)은 export_path, 없으면 환경변수 PARKING_TRACE_FILE, 둘 다 없으면 로그만 남긴다.
+    """
+
+    def __init__(self, name: str, export_path: Optional[str] = None, period_sec: float = DEFAULT_PERIOD_SEC,
+                 log: Optional[Callable[[str], None]] = print):
+        self.name = name
+        self.export_path = export_path or os.environ.get(EXPORT_PATH_ENV) or None
+        self.period_sec = period_sec
+        self.log = log
+        self.stages: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_wall = time.time()
+
+    def record(self, stage: str, latency_ns: int):
+        with self._lock:
+            hist = self.stages.get(stage)
+            if hist is None:
+                hist = self.stages[stage] = LatencyHistogram()
+            hist.record(latency_ns // 1000)
+        self.maybe_export()
+
+    def record_since(self, stage: str, start_mono_ns: int) -> int:
+        """같은 프로세스 안의 구간 - monotonic 시작 시각부터 지금까지, 지금 시각 반환"""
+        now = mono_ns()
+        self.record(stage, now - start_mono_ns)
+        return now
+
+    def record_age(self, stage: str, origin_wall_ns: int) -> int:
+        """장치/프로세스를 건너는 구간 - 원점 벽시계 시각부터 지금까지, 지금 시각 반환"""
+        now = wall_ns()
+        if origin_wall_ns:
+            self.record(stage, now - origin_wall_ns)
+        return now
+
+    def maybe_export(self):
+        if self.period_sec > 0 and time.monotonic() - self._window_start >= self.period_sec:
+            self.export()
+
+    def snapshot(self, reset: bool = True) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            report = {'tracer': self.name, 'start': self._window_wall, 'end': time.time(),
+                      'interval_sec': round(now - self._window_start, 3),
+                      'stages': {stage: hist.to_dict() for stage, hist in self.stages.items() if hist.total}}
+            if reset:
+                for hist in self.stages.values():
+                    hist.reset()
+                self._window_start = now
+                self._window_wall = report['end']
+        return report
+
+    def export(self) -> dict:
+        report = self.snapshot()
+        if not report['stages']:
+            return report
+        if self.export_path:
+            try:
+                with open(self.export_path, 'a') as f:
+                    f.write(json.dumps(report) + '\n')
+            except OSError as e:
+                if self.log:
+                    self.log(f'[{self.name}] trace export failed: {e}')
+        if self.log:
+            for line in self.summary_lines(report):
+                self.log(line)
+        return report
+
+    @staticmethod
+    def summary_lines(report: dict) -> List[str]:
+        lines = []
+        for stage, s in report['stages'].items():
+            skew = f' skewed={s["skewed"]}' if s['skewed'] else ''
+            lines.append(f'[{report["tracer"]}] {stage}: n={s["count"]} p50={s["p50_ms"]:.1f}ms '
+                         f'p90={s["p90_ms"]:.1f}ms p99={s["p99_ms"]:.1f}ms max={s["max_ms"]:.1f}ms{skew}')
+        return lines
@@ -0,0 +1,21 @@
+from setuptools import setup
+
+package_name = 'parking_common'
+
+setup(
+    name=package_name,
+    version='1.0.0',
+    packages=[package_name],
+    data_files=[
+        ('share/ament_index/resource_index/packages',
+            ['resource/' + package_name]),
+        ('share/' + package_name, ['package.xml']),
+    ],
+    install_requires=['setuptools'],
+    zip_safe=True,
+    maintainer='Your Name',
+    maintainer_email='your_email@example.com',
+    description='Shared utilities for the smart parking nodes',
+    license='MIT',
+    tests_require=['pytest'],
+)
@@ -0,0 +1,156 @@
+"""StateJournal WAL/스냅샷 복구 테스트 (잘린/깨진 꼬리, 세대 압축, 비정상 종료)"""
+
+import json
+import os
+import zlib
+
+from parking_common.journal import RECORD_HEADER, StateJournal
+
+
+def open_journal(tmp_path, **kwargs):
+    journal = StateJournal(str(tmp_path), 'node', **kwargs)
+    journal.recover()
+    return journal
+
+
+def read_records(path):
+    """WAL 파일을 (길이, crc, JSON 본문) 목록으로 분해"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    records, offset = [], 0
+    while offset < len(data):
+        length, crc = RECORD_HEADER.unpack_from(data, offset)
+        body = data[offset + RECORD_HEADER.size:offset + RECORD_HEADER.size + length]
+        records.append((length, crc, body))
+        offset += RECORD_HEADER.size + length
+    return records
+
+
+def test_records_are_length_and_crc32_framed(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.put('vehicles', 1, {'spot': 3})
+    journal.delete('vehicles', 1)
+    records = read_records(journal.wal_path(0))
+    assert len(records) == 2
+    for length, crc, body in records:
+        assert length == len(body)
+        assert crc == zlib.crc32(body)
+    assert json.loads(records[0][2]) == {'op': 'put', 't': 'vehicles', 'k': '1', 'v': {'spot': 3}}
+    assert json.loads(records[1][2]) == {'op': 'del', 't': 'vehicles', 'k': '1'}
+
+
+def test_unchanged_put_and_missing_delete_are_not_written(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.put('vehicles', 1, {'spot': 3})
+    journal.put('vehicles', 1, {'spot': 3})
+    journal.delete('vehicles', 2)
+    assert len(read_records(journal.wal_path(0))) == 1
+
+
+def test_recover_after_crash_replays_wal(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.put('vehicles', 1, {'spot': 3})
+    journal.put('vehicles', 2, {'spot': 5})
+    journal.delete('vehicles', 1)
+    # close() 없이 종료 (WAL 은 버퍼 없이 기록되므로 프로세스가 죽어도 남아 있음)
+
+    recovered = open_journal(tmp_path)
+    assert recovered.tables == {'vehicles': {'2': {'spot': 5}}}
+    assert recovered.replayed == 3
+    assert recovered.truncated == 0
+
+
+def test_torn_last_record_is_dropped_and_truncated(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.put('vehicles', 1, {'spot': 3})
+    journal.put('vehicles', 2, {'spot': 5})
+    path = journal.wal_path(0)
+    size = os.path.getsize(path)
+    valid = size - len(read_records(path)[-1][2]) - RECORD_HEADER.size
+    with open(path, 'r+b') as f:
+        f.truncate(size - 4)   # 마지막 레코드를 쓰는 도중 죽은 상황
+
+    recovered = open_journal(tmp_path)
+    assert recovered.tables == {'vehicles': {'1': {'spot': 3}}}
+    assert recovered.replayed == 1
+    assert recovered.truncated == size - 4 - valid
+    assert os.path.getsize(path) == valid
+
+    # 잘라낸 위치부터 이어 쓴 레코드는 다음 복구에서 정상 재생
+    recovered.put('vehicles', 3, {'spot': 7})
+    again = open_journal(tmp_path)
+    assert again.tables == {'vehicles': {'1': {'spot': 3}, '3': {'spot': 7}}}
+    assert again.truncated == 0
+
+
+def test_corrupted_tail_fails_crc_and_stops_replay(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.put('vehicles', 1, {'spot': 3})
+    journal.put('vehicles', 2, {'spot': 5})
+    path = journal.wal_path(0)
+    with open(path, 'r+b') as f:
+        f.seek(-2, os.SEEK_END)
+        f.write(b'99')          # 길이는 맞지만 본문이 깨진 마지막 레코드
+
+    recovered = open_journal(tmp_path)
+    assert recovered.tables == {'vehicles': {'1': {'spot': 3}}}
+    assert recovered.replayed == 1
+    assert len(read_records(path)) == 1
+
+
+def test_replay_returns_end_of_last_valid_record(tmp_path):
+    journal = StateJournal(str(tmp_path), 'node')
+    body = json.dumps({'op': 'put', 't': 'a', 'k': 'x', 'v': 1}).encode()
+    record = RECORD_HEADER.pack(len(body), zlib.crc32(body)) + body
+    assert journal._replay(record) == len(record)
+    assert journal._replay(record + record[:RECORD_HEADER.size - 1]) == len(record)
+    assert journal._replay(record + record[:-1]) == len(record)
+    bad_crc = RECORD_HEADER.pack(len(body), zlib.crc32(body) ^ 1) + body
+    assert journal._replay(record + bad_crc + record) == len(record)
+    assert journal._replay(b'') == 0
+    assert journal.tables == {'a': {'x': 1}}
+
+
+def test_compaction_moves_to_next_generation(tmp_path):
+    journal = open_journal(tmp_path, compact_every=3)
+    for key in range(5):
+        journal.put('vehicles', key, {'spot': key})
+    assert journal.generation == 1
+    assert os.path.exists(journal.snapshot_path)
+    assert not os.path.exists(journal.wal_path(0))
+    assert len(read_records(journal.wal_path(1))) == 2
+    with open(journal.snapshot_path) as f:
+        snapshot = json.load(f)
+    assert snapshot['generation'] == 1
+    assert sorted(snapshot['tables']['vehicles']) == ['0', '1', '2']
+
+    recovered = open_journal(tmp_path, compact_every=3)
+    assert recovered.generation == 1
+    assert recovered.replayed == 2
+    assert recovered.tables == {'vehicles': {str(k): {'spot': k} for k in range(5)}}
+
+
+def test_wal_from_an_older_generation_is_ignored_and_removed(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.put('vehicles', 1, {'spot': 3})
+    journal.compact()
+    # 스냅샷 교체 후 이전 세대 WAL 삭제 전에 죽은 상황
+    stale = journal.wal_path(0)
+    body = json.dumps({'op': 'del', 't': 'vehicles', 'k': '1'}).encode()
+    with open(stale, 'wb') as f:
+        f.write(RECORD_HEADER.pack(len(body), zlib.crc32(body)) + body)
+
+    recovered = open_journal(tmp_path)
+    assert recovered.generation == 1
+    assert recovered.tables == {'vehicles': {'1': {'spot': 3}}}
+    assert not os.path.exists(stale)
+
+
+def test_close_leaves_nothing_to_replay(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.put('vehicles', 1, {'spot': 3})
+    journal.close()
+
+    recovered = open_journal(tmp_path)
+    assert recovered.replayed == 0
+    assert recovered.tables == {'vehicles': {'1': {'spot': 3}}}
@@ -1,12 +1,30 @@
 from launch import LaunchDescription
+from launch.actions import DeclareLaunchArgument
+from launch.conditions import IfCondition
+from launch.substitutions import LaunchConfiguration
 from launch_ros.actions import Node
 
 def generate_launch_description():
+    # 대시보드는 관제 PC에서만 켜고, 엣지 서버에서는 배정 서비스만 실행
+    use_dashboard = LaunchConfiguration('use_dashboard')
+
     return LaunchDescription([
+        DeclareLaunchArgument(
+            'use_dashboard',
+            default_value='false',
+            description='PyQt 관제 대시보드 실행 여부'
+        ),
         Node(
             package='parking_exe',
             executable='parking_exe_node',
             name='parking_exe_node',
             output='screen'
         ),
-    ])
\ No newline at end of file
+        Node(
+            package='parking_exe',
+            executable='parking_dashboard',
+            name='parking_dashboard',
+            output='screen',
+            condition=IfCondition(use_dashboard)
+        ),
+    ])
@@ -4,6 +4,7 @@ import rclpy
 from rclpy.node import Node
 from geometry_msgs.msg import PointStamped
 from std_msgs.msg import String
+from parking_common.qos_profiles import QosRegistry
 import json
 import time
 import threading
@@ -13,9 +14,10 @@ class IllegalParkingTestDummy(Node):
     def __init__(self):
         super().__init__('illegal_parking_test_dummy')
         
-        # Publishers
-        self.uwb_comp_pub = self.create_publisher(PointStamped, '/uwb/comp', 10)
-        self.vehicle_info_pub = self.create_publisher(String, '/uwb/vehicle_info', 10)
+        # Publishers (서버 노드와 같은 토픽별 QoS)
+        self.qos = QosRegistry.from_node(self)
+        self.uwb_comp_pub = self.create_publisher(PointStamped, '/uwb/comp', self.qos.profile('/uwb/comp'))
+        self.vehicle_info_pub = self.create_publisher(String, '/uwb/vehicle_info', self.qos.profile('/uwb/vehicle_info'))
         
         # 테스트 설정
         self.tag_id = 99
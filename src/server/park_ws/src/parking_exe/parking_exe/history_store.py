@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""주차 이벤트 / 차량 궤적 이력 저장소 (mmap 컬럼형 append-only 세그먼트)"""
+
+import os
+import json
+import mmap
+import struct
+import bisect
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 레코드 종류
+KIND_POSITION = 0
+KIND_PARK = 1
+KIND_UNPARK = 2
+KIND_EXIT = 3
+
+NO_SPOT = -1
+
+SEGMENT_MAGIC = b'PKHIST01'
+HEADER_SIZE = 64
+# (컬럼명, struct 포맷, 바이트 크기) - 정렬을 위해 큰 타입부터 배치
+COLUMNS = (
+    ('t', 'd', 8),
+    ('tag', 'i', 4),
+    ('x', 'f', 4),
+    ('y', 'f', 4),
+    ('spot', 'h', 2),
+    ('kind', 'B', 1),
+)
+RECORD_SIZE = sum(size for _, _, size in COLUMNS)
+INDEX_FILE = 'index.json'
+MAX_OPEN_SEGMENTS = 8
+
+
+@dataclass
+class SegmentInfo:
+    """세그먼트 인덱스 항목 (시간 범위, tag/spot 포스팅, 시작 시점 점유 상태)"""
+    name: str
+    t_min: float = 0.0
+    t_max: float = 0.0
+    count: int = 0
+    tags: set = field(default_factory=set)
+    spots: set = field(default_factory=set)
+    # 주차/해제 이벤트 행 번호 (점유율 질의 시 위치 샘플을 건너뛰기 위함)
+    event_rows: List[int] = field(default_factory=list)
+    # 세그먼트 시작 시점 구역별 점유 차량 수
+    occupied_at_start: Dict[int, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name, 't_min': self.t_min, 't_max': self.t_max, 'count': self.count,
+            'tags': sorted(self.tags), 'spots': sorted(self.spots),
+            'event_rows': self.event_rows,
+            'occupied_at_start': {str(k): v for k, v in self.occupied_at_start.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> 'SegmentInfo':
+        return cls(
+            name=d['name'], t_min=d['t_min'], t_max=d['t_max'], count=d['count'],
+            tags=set(d['tags']), spots=set(d['spots']), event_rows=list(d['event_rows']),
+            occupied_at_start={int(k): v for k, v in d['occupied_at_start'].items()},
+        )
+
+
+class Segment:
+    """고정 용량 세그먼트 파일 - 헤더 뒤에 컬럼별 연속 배열 배치"""
+
+    def __init__(self, path: str, capacity: int, create: bool = False):
+        self.path = path
+        if create:
+            with open(path, 'wb') as f:
+                f.truncate(HEADER_SIZE + RECORD_SIZE * capacity)
+                f.write(SEGMENT_MAGIC + struct.pack('<II', capacity, 0))
+        self._file = open(path, 'r+b')
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        if self._mm[:8] != SEGMENT_MAGIC:
+            self.close()
+            raise ValueError(f'이력 세그먼트 형식 오류: {path}')
+        self.capacity, self.count = struct.unpack_from('<II', self._mm, 8)
+
+        self._view = memoryview(self._mm)
+        self.columns = {}
+        offset = HEADER_SIZE
+        for name, fmt, size in COLUMNS:
+            self.columns[name] = self._view[offset:offset + size * self.capacity].cast(fmt)
+            offset += size * self.capacity
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+    def append(self, t: float, tag: int, kind: int, spot: int, x: float, y: float) -> int:
+        """레코드 1개 추가 후 행 번호 반환 (count는 값 기록 후 갱신)"""
+        row = self.count
+        cols = self.columns
+        cols['t'][row] = t
+        cols['tag'][row] = tag
+        cols['x'][row] = x
+        cols['y'][row] = y
+        cols['spot'][row] = spot
+        cols['kind'][row] = kind
+        self.count = row + 1
+        struct.pack_into('<I', self._mm, 12, self.count)
+        return row
+
+    def flush(self):
+        self._mm.flush()
+
+    def close(self):
+        # mmap을 닫기 전에 컬럼 뷰를 먼저 해제해야 함
+        for col in getattr(self, 'columns', {}).values():
+            col.release()
+        self.columns = {}
+        if getattr(self, '_view', None) is not None:
+            self._view.release()
+            self._view = None
+        self._mm.close()
+        self._file.close()
+
+
+class HistoryStore:
+    """주차/해제/출차 이벤트와 위치 샘플을 세그먼트 단위로 누적 저장하고 구간 질의에 응답
+
+    clock은 레코드 시각(초)을 주는 함수 - 노드에서는 ROS 시계를 넘겨 기록 재생(sim time) 시각으로 저장
+    """
+
+    def __init__(self, directory: str, segment_capacity: int = 1 << 16,
+                 occupied: Optional[Dict[int, int]] = None,
+                 clock: Callable[[], float] = time.time):
+        self.directory = os.path.expanduser(directory)
+        self.segment_capacity = segment_capacity
+        self.clock = clock
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.segments: List[SegmentInfo] = []
+        self._open_segments: Dict[str, Segment] = {}
+        self.live_occupancy: Dict[int, int] = {}
+        self._last_t = 0.0
+        self._load_index()
+
+        if not self.segments or self._segment(self.segments[-1]).full:
+            self._start_segment()
+
+        # 이전 실행에서 닫히지 않은 주차는 재시작 시점에 해제로 기록
+        # (노드 재시작 시 차량 상태가 초기화되므로 점유율이 영구히 누적되는 것을 방지)
+        # occupied 는 상태 저널로 복구한 구역별 주차 수 - 그만큼은 이어지는 주차로 남김
+        occupied = occupied or {}
+        now = clock()
+        for spot, count in list(self.live_occupancy.items()):
+            for _ in range(count - occupied.get(spot, 0)):
+                self.append(KIND_UNPARK, -1, spot, 0.0, 0.0, now)
+
+    # ---------------- 기록 ----------------
+
+    def append(self, kind: int, tag: int, spot: Optional[int], x: float, y: float,
+               t: Optional[float] = None):
+        """레코드 추가 (시간은 단조 증가로 보정해 이진 탐색이 가능하도록 유지)"""
+        t = self.clock() if t is None else t
+        t = max(t, self._last_t)
+        self._last_t = t
+        spot = NO_SPOT if spot is None else spot
+
+        info = self.segments[-1]
+        segment = self._segment(info)
+        if segment.full:
+            self._start_segment()
+            info = self.segments[-1]
+            segment = self._segment(info)
+
+        row = segment.append(t, tag, kind, spot, x, y)
+        self._update_info(info, row, t, tag, kind, spot)
+
+    def record_position(self, tag: int, x: float, y: float, spot: Optional[int] = None):
+        self.append(KIND_POSITION, tag, spot, x, y)
+
+    def record_park(self, tag: int, spot: int, x: float, y: float):
+        self.append(KIND_PARK, tag, spot, x, y)
+
+    def record_unpark(self, tag: int, spot: int, x: float, y: float):
+        self.append(KIND_UNPARK, tag, spot, x, y)
+
+    def record_exit(self, tag: int, x: float, y: float):
+        self.append(KIND_EXIT, tag, None, x, y)
+
+    def close(self):
+        """인덱스 저장 후 모든 세그먼트 닫기"""
+        for segment in self._open_segments.values():
+            segment.flush()
+            segment.close()
+        self._open_segments.clear()
+        self._save_index()
+
+    # ---------------- 질의 ----------------
+
+    def spot_intervals(self, spot: int, t1: float, t2: float) -> List[Tuple[float, float]]:
+        """spot 구역이 점유된 구간 목록 [(시작, 끝)] (t1~t2로 잘라서 반환)"""
+        segs = self._segments_in_range(t1, t2)
+        if not segs:
+            return []
+
+        occupied = segs[0].occupied_at_start.get(spot, 0)
+        since = t1 if occupied else None
+        intervals = []
+        for info in segs:
+            if spot not in info.spots:
+                continue
+            segment = self._segment(info)
+            t_col, kind_col, spot_col = segment.columns['t'], segment.columns['kind'], segment.columns['spot']
+            for row in info.event_rows:
+                if spot_col[row] != spot:
+                    continue
+                t = t_col[row]
+                if t > t2:
+                    break
+                kind = kind_col[row]
+                if kind == KIND_PARK:
+                    occupied += 1
+                    if occupied == 1:
+                        since = max(t, t1)
+                elif kind == KIND_UNPARK and occupied > 0:
+                    occupied -= 1
+                    if occupied == 0:
+                        if t > t1:
+                            intervals.append((since, t))
+                        since = None
+        if occupied > 0 and since is not None:
+            # 아직 주차 중이면 현재 시각까지 점유로 계산
+            end = min(t2, max(self.clock(), self._last_t))
+            if end > since:
+                intervals.append((since, end))
+        return intervals
+
+    def spot_utilization(self, spot: int, t1: float, t2: float) -> float:
+        """t1~t2 동안 spot 구역 점유 비율 (0.0 ~ 1.0)"""
+        if t2 <= t1:
+            return 0.0
+        occupied_time = sum(end - start for start, end in self.spot_intervals(spot, t1, t2))
+        return occupied_time / (t2 - t1)
+
+    def trajectory(self, tag: int, t1: float = 0.0,
+                   t2: float = float('inf')) -> List[Tuple[float, float, float]]:
+        """tag 차량의 위치 샘플 [(t, x, y)] (tag 포스팅이 있는 세그먼트만 확인)"""
+        points = []
+        for info in self._segments_in_range(t1, t2):
+            if tag not in info.tags:
+                continue
+            segment = self._segment(info)
+            cols = segment.columns
+            t_col = cols['t']
+            start = bisect.bisect_left(t_col, t1, 0, segment.count)
+            end = bisect.bisect_right(t_col, t2, start, segment.count)
+            tag_col, kind_col, x_col, y_col = cols['tag'], cols['kind'], cols['x'], cols['y']
+            for row in range(start, end):
+                if tag_col[row] == tag and kind_col[row] == KIND_POSITION:
+                    points.append((t_col[row], x_col[row], y_col[row]))
+        return points
+
+    # ---------------- 내부 ----------------
+
+    def _segments_in_range(self, t1: float, t2: float) -> List[SegmentInfo]:
+        """t1~t2와 겹치는 세그먼트 (t1 이전 마지막 세그먼트 포함 - 시작 점유 상태 계산용)"""
+        starts = [info.t_min for info in self.segments]
+        first = max(bisect.bisect_right(starts, t1) - 1, 0)
+        return [info for info in self.segments[first:]
+                if info.count and info.t_min <= t2]
+
+    def _update_info(self, info: SegmentInfo, row: int, t: float, tag: int, kind: int, spot: int):
+        if info.count == 0:
+            info.t_min = t
+        info.t_max = t
+        info.count = row + 1
+        if tag >= 0:
+            info.tags.add(tag)
+        if kind in (KIND_PARK, KIND_UNPARK):
+            info.spots.add(spot)
+            info.event_rows.append(row)
+            count = self.live_occupancy.get(spot, 0) + (1 if kind == KIND_PARK else -1)
+            if count > 0:
+                self.live_occupancy[spot] = count
+            else:
+                self.live_occupancy.pop(spot, None)
+
+    def _segment(self, info: SegmentInfo) -> Segment:
+        segment = self._open_segments.pop(info.name, None)
+        if segment is None:
+            segment = Segment(os.path.join(self.directory, info.name), self.segment_capacity)
+        # 최근 사용 순으로 유지하고, 작성 중인 세그먼트를 제외한 오래된 mmap은 닫음
+        self._open_segments[info.name] = segment
+        active = self.segments[-1].name if self.segments else None
+        for name in list(self._open_segments):
+            if len(self._open_segments) <= MAX_OPEN_SEGMENTS:
+                break
+            if name != active and name != info.name:
+                self._open_segments.pop(name).close()
+        return segment
+
+    def _start_segment(self):
+        """세그먼트 교체 - 이전 세그먼트를 flush하고 인덱스 저장"""
+        if self.segments:
+            previous = self._open_segments.get(self.segments[-1].name)
+            if previous is not None:
+                previous.flush()
+        number = len(self.segments) + 1
+        name = f'seg_{number:06d}.col'
+        path = os.path.join(self.directory, name)
+        self._open_segments[name] = Segment(path, self.segment_capacity, create=True)
+        self.segments.append(SegmentInfo(name=name, occupied_at_start=dict(self.live_occupancy)))
+        self._save_index()
+
+    def _load_index(self):
+        path = os.path.join(self.directory, INDEX_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, 'r') as f:
+            data = json.load(f)
+        self.segments = [SegmentInfo.from_dict(d) for d in data.get('segments', [])]
+        if not self.segments:
+            return
+
+        # 마지막(작성 중이던) 세그먼트는 비정상 종료 대비 파일 내용으로 인덱스 재구성
+        last = self.segments[-1]
+        rebuilt = SegmentInfo(name=last.name, occupied_at_start=dict(last.occupied_at_start))
+        self.live_occupancy = dict(last.occupied_at_start)
+        segment = self._segment(last)
+        cols = segment.columns
+        for row in range(segment.count):
+            self._update_info(rebuilt, row, cols['t'][row], cols['tag'][row],
+                              cols['kind'][row], cols['spot'][row])
+        self.segments[-1] = rebuilt
+        self._last_t = max((info.t_max for info in self.segments), default=0.0)
+
+    def _save_index(self):
+        path = os.path.join(self.directory, INDEX_FILE)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'record_size': RECORD_SIZE,
+                       'segment_capacity': self.segment_capacity,
+                       'segments': [info.to_dict() for info in self.segments]}, f)
+        os.replace(tmp_path, path)
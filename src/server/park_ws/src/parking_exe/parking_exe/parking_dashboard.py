@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""주차장 관제 대시보드 (parking_exe_node 스냅샷 구독 클라이언트)"""
+
+import sys
+import json
+import threading
+from types import SimpleNamespace
+
+import rclpy
+from rclpy.node import Node
+from std_msgs.msg import String
+
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
+                             QHBoxLayout, QLabel, QFrame, QTextEdit, QMessageBox)
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QFont
+
+from parking_exe.parking_exe import ParkingExeNode
+from parking_common.qos_profiles import QosRegistry
+
+
+class ParkingDashboardNode(Node):
+    """/parking_exe/snapshot, /parking_exe/illegal_parking 구독 노드"""
+
+    def __init__(self, status_callback, illegal_parking_callback):
+        super().__init__('parking_dashboard_node')
+        self.status_callback = status_callback
+        self.illegal_parking_callback = illegal_parking_callback
+        self.parking_spots = ParkingExeNode.define_parking_spots()
+        self.qos = QosRegistry.from_node(self)
+
+        self.snapshot_sub = self.create_subscription(
+            String, '/parking_exe/snapshot', self.snapshot_callback, self.qos.profile('/parking_exe/snapshot'))
+        self.illegal_sub = self.create_subscription(
+            String, '/parking_exe/illegal_parking', self.illegal_callback, self.qos.profile('/parking_exe/illegal_parking'))
+
+        self.get_logger().info('주차장 대시보드 시작 (parking_exe_node 스냅샷 구독)')
+
+    def initial_status(self) -> dict:
+        return {'vehicles': {}, 'total_vehicles': 0, 'parked_vehicles': 0,
+                'parking_spots': self.parking_spots}
+
+    def snapshot_callback(self, msg):
+        """스냅샷 JSON을 시각화 위젯이 쓰는 status 형식으로 변환"""
+        try:
+            snapshot = json.loads(msg.data)
+        except json.JSONDecodeError as e:
+            self.get_logger().error(f'스냅샷 JSON 파싱 실패: {e}')
+            return
+        vehicles = {}
+        for v in snapshot.get('vehicles', []):
+            v['current_position'] = tuple(v.get('current_position', (0.0, 0.0)))
+            vehicles[v['tag_id']] = SimpleNamespace(**v)
+        self.status_callback({
+            'vehicles': vehicles,
+            'total_vehicles': snapshot.get('total_vehicles', len(vehicles)),
+            'parked_vehicles': snapshot.get('parked_vehicles', 0),
+            'parking_spots': self.parking_spots,
+        })
+
+    def illegal_callback(self, msg):
+        try:
+            event = json.loads(msg.data)
+            self.illegal_parking_callback(event['tag_id'], event['spot_id'])
+        except (json.JSONDecodeError, KeyError) as e:
+            self.get_logger().error(f'불법 주차 이벤트 파싱 실패: {e}')
+
+
+class ParkingVisualizationWidget(QWidget):
+    """주차장 시각화 위젯"""
+    def __init__(self):
+        super().__init__()
+        self.system_status = {'vehicles': {}, 'parking_spots': {}}
+        self.setFixedSize(1000, 1000)
+        self.scale_factor = 1000 / 2000
+        
+    def update_status(self, status):
+        self.system_status = status
+        self.update()
+        
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        self.draw_parking_lot(painter)
+        
+    def draw_parking_lot(self, painter):
+        painter.fillRect(0, 0, 1000, 1000, QColor(240, 240, 240))
+        
+        # 여백을 추가한 변환 함수 - 상하좌우 50픽셀 여백
+        margin = 50
+        available_size = 1000 - (2 * margin)
+        scale_factor = available_size / 2000
+        def tf(x, y): 
+            return int(x * scale_factor + margin), int(1000 - margin - (y * scale_factor))
+        
+        # 입구 라벨 추가
+        self.draw_entrance_labels(painter)
+        
+        self.draw_parking_spots_fixed(painter, tf)
+        self.draw_vehicles_fixed(painter, tf)
+        self.draw_forbidden_zone_fixed(painter, tf)
+
+    def draw_entrance_labels(self, painter):
+        """입구 라벨을 그리는 메서드"""
+        painter.setPen(QPen(Qt.black, 2))
+        painter.setFont(QFont('Arial', 14, QFont.Bold))
+        
+        # 여백을 추가한 변환 함수 - 상하좌우 50픽셀 여백
+        margin = 50
+        available_size = 1000 - (2 * margin)
+        scale_factor = available_size / 2000
+        def tf(x, y): 
+            return int(x * scale_factor + margin), int(1000 - margin - (y * scale_factor))
+        
+        # 왼쪽 상단 - 백화점 본관 입구
+        painter.drawText(20, 30, "백화점 본관 입구")
+        
+        # 영화관 입구 - (1800, 1800) 좌표
+        movie_x, movie_y = tf(1800, 1800)
+        painter.drawText(movie_x, movie_y, "영화관 입구")
+        
+        # 문화시설 입구 - (1800, 600) 좌표
+        culture_x, culture_y = tf(1800, 600)
+        painter.drawText(culture_x, culture_y, "문화시설 입구")
+
+    def draw_parking_spots_fixed(self, painter, tf):
+        for spot_id, spot in self.system_status.get('parking_spots', {}).items():
+            is_occupied = any(v.is_parked and v.parked_spot == spot_id for v in self.system_status.get('vehicles', {}).values())
+            x1, y1 = tf(spot['min_x'], spot['min_y']); x2, y2 = tf(spot['max_x'], spot['max_y'])
+            w, h = x2 - x1, y1 - y2
+            if not (w > 0 and h > 0): continue
+            if spot_id in [1, 6, 7]: color = QColor(135, 206, 250) if not is_occupied else QColor(100, 150, 255)
+            elif spot_id in [4, 5, 10, 11]: color = QColor(144, 238, 144) if not is_occupied else QColor(80, 200, 80)
+            else: color = QColor(245, 245, 245) if not is_occupied else QColor(180, 180, 180)
+            painter.fillRect(x1, y2, w, h, color); painter.setPen(QPen(Qt.black, 2)); painter.drawRect(x1, y2, w, h)
+            ix1, iy1 = tf(spot['inner_min_x'], spot['inner_min_y']); ix2, iy2 = tf(spot['inner_max_x'], spot['inner_max_y'])
+            iw, ih = ix2 - ix1, iy1 - iy2
+            painter.setPen(QPen(QColor(100, 100, 100), 1, Qt.DotLine)); painter.setBrush(QBrush(QColor(0, 0, 0, 15))); painter.drawRect(ix1, iy2, iw, ih)
+            cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
+            painter.setPen(QPen(Qt.black, 1)); painter.setFont(QFont('Arial', 30)); painter.drawText(cx - 15, cy + 10, str(spot_id))
+            if spot_id in [1, 6, 7]: painter.setFont(QFont('Arial', 40)); painter.drawText(cx - 20, cy + 50, "♿")
+            elif spot_id in [4, 5, 10, 11]: painter.setFont(QFont('Arial', 20)); painter.drawText(cx - 15, y1 - 10, "EV")
+
+    def draw_vehicles_fixed(self, painter, tf):
+        for v in self.system_status.get('vehicles', {}).values():
+            px, py = tf(v.current_position[0], v.current_position[1])
+            if v.elec and v.disabled: color = QColor(135, 206, 235)
+            elif v.elec: color = QColor(144, 238, 144)
+            elif v.disabled: color = QColor(0, 0, 255)
+            else: color = QColor(255, 255, 255)
+            border_color, border_width = (QColor(0, 100, 0), 3) if v.is_parked else (QColor(255, 140, 0), 2)
+            radius = 25
+            painter.setPen(QPen(border_color, border_width)); painter.setBrush(QBrush(color)); painter.drawEllipse(px - radius, py - radius, radius * 2, radius * 2)
+            tag_display = str(v.tag_id)
+            painter.setPen(QPen(Qt.black, 1)); painter.setFont(QFont('Arial', 12, QFont.Bold)); painter.drawText(px - (len(tag_display) * 6)//2, py + 5, tag_display)
+
+    def draw_forbidden_zone_fixed(self, painter, tf):
+        x1, y1 = tf(550, 1050); x2, y2 = tf(1350, 1350); w, h = x2 - x1, y1 - y2
+        painter.setPen(QPen(Qt.red, 2)); painter.setBrush(QBrush(QColor(255, 0, 0, 100))); painter.drawRect(x1, y2, w, h)
+        painter.setPen(QPen(Qt.red, 1)); painter.setFont(QFont('Arial', 20)); painter.drawText((x1 + x2) // 2 - 40, (y1 + y2) // 2 + 10, "금지구역")
+
+class ParkingExeMainWindow(QMainWindow):
+    """메인 윈도우"""
+    update_signal = pyqtSignal(dict)
+    illegal_parking_signal = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle('하늘소 백화점 주차장')
+        self.setGeometry(100, 100, 1300, 1000)
+        central_widget = QWidget(); self.setCentralWidget(central_widget)
+        main_layout = QHBoxLayout(central_widget)
+        self.visualization = ParkingVisualizationWidget()
+        main_layout.addWidget(self.visualization, 3)
+        info_panel = self.create_info_panel()
+        main_layout.addWidget(info_panel, 1)
+
+        # 시그널 연결
+        self.update_signal.connect(self.update_display)
+        self.illegal_parking_signal.connect(self.show_illegal_parking_popup)
+
+        self.ros_thread = None; self.ros_node = None
+
+    def create_info_panel(self):
+        panel = QFrame(); panel.setFrameStyle(QFrame.Box); layout = QVBoxLayout(panel)
+        title = QLabel('하늘소 백화점 주차장'); title.setFont(QFont('Arial', 16, QFont.Bold)); layout.addWidget(title)
+        self.status_labels = {
+            'total_vehicles': QLabel('진입 차량: 0대'), 'parked_vehicles': QLabel('주차 완료: 0대'),
+            'available_disabled': QLabel('잔여 장애인: 3대'), 'available_ev': QLabel('잔여 EV충전: 4대'),
+            'available_general': QLabel('잔여 일반: 4대')
+        }
+        for label in self.status_labels.values(): label.setFont(QFont('Arial', 12)); layout.addWidget(label)
+        layout.addWidget(QLabel())
+        vehicles_title = QLabel('TAG 차량 목록'); vehicles_title.setFont(QFont('Arial', 14, QFont.Bold)); layout.addWidget(vehicles_title)
+        self.vehicles_text = QTextEdit(); self.vehicles_text.setMaximumHeight(200); layout.addWidget(self.vehicles_text)
+        layout.addStretch()
+        return panel
+
+    def update_display(self, status):
+        self.visualization.update_status(status)
+        vehicles = status.get('vehicles', {}).values()
+        disabled_occupied = sum(1 for v in vehicles if v.is_parked and v.parked_spot in [1, 6, 7])
+        ev_occupied = sum(1 for v in vehicles if v.is_parked and v.parked_spot in [4, 5, 10, 11])
+        self.status_labels['total_vehicles'].setText(f"진입 차량: {status.get('total_vehicles', 0)}대")
+        self.status_labels['parked_vehicles'].setText(f"주차 완료: {status.get('parked_vehicles', 0)}대")
+        self.status_labels['available_disabled'].setText(f'잔여 장애인: {3 - disabled_occupied}대')
+        self.status_labels['available_ev'].setText(f'잔여 EV충전: {4 - ev_occupied}대')
+        general_occupied = status.get('parked_vehicles', 0) - disabled_occupied - ev_occupied
+        self.status_labels['available_general'].setText(f'잔여 일반: {4 - general_occupied}대')
+        
+        info = ""
+        for v in vehicles:
+            status_text = "주차완료" if v.is_parked else "이동중"
+            spot_text = f" ({v.parked_spot}번)" if v.parked_spot else ""
+            type_parts = []
+            if v.elec: type_parts.append("전기")
+            if v.disabled: type_parts.append("장애인")
+            type_text = f"[{'+'.join(type_parts)}]" if type_parts else "[일반]"
+            info += f"TAG_{v.tag_id}{type_text}: {status_text}{spot_text} ({v.current_position[0]:.0f},{v.current_position[1]:.0f})\n"
+        self.vehicles_text.setText(info)
+
+    def show_illegal_parking_popup(self, message):
+        """불법 주차 경고 팝업을 표시하는 메서드"""
+        msg_box = QMessageBox(self)
+        msg_box.setIcon(QMessageBox.Warning)
+        msg_box.setWindowTitle("불법 주차 감지")
+        msg_box.setText("미등록 차량이 주차하였습니다.")
+        msg_box.setInformativeText(message)
+        msg_box.setStandardButtons(QMessageBox.Ok)
+        msg_box.exec_()
+
+    def ros_callback(self, status):
+        self.update_signal.emit(status)
+
+    def ros_illegal_parking_callback(self, tag_id, spot_id):
+        """ROS 노드로부터 불법 주차 신호를 받아 처리하는 콜백"""
+        spot_type = "장애인 주차구역" if spot_id in [1, 6, 7] else "전기차 충전구역"
+        message = f"차량 TAG_{tag_id}이(가) {spot_type}({spot_id}번)에 주차했습니다."
+        self.illegal_parking_signal.emit(message)
+
+    def start_ros_node(self):
+        try:
+            rclpy.init()
+            self.ros_node = ParkingDashboardNode(self.ros_callback, self.ros_illegal_parking_callback)
+            self.ros_callback(self.ros_node.initial_status())
+            rclpy.spin(self.ros_node)
+        except Exception as e:
+            print(f"ROS 노드 오류: {e}")
+
+    def closeEvent(self, event):
+        if self.ros_node: self.ros_node.destroy_node()
+        if rclpy.ok(): rclpy.shutdown()
+        event.accept()
+
+def main(args=None):
+    app = QApplication(sys.argv)
+    window = ParkingExeMainWindow()
+    ros_thread = threading.Thread(target=window.start_ros_node)
+    ros_thread.daemon = True
+    window.ros_thread = ros_thread
+    ros_thread.start()
+    window.show()
+    sys.exit(app.exec_())
+
+if __name__ == '__main__':
+    main()
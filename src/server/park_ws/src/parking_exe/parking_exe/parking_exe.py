@@ -1,90 +1,38 @@
 #!/usr/bin/env python3
 
-import sys
 import json
-import time
-import threading
-import socket
 from typing import Dict, List, Tuple, Optional
-from datetime import datetime, timedelta
-from dataclasses import dataclass
+from datetime import datetime
+from dataclasses import dataclass, field
 
 import rclpy
 from rclpy.node import Node
 from geometry_msgs.msg import PointStamped
 from std_msgs.msg import String
 
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
-                             QHBoxLayout, QLabel, QFrame, QPushButton, QTextEdit,
-                             QGridLayout, QScrollArea, QMessageBox)
-from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QThread
-from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QFont
-
-class StopperController:
-    """ESP32 스토퍼 제어 클래스"""
-    def __init__(self, host='192.168.225.99', port=8888):
-        self.host = host
-        self.port = port
-        self.client_socket = None
-        self.connected = False
-        self.last_reconnect_attempt = 0
-        self.reconnect_interval = 5000  # 5초
-        
-    def connect(self):
-        """ESP32 스토퍼에 연결"""
-        try:
-            self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.client_socket.settimeout(3.0)
-            self.client_socket.connect((self.host, self.port))
-            self.connected = True
-            print(f"[STOPPER] Connected to {self.host}:{self.port}")
-            return True
-        except Exception as e:
-            print(f"[STOPPER] Connection failed: {e}")
-            self.connected = False
-            return False
-    
-    def disconnect(self):
-        """연결 해제"""
-        if self.client_socket:
-            self.client_socket.close()
-            self.client_socket = None
-        self.connected = False
-    
-    def send_command(self, command):
-        """스토퍼에 명령 전송 (0=STOP, 1=FORWARD, 2=BACKWARD)"""
-        if not self.connected:
-            if not self.connect():
-                return False
-        
-        try:
-            message = f"CMD:{command}\n"
-            self.client_socket.send(message.encode('utf-8'))
-            
-            if command == 0:
-                print(f"[STOPPER] Sent: STOP command")
-            elif command == 1:
-                print(f"[STOPPER] Sent: FORWARD command")
-            elif command == 2:
-                print(f"[STOPPER] Sent: BACKWARD command")
-            
-            return True
-        except Exception as e:
-            print(f"[STOPPER] Send error: {e}")
-            self.disconnect()
-            return False
-    
-    def move_backward(self):
-        """후진 명령"""
-        return self.send_command(2)
-    
-    def move_forward(self):
-        """전진 명령"""
-        return self.send_command(1)
-    
-    def stop(self):
-        """정지 명령"""
-        return self.send_command(0)
+from parking_common.journal import open_journal
+from parking_common.metrics import NodeMetrics, SeqGapCounter
+from parking_common.qos_profiles import QosRegistry
+from parking_common.tracing import parse_frame_id
+from parking_exe.timer_wheel import TimerWheel, TimerHandle
+from parking_exe.history_store import HistoryStore
+from parking_exe.stopper_manager import StopperManager, parse_stopper_spec, COMMAND_NAMES
+
+# 주차 판정 파라미터
+PARKING_DWELL_SEC = 3.0      # 감지 구역에 머물러야 주차 완료로 판정하는 시간
+SIGNAL_LOSS_SEC = 10.0       # 이 시간 동안 좌표가 없으면 출차로 판정
+TIMER_TICK_SEC = 0.05        # 타이머 휠 해상도
+SNAPSHOT_PERIOD_SEC = 0.2
+SPOT_INFO_REFRESH_SEC = 30.0
+JOURNAL_SYNC_SEC = 0.05      # 상태 저널 fsync 주기 (전원 차단 시 잃을 수 있는 최대 구간)
+
+# 구역 분류 (장애인 / 전기차 충전 / 일반)
+SPOT_CATEGORIES = {
+    'disabled': [1, 6, 7],
+    'elec': [4, 5, 10, 11],
+    'general': [2, 3, 8, 9],
+}
+SPOT_CATEGORY_OF = {spot: name for name, spots in SPOT_CATEGORIES.items() for spot in spots}
 
 @dataclass
 class Vehicle:
@@ -104,6 +52,10 @@ class Vehicle:
     # 위치 필터링을 위한 추가 변수들
     position_history: List[Tuple[float, float]] = None  # 최근 위치 이력
     smoothed_position: Tuple[float, float] = None       # 스무딩된 위치
+    # 이벤트 기반 주차 판정용 (monotonic 시각 / 타이머 휠 핸들)
+    last_seen: float = 0.0
+    dwell_timer: Optional[TimerHandle] = field(default=None, repr=False)
+    loss_timer: Optional[TimerHandle] = field(default=None, repr=False)
     
     def __post_init__(self):
         if self.position_history is None:
@@ -114,33 +66,47 @@ class Vehicle:
 class ParkingExeNode(Node):
     """ROS2 노드 클래스"""
 
-    def __init__(self, gui_callback, illegal_parking_callback):
+    def __init__(self, gui_callback=None, illegal_parking_callback=None):
         super().__init__('parking_exe_node')
 
-        # GUI 콜백 함수
+        # 선택적 콜백 (같은 프로세스에 붙는 클라이언트용, 기본은 토픽으로만 알림)
         self.gui_callback = gui_callback
-        self.illegal_parking_callback = illegal_parking_callback # 불법 주차 콜백 추가
+        self.illegal_parking_callback = illegal_parking_callback
+
+        # 토픽별 QoS (좌표: best-effort 최신값, 상태: transient-local - parking_common.qos_profiles)
+        self.qos = QosRegistry.from_node(self)
+
+        # 실시간 지표 (구독/타이머 콜백은 만들 때 self.metrics.timed 로 감싸 지연 계측)
+        self.metrics = NodeMetrics(self, self.qos)
 
         # UWB 처리된 좌표 구독 (/uwb/comp로 변경)
         self.uwb_sub = self.create_subscription(
-            PointStamped, '/uwb/comp', self.uwb_callback, 10)
+            PointStamped, '/uwb/comp', self.metrics.timed(self.uwb_callback, '/uwb/comp'), self.qos.profile('/uwb/comp'))
 
         # 차량 타입 정보 구독 (새로 추가)
         self.vehicle_info_sub = self.create_subscription(
-            String, '/uwb/vehicle_info', self.vehicle_info_callback, 10)
+            String, '/uwb/vehicle_info', self.metrics.timed(self.vehicle_info_callback, '/uwb/vehicle_info'), self.qos.profile('/uwb/vehicle_info'))
 
         # 주차공간 배정 요청 구독 (경로 전송 프로그램으로부터)
         self.spot_request_sub = self.create_subscription(
-            String, '/parking/spot_request', self.spot_request_callback, 10)
+            String, '/parking/spot_request', self.metrics.timed(self.spot_request_callback, '/parking/spot_request'), self.qos.profile('/parking/spot_request'))
 
         # 상태 발행
-        self.status_pub = self.create_publisher(String, '/parking_exe/status', 10)
+        self.status_pub = self.create_publisher(String, '/parking_exe/status', self.qos.profile('/parking_exe/status'))
         
         # 주차공간 정보 발행 (경로 전송 프로그램으로)
-        self.spot_info_pub = self.create_publisher(String, '/parking/spot_info', 10)
+        # 전체 정보는 transient-local로 래치해 늦게 붙은 구독자도 즉시 받고,
+        # 변경분은 /parking/spot_delta로 바로 발행
+        self.spot_info_pub = self.create_publisher(String, '/parking/spot_info', self.qos.profile('/parking/spot_info'))
+        self.spot_delta_pub = self.create_publisher(String, '/parking/spot_delta', self.qos.profile('/parking/spot_delta'))
         
         # 주차공간 배정 결과 발행
-        self.spot_assignment_pub = self.create_publisher(String, '/parking/spot_assignment', 10)
+        self.spot_assignment_pub = self.create_publisher(String, '/parking/spot_assignment', self.qos.profile('/parking/spot_assignment'))
+
+        # 대시보드용 스냅샷 / 불법 주차 이벤트 발행 (parking_dashboard가 구독)
+        self.snapshot_pub = self.create_publisher(String, '/parking_exe/snapshot', self.qos.profile('/parking_exe/snapshot'))
+        self.illegal_parking_pub = self.create_publisher(String, '/parking_exe/illegal_parking', self.qos.profile('/parking_exe/illegal_parking'))
+        self.snapshot_dirty = True
 
         # 차량 관리 (tag_id를 키로 사용)
         self.vehicles: Dict[int, Vehicle] = {}  # tag_id: Vehicle
@@ -148,14 +114,58 @@ class ParkingExeNode(Node):
         # 주차구역 및 중앙 감지 구역 정의
         self.parking_spots = self.define_parking_spots()
 
-        # 스토퍼 제어기 초기화
-        self.stopper_controller = StopperController()
-
-        # 주차 감지를 위한 타이머
-        self.parking_check_timer = self.create_timer(1.0, self.check_parking_status)
-        
-        # 주차공간 정보 발행 타이머 (5초마다)
-        self.spot_info_timer = self.create_timer(5.0, self.publish_spot_info)
+        # 점유 카운터 (주차 완료/해제 이벤트에서만 증감)
+        self.spot_occupancy: Dict[int, int] = {spot: 0 for spot in self.parking_spots}
+        self.available_spots = {name: len(spots) for name, spots in SPOT_CATEGORIES.items()}
+        self.parked_count = 0
+        self.spot_info_seq = 0
+
+        # 스토퍼 관리자 초기화 (구역=IP:포트 목록, 상시 연결 유지)
+        self.declare_parameter('stoppers', '6=192.168.225.99:8888')
+        stoppers = parse_stopper_spec(self.get_parameter('stoppers').value)
+        self.stopper_manager = StopperManager(stoppers, self.get_logger())
+        self.stopper_manager.start()
+
+        # 주차 감지: 구역 진입/이탈은 좌표 수신 경로에서 판정하고,
+        # dwell(3초)/신호 손실(10초) 데드라인은 타이머 휠로 처리
+        # (use_sim_time이면 기록 재생 속도를 따르도록 ROS 시계, 아니면 monotonic)
+        if self.get_parameter('use_sim_time').value:
+            self.timer_wheel = TimerWheel(tick=TIMER_TICK_SEC, clock=lambda: self.get_clock().now().nanoseconds / 1e9)
+        else:
+            self.timer_wheel = TimerWheel(tick=TIMER_TICK_SEC)
+        self.timer_wheel_timer = self.create_timer(TIMER_TICK_SEC, self.metrics.timed(self.timer_wheel.advance))
+
+        # 차량 상태 저널 (재시작 시 주차 상태/차량 타입을 복구해 전기차·장애인 차량이 불법 주차로 오판되지 않도록)
+        self.declare_parameter('journal_dir', '~/.parking_state')
+        self.journal = open_journal(self.get_parameter('journal_dir').value, self.get_name())
+        if self.journal is not None:
+            self.restore_vehicle_state()
+            self.journal_timer = self.create_timer(JOURNAL_SYNC_SEC, self.metrics.timed(self.journal.sync))
+
+        # 주차/해제/출차 이벤트 및 위치 샘플 이력 저장소 (빈 문자열이면 비활성)
+        # 저널로 복구한 주차는 이력에서도 이어지는 주차로 남김, 시각은 노드 시계 기준 (use_sim_time이면 재생 시각)
+        self.declare_parameter('history_dir', '~/.parking_exe/history')
+        history_dir = self.get_parameter('history_dir').value
+        self.history: Optional[HistoryStore] = \
+            HistoryStore(history_dir, occupied=self.spot_occupancy,
+                         clock=lambda: self.get_clock().now().nanoseconds / 1e9) if history_dir else None
+        
+        # 주차공간 전체 정보 주기 재발행 (변경 시에는 즉시 발행되므로 느린 주기로 보정만)
+        self.spot_info_timer = self.create_timer(SPOT_INFO_REFRESH_SEC, self.metrics.timed(self.publish_spot_info))
+        self.publish_spot_info()
+
+        # 스냅샷 발행 타이머 (변경이 있을 때만, 최대 5Hz)
+        self.snapshot_timer = self.create_timer(SNAPSHOT_PERIOD_SEC, self.metrics.timed(self.publish_snapshot))
+
+        # 노드 상태 지표
+        self.metrics.gauge('vehicles', '추적 중인 차량 수', fn=lambda: len(self.vehicles))
+        self.metrics.gauge('parked_vehicles', '주차 완료 차량 수', fn=lambda: self.parked_count)
+        self.metrics.gauge('timer_wheel_pending', '타이머 휠 대기 데드라인 수', fn=lambda: len(self.timer_wheel))
+        for spot in self.stopper_manager.links:
+            self.metrics.gauge('stopper_queue_depth', '스토퍼 명령 대기열 길이 (전송 중 포함)', labels={'spot': str(spot)},
+                               fn=lambda spot=spot: self.stopper_manager.get_status()[spot]['queued'])
+        self.illegal_parking_total = self.metrics.counter('illegal_parking_total', '불법 주차 이벤트 수')
+        self.uwb_seq_gaps = SeqGapCounter(self.metrics.counter('uwb_seq_gaps_total', '/uwb/comp 시퀀스 누락 수'))
 
         self.get_logger().info('주차장 관리자 시스템 시작 (BFS 기반 배정 + 불법 주차 감지)')
         self.get_logger().info(f'총 주차구역: {len(self.parking_spots)}개')
@@ -181,7 +191,7 @@ class ParkingExeNode(Node):
                                      f'장애인={vehicle_info.get("disabled")}')
             elif action == "stop_tracking":
                 if tag_id in self.vehicles:
-                    del self.vehicles[tag_id]
+                    self.remove_vehicle(tag_id)
                     self.get_logger().info(f'차량 출차 (추적 종료): TAG_{tag_id}')
         except json.JSONDecodeError as e:
             self.get_logger().error(f'차량 정보 JSON 파싱 실패: {e}')
@@ -222,10 +232,10 @@ class ParkingExeNode(Node):
                 dest_name = self.get_destination_name(destination)
                 self.get_logger().info(f'주차공간 배정 완료: {vehicle_id} -> {assigned_spot}번 ({spot_type}), 목적지: {dest_name}')
                 
-                # ✅ 6번 구역 배정 시에만 스토퍼 후진 명령
-                if assigned_spot == 6:
-                    self.get_logger().info(f'6번 장애인 구역 배정 -> 스토퍼 후진 명령 전송')
-                    threading.Thread(target=self.control_stopper_backward, daemon=True).start()
+                # 스토퍼가 설치된 구역 배정 시 스토퍼 후진 명령
+                if self.stopper_manager.has_stopper(assigned_spot):
+                    self.get_logger().info(f'{assigned_spot}번 구역 배정 -> 스토퍼 후진 명령 전송')
+                    self.stopper_manager.move_backward(assigned_spot, self.on_stopper_result)
                     
             else:
                 self.get_logger().warn(f'주차공간 배정 실패: {vehicle_id} - 사용 가능한 공간 없음')
@@ -236,21 +246,10 @@ class ParkingExeNode(Node):
     def assign_parking_spot_with_bfs(self, preferred: str, elec: bool, disabled: bool, destination: int) -> Optional[int]:
         """destination 기반 BFS 주차공간 배정 로직"""
         
-        # 현재 점유 상태 확인
-        occupied_spots = set()
-        for vehicle in self.vehicles.values():
-            if vehicle.is_parked and vehicle.parked_spot:
-                occupied_spots.add(vehicle.parked_spot)
-        
-        # 구역별 분류
-        disabled_spots = [1, 6, 7]  # 장애인 구역
-        elec_spots = [4, 5, 10, 11]  # 전기차 충전 구역
-        general_spots = [2, 3, 8, 9]  # 일반 구역
-        
-        # 사용 가능한 구역 계산
-        available_disabled = [spot for spot in disabled_spots if spot not in occupied_spots]
-        available_elec = [spot for spot in elec_spots if spot not in occupied_spots]
-        available_general = [spot for spot in general_spots if spot not in occupied_spots]
+        # 사용 가능한 구역 계산 (점유 카운터 기준)
+        available_disabled = [spot for spot in SPOT_CATEGORIES['disabled'] if not self.spot_occupancy[spot]]
+        available_elec = [spot for spot in SPOT_CATEGORIES['elec'] if not self.spot_occupancy[spot]]
+        available_general = [spot for spot in SPOT_CATEGORIES['general'] if not self.spot_occupancy[spot]]
         
         self.get_logger().info(f'사용 가능한 공간 - 장애인: {len(available_disabled)}개, '
                              f'전기차: {len(available_elec)}개, 일반: {len(available_general)}개')
@@ -373,38 +372,15 @@ class ParkingExeNode(Node):
             return "일반 구역"
 
     def publish_spot_info(self):
-        """주차공간 정보를 주기적으로 발행"""
-        # 현재 점유 상태 확인
-        occupied_spots = set()
-        for vehicle in self.vehicles.values():
-            if vehicle.is_parked and vehicle.parked_spot:
-                occupied_spots.add(vehicle.parked_spot)
-        
-        # 구역별 사용 가능한 공간 계산
-        disabled_spots = [1, 6, 7]
-        elec_spots = [4, 5, 10, 11]
-        general_spots = [2, 3, 8, 9]
-        
-        available_disabled = len([spot for spot in disabled_spots if spot not in occupied_spots])
-        available_elec = len([spot for spot in elec_spots if spot not in occupied_spots])
-        available_general = len([spot for spot in general_spots if spot not in occupied_spots])
-        
-        # 주차공간 정보 구성
+        """주차공간 전체 정보 발행 (래치 토픽, 변경 시 + 주기 보정)"""
         spot_info = {
+            "seq": self.spot_info_seq,
             "timestamp": datetime.now().isoformat(),
             "total_vehicles": len(self.vehicles),
-            "parked_vehicles": sum(1 for v in self.vehicles.values() if v.is_parked),
-            "available_spots": {
-                "disabled": available_disabled,
-                "elec": available_elec,
-                "general": available_general
-            },
-            "occupied_spots": list(occupied_spots),
-            "total_spots": {
-                "disabled": len(disabled_spots),
-                "elec": len(elec_spots), 
-                "general": len(general_spots)
-            }
+            "parked_vehicles": self.parked_count,
+            "available_spots": dict(self.available_spots),
+            "occupied_spots": [spot for spot, count in self.spot_occupancy.items() if count],
+            "total_spots": {name: len(spots) for name, spots in SPOT_CATEGORIES.items()}
         }
         
         # 발행
@@ -412,7 +388,47 @@ class ParkingExeNode(Node):
         spot_msg.data = json.dumps(spot_info)
         self.spot_info_pub.publish(spot_msg)
 
-    def define_parking_spots(self) -> Dict[int, Dict[str, float]]:
+    def publish_spot_delta(self, spot_id: int, occupied: bool):
+        """주차구역 점유 변경분 즉시 발행 (/parking/spot_delta)"""
+        delta = {
+            "seq": self.spot_info_seq,
+            "spot": spot_id,
+            "occupied": occupied,
+            "available_spots": self.available_spots,
+        }
+        delta_msg = String()
+        delta_msg.data = json.dumps(delta)
+        self.spot_delta_pub.publish(delta_msg)
+
+    def mark_spot_occupied(self, vehicle: Vehicle, spot_id: int):
+        """주차 완료 이벤트 - 점유 카운터 증가, 빈 구역이 채워졌으면 변경 발행"""
+        if self.history is not None:
+            self.history.record_park(vehicle.tag_id, spot_id, *vehicle.current_position)
+        self.parked_count += 1
+        self.spot_occupancy[spot_id] += 1
+        if self.spot_occupancy[spot_id] == 1:
+            self.on_spot_availability_changed(spot_id, True)
+
+    def mark_spot_released(self, vehicle: Vehicle, spot_id: int):
+        """주차 해제 이벤트 - 점유 카운터 감소, 구역이 비었으면 변경 발행"""
+        if self.history is not None:
+            self.history.record_unpark(vehicle.tag_id, spot_id, *vehicle.current_position)
+        self.parked_count -= 1
+        self.spot_occupancy[spot_id] -= 1
+        if self.spot_occupancy[spot_id] == 0:
+            self.on_spot_availability_changed(spot_id, False)
+
+    def on_spot_availability_changed(self, spot_id: int, occupied: bool):
+        """구역별 가용 카운터 갱신 후 변경분 + 래치 전체 정보 발행"""
+        category = SPOT_CATEGORY_OF.get(spot_id)
+        if category is not None:
+            self.available_spots[category] += -1 if occupied else 1
+        self.spot_info_seq += 1
+        self.publish_spot_delta(spot_id, occupied)
+        self.publish_spot_info()
+
+    @staticmethod
+    def define_parking_spots() -> Dict[int, Dict[str, float]]:
         """주차구역 및 중앙 200x200 감지 구역 정의"""
         spots = {}
         detection_zone_size = 200.0
@@ -454,13 +470,18 @@ class ParkingExeNode(Node):
     def uwb_callback(self, msg):
         frame_id = msg.header.frame_id
         if not frame_id.startswith("tag_"): return
-        try: tag_id = int(frame_id[4:])
+        try: tag_id, seq = parse_frame_id(frame_id)
         except ValueError: return
+        self.uwb_seq_gaps.observe(tag_id, seq)
         x, y = msg.point.x, msg.point.y
         self.update_or_create_vehicle(tag_id, x, y, datetime.now())
-        self.gui_callback(self.get_system_status())
+        if self.history is not None:
+            vehicle = self.vehicles[tag_id]
+            self.history.record_position(tag_id, *vehicle.current_position, spot=vehicle.parked_spot)
+        self.notify_status_changed()
 
     def update_or_create_vehicle(self, tag_id: int, x: float, y: float, current_time: datetime):
+        now = self.timer_wheel.clock()
         if tag_id in self.vehicles:
             vehicle = self.vehicles[tag_id]
             
@@ -469,23 +490,29 @@ class ParkingExeNode(Node):
             
             vehicle.current_position = filtered_position
             vehicle.last_update = current_time
+            vehicle.last_seen = now
         else:
             vehicle_info = getattr(self, 'pending_vehicle_info', {}).get(tag_id, {})
             self.vehicles[tag_id] = Vehicle(
                 id=f"TAG_{tag_id}", tag_id=tag_id, current_position=(x, y),
                 entry_time=current_time, last_update=current_time,
                 elec=vehicle_info.get("elec", False), disabled=vehicle_info.get("disabled", False),
-                owner=vehicle_info.get("owner", "Unknown")
+                owner=vehicle_info.get("owner", "Unknown"), last_seen=now
             )
             # 새 차량의 경우 초기 위치 설정
             vehicle = self.vehicles[tag_id]
             vehicle.position_history = [(x, y)]
             vehicle.smoothed_position = (x, y)
+            vehicle.loss_timer = self.timer_wheel.schedule_at(
+                now + SIGNAL_LOSS_SEC, self.on_signal_loss_deadline, tag_id)
+            self.journal_vehicle(vehicle)
             
             self.get_logger().info(f'새 차량 추적 시작: TAG_{tag_id}')
             if hasattr(self, 'pending_vehicle_info') and tag_id in self.pending_vehicle_info:
                 del self.pending_vehicle_info[tag_id]
 
+        self.update_zone_state(vehicle, current_time)
+
     def apply_position_filter(self, vehicle: Vehicle, new_x: float, new_y: float) -> Tuple[float, float]:
         """위치 필터링을 적용하여 노이즈 제거"""
         
@@ -530,56 +557,189 @@ class ParkingExeNode(Node):
         
         return (final_x, final_y)
 
-    def check_parking_status(self):
-        """주차 상태 및 불법 주차 확인 (1초마다 실행)"""
+    def update_zone_state(self, vehicle: Vehicle, current_time: datetime):
+        """좌표 갱신 시 감지 구역 진입/이탈 전이만 처리"""
+        x, y = vehicle.current_position
+        current_spot = self.get_parking_spot(x, y)
+        if current_spot == vehicle.parked_spot:
+            return
+
+        if vehicle.parked_spot is not None:
+            self.leave_zone(vehicle)
+
+        if current_spot is not None:
+            vehicle.parking_start_time = current_time
+            vehicle.parked_spot = current_spot
+            vehicle.dwell_timer = self.timer_wheel.schedule(
+                PARKING_DWELL_SEC, self.on_dwell_deadline, vehicle.tag_id, current_spot)
+            self.get_logger().info(f'차량 TAG_{vehicle.tag_id}이 {current_spot}번 감지 구역 진입')
+
+    def leave_zone(self, vehicle: Vehicle):
+        """감지 구역 이탈 처리 (dwell 타이머 취소, 주차 해제)"""
+        if vehicle.dwell_timer is not None:
+            vehicle.dwell_timer.cancel()
+            vehicle.dwell_timer = None
+        vehicle.parking_start_time = None
+        if vehicle.is_parked:
+            vehicle.is_parked = False
+            previous_spot = vehicle.parked_spot
+            self.mark_spot_released(vehicle, previous_spot)
+            self.journal_vehicle(vehicle)
+            self.get_logger().info(f'차량 TAG_{vehicle.tag_id}이 {previous_spot}번 감지 구역에서 벗어남')
+            
+            # 스토퍼가 설치된 구역에서 출차 시 스토퍼 전진 명령
+            if self.stopper_manager.has_stopper(previous_spot):
+                self.get_logger().info(f'{previous_spot}번 구역 출차 -> 스토퍼 전진 명령 전송')
+                self.stopper_manager.move_forward(previous_spot, self.on_stopper_result)
+                
+        vehicle.parked_spot = None
+
+    def on_dwell_deadline(self, tag_id: int, spot_id: int):
+        """감지 구역에서 3초 머문 시점에 호출 - 주차 완료 및 불법 주차 판정"""
+        vehicle = self.vehicles.get(tag_id)
+        if vehicle is None or vehicle.parked_spot != spot_id or vehicle.is_parked:
+            return
+        vehicle.dwell_timer = None
+        vehicle.is_parked = True
+        self.mark_spot_occupied(vehicle, spot_id)
+        self.journal_vehicle(vehicle)
+        self.get_logger().info(f'차량 TAG_{tag_id}이 {spot_id}번 구역에 주차 완료')
+
+        # --- 불법 주차 감지 로직 ---
+        is_illegal = False
+        # 장애인 구역(1,6,7)에 비장애인 차량이 주차
+        if spot_id in [1, 6, 7] and not vehicle.disabled:
+            is_illegal = True
+        # 전기차 구역(4,5,10,11)에 비전기차 차량이 주차
+        elif spot_id in [4, 5, 10, 11] and not vehicle.elec:
+            is_illegal = True
+
+        if is_illegal:
+            self.get_logger().warn(f'불법 주차 감지: TAG_{tag_id} -> {spot_id}번 구역')
+            self.publish_illegal_parking(vehicle, spot_id)
+
+        self.notify_status_changed()
+
+    def on_signal_loss_deadline(self, tag_id: int):
+        """신호 손실 데드라인 - 마지막 수신 후 10초가 지났으면 출차 처리, 아니면 재예약"""
+        vehicle = self.vehicles.get(tag_id)
+        if vehicle is None:
+            return
+        deadline = vehicle.last_seen + SIGNAL_LOSS_SEC
+        if deadline > self.timer_wheel.clock():
+            vehicle.loss_timer = self.timer_wheel.schedule_at(
+                deadline, self.on_signal_loss_deadline, tag_id)
+            return
+        vehicle.loss_timer = None
+        self.get_logger().info(f'차량 출차 (10초 이상 신호 없음): TAG_{tag_id}')
+        self.remove_vehicle(tag_id)
+        self.notify_status_changed()
+
+    def remove_vehicle(self, tag_id: int):
+        """차량 추적 정보 및 예약된 타이머 제거"""
+        vehicle = self.vehicles.pop(tag_id, None)
+        if vehicle is None:
+            return
+        if vehicle.is_parked:
+            self.mark_spot_released(vehicle, vehicle.parked_spot)
+        if self.history is not None:
+            self.history.record_exit(tag_id, *vehicle.current_position)
+        if self.journal is not None:
+            self.journal.delete('vehicles', tag_id)
+        for handle in (vehicle.dwell_timer, vehicle.loss_timer):
+            if handle is not None:
+                handle.cancel()
+
+    def journal_vehicle(self, vehicle: Vehicle):
+        """차량 상태 전이(추적 시작/주차/해제)를 저널에 기록 - 진행 중인 dwell 은 남기지 않음"""
+        if self.journal is None:
+            return
+        parked = vehicle.is_parked
+        self.journal.put('vehicles', vehicle.tag_id, {
+            'position': list(vehicle.current_position),
+            'entry_time': vehicle.entry_time.isoformat(),
+            'elec': vehicle.elec,
+            'disabled': vehicle.disabled,
+            'owner': vehicle.owner,
+            'parked_spot': vehicle.parked_spot if parked else None,
+            'parking_start_time': (vehicle.parking_start_time.isoformat()
+                                   if parked and vehicle.parking_start_time else None),
+        })
+
+    def restore_vehicle_state(self):
+        """저널에서 차량/주차 상태 복구 - 점유 카운터를 다시 세고, 신호 손실 데드라인은 지금부터 다시 잼
+        (재시작 중 나간 차량은 SIGNAL_LOSS_SEC 뒤 출차 처리됨)"""
+        now = self.timer_wheel.clock()
         current_time = datetime.now()
-        for tag_id, vehicle in list(self.vehicles.items()):
-            if (current_time - vehicle.last_update).seconds > 10:
-                self.get_logger().info(f'차량 출차 (10초 이상 신호 없음): TAG_{tag_id}')
-                del self.vehicles[tag_id]
-                continue
-
-            x, y = vehicle.current_position
-            current_spot = self.get_parking_spot(x, y)
-
-            if current_spot:
-                if vehicle.parking_start_time is None:
-                    vehicle.parking_start_time = current_time
-                    vehicle.parked_spot = current_spot
-                    self.get_logger().info(f'차량 TAG_{tag_id}이 {current_spot}번 감지 구역 진입')
-
-                elif (current_time - vehicle.parking_start_time).seconds >= 3:
-                    if not vehicle.is_parked:
-                        vehicle.is_parked = True
-                        self.get_logger().info(f'차량 TAG_{tag_id}이 {current_spot}번 구역에 주차 완료')
-
-                        # --- 불법 주차 감지 로직 ---
-                        is_illegal = False
-                        # 장애인 구역(1,6,7)에 비장애인 차량이 주차
-                        if current_spot in [1, 6, 7] and not vehicle.disabled:
-                            is_illegal = True
-                        # 전기차 구역(4,5,10,11)에 비전기차 차량이 주차
-                        elif current_spot in [4, 5, 10, 11] and not vehicle.elec:
-                            is_illegal = True
-
-                        if is_illegal:
-                            self.get_logger().warn(f'불법 주차 감지: TAG_{tag_id} -> {current_spot}번 구역')
-                            # GUI에 팝업 요청 콜백 호출
-                            self.illegal_parking_callback(vehicle.tag_id, current_spot)
-
-            elif not current_spot and vehicle.parking_start_time:
-                vehicle.parking_start_time = None
-                if vehicle.is_parked:
-                    vehicle.is_parked = False
-                    previous_spot = vehicle.parked_spot
-                    self.get_logger().info(f'차량 TAG_{tag_id}이 {previous_spot}번 감지 구역에서 벗어남')
-                    
-                    # ✅ 6번 구역에서 출차 시에만 스토퍼 전진 명령
-                    if previous_spot == 6:
-                        self.get_logger().info(f'6번 구역 출차 -> 스토퍼 전진 명령 전송')
-                        threading.Thread(target=self.control_stopper_forward, daemon=True).start()
-                        
-                vehicle.parked_spot = None
+        for tag, saved in self.journal.get('vehicles').items():
+            tag_id = int(tag)
+            vehicle = Vehicle(
+                id=f"TAG_{tag_id}", tag_id=tag_id, current_position=tuple(saved['position']),
+                entry_time=datetime.fromisoformat(saved['entry_time']), last_update=current_time,
+                elec=saved['elec'], disabled=saved['disabled'], owner=saved['owner'], last_seen=now
+            )
+            vehicle.position_history = [vehicle.current_position]
+            spot_id = saved['parked_spot']
+            if spot_id is not None and spot_id in self.spot_occupancy:
+                vehicle.is_parked = True
+                vehicle.parked_spot = spot_id
+                if saved['parking_start_time']:
+                    vehicle.parking_start_time = datetime.fromisoformat(saved['parking_start_time'])
+                self.parked_count += 1
+                self.spot_occupancy[spot_id] += 1
+                if self.spot_occupancy[spot_id] == 1 and spot_id in SPOT_CATEGORY_OF:
+                    self.available_spots[SPOT_CATEGORY_OF[spot_id]] -= 1
+            vehicle.loss_timer = self.timer_wheel.schedule_at(
+                now + SIGNAL_LOSS_SEC, self.on_signal_loss_deadline, tag_id)
+            self.vehicles[tag_id] = vehicle
+        self.get_logger().info(f'상태 저널 복구: 차량 {len(self.vehicles)}대, 주차 {self.parked_count}대 '
+                               f'({self.journal.describe()})')
+
+    def notify_status_changed(self):
+        """상태 변경 표시 - 스냅샷은 타이머에서 발행하고, 콜백이 있으면 즉시 전달"""
+        self.snapshot_dirty = True
+        if self.gui_callback is not None:
+            self.gui_callback(self.get_system_status())
+
+    def publish_illegal_parking(self, vehicle: Vehicle, spot_id: int):
+        """불법 주차 이벤트 발행 (/parking_exe/illegal_parking)"""
+        event = {
+            'tag_id': vehicle.tag_id,
+            'spot_id': spot_id,
+            'elec': vehicle.elec,
+            'disabled': vehicle.disabled,
+            'timestamp': datetime.now().isoformat(),
+        }
+        msg = String()
+        msg.data = json.dumps(event)
+        self.illegal_parking_pub.publish(msg)
+        self.illegal_parking_total.inc()
+        if self.illegal_parking_callback is not None:
+            self.illegal_parking_callback(vehicle.tag_id, spot_id)
+
+    def publish_snapshot(self):
+        """차량 상태 스냅샷 발행 (변경이 있을 때만)"""
+        if not self.snapshot_dirty:
+            return
+        self.snapshot_dirty = False
+        vehicles = [{
+            'tag_id': v.tag_id,
+            'current_position': list(v.current_position),
+            'is_parked': v.is_parked,
+            'parked_spot': v.parked_spot,
+            'elec': v.elec,
+            'disabled': v.disabled,
+            'owner': v.owner,
+        } for v in self.vehicles.values()]
+        snapshot = {
+            'vehicles': vehicles,
+            'total_vehicles': len(vehicles),
+            'parked_vehicles': sum(1 for v in vehicles if v['is_parked']),
+            'timestamp': datetime.now().isoformat(),
+        }
+        msg = String()
+        msg.data = json.dumps(snapshot)
+        self.snapshot_pub.publish(msg)
 
     def get_system_status(self) -> dict:
         return {
@@ -589,222 +749,40 @@ class ParkingExeNode(Node):
             'parking_spots': self.parking_spots,
         }
 
-    def control_stopper_backward(self):
-        """스토퍼 후진 명령 (별도 스레드에서 실행)"""
-        try:
-            success = self.stopper_controller.move_backward()
-            if success:
-                self.get_logger().info('스토퍼 후진 명령 전송 성공')
-            else:
-                self.get_logger().error('스토퍼 후진 명령 전송 실패')
-        except Exception as e:
-            self.get_logger().error(f'스토퍼 후진 제어 오류: {str(e)}')
-
-    def control_stopper_forward(self):
-        """스토퍼 전진 명령 (별도 스레드에서 실행)"""
-        try:
-            success = self.stopper_controller.move_forward()
-            if success:
-                self.get_logger().info('스토퍼 전진 명령 전송 성공')
-            else:
-                self.get_logger().error('스토퍼 전진 명령 전송 실패')
-        except Exception as e:
-            self.get_logger().error(f'스토퍼 전진 제어 오류: {str(e)}')
-
-class ParkingVisualizationWidget(QWidget):
-    """주차장 시각화 위젯"""
-    def __init__(self):
-        super().__init__()
-        self.system_status = {'vehicles': {}, 'parking_spots': {}}
-        self.setFixedSize(1000, 1000)
-        self.scale_factor = 1000 / 2000
-        
-    def update_status(self, status):
-        self.system_status = status
-        self.update()
-        
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        self.draw_parking_lot(painter)
-        
-    def draw_parking_lot(self, painter):
-        painter.fillRect(0, 0, 1000, 1000, QColor(240, 240, 240))
-        
-        # 여백을 추가한 변환 함수 - 상하좌우 50픽셀 여백
-        margin = 50
-        available_size = 1000 - (2 * margin)
-        scale_factor = available_size / 2000
-        def tf(x, y): 
-            return int(x * scale_factor + margin), int(1000 - margin - (y * scale_factor))
-        
-        # 입구 라벨 추가
-        self.draw_entrance_labels(painter)
-        
-        self.draw_parking_spots_fixed(painter, tf)
-        self.draw_vehicles_fixed(painter, tf)
-        self.draw_forbidden_zone_fixed(painter, tf)
-
-    def draw_entrance_labels(self, painter):
-        """입구 라벨을 그리는 메서드"""
-        painter.setPen(QPen(Qt.black, 2))
-        painter.setFont(QFont('Arial', 14, QFont.Bold))
-        
-        # 여백을 추가한 변환 함수 - 상하좌우 50픽셀 여백
-        margin = 50
-        available_size = 1000 - (2 * margin)
-        scale_factor = available_size / 2000
-        def tf(x, y): 
-            return int(x * scale_factor + margin), int(1000 - margin - (y * scale_factor))
-        
-        # 왼쪽 상단 - 백화점 본관 입구
-        painter.drawText(20, 30, "백화점 본관 입구")
-        
-        # 영화관 입구 - (1800, 1800) 좌표
-        movie_x, movie_y = tf(1800, 1800)
-        painter.drawText(movie_x, movie_y, "영화관 입구")
-        
-        # 문화시설 입구 - (1800, 600) 좌표
-        culture_x, culture_y = tf(1800, 600)
-        painter.drawText(culture_x, culture_y, "문화시설 입구")
-
-    def draw_parking_spots_fixed(self, painter, tf):
-        for spot_id, spot in self.system_status.get('parking_spots', {}).items():
-            is_occupied = any(v.is_parked and v.parked_spot == spot_id for v in self.system_status.get('vehicles', {}).values())
-            x1, y1 = tf(spot['min_x'], spot['min_y']); x2, y2 = tf(spot['max_x'], spot['max_y'])
-            w, h = x2 - x1, y1 - y2
-            if not (w > 0 and h > 0): continue
-            if spot_id in [1, 6, 7]: color = QColor(135, 206, 250) if not is_occupied else QColor(100, 150, 255)
-            elif spot_id in [4, 5, 10, 11]: color = QColor(144, 238, 144) if not is_occupied else QColor(80, 200, 80)
-            else: color = QColor(245, 245, 245) if not is_occupied else QColor(180, 180, 180)
-            painter.fillRect(x1, y2, w, h, color); painter.setPen(QPen(Qt.black, 2)); painter.drawRect(x1, y2, w, h)
-            ix1, iy1 = tf(spot['inner_min_x'], spot['inner_min_y']); ix2, iy2 = tf(spot['inner_max_x'], spot['inner_max_y'])
-            iw, ih = ix2 - ix1, iy1 - iy2
-            painter.setPen(QPen(QColor(100, 100, 100), 1, Qt.DotLine)); painter.setBrush(QBrush(QColor(0, 0, 0, 15))); painter.drawRect(ix1, iy2, iw, ih)
-            cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
-            painter.setPen(QPen(Qt.black, 1)); painter.setFont(QFont('Arial', 30)); painter.drawText(cx - 15, cy + 10, str(spot_id))
-            if spot_id in [1, 6, 7]: painter.setFont(QFont('Arial', 40)); painter.drawText(cx - 20, cy + 50, "♿")
-            elif spot_id in [4, 5, 10, 11]: painter.setFont(QFont('Arial', 20)); painter.drawText(cx - 15, y1 - 10, "EV")
-
-    def draw_vehicles_fixed(self, painter, tf):
-        for v in self.system_status.get('vehicles', {}).values():
-            px, py = tf(v.current_position[0], v.current_position[1])
-            if v.elec and v.disabled: color = QColor(135, 206, 235)
-            elif v.elec: color = QColor(144, 238, 144)
-            elif v.disabled: color = QColor(0, 0, 255)
-            else: color = QColor(255, 255, 255)
-            border_color, border_width = (QColor(0, 100, 0), 3) if v.is_parked else (QColor(255, 140, 0), 2)
-            radius = 25
-            painter.setPen(QPen(border_color, border_width)); painter.setBrush(QBrush(color)); painter.drawEllipse(px - radius, py - radius, radius * 2, radius * 2)
-            tag_display = str(v.tag_id)
-            painter.setPen(QPen(Qt.black, 1)); painter.setFont(QFont('Arial', 12, QFont.Bold)); painter.drawText(px - (len(tag_display) * 6)//2, py + 5, tag_display)
-
-    def draw_forbidden_zone_fixed(self, painter, tf):
-        x1, y1 = tf(550, 1050); x2, y2 = tf(1350, 1350); w, h = x2 - x1, y1 - y2
-        painter.setPen(QPen(Qt.red, 2)); painter.setBrush(QBrush(QColor(255, 0, 0, 100))); painter.drawRect(x1, y2, w, h)
-        painter.setPen(QPen(Qt.red, 1)); painter.setFont(QFont('Arial', 20)); painter.drawText((x1 + x2) // 2 - 40, (y1 + y2) // 2 + 10, "금지구역")
-
-class ParkingExeMainWindow(QMainWindow):
-    """메인 윈도우"""
-    update_signal = pyqtSignal(dict)
-    illegal_parking_signal = pyqtSignal(str)
-
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle('하늘소 백화점 주차장')
-        self.setGeometry(100, 100, 1300, 1000)
-        central_widget = QWidget(); self.setCentralWidget(central_widget)
-        main_layout = QHBoxLayout(central_widget)
-        self.visualization = ParkingVisualizationWidget()
-        main_layout.addWidget(self.visualization, 3)
-        info_panel = self.create_info_panel()
-        main_layout.addWidget(info_panel, 1)
-
-        # 시그널 연결
-        self.update_signal.connect(self.update_display)
-        self.illegal_parking_signal.connect(self.show_illegal_parking_popup)
-
-        self.ros_thread = QThread(); self.ros_node = None
-
-    def create_info_panel(self):
-        panel = QFrame(); panel.setFrameStyle(QFrame.Box); layout = QVBoxLayout(panel)
-        title = QLabel('하늘소 백화점 주차장'); title.setFont(QFont('Arial', 16, QFont.Bold)); layout.addWidget(title)
-        self.status_labels = {
-            'total_vehicles': QLabel('진입 차량: 0대'), 'parked_vehicles': QLabel('주차 완료: 0대'),
-            'available_disabled': QLabel('잔여 장애인: 3대'), 'available_ev': QLabel('잔여 EV충전: 4대'),
-            'available_general': QLabel('잔여 일반: 4대')
-        }
-        for label in self.status_labels.values(): label.setFont(QFont('Arial', 12)); layout.addWidget(label)
-        layout.addWidget(QLabel())
-        vehicles_title = QLabel('TAG 차량 목록'); vehicles_title.setFont(QFont('Arial', 14, QFont.Bold)); layout.addWidget(vehicles_title)
-        self.vehicles_text = QTextEdit(); self.vehicles_text.setMaximumHeight(200); layout.addWidget(self.vehicles_text)
-        layout.addStretch()
-        return panel
-
-    def update_display(self, status):
-        self.visualization.update_status(status)
-        vehicles = status.get('vehicles', {}).values()
-        disabled_occupied = sum(1 for v in vehicles if v.is_parked and v.parked_spot in [1, 6, 7])
-        ev_occupied = sum(1 for v in vehicles if v.is_parked and v.parked_spot in [4, 5, 10, 11])
-        self.status_labels['total_vehicles'].setText(f"진입 차량: {status.get('total_vehicles', 0)}대")
-        self.status_labels['parked_vehicles'].setText(f"주차 완료: {status.get('parked_vehicles', 0)}대")
-        self.status_labels['available_disabled'].setText(f'잔여 장애인: {3 - disabled_occupied}대')
-        self.status_labels['available_ev'].setText(f'잔여 EV충전: {4 - ev_occupied}대')
-        general_occupied = status.get('parked_vehicles', 0) - disabled_occupied - ev_occupied
-        self.status_labels['available_general'].setText(f'잔여 일반: {4 - general_occupied}대')
-        
-        info = ""
-        for v in vehicles:
-            status_text = "주차완료" if v.is_parked else "이동중"
-            spot_text = f" ({v.parked_spot}번)" if v.parked_spot else ""
-            type_parts = []
-            if v.elec: type_parts.append("전기")
-            if v.disabled: type_parts.append("장애인")
-            type_text = f"[{'+'.join(type_parts)}]" if type_parts else "[일반]"
-            info += f"TAG_{v.tag_id}{type_text}: {status_text}{spot_text} ({v.current_position[0]:.0f},{v.current_position[1]:.0f})\n"
-        self.vehicles_text.setText(info)
-
-    def show_illegal_parking_popup(self, message):
-        """불법 주차 경고 팝업을 표시하는 메서드"""
-        msg_box = QMessageBox(self)
-        msg_box.setIcon(QMessageBox.Warning)
-        msg_box.setWindowTitle("불법 주차 감지")
-        msg_box.setText("미등록 차량이 주차하였습니다.")
-        msg_box.setInformativeText(message)
-        msg_box.setStandardButtons(QMessageBox.Ok)
-        msg_box.exec_()
-
-    def ros_callback(self, status):
-        self.update_signal.emit(status)
-
-    def ros_illegal_parking_callback(self, tag_id, spot_id):
-        """ROS 노드로부터 불법 주차 신호를 받아 처리하는 콜백"""
-        spot_type = "장애인 주차구역" if spot_id in [1, 6, 7] else "전기차 충전구역"
-        message = f"차량 TAG_{tag_id}이(가) {spot_type}({spot_id}번)에 주차했습니다."
-        self.illegal_parking_signal.emit(message)
-
-    def start_ros_node(self):
-        try:
-            rclpy.init()
-            self.ros_node = ParkingExeNode(self.ros_callback, self.ros_illegal_parking_callback)
-            self.ros_callback(self.ros_node.get_system_status())
-            rclpy.spin(self.ros_node)
-        except Exception as e:
-            print(f"ROS 노드 오류: {e}")
-
-    def closeEvent(self, event):
-        if self.ros_node: self.ros_node.destroy_node()
-        if rclpy.ok(): rclpy.shutdown()
-        event.accept()
+    def destroy_node(self):
+        """노드 종료 시 스토퍼 연결 정리, 이력 저장소 인덱스 저장, 상태 저널 스냅샷 정리"""
+        self.stopper_manager.stop()
+        if self.history is not None:
+            self.history.close()
+            self.history = None
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        super().destroy_node()
+
+    def on_stopper_result(self, spot_id: int, command: int, success: bool, status: str):
+        """스토퍼 명령 결과 (스토퍼 관리자 스레드에서 호출)"""
+        name = COMMAND_NAMES.get(command, str(command))
+        if success:
+            self.get_logger().info(f'{spot_id}번 스토퍼 {name} 완료 (STATUS:{status})')
+        elif status == 'LINK_LOST':
+            # 펌웨어가 이미 구동했을 수 있어 자동 재시도하지 않음 - 재연결 후 상태 확인 필요
+            self.get_logger().error(f'{spot_id}번 스토퍼 {name} 결과 불명 (응답 전 연결 끊김) - 차단기 상태 확인 필요, 재시도 안 함')
+        else:
+            self.get_logger().error(f'{spot_id}번 스토퍼 {name} 실패 ({status})')
 
 def main(args=None):
-    app = QApplication(sys.argv)
-    window = ParkingExeMainWindow()
-    ros_thread = threading.Thread(target=window.start_ros_node)
-    ros_thread.daemon = True
-    window.ros_thread = ros_thread
-    ros_thread.start()
-    window.show()
-    sys.exit(app.exec_())
+    rclpy.init(args=args)
+
+    node = ParkingExeNode()
+
+    try:
+        rclpy.spin(node)
+    except KeyboardInterrupt:
+        node.get_logger().info('Ctrl+C로 종료 요청됨')
+    finally:
+        node.destroy_node()
+        rclpy.shutdown()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -4,6 +4,7 @@ import rclpy
 from rclpy.node import Node
 from geometry_msgs.msg import PointStamped
 from std_msgs.msg import String
+from parking_common.qos_profiles import QosRegistry
 import json
 import time
 import threading
@@ -14,13 +15,16 @@ class NormalVehicleTest4Dummy(Node):
     def __init__(self):
         super().__init__('normal_vehicle_test4_dummy')
         
+        # 서버 노드와 같은 토픽별 QoS (좌표 best-effort, 차량 정보 reliable)
+        self.qos = QosRegistry.from_node(self)
+
         # UWB 좌표 발행 (주차장 모니터링 프로그램이 /uwb/comp 구독)
         self.uwb_comp_pub = self.create_publisher(
-            PointStamped, '/uwb/comp', 10)
+            PointStamped, '/uwb/comp', self.qos.profile('/uwb/comp'))
         
         # 차량 정보 발행 (일반차량으로 설정)
         self.vehicle_info_pub = self.create_publisher(
-            String, '/uwb/vehicle_info', 10)
+            String, '/uwb/vehicle_info', self.qos.profile('/uwb/vehicle_info'))
         
         # 테스트 변수
         self.tag_id = 88  # 테스트용 태그 ID
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""ESP32 스토퍼 연결 관리자 (단일 selector 스레드, 스토퍼별 명령 큐 / ACK / 하트비트 / 재연결)"""
+
+import time
+import errno
+import socket
+import selectors
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+# 명령 코드 (motor_control.ino의 CMD:<n>)
+CMD_STOP = 0
+CMD_FORWARD = 1
+CMD_BACKWARD = 2
+
+# 명령별로 기대하는 STATUS 응답
+ACK_STATUS = {
+    CMD_STOP: 'STOPPED',
+    CMD_FORWARD: 'FORWARD',
+    CMD_BACKWARD: 'BACKWARD',
+}
+COMMAND_NAMES = {CMD_STOP: 'STOP', CMD_FORWARD: 'FORWARD', CMD_BACKWARD: 'BACKWARD'}
+
+CONNECT_TIMEOUT_SEC = 3.0
+ACK_TIMEOUT_SEC = 1.0
+HEARTBEAT_TIMEOUT_SEC = 7.0     # 펌웨어는 2초마다 HEARTBEAT 전송
+COMMAND_EXPIRY_SEC = 15.0       # 재연결을 기다리다 이 시간이 지난 명령은 폐기
+RECONNECT_MIN_SEC = 0.5
+RECONNECT_MAX_SEC = 5.0
+LOOP_INTERVAL_SEC = 0.1
+
+ResultCallback = Callable[[int, int, bool, str], None]
+
+
+def parse_stopper_spec(spec: str) -> Dict[int, Tuple[str, int]]:
+    """'6=192.168.225.99:8888,7=192.168.225.98' 형식 -> {spot: (host, port)}"""
+    stoppers = {}
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        spot, address = item.split('=', 1)
+        host, _, port = address.strip().partition(':')
+        stoppers[int(spot)] = (host, int(port) if port else 8888)
+    return stoppers
+
+
+@dataclass
+class StopperCommand:
+    command: int
+    enqueued_at: float
+    callback: Optional[ResultCallback] = None
+    sent_at: float = 0.0
+
+
+class StopperLink:
+    """스토퍼 1대와의 연결 상태 및 명령 큐"""
+
+    def __init__(self, spot: int, host: str, port: int):
+        self.spot = spot
+        self.host = host
+        self.port = port
+        self.sock: Optional[socket.socket] = None
+        self.connecting = False
+        self.connected = False
+        self.connect_started = 0.0
+        self.next_attempt = 0.0
+        self.backoff = RECONNECT_MIN_SEC
+        self.queue: Deque[StopperCommand] = deque()
+        self.inflight: Optional[StopperCommand] = None
+        self.rx_buffer = b''
+        self.last_rx = 0.0
+        self.last_status = 'UNKNOWN'
+
+    @property
+    def alive(self) -> bool:
+        return self.connected and time.monotonic() - self.last_rx < HEARTBEAT_TIMEOUT_SEC
+
+
+class StopperManager:
+    """여러 스토퍼와 상시 연결을 유지하고 명령을 큐잉해 순서대로 전송
+
+    send()는 어느 스레드에서 호출해도 되며 즉시 반환한다.
+    결과는 callback(spot, command, success, status)로 selector 스레드에서 전달된다.
+    전송 후 ACK 전에 연결이 끊긴 명령은 펌웨어가 이미 실행했을 수 있으므로 (1200ms 타이머 구동)
+    재연결 후 다시 보내지 않고 status 'LINK_LOST' 로 실패 처리한다 - 재시도 여부는 호출 측이 판단.
+    """
+
+    def __init__(self, stoppers: Dict[int, Tuple[str, int]], logger):
+        self.logger = logger
+        self.links: Dict[int, StopperLink] = {
+            spot: StopperLink(spot, host, port) for spot, (host, port) in stoppers.items()}
+        self._lock = threading.Lock()
+        self._selector = selectors.DefaultSelector()
+        # 다른 스레드에서 명령을 넣었을 때 select()를 깨우기 위한 소켓 쌍
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------------- 외부 API ----------------
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wake()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        for link in self.links.values():
+            self._close_link(link)
+        self._selector.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    def has_stopper(self, spot: Optional[int]) -> bool:
+        return spot in self.links
+
+    def is_alive(self, spot: int) -> bool:
+        link = self.links.get(spot)
+        return link is not None and link.alive
+
+    def send(self, spot: int, command: int, callback: Optional[ResultCallback] = None) -> bool:
+        """명령을 해당 스토퍼 큐에 넣음 (스토퍼가 없는 구역이면 False)"""
+        link = self.links.get(spot)
+        if link is None:
+            return False
+        with self._lock:
+            link.queue.append(StopperCommand(command, time.monotonic(), callback))
+        self._wake()
+        return True
+
+    def move_forward(self, spot: int, callback: Optional[ResultCallback] = None) -> bool:
+        return self.send(spot, CMD_FORWARD, callback)
+
+    def move_backward(self, spot: int, callback: Optional[ResultCallback] = None) -> bool:
+        return self.send(spot, CMD_BACKWARD, callback)
+
+    def stop_motor(self, spot: int, callback: Optional[ResultCallback] = None) -> bool:
+        return self.send(spot, CMD_STOP, callback)
+
+    def get_status(self) -> Dict[int, dict]:
+        return {spot: {'host': link.host, 'port': link.port, 'connected': link.connected,
+                       'alive': link.alive, 'last_status': link.last_status,
+                       'queued': len(link.queue) + (1 if link.inflight else 0)}
+                for spot, link in self.links.items()}
+
+    # ---------------- selector 스레드 ----------------
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass
+
+    def _run(self):
+        while self._running:
+            now = time.monotonic()
+            for link in self.links.values():
+                self._service_link(link, now)
+            for key, mask in self._selector.select(timeout=LOOP_INTERVAL_SEC):
+                if key.data is None:
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except (BlockingIOError, OSError):
+                        pass
+                    continue
+                link = key.data
+                if link.connecting and mask & selectors.EVENT_WRITE:
+                    self._finish_connect(link)
+                elif mask & selectors.EVENT_READ:
+                    self._read(link)
+
+    def _service_link(self, link: StopperLink, now: float):
+        """재연결, 연결 타임아웃, ACK 타임아웃, 하트비트 감시, 대기 명령 전송"""
+        if link.sock is None:
+            if now >= link.next_attempt:
+                self._start_connect(link, now)
+            self._expire_queued(link, now)
+            return
+
+        if link.connecting:
+            if now - link.connect_started > CONNECT_TIMEOUT_SEC:
+                self._connection_lost(link, '연결 시간 초과')
+            return
+
+        if now - link.last_rx > HEARTBEAT_TIMEOUT_SEC:
+            self._connection_lost(link, '하트비트 없음')
+            return
+
+        if link.inflight is not None and now - link.inflight.sent_at > ACK_TIMEOUT_SEC:
+            cmd = link.inflight
+            link.inflight = None
+            self.logger.warn(f'[STOPPER] {link.spot}번 {COMMAND_NAMES[cmd.command]} ACK 시간 초과')
+            self._complete(link, cmd, False, 'ACK_TIMEOUT')
+
+        if link.inflight is None:
+            with self._lock:
+                cmd = link.queue.popleft() if link.queue else None
+            if cmd is not None:
+                self._transmit(link, cmd, now)
+
+    def _start_connect(self, link: StopperLink, now: float):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        err = sock.connect_ex((link.host, link.port))
+        if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+            sock.close()
+            self._schedule_reconnect(link, now)
+            return
+        link.sock = sock
+        link.connecting = True
+        link.connect_started = now
+        self._selector.register(sock, selectors.EVENT_WRITE, link)
+
+    def _finish_connect(self, link: StopperLink):
+        err = link.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err != 0:
+            self._connection_lost(link, f'연결 실패 (errno {err})')
+            return
+        link.connecting = False
+        link.connected = True
+        link.backoff = RECONNECT_MIN_SEC
+        link.last_rx = time.monotonic()
+        link.rx_buffer = b''
+        self._selector.modify(link.sock, selectors.EVENT_READ, link)
+        self.logger.info(f'[STOPPER] {link.spot}번 스토퍼 연결됨 ({link.host}:{link.port})')
+
+    def _read(self, link: StopperLink):
+        try:
+            data = link.sock.recv(1024)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            self._connection_lost(link, f'수신 오류: {e}')
+            return
+        if not data:
+            self._connection_lost(link, '연결 종료됨')
+            return
+
+        link.last_rx = time.monotonic()
+        link.rx_buffer += data
+        while b'\n' in link.rx_buffer:
+            line, link.rx_buffer = link.rx_buffer.split(b'\n', 1)
+            self._handle_line(link, line.decode('utf-8', errors='ignore').strip())
+
+    def _handle_line(self, link: StopperLink, line: str):
+        if not line or line in ('HEARTBEAT', 'ESP32_CONNECTED'):
+            return
+        if not line.startswith('STATUS:'):
+            self.logger.info(f'[STOPPER] {link.spot}번 ESP32: {line}')
+            return
+
+        status = line[len('STATUS:'):]
+        link.last_status = status
+        cmd = link.inflight
+        if cmd is not None and ACK_STATUS.get(cmd.command) == status:
+            link.inflight = None
+            self._complete(link, cmd, True, status)
+        elif status in ('TIMER_STOP', 'TIMEOUT'):
+            self.logger.info(f'[STOPPER] {link.spot}번 모터 정지 ({status})')
+
+    def _transmit(self, link: StopperLink, cmd: StopperCommand, now: float):
+        try:
+            link.sock.send(f'CMD:{cmd.command}\n'.encode('utf-8'))
+        except OSError as e:
+            # 일부라도 나갔을 수 있으므로 다시 큐에 넣지 않음
+            link.inflight = cmd
+            self._connection_lost(link, f'전송 오류: {e}')
+            return
+        cmd.sent_at = now
+        link.inflight = cmd
+        self.logger.info(f'[STOPPER] {link.spot}번 {COMMAND_NAMES[cmd.command]} 명령 전송 '
+                         f'(대기 {(now - cmd.enqueued_at) * 1000:.0f}ms)')
+
+    def _connection_lost(self, link: StopperLink, reason: str):
+        if link.connected:
+            self.logger.warn(f'[STOPPER] {link.spot}번 스토퍼 연결 끊김: {reason}')
+        cmd = link.inflight
+        link.inflight = None
+        self._close_link(link)
+        self._schedule_reconnect(link, time.monotonic())
+        # 응답을 못 받은 명령은 실행 여부를 알 수 없음 - 다시 보내면 차단기를 두 번 구동할 수 있어 실패로 돌려줌
+        if cmd is not None:
+            self.logger.error(f'[STOPPER] {link.spot}번 {COMMAND_NAMES[cmd.command]} 응답 전 연결 끊김 (재전송 안 함)')
+            self._complete(link, cmd, False, 'LINK_LOST')
+
+    def _schedule_reconnect(self, link: StopperLink, now: float):
+        link.next_attempt = now + link.backoff
+        link.backoff = min(link.backoff * 2, RECONNECT_MAX_SEC)
+
+    def _close_link(self, link: StopperLink):
+        if link.sock is not None:
+            try:
+                self._selector.unregister(link.sock)
+            except (KeyError, ValueError):
+                pass
+            link.sock.close()
+            link.sock = None
+        link.connecting = False
+        link.connected = False
+
+    def _expire_queued(self, link: StopperLink, now: float):
+        """연결이 안 된 동안 너무 오래 기다린 명령 폐기"""
+        expired = []
+        with self._lock:
+            while link.queue and now - link.queue[0].enqueued_at > COMMAND_EXPIRY_SEC:
+                expired.append(link.queue.popleft())
+        for cmd in expired:
+            self.logger.error(f'[STOPPER] {link.spot}번 {COMMAND_NAMES[cmd.command]} 명령 폐기 (연결 불가)')
+            self._complete(link, cmd, False, 'EXPIRED')
+
+    def _complete(self, link: StopperLink, cmd: StopperCommand, success: bool, status: str):
+        if cmd.callback is None:
+            return
+        try:
+            cmd.callback(link.spot, cmd.command, success, status)
+        except Exception as e:
+            self.logger.error(f'[STOPPER] 결과 콜백 오류: {e}')
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""주차 판정용 해시 타이머 휠 (dwell / 신호 손실 데드라인 관리)"""
+
+import math
+import time
+from typing import Callable, List, Optional
+
+
+class TimerHandle:
+    """예약된 타이머 핸들 (cancel()로 취소)"""
+    __slots__ = ('deadline', 'tick', 'callback', 'args', 'cancelled')
+
+    def __init__(self, deadline: float, tick: int, callback: Callable, args: tuple):
+        self.deadline = deadline
+        self.tick = tick
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        """타이머 취소 (슬롯에서는 다음 순회 때 제거됨)"""
+        self.cancelled = True
+
+
+class TimerWheel:
+    """고정 tick 단위 슬롯에 데드라인을 해시하는 타이머 휠
+
+    schedule/cancel은 O(1), advance는 지나간 슬롯에 들어있는 타이머 수에만 비례한다.
+    휠 한 바퀴(tick * slots)보다 먼 데드라인은 같은 슬롯에 남아 있다가 해당 바퀴에 실행된다.
+    """
+
+    def __init__(self, tick: float = 0.05, slots: int = 512,
+                 clock: Callable[[], float] = time.monotonic):
+        self.tick = tick
+        self.slots = slots
+        self.clock = clock
+        self._wheel: List[List[TimerHandle]] = [[] for _ in range(slots)]
+        self._current_tick = int(clock() / tick)
+        self._pending = 0
+
+    def __len__(self):
+        return self._pending
+
+    def schedule(self, delay: float, callback: Callable, *args) -> TimerHandle:
+        """delay초 뒤 callback(*args) 실행 예약"""
+        return self.schedule_at(self.clock() + delay, callback, *args)
+
+    def schedule_at(self, deadline: float, callback: Callable, *args) -> TimerHandle:
+        """절대 시각(clock 기준) deadline에 callback(*args) 실행 예약"""
+        # 데드라인이 속한 tick의 끝(올림)에 배치해 조기 실행을 막고,
+        # 이미 지나간 tick이면 한 바퀴 뒤에나 보이므로 최소 다음 tick으로 보정
+        target_tick = max(math.ceil(deadline / self.tick), self._current_tick + 1)
+        handle = TimerHandle(deadline, target_tick, callback, args)
+        self._wheel[target_tick % self.slots].append(handle)
+        self._pending += 1
+        return handle
+
+    def advance(self, now: Optional[float] = None) -> int:
+        """now까지 도래한 타이머를 실행하고 실행 개수 반환"""
+        if now is None:
+            now = self.clock()
+        target_tick = self._tick_of(now)
+        if target_tick <= self._current_tick:
+            return 0
+
+        # 한 바퀴 이상 밀렸으면 마지막 한 바퀴만 훑는다 (모든 슬롯을 한 번씩 확인하고,
+        # 도래 여부는 handle.tick <= target_tick 으로 판정하므로 건너뛴 tick 의 타이머도 실행됨)
+        base_tick = max(self._current_tick, target_tick - self.slots)
+        fired = 0
+        for tick in range(base_tick + 1, target_tick + 1):
+            slot_index = tick % self.slots
+            slot = self._wheel[slot_index]
+            # 이 슬롯을 실행하기 전에 현재 tick 을 옮겨 두어야 콜백 안에서 재예약한 타이머가
+            # 이미 지나간 슬롯이 아닌 이번 순회의 뒤쪽 슬롯(또는 다음 advance)에 들어감
+            self._current_tick = tick
+            if not slot:
+                continue
+            keep = []
+            due = []
+            for handle in slot:
+                if handle.cancelled:
+                    self._pending -= 1
+                elif handle.tick <= target_tick:
+                    due.append(handle)
+                    self._pending -= 1
+                else:
+                    keep.append(handle)
+            self._wheel[slot_index] = keep
+            # 콜백 안에서 재예약해도 안전하도록 슬롯 정리 후 실행
+            for handle in sorted(due, key=lambda h: h.deadline):
+                handle.callback(*handle.args)
+                fired += 1
+        self._current_tick = target_tick
+        return fired
+
+    def _tick_of(self, t: float) -> int:
+        return int(t / self.tick)
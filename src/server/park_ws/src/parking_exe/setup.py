@@ -26,6 +26,7 @@ setup(
     entry_points={
         'console_scripts': [
             'parking_exe_node = parking_exe.parking_exe:main',
+            'parking_dashboard = parking_exe.parking_dashboard:main',
         ],
     },
 )
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""HistoryStore 동작 테스트 (가짜 시계, 임시 디렉터리)"""
+
+import os
+
+from parking_exe.history_store import HistoryStore
+
+
+class FakeClock:
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def make_store(tmp_path, clock, capacity=4, occupied=None):
+    return HistoryStore(str(tmp_path), segment_capacity=capacity, occupied=occupied, clock=clock)
+
+
+def test_records_are_stamped_with_the_given_clock(tmp_path):
+    clock = FakeClock(50.0)
+    store = make_store(tmp_path, clock)
+    store.record_position(1, 1.0, 2.0)
+    clock.t = 51.5
+    store.record_position(1, 3.0, 4.0)
+    assert store.trajectory(1) == [(50.0, 1.0, 2.0), (51.5, 3.0, 4.0)]
+    store.close()
+
+
+def test_segment_rotation_keeps_queries_across_segments(tmp_path):
+    clock = FakeClock()
+    store = make_store(tmp_path, clock, capacity=4)
+    for i in range(10):
+        clock.t = 1000.0 + i
+        store.record_position(7, float(i), 0.0)
+    assert [info.name for info in store.segments] == ['seg_000001.col', 'seg_000002.col', 'seg_000003.col']
+    assert [info.count for info in store.segments] == [4, 4, 2]
+    assert all(os.path.exists(tmp_path / info.name) for info in store.segments)
+    assert [x for _, x, _ in store.trajectory(7)] == [float(i) for i in range(10)]
+    store.close()
+
+
+def test_trajectory_filters_tag_kind_and_time_range(tmp_path):
+    clock = FakeClock()
+    store = make_store(tmp_path, clock, capacity=4)
+    for i in range(6):
+        clock.t = 1000.0 + i
+        store.record_position(1, float(i), 0.0)
+        store.record_position(2, float(-i), 0.0)
+    clock.t = 1010.0
+    store.record_park(1, 3, 9.0, 9.0)
+    assert store.trajectory(1, 1002.0, 1004.0) == [(1002.0, 2.0, 0.0), (1003.0, 3.0, 0.0), (1004.0, 4.0, 0.0)]
+    assert len(store.trajectory(2)) == 6
+    assert store.trajectory(3) == []
+    store.close()
+
+
+def test_time_never_goes_backwards(tmp_path):
+    clock = FakeClock(100.0)
+    store = make_store(tmp_path, clock)
+    store.record_position(1, 0.0, 0.0)
+    clock.t = 90.0
+    store.record_position(1, 1.0, 0.0)
+    assert [t for t, _, _ in store.trajectory(1)] == [100.0, 100.0]
+    store.close()
+
+
+def test_spot_intervals_and_utilization(tmp_path):
+    clock = FakeClock(10.0)
+    store = make_store(tmp_path, clock, capacity=3)
+    store.record_park(1, 5, 0.0, 0.0)
+    clock.t = 20.0
+    store.record_unpark(1, 5, 0.0, 0.0)
+    clock.t = 25.0
+    store.record_park(2, 6, 0.0, 0.0)
+    clock.t = 30.0
+    store.record_park(3, 5, 0.0, 0.0)
+    clock.t = 40.0
+    # 아직 주차 중인 구간은 현재 시각까지
+    assert store.spot_intervals(5, 0.0, 50.0) == [(10.0, 20.0), (30.0, 40.0)]
+    assert store.spot_intervals(5, 15.0, 35.0) == [(15.0, 20.0), (30.0, 35.0)]
+    assert store.spot_intervals(6, 0.0, 50.0) == [(25.0, 40.0)]
+    assert store.spot_intervals(7, 0.0, 50.0) == []
+    assert store.spot_utilization(5, 10.0, 30.0) == 0.5
+    store.close()
+
+
+def test_reopen_continues_existing_segment_and_keeps_history(tmp_path):
+    clock = FakeClock()
+    store = make_store(tmp_path, clock, capacity=4)
+    for i in range(5):
+        clock.t = 1000.0 + i
+        store.record_position(1, float(i), 0.0)
+    store.close()
+
+    clock.t = 2000.0
+    store = make_store(tmp_path, clock, capacity=4)
+    assert [info.count for info in store.segments] == [4, 1]
+    store.record_position(1, 5.0, 0.0)
+    assert [info.count for info in store.segments] == [4, 2]
+    assert [x for _, x, _ in store.trajectory(1)] == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    store.close()
+
+
+def test_reopen_after_crash_rebuilds_last_segment_from_file(tmp_path):
+    clock = FakeClock()
+    store = make_store(tmp_path, clock, capacity=8)
+    clock.t = 1001.0
+    store.record_park(1, 2, 0.0, 0.0)
+    clock.t = 1002.0
+    store.record_position(1, 1.0, 1.0)
+    # close() 없이 종료 - 인덱스에는 빈 세그먼트만 기록되어 있음
+    store._open_segments[store.segments[-1].name].flush()
+
+    clock.t = 1005.0
+    reopened = make_store(tmp_path, clock, capacity=8, occupied={2: 1})
+    assert reopened.segments[-1].count == 2
+    assert reopened.trajectory(1) == [(1002.0, 1.0, 1.0)]
+    # 저널로 복구한 주차는 이어지는 주차로 남음
+    assert reopened.spot_intervals(2, 1000.0, 1010.0) == [(1001.0, 1005.0)]
+    reopened.close()
+    store.close()
+
+
+def test_reopen_closes_parks_not_restored_by_journal(tmp_path):
+    clock = FakeClock(10.0)
+    store = make_store(tmp_path, clock)
+    store.record_park(1, 4, 0.0, 0.0)
+    store.close()
+
+    clock.t = 30.0
+    reopened = make_store(tmp_path, clock)
+    assert reopened.live_occupancy == {}
+    assert reopened.spot_intervals(4, 0.0, 100.0) == [(10.0, 30.0)]
+    reopened.close()
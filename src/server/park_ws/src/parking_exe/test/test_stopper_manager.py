@@ -0,0 +1,119 @@
+"""StopperManager 테스트 (루프백 가짜 ESP32 로 부분 수신 / 연결 끊김 확인)"""
+
+import socket
+import threading
+import time
+
+import pytest
+
+from parking_exe.stopper_manager import CMD_BACKWARD, CMD_FORWARD, StopperManager, parse_stopper_spec
+
+
+class NullLogger:
+    def info(self, message):
+        pass
+
+    warn = error = info
+
+
+class FakeEsp32:
+    """연결마다 handler(conn, 수신한 명령 줄) 를 부르는 가짜 스토퍼"""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.received = []
+        self.connections = 0
+        self.server = socket.socket()
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen()
+        self.port = self.server.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            self.connections += 1
+            conn.sendall(b'ESP32_CONNECTED\n')
+            reader = conn.makefile('rb')
+            for line in reader:
+                self.received.append(line)
+                if not self.handler(conn, line):
+                    break
+            reader.close()
+            conn.close()
+
+    def close(self):
+        self.server.close()
+
+
+@pytest.fixture
+def run_manager():
+    managers = []
+
+    def run(esp32):
+        manager = StopperManager({6: ('127.0.0.1', esp32.port)}, NullLogger())
+        manager.start()
+        managers.append((manager, esp32))
+        return manager
+    yield run
+    for manager, esp32 in managers:
+        manager.stop()
+        esp32.close()
+
+
+def wait_result(manager, command):
+    done = threading.Event()
+    results = []
+
+    def callback(*result):
+        results.append(result)
+        done.set()
+    manager.send(6, command, callback)
+    assert done.wait(5.0)
+    return results
+
+
+def test_parse_stopper_spec():
+    assert parse_stopper_spec('6=192.168.0.9:8888, 7=192.168.0.8,') == {
+        6: ('192.168.0.9', 8888), 7: ('192.168.0.8', 8888)}
+
+
+def test_ack_split_across_reads_completes_command(run_manager):
+    def handler(conn, line):
+        # STATUS 줄을 두 번에 나눠 보냄 - 개행이 올 때까지 버퍼에 모아야 함
+        conn.sendall(b'HEARTBEAT\nSTATUS:FORW')
+        time.sleep(0.1)
+        conn.sendall(b'ARD\n')
+        return True
+    esp32 = FakeEsp32(handler)
+    manager = run_manager(esp32)
+    assert wait_result(manager, CMD_FORWARD) == [(6, CMD_FORWARD, True, 'FORWARD')]
+    assert esp32.received == [b'CMD:1\n']
+    assert manager.get_status()[6]['last_status'] == 'FORWARD'
+
+
+def test_unrelated_status_does_not_ack(run_manager):
+    def handler(conn, line):
+        conn.sendall(b'STATUS:TIMER_STOP\n')
+        return True
+    manager = run_manager(FakeEsp32(handler))
+    assert wait_result(manager, CMD_FORWARD) == [(6, CMD_FORWARD, False, 'ACK_TIMEOUT')]
+
+
+def test_disconnect_before_ack_fails_without_resend(run_manager):
+    def handler(conn, line):
+        return False   # ACK 없이 연결 종료
+    esp32 = FakeEsp32(handler)
+    manager = run_manager(esp32)
+    assert wait_result(manager, CMD_BACKWARD) == [(6, CMD_BACKWARD, False, 'LINK_LOST')]
+    # 재연결 후에도 같은 명령을 다시 보내지 않음
+    deadline = time.monotonic() + 3.0
+    while esp32.connections < 2 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    time.sleep(0.2)
+    assert esp32.connections >= 2
+    assert esp32.received == [b'CMD:2\n']
@@ -0,0 +1,81 @@
+"""TimerWheel 동작 테스트 (가짜 시계로 진행)"""
+
+from parking_exe.timer_wheel import TimerWheel
+
+
+class FakeClock:
+    def __init__(self, t=100.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def test_fires_after_deadline_not_before():
+    clock = FakeClock()
+    wheel = TimerWheel(tick=0.05, slots=16, clock=clock)
+    fired = []
+    wheel.schedule(0.3, fired.append, 'a')
+    clock.t += 0.25
+    wheel.advance()
+    assert fired == []
+    clock.t += 0.1
+    wheel.advance()
+    assert fired == ['a']
+    assert len(wheel) == 0
+
+
+def test_cancelled_timer_does_not_fire():
+    clock = FakeClock()
+    wheel = TimerWheel(tick=0.05, slots=16, clock=clock)
+    fired = []
+    wheel.schedule(0.1, fired.append, 'a').cancel()
+    clock.t += 1.0
+    wheel.advance()
+    assert fired == []
+    assert len(wheel) == 0
+
+
+def test_reschedule_inside_callback_fires_in_same_sweep():
+    """콜백에서 이번 advance 범위 안으로 재예약한 타이머는 한 바퀴 늦지 않고 같은 advance 에서 실행"""
+    clock = FakeClock()
+    wheel = TimerWheel(tick=0.05, slots=16, clock=clock)
+    fired = []
+
+    def first():
+        fired.append(('first', clock.t))
+        # 이미 지나간 시각으로 재예약 (신호 손실 재무장처럼 last_seen 기준 데드라인)
+        wheel.schedule_at(clock.t - 10.0, lambda: fired.append(('again', clock.t)))
+
+    wheel.schedule(0.1, first)
+    clock.t += 0.5
+    wheel.advance()
+    assert [name for name, _ in fired] == ['first', 'again']
+    assert len(wheel) == 0
+
+
+def test_reschedule_inside_callback_beyond_target_waits():
+    clock = FakeClock()
+    wheel = TimerWheel(tick=0.05, slots=16, clock=clock)
+    fired = []
+    wheel.schedule(0.1, lambda: wheel.schedule(0.3, fired.append, 'later'))
+    clock.t += 0.2
+    wheel.advance()
+    assert fired == []
+    clock.t += 0.3
+    wheel.advance()
+    assert fired == ['later']
+
+
+def test_lagging_more_than_one_revolution():
+    clock = FakeClock()
+    wheel = TimerWheel(tick=0.05, slots=8, clock=clock)
+    fired = []
+    for delay in (0.1, 0.3, 1.0, 5.0):
+        wheel.schedule(delay, fired.append, delay)
+    clock.t += 2.0  # 휠 한 바퀴(0.4초)보다 훨씬 밀림
+    wheel.advance()
+    assert sorted(fired) == [0.1, 0.3, 1.0]
+    clock.t += 3.5
+    wheel.advance()
+    assert sorted(fired) == [0.1, 0.3, 1.0, 5.0]
@@ -31,8 +31,8 @@ class DummyPositionSender:
                 'source': 'dummy_test_sender'
             }
             
-            message = json.dumps(position_data, ensure_ascii=False)
-            sock.send(message.encode('utf-8'))
+            message = json.dumps(position_data, ensure_ascii=False) + '\n'
+            sock.sendall(message.encode('utf-8'))
             
             # 응답 수신
             response = sock.recv(1024).decode('utf-8')
@@ -62,8 +62,8 @@ class DummyPositionSender:
                 'source': 'dummy_test_sender'
             }
             
-            message = json.dumps(waypoint_data, ensure_ascii=False)
-            sock.send(message.encode('utf-8'))
+            message = json.dumps(waypoint_data, ensure_ascii=False) + '\n'
+            sock.sendall(message.encode('utf-8'))
             
             response = sock.recv(1024).decode('utf-8')
             response_data = json.loads(response)
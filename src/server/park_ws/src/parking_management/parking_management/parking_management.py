@@ -6,9 +6,12 @@ from std_msgs.msg import Int32, String
 from geometry_msgs.msg import PointStamped
 import json
 import socket
-from typing import List, Tuple, Optional
+from typing import List, Tuple
 from datetime import datetime
 import time
+from parking_common.metrics import NodeMetrics, SeqGapCounter
+from parking_common.qos_profiles import QosRegistry
+from parking_common.tracing import Tracer, mono_ns, parse_frame_id, stamp_to_ns, wall_ns
 
 class ParkingManagementNode(Node):
     def __init__(self):
@@ -17,9 +20,18 @@ class ParkingManagementNode(Node):
         # 파라미터 설정
         self.declare_parameter('teammate_ip', '192.168.225.86')
         self.declare_parameter('teammate_port', 9999)
+        self.declare_parameter('trace_export_path', '')  # 지연 추적 히스토그램 내보내기 파일 (JSON Lines, 빈 값이면 로그만)
+        self.declare_parameter('trace_period_sec', 10.0)
         
         self.teammate_ip = self.get_parameter('teammate_ip').value
         self.teammate_port = self.get_parameter('teammate_port').value
+        self.car_sock = None    # 차량 세션과 유지하는 TCP 연결 (메시지마다 새로 연결하지 않음)
+        self.car_reader = None
+        # 좌표 지연 추적 (원점 → 수신, 수신 → TCP 전송)
+        self.tracer = Tracer('parking_management',
+                             export_path=self.get_parameter('trace_export_path').value or None,
+                             period_sec=self.get_parameter('trace_period_sec').value,
+                             log=self.get_logger().info)
         
         # 주차장 설정
         self.init_parking_system()
@@ -31,6 +43,11 @@ class ParkingManagementNode(Node):
         self.current_spot_info = {}
         self.pending_requests = {}  # 배정 대기 중인 요청들
         
+        # 실시간 지표 (TCP 전송 성공/실패, /uwb/comp 시퀀스 누락 - 콜백 지연은 setup_ros_topics 에서)
+        self.metrics.gauge('pending_requests', '배정 대기 중인 요청 수', fn=lambda: len(self.pending_requests))
+        self.metrics.gauge('car_connected', '차량 세션 TCP 연결 여부', fn=lambda: int(self.car_sock is not None))
+        self.uwb_seq_gaps = SeqGapCounter(self.metrics.counter('uwb_seq_gaps_total', '/uwb/comp 시퀀스 누락 수'))
+        
         self.get_logger().info('주차장 관제 노드 시작 (TCP 통신 전용)')
         self.get_logger().info(f'팀원 노트북: {self.teammate_ip}:{self.teammate_port}')
         self.get_logger().info('UWB 실시간 좌표 전송 기능 활성화')
@@ -54,37 +71,49 @@ class ParkingManagementNode(Node):
         self.get_logger().info('주차장 시스템 초기화 완료')
     
     def setup_ros_topics(self):
-        """ROS2 토픽 설정"""
+        """ROS2 토픽 설정 - QoS 는 토픽별 레지스트리에서 (좌표: best-effort 최신값, 상태: transient-local)"""
+        self.qos = QosRegistry.from_node(self)
+        # 콜백 지연 계측 - 구독 콜백은 만들 때 self.metrics.timed 로 감쌈
+        self.metrics = NodeMetrics(self, self.qos)
+        
         # Subscribers
         self.spot_sub = self.create_subscription(
-            Int32, '/assign_spot', self.assign_spot_callback, 10)
+            Int32, '/assign_spot', self.metrics.timed(self.assign_spot_callback, '/assign_spot'), self.qos.profile('/assign_spot'))
         
+        # 전체 정보는 래치(transient-local) 토픽이라 같은 QoS로 구독해야 기동 직후에도 수신됨
         self.spot_info_sub = self.create_subscription(
-            String, '/parking/spot_info', self.spot_info_callback, 10)
+            String, '/parking/spot_info', self.metrics.timed(self.spot_info_callback, '/parking/spot_info'), self.qos.profile('/parking/spot_info'))
+        
+        self.spot_delta_sub = self.create_subscription(
+            String, '/parking/spot_delta', self.metrics.timed(self.spot_delta_callback, '/parking/spot_delta'), self.qos.profile('/parking/spot_delta'))
             
         self.spot_assignment_sub = self.create_subscription(
-            String, '/parking/spot_assignment', self.spot_assignment_callback, 10)
+            String, '/parking/spot_assignment', self.metrics.timed(self.spot_assignment_callback, '/parking/spot_assignment'), self.qos.profile('/parking/spot_assignment'))
         
         self.vehicle_info_sub = self.create_subscription(
-            String, '/uwb/vehicle_info', self.vehicle_info_callback, 10)
+            String, '/uwb/vehicle_info', self.metrics.timed(self.vehicle_info_callback, '/uwb/vehicle_info'), self.qos.profile('/uwb/vehicle_info'))
         
         # UWB 실시간 좌표 구독 추가
         self.uwb_comp_sub = self.create_subscription(
-            PointStamped, '/uwb/comp', self.uwb_comp_callback, 10)
+            PointStamped, '/uwb/comp', self.metrics.timed(self.uwb_comp_callback, '/uwb/comp'), self.qos.profile('/uwb/comp'))
         
         # Publishers
         self.spot_request_pub = self.create_publisher(
-            String, '/parking/spot_request', 10)
+            String, '/parking/spot_request', self.qos.profile('/parking/spot_request'))
         
-        self.status_pub = self.create_publisher(String, '/parking_status', 10)
-        self.waypoint_pub = self.create_publisher(String, '/waypoint_result', 10)
+        self.status_pub = self.create_publisher(String, '/parking_status', self.qos.profile('/parking_status'))
+        self.waypoint_pub = self.create_publisher(String, '/waypoint_result', self.qos.profile('/waypoint_result'))
 
     def uwb_comp_callback(self, msg):
         """UWB 실시간 좌표 수신 및 팀원에게 전송"""
+        recv_ns = mono_ns()
         try:
             frame_id = msg.header.frame_id
             if frame_id.startswith("tag_"):
-                tag_id = int(frame_id[4:])
+                tag_id, seq = parse_frame_id(frame_id)
+                self.uwb_seq_gaps.observe(tag_id, seq)
+                origin_ns = stamp_to_ns(msg.header.stamp)
+                recv_wall_ns = self.tracer.record_age('origin->mgmt', origin_ns)
                 
                 # 좌표 데이터 구성
                 position_data = {
@@ -95,11 +124,16 @@ class ParkingManagementNode(Node):
                     'y': float(msg.point.y),
                     'z': float(msg.point.z),
                     'timestamp': datetime.now().isoformat(),
-                    'source': 'parking_management_node'
+                    'source': 'parking_management_node',
+                    'ack': False,  # 고빈도 좌표는 응답 생략
+                    # 지연 추적: 원점/관제 수신/전송 벽시계 시각(ns) - 차량 GUI가 구간별로 나눠 기록
+                    'trace': {'seq': seq, 'origin_ns': origin_ns, 'mgmt_recv_ns': recv_wall_ns}
                 }
                 
                 # TCP로 실시간 좌표 전송
-                self.send_tcp_message(position_data, timeout=0.5)
+                position_data['trace']['sent_ns'] = wall_ns()
+                if self.send_tcp_message(position_data, timeout=0.5):
+                    self.tracer.record_since('mgmt', recv_ns)
                 
             else:
                 self.get_logger().warn(f'Invalid frame_id format: {frame_id}')
@@ -168,11 +202,38 @@ class ParkingManagementNode(Node):
         """관리자 프로그램으로부터 주차공간 정보 수신"""
         try:
             spot_info = json.loads(msg.data)
+            # 전체 정보가 기준 (관리자 노드 재시작으로 seq가 초기화돼도 그대로 덮어씀)
             self.current_spot_info = spot_info
             
         except json.JSONDecodeError as e:
             self.get_logger().error(f'주차공간 정보 JSON 파싱 실패: {e}')
 
+    def spot_delta_callback(self, msg):
+        """주차구역 점유 변경분 수신 - 현재 주차공간 정보에 즉시 반영"""
+        try:
+            delta = json.loads(msg.data)
+        except json.JSONDecodeError as e:
+            self.get_logger().error(f'주차공간 변경분 JSON 파싱 실패: {e}')
+            return
+        
+        seq = delta.get('seq', 0)
+        last_seq = self.current_spot_info.get('seq', 0)
+        if seq <= last_seq:
+            return
+        if seq != last_seq + 1:
+            # 중간 변경분 유실 - 가용 개수는 변경분에 전체가 실려 오므로 그대로 반영,
+            # 점유 목록은 다음 전체 정보 수신 시 보정됨
+            self.get_logger().warn(f'주차공간 변경분 순번 누락: {last_seq} -> {seq}')
+        
+        occupied = set(self.current_spot_info.get('occupied_spots', []))
+        if delta['occupied']:
+            occupied.add(delta['spot'])
+        else:
+            occupied.discard(delta['spot'])
+        self.current_spot_info['seq'] = seq
+        self.current_spot_info['available_spots'] = delta['available_spots']
+        self.current_spot_info['occupied_spots'] = sorted(occupied)
+
     def spot_assignment_callback(self, msg):
         """관리자 프로그램으로부터 주차공간 배정 결과 수신"""
         try:
@@ -281,24 +342,32 @@ class ParkingManagementNode(Node):
         return self.send_tcp_message(data, timeout=5.0, expect_response=True)
     
     def send_tcp_message(self, data: dict, timeout: float = 5.0, expect_response: bool = False) -> bool:
-        """TCP로 메시지 전송 (공통 함수)"""
+        """TCP로 메시지 전송 (공통 함수) - 차량 세션과의 연결을 유지하며 재사용, 유휴 연결이 끊겨 있으면 한 번 재연결"""
+        message = (json.dumps(data, ensure_ascii=False) + '\n').encode('utf-8')  # 수신측은 줄바꿈 단위로 메시지를 구분
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(timeout)
-            sock.connect((self.teammate_ip, self.teammate_port))
-            
-            message = json.dumps(data, ensure_ascii=False)
-            sock.send(message.encode('utf-8'))
+            try:
+                self.write_car_message(message, timeout)
+            except OSError as e:
+                if self.car_sock is None or isinstance(e, socket.timeout):
+                    raise  # 새 연결 실패나 전송 중 타임아웃(일부 전송됐을 수 있음)은 재시도하지 않음
+                # 유휴 중 끊긴 연결이면 새 연결로 한 번 더 시도 (아직 한 바이트도 전달되지 않은 상태)
+                self.close_car_connection()
+                self.write_car_message(message, timeout)
             
+            # sendall 이후 실패는 차량이 이미 메시지를 받았을 수 있으므로 재전송하지 않고 실패로 보고
             if expect_response:
-                response = sock.recv(1024).decode('utf-8')
-                response_data = json.loads(response)
+                response = self.car_reader.readline()
+                if not response:
+                    raise ConnectionError('차량이 연결을 종료함')
+                response_data = json.loads(response.decode('utf-8'))
                 self.get_logger().info(f'팀원 응답: {response_data.get("status", "unknown")}')
             
-            sock.close()
+            self.metrics.counter('tcp_send_total', 'TCP 전송 성공 수', labels={'type': data.get('type', '')}).inc()
             return True
             
         except Exception as e:
+            self.close_car_connection()
+            self.metrics.counter('tcp_send_failures_total', 'TCP 전송 실패 수', labels={'type': data.get('type', '')}).inc()
             if data.get('type') == 'real_time_position':
                 # 실시간 좌표는 debug 레벨로
                 self.get_logger().debug(f'TCP 전송 실패: {e}')
@@ -306,6 +375,25 @@ class ParkingManagementNode(Node):
                 self.get_logger().error(f'TCP 전송 오류: {e}')
             return False
     
+    def write_car_message(self, message: bytes, timeout: float):
+        """차량 세션 연결이 없으면 새로 연결한 뒤 메시지 전송"""
+        if self.car_sock is None:
+            sock = socket.create_connection((self.teammate_ip, self.teammate_port), timeout=timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.car_sock, self.car_reader = sock, sock.makefile('rb')
+        self.car_sock.settimeout(timeout)
+        self.car_sock.sendall(message)
+    
+    def close_car_connection(self):
+        """차량 세션 연결 정리"""
+        for f in (self.car_reader, self.car_sock):
+            if f is not None:
+                try:
+                    f.close()
+                except OSError:
+                    pass
+        self.car_sock = self.car_reader = None
+    
     def get_route_description(self, spot_number: int) -> str:
         """경로 설명 생성"""
         spot_type = "장애인 구역" if spot_number in [1, 6, 7] else \
@@ -357,6 +445,8 @@ class ParkingManagementNode(Node):
     def destroy_node(self):
         """노드 종료 시 정리"""
         self.get_logger().info('주차장 관제 노드를 종료합니다...')
+        self.close_car_connection()
+        self.tracer.export()
         self.get_logger().info('노드 종료 완료')
         super().destroy_node()
 
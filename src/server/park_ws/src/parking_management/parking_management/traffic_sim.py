@@ -0,0 +1,566 @@
+#!/usr/bin/env python3
+"""이산 사건 교통 시뮬레이터 - 서버 노드 부하 테스트용
+
+시드 고정 난수로 차량 도착(포아송/고정 간격/러시), 차종 비율, 목적지, 주차 시간을 생성하고
+주차장 차선을 따라 차량을 움직이며 게이트/UWB 브리지와 같은 형식으로
+/parking/auth_req, /uwb/pos(또는 /uwb/comp), /parking/exit_req, /parking/barrier_event 를 발행한다.
+차량은 서버가 /parking/spot_assignment 로 배정한 구역으로 가고, 입차 시점까지 배정이 없거나
+배정 구역이 이미 차 있으면 시뮬레이터가 직접 고른 구역으로 간다.
+시뮬레이션 시계는 벽시계와 분리되어 있어 time_scale 배속(0이면 최대 속도)으로 실행되며,
+/clock 과 메시지 stamp 도 시뮬레이션 시각이므로 서버 노드를 use_sim_time:=true 로 띄우면 같은 배속으로 판정한다.
+"""
+
+import heapq
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import rclpy
+from rclpy.node import Node
+from geometry_msgs.msg import PointStamped
+from rosgraph_msgs.msg import Clock
+from std_msgs.msg import String
+
+from parking_common.qos_profiles import QosRegistry
+
+Point = Tuple[float, float]
+
+# 주차장 모델 (장면 좌표 mm, parking_exe / parking_management 와 동일)
+ENTRANCE = (200.0, 200.0)             # 입구/출구 게이트
+MANDATORY_WAYPOINT = (200.0, 925.0)
+LOWER_LANE_Y, UPPER_LANE_Y = 925.0, 1475.0
+LEFT_LANE_X, RIGHT_LANE_X = 200.0, 1475.0
+SPOT_WAYPOINTS = {
+    1: (200, 1475), 2: (550, 1475), 3: (850, 1475), 4: (1150, 1475), 5: (1450, 1475),
+    6: (1475, 1400), 7: (1475, 1000),
+    8: (1475, 925), 9: (1150, 925), 10: (850, 925), 11: (550, 925),
+}
+SPOT_CENTERS = {
+    1: (200, 1800), 2: (550, 1800), 3: (850, 1800), 4: (1150, 1800), 5: (1450, 1800),
+    6: (1800, 1400), 7: (1800, 1000),
+    8: (1450, 600), 9: (1150, 600), 10: (850, 600), 11: (550, 600),
+}
+SPOT_CATEGORIES = {
+    'disabled': [1, 6, 7],
+    'elec': [4, 5, 10, 11],
+    'general': [2, 3, 8, 9],
+}
+# 빈 구역이 없을 때 도는 순환 차선
+CRUISE_LOOP = [MANDATORY_WAYPOINT, (RIGHT_LANE_X, LOWER_LANE_Y), (RIGHT_LANE_X, UPPER_LANE_Y),
+               (LEFT_LANE_X, UPPER_LANE_Y), MANDATORY_WAYPOINT]
+TAG_IDS = range(10, 100)              # uwb_coordinate_parser 가 허용하는 2자리 tag_id
+VEHICLE_ID_PREFIX = 'SIM'
+
+ARRIVAL_PROCESSES = ('poisson', 'fixed', 'burst')
+
+
+def spot_route(spot_id: int) -> List[Point]:
+    """입구 -> 필수 경유점 -> 차선 -> 주차구역 중앙"""
+    wx, wy = SPOT_WAYPOINTS[spot_id]
+    route = [ENTRANCE, MANDATORY_WAYPOINT]
+    if wy == UPPER_LANE_Y:
+        route.append((LEFT_LANE_X, UPPER_LANE_Y))
+    elif wx == RIGHT_LANE_X and wy != LOWER_LANE_Y:
+        route.append((RIGHT_LANE_X, LOWER_LANE_Y))
+    route += [(float(wx), float(wy)), tuple(map(float, SPOT_CENTERS[spot_id]))]
+    return [p for i, p in enumerate(route) if i == 0 or p != route[i - 1]]
+
+
+def polyline_length(points: List[Point]) -> float:
+    return sum(math.dist(points[i], points[i + 1]) for i in range(len(points) - 1))
+
+
+def point_along(points: List[Point], distance: float) -> Point:
+    """폴리라인 시작점에서 distance 만큼 진행한 위치"""
+    for i in range(len(points) - 1):
+        seg = math.dist(points[i], points[i + 1])
+        if distance <= seg and seg > 0:
+            r = distance / seg
+            return (points[i][0] + (points[i + 1][0] - points[i][0]) * r,
+                    points[i][1] + (points[i + 1][1] - points[i][1]) * r)
+        distance -= seg
+    return points[-1]
+
+
+@dataclass
+class SimConfig:
+    """시뮬레이션 설정 (시간 단위: 시뮬레이션 초, 거리 단위: mm)"""
+    seed: int = 0
+    duration_sec: float = 3600.0
+    arrival_process: str = 'poisson'
+    arrivals_per_hour: float = 60.0
+    burst_factor: float = 4.0           # burst: 러시 구간 도착률 배수
+    burst_period_sec: float = 900.0
+    burst_length_sec: float = 180.0
+    elec_ratio: float = 0.25
+    disabled_ratio: float = 0.1
+    dwell_mean_sec: float = 300.0       # 주차 시간 (지수 분포 평균 + 최소값)
+    dwell_min_sec: float = 30.0
+    drive_speed: float = 400.0          # mm/s
+    pos_hz: float = 10.0                # 주행 중 UWB 발행 주기
+    parked_hz: float = 1.0              # 주차 중 UWB 발행 주기 (신호 손실 판정 방지)
+    position_noise: float = 15.0        # UWB 측정 잡음 표준편차 (mm)
+    gate_service_sec: float = 4.0       # 인증 ~ 차단기 닫힘까지 게이트 점유 시간
+    cruise_patience_sec: float = 300.0  # 빈 구역을 기다리며 순환하는 최대 시간
+
+
+@dataclass(order=True)
+class _Event:
+    time: float
+    seq: int
+    kind: str = field(compare=False)
+    vehicle: Optional['SimVehicle'] = field(compare=False, default=None)
+    token: int = field(compare=False, default=0)
+
+
+@dataclass
+class SimVehicle:
+    """시뮬레이션 차량 상태"""
+    index: int
+    vehicle_id: str
+    elec: bool
+    disabled: bool
+    preferred: str
+    destination: int
+    arrival_time: float
+    tag_id: Optional[int] = None
+    state: str = 'queued'               # queued / entering / driving / cruising / parked / leaving / exiting / done
+    spot: Optional[int] = None
+    path: List[Point] = field(default_factory=list)
+    path_length: float = 0.0
+    path_start: float = 0.0
+    position: Point = ENTRANCE
+    motion_token: int = 0               # 경로가 바뀌면 이전 도착/위치 이벤트 무효화
+    cruise_since: float = 0.0
+
+
+class TrafficSimulator:
+    """이벤트 큐(heap) 기반 주차장 교통 시뮬레이터
+
+    emit(topic, payload, sim_time)으로 메시지를 내보내며, 같은 설정/시드면 항상 같은 메시지 열을 만든다.
+    topic 은 'auth_req' / 'pos' / 'exit_req' / 'barrier_event' 이고 pos payload 의 좌표는 mm 단위.
+    """
+
+    def __init__(self, config: SimConfig, emit: Callable[[str, dict, float], None]):
+        if config.arrival_process not in ARRIVAL_PROCESSES:
+            raise ValueError(f'알 수 없는 도착 과정: {config.arrival_process} ({", ".join(ARRIVAL_PROCESSES)})')
+        self.config = config
+        self.emit = emit
+        # 용도별 난수열 분리 (도착 과정을 바꿔도 차종/잡음 난수열은 그대로)
+        self.rng_arrival = random.Random(f'{config.seed}-arrival')
+        self.rng_vehicle = random.Random(f'{config.seed}-vehicle')
+        self.rng_noise = random.Random(f'{config.seed}-noise')
+        self.now = 0.0
+        self._queue: List[_Event] = []
+        self._seq = 0
+        self.free_tags: List[int] = list(TAG_IDS)
+        self.free_spots: Dict[int, bool] = {spot: True for spot in SPOT_CENTERS}
+        self.entry_queue: List[SimVehicle] = []
+        self.exit_queue: List[SimVehicle] = []
+        self.entry_busy = False
+        self.exit_busy = False
+        self.vehicles: List[SimVehicle] = []
+        self.active = 0
+        self.assignments: Dict[str, Optional[int]] = {}  # vehicle_id -> 서버 배정 구역 (다른 스레드에서 기록)
+        self._assign_lock = threading.Lock()
+        self.stats = {'arrived': 0, 'entered': 0, 'parked': 0, 'gave_up': 0, 'exited': 0,
+                      'peak_active': 0, 'peak_entry_queue': 0,
+                      'server_spots': 0, 'local_spots': 0, 'assignment_conflicts': 0,
+                      'messages': {'auth_req': 0, 'pos': 0, 'exit_req': 0, 'barrier_event': 0}}
+
+    # ---------------- 이벤트 큐 ----------------
+
+    def schedule(self, delay: float, kind: str, vehicle: Optional[SimVehicle] = None, token: int = 0):
+        self._seq += 1
+        heapq.heappush(self._queue, _Event(self.now + delay, self._seq, kind, vehicle, token))
+
+    def run(self, until: Optional[float] = None, pace: Optional[Callable[[float], bool]] = None):
+        """until(시뮬레이션 초)까지 이벤트 처리, pace(sim_time)가 False 를 반환하면 중단"""
+        until = self.config.duration_sec if until is None else until
+        if not self._queue and self.now == 0.0:
+            self.schedule(self.next_interarrival(), 'arrival')
+        while self._queue and self._queue[0].time <= until:
+            event = heapq.heappop(self._queue)
+            if pace is not None and not pace(event.time):
+                heapq.heappush(self._queue, event)
+                return
+            self.now = event.time
+            getattr(self, '_on_' + event.kind)(event)
+        self.now = max(self.now, until)
+
+    def _publish(self, topic: str, payload: dict):
+        self.stats['messages'][topic] += 1
+        self.emit(topic, payload, self.now)
+
+    # ---------------- 도착 과정 / 차량 생성 ----------------
+
+    def arrival_rate(self, t: float) -> float:
+        """시각 t 의 도착률 (대/초)"""
+        rate = self.config.arrivals_per_hour / 3600.0
+        if self.config.arrival_process == 'burst' and t % self.config.burst_period_sec < self.config.burst_length_sec:
+            rate *= self.config.burst_factor
+        return rate
+
+    def next_interarrival(self) -> float:
+        cfg = self.config
+        base = cfg.arrivals_per_hour / 3600.0
+        if base <= 0:
+            return math.inf
+        if cfg.arrival_process == 'fixed':
+            return 1.0 / base
+        if cfg.arrival_process == 'poisson':
+            return self.rng_arrival.expovariate(base)
+        # burst: 최대 도착률로 후보를 뽑고 시각별 도착률 비율로 솎아내는 비균질 포아송 과정
+        peak = base * max(1.0, cfg.burst_factor)
+        t = self.now
+        while True:
+            t += self.rng_arrival.expovariate(peak)
+            if self.rng_arrival.random() * peak <= self.arrival_rate(t):
+                return t - self.now
+
+    def make_vehicle(self) -> SimVehicle:
+        rng = self.rng_vehicle
+        index = len(self.vehicles) + 1
+        disabled = rng.random() < self.config.disabled_ratio
+        elec = rng.random() < self.config.elec_ratio
+        preferred = 'disabled' if disabled else 'elec' if elec else 'normal'
+        return SimVehicle(index=index, vehicle_id=f'{VEHICLE_ID_PREFIX}{index:05d}', elec=elec, disabled=disabled,
+                          preferred=preferred, destination=rng.randrange(3), arrival_time=self.now)
+
+    def _on_arrival(self, event: _Event):
+        vehicle = self.make_vehicle()
+        self.vehicles.append(vehicle)
+        self.stats['arrived'] += 1
+        self.entry_queue.append(vehicle)
+        self.stats['peak_entry_queue'] = max(self.stats['peak_entry_queue'], len(self.entry_queue))
+        self._serve_entry()
+        delay = self.next_interarrival()
+        if self.now + delay <= self.config.duration_sec:
+            self.schedule(delay, 'arrival')
+
+    # ---------------- 게이트 ----------------
+
+    def _serve_entry(self):
+        # tag 가 모두 사용 중이면 출차로 tag 가 반납될 때까지 게이트 앞에서 대기
+        if self.entry_busy or not self.entry_queue or not self.free_tags:
+            return
+        vehicle = self.entry_queue.pop(0)
+        vehicle.tag_id = self.free_tags.pop(0)
+        vehicle.state = 'entering'
+        self.entry_busy = True
+        self.active += 1
+        self.stats['peak_active'] = max(self.stats['peak_active'], self.active)
+        self._publish('auth_req', {
+            'vehicle_id': vehicle.vehicle_id, 'tag_id': vehicle.tag_id, 'elec': vehicle.elec,
+            'disabled': vehicle.disabled, 'preferred': vehicle.preferred, 'destination': vehicle.destination,
+        })
+        self.schedule(self.config.gate_service_sec, 'entry_passed', vehicle)
+
+    def _on_entry_passed(self, event: _Event):
+        vehicle = event.vehicle
+        self._publish('barrier_event', {'gate': 'entry', 'state': 'closed'})
+        self.entry_busy = False
+        self.stats['entered'] += 1
+        self._head_for_spot(vehicle)
+        self._serve_entry()
+
+    def _serve_exit(self):
+        if self.exit_busy or not self.exit_queue:
+            return
+        vehicle = self.exit_queue.pop(0)
+        vehicle.state = 'exiting'
+        self.exit_busy = True
+        self._publish('exit_req', {'tag_id': vehicle.tag_id})
+        self.schedule(self.config.gate_service_sec, 'exit_passed', vehicle)
+
+    def _on_exit_passed(self, event: _Event):
+        vehicle = event.vehicle
+        self._publish('barrier_event', {'gate': 'exit', 'state': 'closed'})
+        self.exit_busy = False
+        vehicle.state = 'done'
+        vehicle.motion_token += 1
+        self.free_tags.append(vehicle.tag_id)
+        with self._assign_lock:
+            self.assignments.pop(vehicle.vehicle_id, None)
+        self.active -= 1
+        self.stats['exited'] += 1
+        self._serve_exit()
+        self._serve_entry()
+
+    # ---------------- 주행 ----------------
+
+    def assign(self, vehicle_id: str, spot: Optional[int]):
+        """서버 배정 결과 기록 (ROS 콜백 스레드에서 호출) - 차량이 구역으로 출발할 때 사용"""
+        with self._assign_lock:
+            self.assignments[vehicle_id] = spot
+
+    def choose_spot(self, vehicle: SimVehicle) -> Optional[int]:
+        """서버가 배정한 빈 구역, 배정이 없거나 이미 차 있으면 pick_spot"""
+        with self._assign_lock:
+            assigned = self.assignments.pop(vehicle.vehicle_id, None)
+        if assigned is not None:
+            if self.free_spots.get(assigned):
+                self.stats['server_spots'] += 1
+                return assigned
+            self.stats['assignment_conflicts'] += 1
+        spot = self.pick_spot(vehicle)
+        if spot is not None:
+            self.stats['local_spots'] += 1
+        return spot
+
+    def pick_spot(self, vehicle: SimVehicle) -> Optional[int]:
+        """차종에 맞는 빈 구역 (없으면 일반 구역, 장애인 구역은 장애인 차량만)"""
+        categories = ['disabled'] if vehicle.disabled else []
+        categories += ['elec'] if vehicle.elec else []
+        categories += ['general']
+        for category in categories:
+            for spot in SPOT_CATEGORIES[category]:
+                if self.free_spots[spot]:
+                    return spot
+        return None
+
+    def _head_for_spot(self, vehicle: SimVehicle):
+        spot = self.choose_spot(vehicle)
+        if spot is not None:
+            self.free_spots[spot] = False
+            vehicle.spot = spot
+            vehicle.state = 'driving'
+            route = spot_route(spot)
+            if vehicle.position != ENTRANCE:
+                # 순환 중이던 차량은 순환 끝인 필수 경유점부터 출발
+                route = route[route.index(MANDATORY_WAYPOINT):]
+            self._start_motion(vehicle, route)
+            return
+        if vehicle.state != 'cruising':
+            vehicle.state = 'cruising'
+            vehicle.cruise_since = self.now
+        start = [ENTRANCE] if vehicle.position == ENTRANCE else []
+        self._start_motion(vehicle, start + CRUISE_LOOP)
+
+    def _start_motion(self, vehicle: SimVehicle, path: List[Point]):
+        vehicle.motion_token += 1
+        vehicle.path = [tuple(map(float, p)) for p in path]
+        vehicle.path_length = polyline_length(vehicle.path)
+        vehicle.path_start = self.now
+        self.schedule(vehicle.path_length / self.config.drive_speed, 'path_end', vehicle, vehicle.motion_token)
+        self.schedule(0.0, 'position', vehicle, vehicle.motion_token)
+
+    def _on_path_end(self, event: _Event):
+        vehicle = event.vehicle
+        if event.token != vehicle.motion_token:
+            return
+        vehicle.position = vehicle.path[-1]
+        if vehicle.state == 'driving':
+            vehicle.state = 'parked'
+            self.stats['parked'] += 1
+            dwell = self.config.dwell_min_sec + self.rng_vehicle.expovariate(1.0 / max(self.config.dwell_mean_sec, 1e-6))
+            self.schedule(dwell, 'depart', vehicle, vehicle.motion_token)
+        elif vehicle.state == 'cruising':
+            if self.now - vehicle.cruise_since >= self.config.cruise_patience_sec:
+                self.stats['gave_up'] += 1
+                self._leave(vehicle)
+            else:
+                self._head_for_spot(vehicle)
+        elif vehicle.state == 'leaving':
+            vehicle.state = 'queued_exit'
+            self.exit_queue.append(vehicle)
+            self._serve_exit()
+
+    def _on_depart(self, event: _Event):
+        vehicle = event.vehicle
+        if event.token != vehicle.motion_token:
+            return
+        self.free_spots[vehicle.spot] = True
+        self._leave(vehicle)
+        # 구역이 비면 순환 중인 차량이 다음 순환 끝에서 들어감
+
+    def _leave(self, vehicle: SimVehicle):
+        vehicle.state = 'leaving'
+        if vehicle.spot is not None:
+            path = list(reversed(spot_route(vehicle.spot)))
+        else:
+            path = [vehicle.position, ENTRANCE]
+        self._start_motion(vehicle, path)
+
+    def _on_position(self, event: _Event):
+        vehicle = event.vehicle
+        # 경로가 바뀌었거나 출차가 끝난 차량의 이전 발행 주기는 버림 (주차/출차 대기 중에는 같은 주기로 계속 발행)
+        if event.token != vehicle.motion_token:
+            return
+        cfg = self.config
+        moving = vehicle.state in ('driving', 'cruising', 'leaving')
+        if moving:
+            vehicle.position = point_along(vehicle.path, (self.now - vehicle.path_start) * cfg.drive_speed)
+        x, y = vehicle.position
+        if cfg.position_noise > 0:
+            x += self.rng_noise.gauss(0.0, cfg.position_noise)
+            y += self.rng_noise.gauss(0.0, cfg.position_noise)
+        self._publish('pos', {'tag_id': vehicle.tag_id, 'x': x, 'y': y})
+        hz = cfg.pos_hz if moving else cfg.parked_hz
+        if hz > 0:
+            self.schedule(1.0 / hz, 'position', vehicle, event.token)
+
+
+class TrafficSimNode(Node):
+    """시뮬레이터 메시지를 게이트/UWB 브리지와 같은 토픽으로 발행하는 노드"""
+
+    def __init__(self):
+        super().__init__('traffic_sim_node')
+
+        defaults = SimConfig()
+        for name, value in vars(defaults).items():
+            self.declare_parameter(name, value)
+        # 시뮬레이션 초 / 벽시계 초 (0 이하면 최대 속도 - 서버 배정을 기다리지 못해 대부분 직접 고른 구역으로 감)
+        # 서버 노드를 use_sim_time 없이 띄우면 주차/신호 손실 판정이 벽시계 기준이므로 dwell_min_sec 도 함께 늘릴 것
+        self.declare_parameter('time_scale', 20.0)
+        self.declare_parameter('clock_hz', 100.0)  # /clock 발행 주기 (벽시계 기준, 0 이하면 발행 안 함)
+        self.declare_parameter('position_topic', '/uwb/pos')  # /uwb/pos(m, 파서 경유) 또는 /uwb/comp(mm, 직접)
+        self.declare_parameter('report_period_sec', 60.0)
+
+        self.config = SimConfig(**{name: type(value)(self.get_parameter(name).value)
+                                   for name, value in vars(defaults).items()})
+        self.time_scale = float(self.get_parameter('time_scale').value)
+        self.position_topic = self.get_parameter('position_topic').value
+        self.report_period = float(self.get_parameter('report_period_sec').value)
+        clock_hz = float(self.get_parameter('clock_hz').value)
+        self.clock_period = 1.0 / clock_hz if clock_hz > 0 else 0.0
+        self.position_scale = 0.001 if self.position_topic == '/uwb/pos' else 1.0
+
+        # 서버 노드와 같은 토픽별 QoS (좌표 토픽이 best-effort 면 발행도 best-effort 로 맞춤)
+        self.qos = QosRegistry.from_node(self)
+        self.auth_req_pub = self.create_publisher(String, '/parking/auth_req', self.qos.profile('/parking/auth_req'))
+        self.exit_req_pub = self.create_publisher(String, '/parking/exit_req', self.qos.profile('/parking/exit_req'))
+        self.barrier_event_pub = self.create_publisher(String, '/parking/barrier_event',
+                                                       self.qos.profile('/parking/barrier_event'))
+        self.position_pub = self.create_publisher(PointStamped, self.position_topic, self.qos.profile(self.position_topic))
+        self.clock_pub = self.create_publisher(Clock, '/clock', self.qos.profile('/clock'))
+
+        self.simulator = TrafficSimulator(self.config, self.emit)
+        self.spot_assignment_sub = self.create_subscription(
+            String, '/parking/spot_assignment', self.spot_assignment_callback, self.qos.profile('/parking/spot_assignment'))
+        self.running = False
+        self.finished = threading.Event()
+        self.wall_start = 0.0
+        self.epoch_ns = 0          # 시뮬레이션 0초에 해당하는 ROS 시각 (시작 시 벽시계)
+        self.last_clock = -1.0
+        self.last_clock_wall = 0.0
+        self.next_report = self.report_period
+
+        self.get_logger().info(
+            f'교통 시뮬레이터: seed={self.config.seed}, {self.config.arrival_process} '
+            f'{self.config.arrivals_per_hour:.0f}대/h, {self.config.duration_sec:.0f}s, '
+            f'x{self.time_scale:g} 배속, 위치 토픽 {self.position_topic}')
+
+    def spot_assignment_callback(self, msg):
+        """서버 배정 결과 중 시뮬레이션 차량 것만 시뮬레이터에 전달"""
+        try:
+            data = json.loads(msg.data)
+        except json.JSONDecodeError:
+            return
+        vehicle_id = str(data.get('vehicle_id') or '')
+        if vehicle_id.startswith(VEHICLE_ID_PREFIX):
+            self.simulator.assign(vehicle_id, data.get('assigned_spot'))
+
+    def set_stamp(self, stamp, sim_time: float):
+        stamp.sec, stamp.nanosec = divmod(self.epoch_ns + int(sim_time * 1e9), 1_000_000_000)
+
+    def publish_clock(self, sim_time: float):
+        """시뮬레이션 시각을 /clock 으로 발행 (clock_hz 로 제한, 되돌아가지 않음)"""
+        now = time.monotonic()
+        if self.clock_period <= 0 or sim_time <= self.last_clock or now - self.last_clock_wall < self.clock_period:
+            return
+        msg = Clock()
+        self.set_stamp(msg.clock, sim_time)
+        self.clock_pub.publish(msg)
+        self.last_clock, self.last_clock_wall = sim_time, now
+
+    def emit(self, topic: str, payload: dict, sim_time: float):
+        if topic == 'pos':
+            msg = PointStamped()
+            self.set_stamp(msg.header.stamp, sim_time)
+            msg.header.frame_id = f"tag_{payload['tag_id']}"
+            msg.point.x = payload['x'] * self.position_scale
+            msg.point.y = payload['y'] * self.position_scale
+            msg.point.z = 0.0
+            self.position_pub.publish(msg)
+            return
+        msg = String()
+        msg.data = json.dumps(payload)
+        {'auth_req': self.auth_req_pub, 'exit_req': self.exit_req_pub,
+         'barrier_event': self.barrier_event_pub}[topic].publish(msg)
+
+    def pace(self, sim_time: float) -> bool:
+        """이벤트 시각까지 벽시계 대기 (배속 적용), 주기 보고"""
+        if not self.running:
+            return False
+        if sim_time >= self.next_report:
+            self.report(sim_time)
+            self.next_report += self.report_period
+        if self.time_scale > 0:
+            target = self.wall_start + sim_time / self.time_scale
+            # 다음 이벤트까지 기다리는 동안에도 /clock 이 흐르도록 나눠서 대기
+            while self.running:
+                now = time.monotonic()
+                if now >= target:
+                    break
+                self.publish_clock((now - self.wall_start) * self.time_scale)
+                time.sleep(min(target - now, self.clock_period) if self.clock_period > 0 else target - now)
+            if not self.running:
+                return False
+        self.publish_clock(sim_time)
+        return True
+
+    def start(self):
+        self.running = True
+        self.wall_start = time.monotonic()
+        self.epoch_ns = time.time_ns()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        try:
+            self.simulator.run(pace=self.pace)
+            self.report(self.simulator.now, final=True)
+        except Exception as e:
+            self.get_logger().error(f'시뮬레이션 오류: {e}')
+        finally:
+            self.running = False
+            self.finished.set()
+
+    def report(self, sim_time: float, final: bool = False):
+        stats = self.simulator.stats
+        wall = max(time.monotonic() - self.wall_start, 1e-6)
+        published = sum(stats['messages'].values())
+        self.get_logger().info(
+            f"{'[완료] ' if final else ''}sim {sim_time:.0f}s / wall {wall:.1f}s (x{sim_time / wall:.1f}) | "
+            f"도착 {stats['arrived']} 입차 {stats['entered']} 주차 {stats['parked']} 출차 {stats['exited']} "
+            f"포기 {stats['gave_up']} | 운행 {self.simulator.active} (최대 {stats['peak_active']}) "
+            f"입구 대기 {len(self.simulator.entry_queue)} (최대 {stats['peak_entry_queue']}) | "
+            f"발행 {published}건 ({published / wall:.0f}/s) {stats['messages']}")
+
+    def stop(self):
+        self.running = False
+
+
+def main(args=None):
+    rclpy.init(args=args)
+
+    node = TrafficSimNode()
+    node.start()
+
+    try:
+        while rclpy.ok() and not node.finished.is_set():
+            rclpy.spin_once(node, timeout_sec=0.1)
+    except KeyboardInterrupt:
+        node.get_logger().info('Ctrl+C로 종료 요청됨')
+        node.stop()
+    finally:
+        node.destroy_node()
+        rclpy.shutdown()
+
+
+if __name__ == '__main__':
+    main()
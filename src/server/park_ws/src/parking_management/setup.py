@@ -27,6 +27,7 @@ setup(
     entry_points={
         'console_scripts': [
             'parking_management = parking_management.parking_management:main',
+            'traffic_sim = parking_management.traffic_sim:main',
         ],
     },
 )
\ No newline at end of file
@@ -7,6 +7,13 @@ from std_msgs.msg import String
 import json
 import re
 import time
+from parking_common.journal import open_journal
+from parking_common.metrics import NodeMetrics, SeqGapCounter
+from parking_common.qos_profiles import QosRegistry
+from parking_common.tracing import Tracer, format_frame_id, mono_ns, parse_frame_id, stamp_to_ns
+
+
+JOURNAL_SYNC_SEC = 0.05  # 상태 저널 fsync 주기 (전원 차단 시 잃을 수 있는 최대 구간)
 
 
 class UWBControlSystem(Node):
@@ -21,6 +28,9 @@ class UWBControlSystem(Node):
         self.declare_parameter('track_start_topic', '/uwb/track_start') #uwb 추적 시작 명령 토픽
         self.declare_parameter('track_stop_topic', '/uwb/track_stop') #uwb 추적 중단 명령 토픽
         self.declare_parameter('frame_id', 'uwb_frame') #uwb에 부여하는 추적 번호 id 값
+        self.declare_parameter('trace_export_path', '') #지연 추적 히스토그램 내보내기 파일 (JSON Lines, 빈 값이면 로그만)
+        self.declare_parameter('trace_period_sec', 10.0) #지연 추적 내보내기 주기 (0이면 내보내지 않음)
+        self.declare_parameter('journal_dir', '~/.parking_state') #추적/출차 대기 상태 저널 디렉터리 (빈 값이면 재시작 시 복구 안 함)
         
         # 파라미터 가져오기
         parking_input_topic = self.get_parameter('parking_input_topic').value
@@ -31,6 +41,13 @@ class UWBControlSystem(Node):
         track_stop_topic = self.get_parameter('track_stop_topic').value
         self.frame_id = self.get_parameter('frame_id').value
         
+        # === 지연 추적 (ESP32 측정 → 수신, 수신 → /uwb/comp 발행) ===
+        self.tracer = Tracer('uwb_parser',
+                             export_path=self.get_parameter('trace_export_path').value or None,
+                             period_sec=self.get_parameter('trace_period_sec').value,
+                             log=self.get_logger().info)
+        self.uwb_seq = {}  # tag_id: 마지막으로 붙인 시퀀스 번호 (브리지가 시퀀스를 안 붙인 경우)
+        
         # === 차량 번호 → tag_id 매핑 ===
         self.vehicle_to_tag = {}  # 차량번호: tag_id
         self.active_trackings = {}  # tag_id: {"vehicle_id": str, "start_time": float}
@@ -41,37 +58,49 @@ class UWBControlSystem(Node):
         # === 중복 요청 방지 ===
         self.recent_requests = {}  # vehicle_id: timestamp (중복 요청 방지)
         
+        # 토픽별 QoS (좌표는 best-effort 최신값, 상태는 transient-local - parking_common.qos_profiles)
+        self.qos = QosRegistry.from_node(self)
+        
+        # === 실시간 지표 (구독/타이머 콜백은 만들 때 self.metrics.timed 로 감싸 지연 계측) ===
+        self.metrics = NodeMetrics(self, self.qos)
+        
+        # === 상태 저널 (재시작 시 추적 중인 차량 복구 - 입차 인증을 다시 받지 않도록) ===
+        self.journal = open_journal(self.get_parameter('journal_dir').value, self.get_name())
+        if self.journal is not None:
+            self.restore_tracking_state()
+            self.journal_timer = self.create_timer(JOURNAL_SYNC_SEC, self.metrics.timed(self.journal.sync))
+        
         # === Subscribers ===
         # 주차 차단기로부터 차량 ID 수신
         self.parking_subscription = self.create_subscription(
             String,
             parking_input_topic,
-            self.parking_callback,
-            10
+            self.metrics.timed(self.parking_callback, parking_input_topic),
+            self.qos.profile(parking_input_topic)
         )
         
         # UWB 모듈로부터 좌표 수신
         self.uwb_subscription = self.create_subscription(
             PointStamped,
             uwb_pos_topic,
-            self.uwb_pos_callback,
-            10
+            self.metrics.timed(self.uwb_pos_callback, uwb_pos_topic),
+            self.qos.profile(uwb_pos_topic)
         )
         
         # 출차 요청 수신 (새로 추가)
         self.exit_subscription = self.create_subscription(
             String,
             '/parking/exit_req',
-            self.exit_request_callback,
-            10
+            self.metrics.timed(self.exit_request_callback, '/parking/exit_req'),
+            self.qos.profile('/parking/exit_req')
         )
         
         # 차단기 이벤트 수신 (새로 추가)
         self.barrier_event_subscription = self.create_subscription(
             String,
             '/parking/barrier_event',
-            self.barrier_event_callback,
-            10
+            self.metrics.timed(self.barrier_event_callback, '/parking/barrier_event'),
+            self.qos.profile('/parking/barrier_event')
         )
         
         # === Publishers ===
@@ -79,44 +108,53 @@ class UWBControlSystem(Node):
         self.barrier_cmd_publisher = self.create_publisher(
             String,
             parking_output_topic,
-            10
+            self.qos.profile(parking_output_topic)
         )
         
         # UWB 추적 시작 명령
         self.track_start_publisher = self.create_publisher(
             String,
             track_start_topic,
-            10
+            self.qos.profile(track_start_topic)
         )
         
         # UWB 추적 종료 명령
         self.track_stop_publisher = self.create_publisher(
             String,
             track_stop_topic,
-            10
+            self.qos.profile(track_stop_topic)
         )
         
         # 처리된 UWB 좌표 발행
         self.uwb_comp_publisher = self.create_publisher(
             PointStamped,
             uwb_comp_topic,
-            10
+            self.qos.profile(uwb_comp_topic)
         )
         
         # 차량 타입 정보 발행 (주차장 모니터링용)
         self.vehicle_info_publisher = self.create_publisher(
             String,
             '/uwb/vehicle_info',
-            10
+            self.qos.profile('/uwb/vehicle_info')
         )
         
         # === 통계 변수 ===
         self.total_parking_requests = 0
         self.processed_vehicles = 0
-        self.active_tracking_count = 0
+        self.active_tracking_count = len(self.active_trackings)
         self.total_uwb_messages = 0
         self.processed_uwb_messages = 0
         
+        # === 실시간 지표 (get_statistics 값 + ESP32 시퀀스 누락) ===
+        self.metrics.counter('uwb_messages_total', '/uwb/pos 수신 수', fn=lambda: self.total_uwb_messages)
+        self.metrics.counter('uwb_processed_total', '/uwb/comp 발행 수', fn=lambda: self.processed_uwb_messages)
+        self.metrics.counter('parking_requests_total', '입차 요청 수', fn=lambda: self.total_parking_requests)
+        self.metrics.counter('processed_vehicles_total', '추적 시작한 차량 수', fn=lambda: self.processed_vehicles)
+        self.metrics.gauge('active_trackings', '추적 중인 태그 수', fn=lambda: len(self.active_trackings))
+        self.metrics.gauge('pending_exit_tags', '출차 대기 태그 수', fn=lambda: len(self.pending_exit_tags))
+        self.uwb_seq_gaps = SeqGapCounter(self.metrics.counter('uwb_seq_gaps_total', 'ESP32 frame_id 시퀀스 누락 수'))
+        
         self.get_logger().info(f'UWB Control System initialized')
         self.get_logger().info(f'Listening for auth requests on: {parking_input_topic}')
         self.get_logger().info(f'Listening for exit requests on: /parking/exit_req')
@@ -140,7 +178,7 @@ class UWBControlSystem(Node):
 
     def is_duplicate_request(self, vehicle_id):
         """중복 요청 체크 (5초 이내 같은 차량 요청 무시)"""
-        current_time = time.time()
+        current_time = self.get_clock().now().nanoseconds / 1e9  # ROS 시계 (기록 재생 시 시뮬레이션 시각)
         
         if vehicle_id in self.recent_requests:
             if current_time - self.recent_requests[vehicle_id] < 5.0:
@@ -150,6 +188,26 @@ class UWBControlSystem(Node):
         self.recent_requests[vehicle_id] = current_time
         return False
 
+    def restore_tracking_state(self):
+        """저널에서 추적 중인 차량/출차 대기 태그 복구 (vehicle_to_tag 는 추적 목록에서 다시 만듦)"""
+        for tag, tracking in self.journal.get('trackings').items():
+            self.active_trackings[int(tag)] = dict(tracking)
+            self.vehicle_to_tag[tracking["vehicle_id"]] = int(tag)
+        for tag, pending in self.journal.get('exits').items():
+            self.pending_exit_tags[int(tag)] = dict(pending)
+        self.get_logger().info(f'State journal restored: {len(self.active_trackings)} trackings, '
+                               f'{len(self.pending_exit_tags)} pending exits ({self.journal.describe()})')
+
+    def journal_tag(self, tag_id):
+        """tag 하나의 추적/출차 대기 상태를 저널에 반영 (목록에서 빠졌으면 삭제 기록)"""
+        if self.journal is None:
+            return
+        for table, state in (('trackings', self.active_trackings), ('exits', self.pending_exit_tags)):
+            if tag_id in state:
+                self.journal.put(table, tag_id, state[tag_id])
+            else:
+                self.journal.delete(table, tag_id)
+
     def parking_callback(self, msg):
         """주차 차단기로부터 차량 ID 수신 처리"""
         self.total_parking_requests += 1
@@ -293,6 +351,7 @@ class UWBControlSystem(Node):
                 "stage": "exit_requested",
                 "timestamp": time.time()
             }
+            self.journal_tag(tag_id)
             
             # 2단계: 출차 차단기 열기 명령 발행
             barrier_msg = String()
@@ -366,6 +425,7 @@ class UWBControlSystem(Node):
             # 출차 대기 목록에서 제거
             if tag_id in self.pending_exit_tags:
                 del self.pending_exit_tags[tag_id]
+            self.journal_tag(tag_id)
             
             self.active_tracking_count -= 1
             
@@ -401,6 +461,7 @@ class UWBControlSystem(Node):
                 "preferred": preferred,
                 "destination": destination
             }
+            self.journal_tag(tag_id)
             
             # UWB 모듈에 추적 시작 명령 전송
             # 메시지 형식: "vehicle_id,tag_id"
@@ -459,6 +520,7 @@ class UWBControlSystem(Node):
             if vehicle_id in self.vehicle_to_tag:
                 del self.vehicle_to_tag[vehicle_id]
             del self.active_trackings[tag_id]
+            self.journal_tag(tag_id)
             
             self.active_tracking_count -= 1
             
@@ -495,6 +557,7 @@ class UWBControlSystem(Node):
             del self.vehicle_to_tag[vehicle_id]
             if tag_id in self.active_trackings:
                 del self.active_trackings[tag_id]
+            self.journal_tag(tag_id)
             
             self.active_tracking_count -= 1
             
@@ -505,25 +568,36 @@ class UWBControlSystem(Node):
 
     def uwb_pos_callback(self, msg):
         """UWB 좌표 데이터 처리 - 미터를 mm로 변환하여 발행"""
+        recv_ns = mono_ns()
         self.total_uwb_messages += 1
         
         try:
-            # frame_id에서 tag_id 추출 (예: "tag_10" → 10)
+            # frame_id에서 tag_id, 시퀀스 추출 (예: "tag_10#42" → 10, 42 / "tag_10" → 10, None)
             frame_id = msg.header.frame_id
             if frame_id.startswith("tag_"):
-                tag_id = int(frame_id[4:])
+                tag_id, seq = parse_frame_id(frame_id)
+                self.uwb_seq_gaps.observe(tag_id, seq)
                 
                 # 활성 추적 목록에 있는지 확인
                 if tag_id in self.active_trackings:
                     # 핵심 수정: 처리된 좌표 발행 (미터를 mm로 변환)
                     output_msg = PointStamped()
-                    output_msg.header.stamp = self.get_clock().now().to_msg()
-                    output_msg.header.frame_id = frame_id  # 원본 frame_id 유지
+                    # 원점 시각 유지 - 브리지가 측정 시각을 못 붙였으면(stamp 0) 수신 시각이 원점
+                    origin_ns = stamp_to_ns(msg.header.stamp)
+                    if origin_ns:
+                        self.tracer.record_age('esp32->parser', origin_ns)
+                        output_msg.header.stamp = msg.header.stamp
+                    else:
+                        output_msg.header.stamp = self.get_clock().now().to_msg()
+                    if seq is None:
+                        seq = self.uwb_seq[tag_id] = self.uwb_seq.get(tag_id, 0) + 1
+                    output_msg.header.frame_id = format_frame_id(tag_id, seq)
                     output_msg.point.x = msg.point.x * 1000  # 미터 → mm 변환
                     output_msg.point.y = msg.point.y * 1000  # 미터 → mm 변환
                     output_msg.point.z = 0.0
                     
                     self.uwb_comp_publisher.publish(output_msg)
+                    self.tracer.record_since('parser', recv_ns)
                     self.processed_uwb_messages += 1
                     
                     vehicle_id = self.active_trackings[tag_id]["vehicle_id"]
@@ -599,6 +673,13 @@ class UWBControlSystem(Node):
         else:
             self.get_logger().info("No active trackings")
 
+    def destroy_node(self):
+        """종료 시 상태 저널을 스냅샷으로 정리"""
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        super().destroy_node()
+
 
 def main(args=None):
     rclpy.init(args=args)
@@ -622,6 +703,7 @@ def main(args=None):
         uwb_system.get_logger().info(f"  UWB success rate: {stats['uwb_success_rate']:.1f}%")
         
         uwb_system.list_active_trackings()
+        uwb_system.tracer.export()
         
         uwb_system.destroy_node()
         rclpy.shutdown()